@@ -60,10 +60,19 @@ class AIEnhancementEngine {
      * This creates a step-by-step reasoning process like GPT-4
      */
     createChainOfThoughtPrompt(userMessage, marketData, context) {
-        const cot = `
+        return `
 # ADVANCED CRYPTO ANALYSIS FRAMEWORK
 
-## Step 1: UNDERSTAND THE QUESTION
+${this.createQuestionAnalysisPrompt(userMessage, marketData)}
+
+${this.getAnalysisFrameworkPrompt()}`;
+    }
+
+    /**
+     * ❓ Steps 1-2: the request-specific part of the chain-of-thought prompt
+     */
+    createQuestionAnalysisPrompt(userMessage, marketData) {
+        return `## Step 1: UNDERSTAND THE QUESTION
 Question: "${userMessage}"
 - Intent: ${this.classifyIntent(userMessage)}
 - Coins Mentioned: ${this.extractCoins(userMessage)}
@@ -72,9 +81,15 @@ Question: "${userMessage}"
 - Risk Appetite: Aggressive short-term trader
 
 ## Step 2: GATHER REAL-TIME DATA
-${this.formatMarketData(marketData)}
+${this.formatMarketData(marketData)}`;
+    }
 
-## Step 3: SHORT-TERM TECHNICAL ANALYSIS
+    /**
+     * 📋 Steps 3-8 and rules: identical for every request, so it is built once
+     */
+    getAnalysisFrameworkPrompt() {
+        if (!this.analysisFrameworkPrompt) {
+            this.analysisFrameworkPrompt = `## Step 3: SHORT-TERM TECHNICAL ANALYSIS
 Apply these indicators for INTRADAY/SHORT-TERM trading:
 1. RSI (14) - Critical for scalping setups (overbought/oversold)
 2. Momentum (MACD 5min-15min timeframes)
@@ -145,7 +160,8 @@ Based on ALL above factors, provide QUICK TRADING SETUP:
 Use clear sections with emojis for readability. Be DETAILED and thorough.
 Provide complete analysis that helps users make informed decisions.
 `;
-        return cot;
+        }
+        return this.analysisFrameworkPrompt;
     }
 
     /**
@@ -256,32 +272,8 @@ Provide complete analysis that helps users make informed decisions.
     calculateRSI(prices, period = 14) {
         if (prices.length < period + 1) return null;
 
-        let gains = 0;
-        let losses = 0;
-
-        // Calculate initial average gain/loss
-        for (let i = 1; i <= period; i++) {
-            const change = prices[i] - prices[i - 1];
-            if (change > 0) gains += change;
-            else losses += Math.abs(change);
-        }
-
-        let avgGain = gains / period;
-        let avgLoss = losses / period;
-
-        // Calculate RSI using smoothed averages
-        for (let i = period + 1; i < prices.length; i++) {
-            const change = prices[i] - prices[i - 1];
-            const gain = change > 0 ? change : 0;
-            const loss = change < 0 ? Math.abs(change) : 0;
-
-            avgGain = (avgGain * (period - 1) + gain) / period;
-            avgLoss = (avgLoss * (period - 1) + loss) / period;
-        }
-
-        if (avgLoss === 0) return 100;
-        const rs = avgGain / avgLoss;
-        const rsi = 100 - (100 / (1 + rs));
+        // Wilder-smoothed RSI kernel, latest value
+        const rsi = IndicatorKernels.last(IndicatorKernels.rsi(IndicatorKernels.toFloat64(prices), period));
 
         return {
             value: rsi,
@@ -296,27 +288,18 @@ Provide complete analysis that helps users make informed decisions.
     calculateMACD(prices, fast = 12, slow = 26, signal = 9) {
         if (prices.length < slow) return null;
 
-        const emaFast = this.calculateEMA(prices, fast);
-        const emaSlow = this.calculateEMA(prices, slow);
-        const macdLine = emaFast - emaSlow;
-
-        // Calculate signal line (EMA of MACD)
-        const macdHistory = [];
-        for (let i = slow; i < prices.length; i++) {
-            const emaF = this.calculateEMA(prices.slice(0, i), fast);
-            const emaS = this.calculateEMA(prices.slice(0, i), slow);
-            macdHistory.push(emaF - emaS);
-        }
-
-        const signalLine = this.calculateEMA(macdHistory, signal);
-        const histogram = macdLine - signalLine;
+        // Single O(n) pass for MACD, signal and histogram series
+        const series = IndicatorKernels.macd(IndicatorKernels.toFloat64(prices), fast, slow, signal);
+        const macdLine = IndicatorKernels.last(series.macd);
+        const signalLine = IndicatorKernels.last(series.signal);
+        const histogram = IndicatorKernels.last(series.histogram);
 
         return {
             macd: macdLine,
             signal: signalLine,
             histogram: histogram,
             signal_type: histogram > 0 ? 'bullish' : 'bearish',
-            crossover: this.detectMACDCrossover(macdHistory, signal)
+            crossover: this.detectMACDCrossover(series.macd, series.signal)
         };
     }
 
@@ -325,31 +308,17 @@ Provide complete analysis that helps users make informed decisions.
      */
     calculateEMA(prices, period) {
         if (prices.length < period) return null;
-
-        const multiplier = 2 / (period + 1);
-        let ema = prices.slice(0, period).reduce((a, b) => a + b, 0) / period;
-
-        for (let i = period; i < prices.length; i++) {
-            ema = (prices[i] - ema) * multiplier + ema;
-        }
-
-        return ema;
+        return IndicatorKernels.last(IndicatorKernels.ema(IndicatorKernels.toFloat64(prices), period));
     }
 
     /**
      * 🎯 Calculate Volatility Metrics
      */
     calculateVolatility(prices) {
-        const closePrices = prices.map(p => p.close || p.price || p);
-        const returns = [];
-
-        for (let i = 1; i < closePrices.length; i++) {
-            returns.push((closePrices[i] - closePrices[i - 1]) / closePrices[i - 1]);
-        }
+        const closePrices = IndicatorKernels.toFloat64(prices);
 
-        const mean = returns.reduce((a, b) => a + b, 0) / returns.length;
-        const variance = returns.reduce((sum, r) => sum + Math.pow(r - mean, 2), 0) / returns.length;
-        const stdDev = Math.sqrt(variance);
+        // Welford std dev of returns - no intermediate returns array
+        const stdDev = IndicatorKernels.returnStats(closePrices).stdDev;
 
         // Bollinger Bands
         const sma20 = this.calculateSMA(closePrices, 20);
@@ -376,8 +345,7 @@ Provide complete analysis that helps users make informed decisions.
      */
     calculateSMA(prices, period) {
         if (prices.length < period) return null;
-        const slice = prices.slice(-period);
-        return slice.reduce((a, b) => a + b, 0) / period;
+        return IndicatorKernels.last(IndicatorKernels.sma(IndicatorKernels.toFloat64(prices), period));
     }
 
     /**
@@ -502,12 +470,13 @@ Provide complete analysis that helps users make informed decisions.
     calculateStochastic(prices, period = 14) {
         if (prices.length < period) return null;
 
-        const recent = prices.slice(-period);
-        const currentClose = recent[recent.length - 1].close || recent[recent.length - 1];
-        const highestHigh = Math.max(...recent.map(p => p.high || p));
-        const lowestLow = Math.min(...recent.map(p => p.low || p));
+        // Use candle highs/lows when present, otherwise the close series for all three
+        const closes = IndicatorKernels.toFloat64(prices);
+        const hasCandles = typeof prices[0] === 'object' && prices[0].high !== undefined;
+        const highs = hasCandles ? IndicatorKernels.toFloat64(prices, 'high') : closes;
+        const lows = hasCandles ? IndicatorKernels.toFloat64(prices, 'low') : closes;
 
-        const k = ((currentClose - lowestLow) / (highestHigh - lowestLow)) * 100;
+        const k = IndicatorKernels.last(IndicatorKernels.stochastic(highs, lows, closes, period));
 
         return {
             k: k,
@@ -647,12 +616,13 @@ Provide complete analysis that helps users make informed decisions.
         return Math.min(100, spread * 10); // 0-100 scale
     }
 
-    detectMACDCrossover(macdHistory, signalPeriod) {
-        if (macdHistory.length < signalPeriod + 2) return null;
-        const current = macdHistory[macdHistory.length - 1];
-        const previous = macdHistory[macdHistory.length - 2];
-        const signalCurrent = this.calculateEMA(macdHistory.slice(-signalPeriod), signalPeriod);
-        const signalPrevious = this.calculateEMA(macdHistory.slice(-signalPeriod - 1, -1), signalPeriod);
+    detectMACDCrossover(macdLine, signalLine) {
+        const n = macdLine.length;
+        if (n < 2 || !Number.isFinite(signalLine[n - 2])) return null;
+        const current = macdLine[n - 1];
+        const previous = macdLine[n - 2];
+        const signalCurrent = signalLine[n - 1];
+        const signalPrevious = signalLine[n - 2];
 
         if (current > signalCurrent && previous <= signalPrevious) {
             return 'bullish_crossover';
@@ -35,57 +35,33 @@
         console.log('🎉 Advanced AI features successfully integrated!');
     }
 
-    function enhanceSamCryptoAI() {
-        const proto = SamCryptoAI.prototype;
-
-        // Store original method
-        proto._originalCreateAdvancedSystemPrompt = proto.createAdvancedSystemPrompt;
-
-        /**
-         * 🧠 Enhanced System Prompt with Chain-of-Thought Reasoning
-         */
-        proto.createAdvancedSystemPrompt = function(marketData, newsData, intent, userMessage) {
-            console.log('🧠 Creating enhanced system prompt with chain-of-thought...');
-
-            // Get AI enhancer instance
-            const enhancer = window.aiEnhancer;
-
-            // Create chain-of-thought prompt
-            const cotPrompt = enhancer.createChainOfThoughtPrompt(
-                userMessage,
-                marketData,
-                {
-                    conversationContext: this.conversationContext,
-                    userProfile: this.userPreferences || {}
-                }
-            );
-
-            // Create enhanced technical analysis section
-            let technicalSection = '';
-            if (marketData && Object.keys(marketData).length > 0) {
-                technicalSection = this.createTechnicalAnalysisSection(marketData);
+    /**
+     * 🧱 Chain-of-thought prompt layer
+     * Replaces the base identity/market sections; the static framework and persona
+     * rules form a fixed prefix ahead of the per-request sections.
+     */
+    function registerPromptSections(builder) {
+        const enhancer = window.aiEnhancer;
+
+        builder.remove('core_identity', 'trading_rules', 'response_craft', 'portfolio', 'market_data', 'intent_guidance');
+
+        builder.register({
+            id: 'analysis_framework',
+            static: true,
+            order: 10,
+            required: true,
+            build() {
+                return `# ADVANCED CRYPTO ANALYSIS FRAMEWORK\n\n${enhancer.getAnalysisFrameworkPrompt()}`;
             }
+        });
 
-            // Build comprehensive prompt
-            const enhancedPrompt = `${cotPrompt}
-
-${technicalSection}
-
-## REAL-TIME NEWS & EVENTS:
-${newsData ? this.formatNewsData(newsData) : 'No recent news available'}
-
-## USER CONTEXT:
-- Trading Experience: ${this.userPreferences.experienceLevel || 'intermediate'}
-- Risk Tolerance: ${this.userPreferences.riskTolerance || 'moderate'}
-- Preferred Style: ${this.userPreferences.tradingStyle || 'balanced'}
-- Recent Topics: ${this.conversationContext.keyPoints.slice(0, 5).join(', ') || 'none'}
-
-## CONVERSATION MEMORY:
-${this.getContextualPromptEnhancement()}
-
----
-
-You are SamCrypto AI — a concise, professional crypto assistant modeled after ChatGPT.
+        builder.register({
+            id: 'persona_rules',
+            static: true,
+            order: 40,
+            required: true,
+            build() {
+                return `You are SamCrypto AI — a concise, professional crypto assistant modeled after ChatGPT.
 
 RESPONSE RULES:
 - Be concise: 1–4 short paragraphs max. No filler.
@@ -94,69 +70,132 @@ RESPONSE RULES:
 - Provide precise trading insights: levels, entries/stops/targets, risk.
 - Do not ask questions; respond directly to the user’s request.
 - No emojis unless the user used them first.
-- Maintain a calm, factual tone. End with a complete answer.
-`;
+- Maintain a calm, factual tone. End with a complete answer.`;
+            }
+        });
+
+        builder.register({
+            id: 'question_analysis',
+            order: 100,
+            required: true,
+            build(ctx) {
+                return enhancer.createQuestionAnalysisPrompt(ctx.userMessage, ctx.marketData);
+            }
+        });
+
+        builder.register({
+            id: 'technical_analysis',
+            order: 110,
+            priority: 70,
+            truncate: true,
+            build(ctx) {
+                if (!ctx.marketData || Object.keys(ctx.marketData).length === 0) return '';
+                return this.createTechnicalAnalysisSection(ctx.marketData);
+            }
+        });
+
+        builder.register({
+            id: 'news',
+            order: 130,
+            priority: 40,
+            build(ctx) {
+                const listed = new Set((ctx.newsData || []).slice(0, 5).map(article => article.title));
+                const coinNews = this.createCoinNewsPromptSection(ctx.userMessage, listed);
+                return `## REAL-TIME NEWS & EVENTS:\n${ctx.newsData ? this.formatNewsData(ctx.newsData) : 'No recent news available'}` +
+                    (coinNews ? `\n\n${coinNews}` : '');
+            }
+        });
+
+        builder.register({
+            id: 'user_context',
+            order: 140,
+            priority: 60,
+            build() {
+                return `## USER CONTEXT:
+- Trading Experience: ${this.userPreferences.experienceLevel || 'intermediate'}
+- Risk Tolerance: ${this.userPreferences.riskTolerance || 'moderate'}
+- Preferred Style: ${this.userPreferences.tradingStyle || 'balanced'}
+- Recent Topics: ${this.conversationContext.keyPoints.slice(0, 5).join(', ') || 'none'}`;
+            }
+        });
 
-            return enhancedPrompt;
-        };
+        console.log('✅ Chain-of-thought prompt layer registered');
+    }
+
+    function enhanceSamCryptoAI() {
+        const proto = SamCryptoAI.prototype;
+
+        // Replace the base prompt layer with the chain-of-thought layer
+        registerPromptSections(window.promptBuilder);
 
         /**
          * 📊 Create Technical Analysis Section
          */
         proto.createTechnicalAnalysisSection = function(marketData) {
-            const enhancer = window.aiEnhancer;
             let section = '\n## TECHNICAL ANALYSIS:\n\n';
 
             for (const [coinId, data] of Object.entries(marketData)) {
                 if (!data || typeof data !== 'object') continue;
 
-                section += `### ${coinId.toUpperCase()} Technical Indicators:\n\n`;
-
-                // Calculate technical metrics - support multiple field names
-                const price = data.price_usd || data.price || data.current_price || 0;
-                const change24h = data.change_24h || data.price_change_24h || data.price_change_percentage_24h || 0;
-                const volume = data.volume_24h || data.volume || data.total_volume || 0;
-                const marketCap = data.market_cap_usd || data.market_cap || 0;
-                const high24h = data.high_24h || price * 1.05;
-                const low24h = data.low_24h || price * 0.95;
-
-                // Calculate quick technical indicators
-                const volatility = ((high24h - low24h) / price) * 100;
-                const volumeRank = this.getVolumeRank(volume);
-                const trendStrength = Math.abs(change24h);
-
-                // Determine trend
-                let trend = 'Neutral';
-                let trendEmoji = '➡️';
-                if (change24h > 3) {
-                    trend = 'Strong Bullish';
-                    trendEmoji = '📈';
-                } else if (change24h > 0) {
-                    trend = 'Bullish';
-                    trendEmoji = '📊';
-                } else if (change24h < -3) {
-                    trend = 'Strong Bearish';
-                    trendEmoji = '📉';
-                } else if (change24h < 0) {
-                    trend = 'Bearish';
-                    trendEmoji = '📊';
-                }
-
-                // Calculate simple RSI estimate from price change
-                const rsiEstimate = 50 + (change24h * 2); // Rough approximation
-                const rsiClamped = Math.max(0, Math.min(100, rsiEstimate));
-                let rsiSignal = 'Neutral';
-                if (rsiClamped > 70) rsiSignal = 'Overbought ⚠️';
-                else if (rsiClamped < 30) rsiSignal = 'Oversold 🎯';
-
-                // Calculate support and resistance levels
-                const support1 = (low24h * 0.98).toFixed(2);
-                const support2 = (low24h * 0.96).toFixed(2);
-                const resistance1 = (high24h * 1.02).toFixed(2);
-                const resistance2 = (high24h * 1.04).toFixed(2);
-
-                // Build detailed technical section
-                section += `
+                // Cached per coin until its market data changes
+                section += this.promptBuilder.memo('technical', `${coinId}|${PromptBuilder.dataVersion(data)}`,
+                    () => this.formatTechnicalAnalysisBlock(coinId, data));
+            }
+
+            return section;
+        };
+
+        /**
+         * 📈 Technical Analysis Block for One Coin
+         */
+        proto.formatTechnicalAnalysisBlock = function(coinId, data) {
+            let block = `### ${coinId.toUpperCase()} Technical Indicators:\n\n`;
+
+            // Calculate technical metrics - support multiple field names
+            const price = data.price_usd || data.price || data.current_price || 0;
+            const change24h = data.change_24h || data.price_change_24h || data.price_change_percentage_24h || 0;
+            const volume = data.volume_24h || data.volume || data.total_volume || 0;
+            const marketCap = data.market_cap_usd || data.market_cap || 0;
+            const high24h = data.high_24h || price * 1.05;
+            const low24h = data.low_24h || price * 0.95;
+
+            // Calculate quick technical indicators
+            const volatility = ((high24h - low24h) / price) * 100;
+            const volumeRank = this.getVolumeRank(volume);
+            const trendStrength = Math.abs(change24h);
+
+            // Determine trend
+            let trend = 'Neutral';
+            let trendEmoji = '➡️';
+            if (change24h > 3) {
+                trend = 'Strong Bullish';
+                trendEmoji = '📈';
+            } else if (change24h > 0) {
+                trend = 'Bullish';
+                trendEmoji = '📊';
+            } else if (change24h < -3) {
+                trend = 'Strong Bearish';
+                trendEmoji = '📉';
+            } else if (change24h < 0) {
+                trend = 'Bearish';
+                trendEmoji = '📊';
+            }
+
+            // Calculate simple RSI estimate from price change
+            const rsiEstimate = 50 + (change24h * 2); // Rough approximation
+            const rsiClamped = Math.max(0, Math.min(100, rsiEstimate));
+            let rsiSignal = 'Neutral';
+            if (rsiClamped > 70) rsiSignal = 'Overbought ⚠️';
+            else if (rsiClamped < 30) rsiSignal = 'Oversold 🎯';
+
+            // Calculate support and resistance levels
+            const support1 = (low24h * 0.98).toFixed(2);
+            const support2 = (low24h * 0.96).toFixed(2);
+            const resistance1 = (high24h * 1.02).toFixed(2);
+            const resistance2 = (high24h * 1.04).toFixed(2);
+
+            // Build detailed technical section
+            block += `
 **Price Action:**
 - Current: $${price.toFixed(2)}
 - 24h Range: $${low24h.toFixed(2)} - $${high24h.toFixed(2)}
@@ -185,9 +224,8 @@ ${this.generateDetailedSignals(change24h, rsiClamped, volatility)}
 
 ---
 `;
-            }
 
-            return section;
+            return block;
         };
 
         /**
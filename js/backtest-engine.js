@@ -0,0 +1,456 @@
+// 🧪 Backtest Engine - Worker-pool backtesting with parameter sweeps
+// The same file runs in two places:
+// - page: BacktestEngine manages a pool of workers and ranks sweep results
+// - worker: BacktestCore executes strategies on transferred Float64Array prices
+
+class BacktestCore {
+    /**
+     * ⚙️ Default strategy parameters (the thresholds the backtester always used)
+     */
+    static defaultParams(strategy) {
+        switch (strategy) {
+            case 'rsi': return { period: 14, oversold: 30, overbought: 70 };
+            case 'macd': return { fast: 12, slow: 26, signal: 9 };
+            case 'ema': return { fast: 12, slow: 26 };
+            case 'bollinger': return { period: 20, stdDev: 2 };
+            default: return {};
+        }
+    }
+
+    /**
+     * 📐 Compute only the indicator series the strategy needs
+     */
+    static computeIndicators(strategy, prices, params) {
+        const K = self.IndicatorKernels;
+        switch (strategy) {
+            case 'rsi': return { rsi: K.rsi(prices, params.period) };
+            case 'macd': return K.macd(prices, params.fast, params.slow, params.signal);
+            case 'ema': return { fast: K.ema(prices, params.fast), slow: K.ema(prices, params.slow) };
+            case 'bollinger': return K.bollinger(prices, params.period, params.stdDev);
+            default: throw new Error(`Unknown strategy: ${strategy}`);
+        }
+    }
+
+    static signalAt(strategy, ind, prices, params, i) {
+        // Series are index-aligned with prices; NaN comparisons fall through to HOLD
+        switch (strategy) {
+            case 'rsi':
+                if (ind.rsi[i] < params.oversold) return 'BUY';
+                if (ind.rsi[i] > params.overbought) return 'SELL';
+                break;
+            case 'macd':
+                if (ind.macd[i] > ind.signal[i] && ind.macd[i - 1] <= ind.signal[i - 1]) return 'BUY';
+                if (ind.macd[i] < ind.signal[i] && ind.macd[i - 1] >= ind.signal[i - 1]) return 'SELL';
+                break;
+            case 'ema':
+                if (ind.fast[i] > ind.slow[i] && ind.fast[i - 1] <= ind.slow[i - 1]) return 'BUY';
+                if (ind.fast[i] < ind.slow[i] && ind.fast[i - 1] >= ind.slow[i - 1]) return 'SELL';
+                break;
+            case 'bollinger':
+                if (prices[i] <= ind.lower[i]) return 'BUY';
+                if (prices[i] >= ind.upper[i]) return 'SELL';
+                break;
+        }
+        return 'HOLD';
+    }
+
+    /**
+     * 🚀 Run one long-only strategy over a price series
+     */
+    static execute(strategy, prices, timestamps, initialCapital, params = {}) {
+        params = { ...BacktestCore.defaultParams(strategy), ...params };
+        const indicators = BacktestCore.computeIndicators(strategy, prices, params);
+        const n = prices.length;
+
+        const trades = [];
+        let cash = initialCapital;
+        let shares = 0;
+        let entryCapital = 0;
+        let wins = 0;
+        let roundTrips = 0;
+
+        // Mark-to-market equity stats (Welford over per-bar returns)
+        let peakEquity = initialCapital;
+        let maxDrawdown = 0;
+        let prevEquity = initialCapital;
+        let count = 0;
+        let mean = 0;
+        let m2 = 0;
+
+        for (let i = 1; i < n; i++) {
+            const price = prices[i];
+            const signal = BacktestCore.signalAt(strategy, indicators, prices, params, i);
+
+            if (signal === 'BUY' && shares === 0) {
+                shares = cash / price;
+                entryCapital = cash;
+                cash = 0;
+                trades.push({ type: 'BUY', timestamp: timestamps[i], price: price, shares: shares, capital: entryCapital });
+            } else if (signal === 'SELL' && shares > 0) {
+                cash = shares * price;
+                trades.push({ type: 'SELL', timestamp: timestamps[i], price: price, shares: shares, capital: cash });
+                roundTrips++;
+                if (cash > entryCapital) wins++;
+                shares = 0;
+            }
+
+            const equity = cash + shares * price;
+            if (equity > peakEquity) peakEquity = equity;
+            const drawdown = ((peakEquity - equity) / peakEquity) * 100;
+            if (drawdown > maxDrawdown) maxDrawdown = drawdown;
+
+            const r = (equity - prevEquity) / prevEquity;
+            prevEquity = equity;
+            count++;
+            const delta = r - mean;
+            mean += delta / count;
+            m2 += delta * (r - mean);
+        }
+
+        // Close any remaining position
+        if (shares > 0) {
+            const finalPrice = prices[n - 1];
+            cash = shares * finalPrice;
+            trades.push({ type: 'SELL', timestamp: timestamps[n - 1], price: finalPrice, shares: shares, capital: cash });
+            roundTrips++;
+            if (cash > entryCapital) wins++;
+            shares = 0;
+        }
+
+        // Annualize per-bar Sharpe using the series' own bar spacing
+        const stdDev = count > 0 ? Math.sqrt(m2 / count) : 0;
+        const barMs = n > 1 ? (timestamps[n - 1] - timestamps[0]) / (n - 1) : 86400000;
+        const barsPerYear = barMs > 0 ? (365 * 86400000) / barMs : 365;
+        const sharpeRatio = stdDev > 0 ? (mean / stdDev) * Math.sqrt(barsPerYear) : 0;
+
+        return {
+            strategy: strategy,
+            params: params,
+            totalReturn: ((cash - initialCapital) / initialCapital) * 100,
+            winRate: roundTrips > 0 ? (wins / roundTrips) * 100 : 0,
+            maxDrawdown: maxDrawdown,
+            sharpeRatio: sharpeRatio,
+            totalTrades: roundTrips,
+            finalCapital: cash,
+            trades: trades,
+            initialCapital: initialCapital
+        };
+    }
+}
+
+// ===== WORKER SIDE =====
+if (typeof WorkerGlobalScope !== 'undefined' && self instanceof WorkerGlobalScope) {
+    importScripts('indicator-kernels.js');
+
+    // Price series loaded into this worker, keyed by dataset id
+    const datasets = new Map();
+
+    self.onmessage = (event) => {
+        const message = event.data;
+        try {
+            if (message.type === 'load') {
+                datasets.set(message.datasetId, { prices: message.prices, timestamps: message.timestamps });
+                self.postMessage({ type: 'loaded', jobId: message.jobId });
+            } else if (message.type === 'unload') {
+                datasets.delete(message.datasetId);
+            } else if (message.type === 'run') {
+                const dataset = datasets.get(message.datasetId);
+                if (!dataset) throw new Error(`Dataset ${message.datasetId} not loaded`);
+
+                const result = BacktestCore.execute(message.strategy, dataset.prices, dataset.timestamps, message.initialCapital, message.params);
+
+                // Sweeps only need the metrics, not every trade
+                if (message.summaryOnly) {
+                    result.trades = result.trades.slice(-6);
+                }
+                self.postMessage({ type: 'result', jobId: message.jobId, result: result });
+            }
+        } catch (error) {
+            self.postMessage({ type: 'error', jobId: message.jobId, error: error.message });
+        }
+    };
+}
+
+// ===== PAGE SIDE =====
+class BacktestEngine {
+    constructor(options = {}) {
+        this.workerUrl = options.workerUrl || 'js/backtest-engine.js';
+        this.poolSize = options.poolSize ||
+            Math.max(1, Math.min(4, (navigator.hardwareConcurrency || 2) - 1));
+
+        this.workers = [];
+        this.queue = [];
+        this.pending = new Map();
+        this.nextJobId = 1;
+        this.nextDatasetId = 1;
+        this.workersAvailable = typeof Worker !== 'undefined';
+    }
+
+    /**
+     * 🏊 Lazily start the worker pool
+     */
+    ensurePool() {
+        if (!this.workersAvailable || this.workers.length > 0) return this.workersAvailable;
+
+        try {
+            for (let i = 0; i < this.poolSize; i++) {
+                const worker = new Worker(this.workerUrl);
+                worker.onmessage = (event) => this.handleMessage(worker, event.data);
+                worker.onerror = (event) => this.handleWorkerError(event);
+                this.workers.push(worker);
+            }
+            console.log(`🧪 Backtest worker pool started (${this.poolSize} workers)`);
+        } catch (error) {
+            // e.g. file:// origins block workers - fall back to the main thread
+            console.warn('⚠️ Backtest workers unavailable, running on main thread:', error.message);
+            this.workersAvailable = false;
+            this.workers = [];
+        }
+        return this.workersAvailable;
+    }
+
+    /**
+     * 💥 A worker failed to load or crashed: drop the pool and fail its jobs over to the main thread
+     */
+    handleWorkerError(event) {
+        if (!this.workersAvailable) return;
+        console.error('❌ Backtest worker error, falling back to main thread:', event.message);
+        if (event.preventDefault) event.preventDefault();
+
+        this.workersAvailable = false;
+        this.terminate(this.workerFailure(event.message));
+    }
+
+    workerFailure(reason = 'Backtest workers unavailable') {
+        const error = new Error(reason);
+        error.workerFailure = true;
+        return error;
+    }
+
+    handleMessage(worker, message) {
+        const job = this.pending.get(message.jobId);
+        if (job) {
+            this.pending.delete(message.jobId);
+            if (message.type === 'error') {
+                job.reject(new Error(message.error));
+            } else {
+                job.resolve(message.result);
+            }
+        }
+
+        // Jobs are pinned to the worker holding their dataset
+        const next = this.queue.findIndex(queued => queued.worker === worker);
+        if (next !== -1) {
+            const [queued] = this.queue.splice(next, 1);
+            this.dispatch(queued);
+        } else {
+            worker.busy = false;
+        }
+    }
+
+    dispatch(job) {
+        job.worker.busy = true;
+        this.pending.set(job.message.jobId, job);
+        job.worker.postMessage(job.message, job.transfer || []);
+    }
+
+    post(worker, message, transfer = []) {
+        return new Promise((resolve, reject) => {
+            if (!this.workersAvailable) {
+                reject(this.workerFailure());
+                return;
+            }
+            message.jobId = this.nextJobId++;
+            const job = { worker, message, transfer, resolve, reject };
+            if (worker.busy) {
+                this.queue.push(job);
+            } else {
+                this.dispatch(job);
+            }
+        });
+    }
+
+    /**
+     * 📦 Normalize historical data into Float64Array columns
+     */
+    toColumns(historicalData) {
+        if (historicalData.prices instanceof Float64Array) {
+            return { prices: historicalData.prices, timestamps: historicalData.timestamps };
+        }
+
+        const n = historicalData.length;
+        const prices = new Float64Array(n);
+        const timestamps = new Float64Array(n);
+        for (let i = 0; i < n; i++) {
+            prices[i] = historicalData[i].price;
+            timestamps[i] = historicalData[i].timestamp;
+        }
+        return { prices, timestamps };
+    }
+
+    /**
+     * 📤 Load a price series into a worker (copy transferred zero-copy)
+     */
+    async loadDataset(worker, columns) {
+        const datasetId = this.nextDatasetId++;
+        const prices = columns.prices.slice();
+        const timestamps = columns.timestamps.slice();
+        await this.post(worker, { type: 'load', datasetId, prices, timestamps }, [prices.buffer, timestamps.buffer]);
+        return datasetId;
+    }
+
+    withDates(result) {
+        result.trades = result.trades.map(trade => ({ ...trade, date: new Date(trade.timestamp) }));
+        return result;
+    }
+
+    /**
+     * 🚀 Run a single backtest off the main thread
+     */
+    async run(strategy, historicalData, initialCapital, params = {}) {
+        const columns = this.toColumns(historicalData);
+
+        if (!this.ensurePool()) {
+            return this.withDates(BacktestCore.execute(strategy, columns.prices, columns.timestamps, initialCapital, params));
+        }
+
+        const worker = this.workers.find(w => !w.busy) || this.workers[0];
+        let datasetId = null;
+        try {
+            datasetId = await this.loadDataset(worker, columns);
+            const result = await this.post(worker, { type: 'run', datasetId, strategy, params, initialCapital });
+            return this.withDates(result);
+        } catch (error) {
+            if (!error.workerFailure) throw error;
+            return this.withDates(BacktestCore.execute(strategy, columns.prices, columns.timestamps, initialCapital, params));
+        } finally {
+            if (datasetId !== null) worker.postMessage({ type: 'unload', datasetId });
+        }
+    }
+
+    /**
+     * 🧮 Expand { period: [10, 14], oversold: [25, 30] } into every combination
+     */
+    expandGrid(grid) {
+        return Object.entries(grid).reduce((combos, [key, values]) => {
+            const list = Array.isArray(values) ? values : [values];
+            const expanded = [];
+            combos.forEach(combo => list.forEach(value => expanded.push({ ...combo, [key]: value })));
+            return expanded;
+        }, [{}]);
+    }
+
+    /**
+     * 🏆 Rank by Sharpe (desc), then max drawdown (asc)
+     */
+    rankResults(results) {
+        return [...results].sort((a, b) =>
+            (b.sharpeRatio - a.sharpeRatio) || (a.maxDrawdown - b.maxDrawdown)
+        );
+    }
+
+    /**
+     * 🔬 Parameter sweep: every grid combination × every coin, in parallel
+     * @param {Object} options
+     * @param {Object} options.datasets - { coinId: historicalData | {prices, timestamps} }
+     * @param {Object} options.strategies - { rsi: { period: [...], oversold: [...] }, ... }
+     * @param {number} options.initialCapital
+     * @param {Function} [options.onProgress] - (result, ranked, done, total) per finished run
+     */
+    async sweep({ datasets, strategies, initialCapital, onProgress = null }) {
+        const jobs = [];
+        for (const [strategy, grid] of Object.entries(strategies)) {
+            for (const params of this.expandGrid(grid)) {
+                for (const coin of Object.keys(datasets)) {
+                    jobs.push({ coin, strategy, params });
+                }
+            }
+        }
+
+        const results = [];
+        const total = jobs.length;
+        console.log(`🔬 Sweeping ${total} backtests across ${Object.keys(datasets).length} coins...`);
+
+        const report = (coin, result) => {
+            result.coin = coin;
+            results.push(result);
+            if (onProgress) onProgress(result, this.rankResults(results), results.length, total);
+        };
+
+        if (!this.ensurePool()) {
+            await this.sweepOnMainThread(jobs, datasets, initialCapital, report);
+            return this.rankResults(results);
+        }
+
+        // Every worker gets its own copy of each coin's series, then jobs round-robin
+        const workers = [...this.workers];
+        const datasetIds = workers.map(() => ({}));
+        const finished = new Set();
+
+        try {
+            await Promise.all(workers.map(async (worker, i) => {
+                for (const [coin, data] of Object.entries(datasets)) {
+                    datasetIds[i][coin] = await this.loadDataset(worker, this.toColumns(data));
+                }
+            }));
+
+            await Promise.all(jobs.map((job, index) => {
+                const workerIndex = index % workers.length;
+                return this.post(workers[workerIndex], {
+                    type: 'run',
+                    datasetId: datasetIds[workerIndex][job.coin],
+                    strategy: job.strategy,
+                    params: job.params,
+                    initialCapital: initialCapital,
+                    summaryOnly: true
+                }).then(result => {
+                    finished.add(job);
+                    report(job.coin, result);
+                }).catch(error => {
+                    if (!error.workerFailure) console.error(`Sweep job failed (${job.coin} ${job.strategy}):`, error);
+                });
+            }));
+        } catch (error) {
+            if (!error.workerFailure) throw error;
+        } finally {
+            workers.forEach((worker, i) => {
+                Object.values(datasetIds[i]).forEach(datasetId => worker.postMessage({ type: 'unload', datasetId }));
+            });
+        }
+
+        // The pool died mid-sweep: finish whatever it didn't
+        if (!this.workersAvailable) {
+            await this.sweepOnMainThread(jobs.filter(job => !finished.has(job)), datasets, initialCapital, report);
+        }
+
+        return this.rankResults(results);
+    }
+
+    /**
+     * 🐢 Main-thread fallback: yield between runs so the UI stays responsive
+     */
+    async sweepOnMainThread(jobs, datasets, initialCapital, report) {
+        const columnsByCoin = {};
+        for (const [coin, data] of Object.entries(datasets)) columnsByCoin[coin] = this.toColumns(data);
+        for (const job of jobs) {
+            const columns = columnsByCoin[job.coin];
+            report(job.coin, BacktestCore.execute(job.strategy, columns.prices, columns.timestamps, initialCapital, job.params));
+            await new Promise(resolve => setTimeout(resolve, 0));
+        }
+    }
+
+    terminate(error = new Error('Backtest engine terminated')) {
+        this.workers.forEach(worker => worker.terminate());
+        this.workers = [];
+        this.queue.forEach(job => job.reject(error));
+        this.queue = [];
+        this.pending.forEach(job => job.reject(error));
+        this.pending.clear();
+    }
+}
+
+// Export for use in main application
+if (typeof window !== 'undefined') {
+    window.BacktestCore = BacktestCore;
+    window.BacktestEngine = BacktestEngine;
+}
@@ -0,0 +1,240 @@
+// 🗄️ Cache Manager - Shared TTL + LRU cache with stale-while-revalidate
+// One bounded cache for SamCryptoAI and DataAggregator: per-namespace TTLs,
+// entry-count and byte budgets, and hit/miss/eviction counters
+
+class CacheManager {
+    constructor(options = {}) {
+        // Global budgets - least recently used entries are evicted first
+        this.maxEntries = options.maxEntries || 500;
+        this.maxBytes = options.maxBytes || 8 * 1024 * 1024; // ~8MB
+
+        // Namespace config: { ttl, staleTTL } in milliseconds
+        this.namespaces = new Map();
+        this.defaultTTL = options.defaultTTL || 30000;
+
+        // Map keeps insertion order - re-inserting on access makes it an LRU list
+        this.entries = new Map();
+        this.totalBytes = 0;
+
+        // In-flight fetches so concurrent misses share one request
+        this.inflight = new Map();
+
+        this.stats = {
+            hits: 0,
+            staleHits: 0,
+            misses: 0,
+            evictions: 0,
+            expirations: 0,
+            revalidations: 0
+        };
+
+        // Expired entries are swept periodically, not only when read again
+        this.sweepInterval = setInterval(() => this.sweep(), options.sweepInterval || 60000);
+    }
+
+    /**
+     * ⚙️ Configure TTLs for a namespace
+     */
+    defineNamespace(name, { ttl, staleTTL = 0 }) {
+        this.namespaces.set(name, { ttl, staleTTL });
+    }
+
+    getNamespaceConfig(namespace) {
+        return this.namespaces.get(namespace) || { ttl: this.defaultTTL, staleTTL: 0 };
+    }
+
+    fullKey(namespace, key) {
+        return `${namespace}:${key}`;
+    }
+
+    /**
+     * 🔍 Look up an entry: { data, stale } or null (counts toward stats)
+     */
+    lookup(namespace, key) {
+        const result = this.read(namespace, key);
+        if (!result) this.stats.misses++;
+        else if (result.stale) this.stats.staleHits++;
+        else this.stats.hits++;
+        return result;
+    }
+
+    /**
+     * 📦 Fresh value or null (stale entries are treated - and counted - as misses)
+     */
+    get(namespace, key) {
+        const result = this.read(namespace, key);
+        if (!result || result.stale) {
+            this.stats.misses++;
+            return null;
+        }
+        this.stats.hits++;
+        return result.data;
+    }
+
+    // Entry within its stale window, touched for LRU; expired entries are dropped. No hit/miss stats.
+    read(namespace, key) {
+        const fullKey = this.fullKey(namespace, key);
+        const entry = this.entries.get(fullKey);
+        if (!entry) return null;
+
+        const age = Date.now() - entry.timestamp;
+        const { ttl, staleTTL } = this.getNamespaceConfig(namespace);
+
+        if (age > ttl + staleTTL) {
+            this.remove(fullKey);
+            this.stats.expirations++;
+            return null;
+        }
+
+        // Touch for LRU ordering
+        this.entries.delete(fullKey);
+        this.entries.set(fullKey, entry);
+
+        return { data: entry.data, stale: age > ttl };
+    }
+
+    set(namespace, key, data) {
+        const fullKey = this.fullKey(namespace, key);
+        if (this.entries.has(fullKey)) {
+            this.remove(fullKey);
+        }
+
+        const bytes = this.estimateBytes(data);
+        this.entries.set(fullKey, {
+            data: data,
+            namespace: namespace,
+            timestamp: Date.now(),
+            bytes: bytes
+        });
+        this.totalBytes += bytes;
+
+        this.enforceBudget();
+    }
+
+    /**
+     * ⚡ Stale-while-revalidate read-through
+     * Fresh → cached value. Stale → cached value now, refresh in background.
+     * Miss → fetch (shared with any concurrent caller for the same key).
+     */
+    async getOrFetch(namespace, key, fetcher) {
+        const cached = this.lookup(namespace, key);
+
+        if (cached && !cached.stale) {
+            return cached.data;
+        }
+
+        if (cached && cached.stale) {
+            this.revalidate(namespace, key, fetcher).catch(error => {
+                console.warn(`⚠️ Background refresh failed for ${namespace}:${key}:`, error?.message || error);
+            });
+            return cached.data;
+        }
+
+        return this.revalidate(namespace, key, fetcher);
+    }
+
+    revalidate(namespace, key, fetcher) {
+        const fullKey = this.fullKey(namespace, key);
+        if (this.inflight.has(fullKey)) {
+            return this.inflight.get(fullKey);
+        }
+
+        this.stats.revalidations++;
+        const promise = (async () => {
+            try {
+                const data = await fetcher();
+                if (data !== null && data !== undefined) {
+                    this.set(namespace, key, data);
+                }
+                return data;
+            } finally {
+                this.inflight.delete(fullKey);
+            }
+        })();
+
+        this.inflight.set(fullKey, promise);
+        return promise;
+    }
+
+    remove(fullKey) {
+        const entry = this.entries.get(fullKey);
+        if (!entry) return;
+        this.totalBytes -= entry.bytes;
+        this.entries.delete(fullKey);
+    }
+
+    delete(namespace, key) {
+        this.remove(this.fullKey(namespace, key));
+    }
+
+    enforceBudget() {
+        while (this.entries.size > this.maxEntries || this.totalBytes > this.maxBytes) {
+            const oldestKey = this.entries.keys().next().value;
+            if (oldestKey === undefined) break;
+            this.remove(oldestKey);
+            this.stats.evictions++;
+        }
+    }
+
+    /**
+     * 🧹 Drop entries past their stale window
+     */
+    sweep() {
+        const now = Date.now();
+        for (const [fullKey, entry] of this.entries) {
+            const { ttl, staleTTL } = this.getNamespaceConfig(entry.namespace);
+            if (now - entry.timestamp > ttl + staleTTL) {
+                this.remove(fullKey);
+                this.stats.expirations++;
+            }
+        }
+    }
+
+    clear(namespace = null) {
+        if (!namespace) {
+            this.entries.clear();
+            this.totalBytes = 0;
+            return;
+        }
+        for (const [fullKey, entry] of this.entries) {
+            if (entry.namespace === namespace) this.remove(fullKey);
+        }
+    }
+
+    size(namespace = null) {
+        if (!namespace) return this.entries.size;
+        let count = 0;
+        for (const entry of this.entries.values()) {
+            if (entry.namespace === namespace) count++;
+        }
+        return count;
+    }
+
+    estimateBytes(data) {
+        try {
+            // UTF-16: ~2 bytes per character
+            return (JSON.stringify(data)?.length || 0) * 2;
+        } catch (error) {
+            return 1024;
+        }
+    }
+
+    /**
+     * 📊 Counters + usage
+     */
+    getStats() {
+        const lookups = this.stats.hits + this.stats.staleHits + this.stats.misses;
+        return {
+            ...this.stats,
+            entries: this.entries.size,
+            bytes: this.totalBytes,
+            maxEntries: this.maxEntries,
+            maxBytes: this.maxBytes,
+            hitRate: lookups > 0 ? (this.stats.hits + this.stats.staleHits) / lookups : 0
+        };
+    }
+}
+
+// Export shared instance for use across modules
+window.CacheManager = CacheManager;
+window.cacheManager = new CacheManager();
@@ -0,0 +1,475 @@
+// 📉 Chart Renderer - Downsampled, off-main-thread canvas charts
+// The same file runs in two places:
+// - page: ChartRenderer hands each canvas to a worker via OffscreenCanvas
+//   (or keeps drawing on the main thread where that is unsupported)
+// - worker: ChartCore downsamples series to the chart's pixel width (LTTB),
+//   draws them, and redraws only the tail of the line when a point is appended
+
+class ChartCore {
+    constructor(canvas) {
+        this.canvas = canvas;
+        this.ctx = canvas.getContext('2d');
+        this.padding = 20;
+
+        // Headroom kept right of the newest point so appends rarely need a full redraw
+        this.headroom = 0.02;
+
+        // Line chart state: window, value bounds and the rendered (downsampled) points
+        this.line = null;
+        this.span = null;
+    }
+
+    handle(message) {
+        switch (message.type) {
+            case 'line': return this.renderLine(message.spec);
+            case 'append': return this.appendPoint(message.point);
+            case 'pie': return this.renderPie(message.slices);
+        }
+    }
+
+    /**
+     * 📐 Largest-Triangle-Three-Buckets: keep `threshold` points that preserve the shape
+     */
+    static lttb(times, values, threshold) {
+        const n = values.length;
+        if (threshold >= n || threshold < 3) {
+            return { times: Float64Array.from(times), values: Float64Array.from(values) };
+        }
+
+        const sampledTimes = new Float64Array(threshold);
+        const sampledValues = new Float64Array(threshold);
+        const every = (n - 2) / (threshold - 2);
+
+        let previous = 0;
+        sampledTimes[0] = times[0];
+        sampledValues[0] = values[0];
+
+        for (let i = 0; i < threshold - 2; i++) {
+            // Average of the next bucket is the third triangle corner
+            const avgStart = Math.floor((i + 1) * every) + 1;
+            const avgEnd = Math.min(Math.floor((i + 2) * every) + 1, n);
+            let avgTime = 0;
+            let avgValue = 0;
+            for (let j = avgStart; j < avgEnd; j++) {
+                avgTime += times[j];
+                avgValue += values[j];
+            }
+            avgTime /= (avgEnd - avgStart);
+            avgValue /= (avgEnd - avgStart);
+
+            const rangeStart = Math.floor(i * every) + 1;
+            const rangeEnd = Math.floor((i + 1) * every) + 1;
+            let maxArea = -1;
+            let selected = rangeStart;
+            for (let j = rangeStart; j < rangeEnd; j++) {
+                const area = Math.abs(
+                    (times[previous] - avgTime) * (values[j] - values[previous]) -
+                    (times[previous] - times[j]) * (avgValue - values[previous])
+                );
+                if (area > maxArea) {
+                    maxArea = area;
+                    selected = j;
+                }
+            }
+
+            sampledTimes[i + 1] = times[selected];
+            sampledValues[i + 1] = values[selected];
+            previous = selected;
+        }
+
+        sampledTimes[threshold - 1] = times[n - 1];
+        sampledValues[threshold - 1] = values[n - 1];
+        return { times: sampledTimes, values: sampledValues };
+    }
+
+    // Loop instead of Math.min(...values), which throws past the engine's argument limit
+    static bounds(values) {
+        let min = Infinity;
+        let max = -Infinity;
+        for (let i = 0; i < values.length; i++) {
+            if (values[i] < min) min = values[i];
+            if (values[i] > max) max = values[i];
+        }
+        return { min, max };
+    }
+
+    get chartWidth() {
+        return this.canvas.width - 2 * this.padding;
+    }
+
+    get chartHeight() {
+        return this.canvas.height - 2 * this.padding;
+    }
+
+    /**
+     * 📈 Full render: spec = { times, values, from, to, emptyText }
+     */
+    renderLine(spec) {
+        const { ctx, canvas } = this;
+        this.span = spec.to - spec.from;
+
+        if (spec.values.length === 0) {
+            this.line = null;
+            ctx.clearRect(0, 0, canvas.width, canvas.height);
+            ctx.fillStyle = '#888';
+            ctx.font = '14px Arial';
+            ctx.textAlign = 'center';
+            ctx.fillText(spec.emptyText || 'No data', canvas.width / 2, canvas.height / 2);
+            return;
+        }
+
+        // One point per horizontal pixel is all the canvas can show
+        const sampled = ChartCore.lttb(spec.times, spec.values, Math.round(this.chartWidth));
+        const { min, max } = ChartCore.bounds(sampled.values);
+
+        // A little vertical margin lets small moves append without rescaling
+        const margin = (max - min) * 0.05 || Math.abs(max) * 0.01 || 1;
+        const newest = sampled.times[sampled.times.length - 1];
+        const to = Math.max(spec.to, newest);
+
+        this.line = {
+            from: spec.from,
+            to: to + this.span * this.headroom,
+            min: min - margin,
+            max: max + margin,
+            times: Array.from(sampled.times),
+            values: Array.from(sampled.values)
+        };
+
+        this.drawLineRange(0);
+    }
+
+    /**
+     * ➕ Append (or update the newest bucket of) the line, repainting only the tail
+     */
+    appendPoint(point) {
+        const line = this.line;
+        if (!line) {
+            if (this.span !== null) {
+                this.renderLine({ times: [point.timestamp], values: [point.value], from: point.timestamp - this.span, to: point.timestamp });
+            }
+            return;
+        }
+
+        const last = line.times.length - 1;
+        let dirtyIndex;
+        if (point.timestamp === line.times[last]) {
+            line.values[last] = point.value;
+            dirtyIndex = last - 1;
+        } else if (point.timestamp > line.times[last]) {
+            line.times.push(point.timestamp);
+            line.values.push(point.value);
+            dirtyIndex = last;
+        } else {
+            return;
+        }
+
+        // Past the headroom or outside the value range: rescale with a full render
+        if (point.timestamp > line.to || point.value < line.min || point.value > line.max) {
+            this.renderLine({
+                times: line.times,
+                values: line.values,
+                from: Math.max(line.from, point.timestamp - this.span),
+                to: point.timestamp
+            });
+            return;
+        }
+
+        this.drawLineRange(this.x(line.times[Math.max(0, dirtyIndex)]) - 2);
+    }
+
+    x(time) {
+        const line = this.line;
+        return this.padding + ((time - line.from) / (line.to - line.from)) * this.chartWidth;
+    }
+
+    y(value) {
+        const line = this.line;
+        return this.padding + this.chartHeight - ((value - line.min) / (line.max - line.min)) * this.chartHeight;
+    }
+
+    /**
+     * 🖌️ Repaint everything right of `left` - grid, area and line - in one pass over the points
+     */
+    drawLineRange(left) {
+        const { ctx, canvas, padding } = this;
+        const { times, values } = this.line;
+        const clipLeft = Math.max(0, Math.floor(left));
+        const baseline = padding + this.chartHeight;
+
+        ctx.save();
+        ctx.beginPath();
+        ctx.rect(clipLeft, 0, canvas.width - clipLeft, canvas.height);
+        ctx.clip();
+        ctx.clearRect(clipLeft, 0, canvas.width - clipLeft, canvas.height);
+
+        // Grid lines
+        ctx.strokeStyle = 'rgba(255, 255, 255, 0.1)';
+        ctx.lineWidth = 1;
+        for (let i = 0; i <= 4; i++) {
+            const y = padding + (i * this.chartHeight / 4);
+            ctx.beginPath();
+            ctx.moveTo(padding, y);
+            ctx.lineTo(padding + this.chartWidth, y);
+            ctx.stroke();
+        }
+
+        // Start one point before the clip so the first visible segment connects
+        let start = 0;
+        while (start < times.length - 1 && this.x(times[start + 1]) < clipLeft) start++;
+
+        const linePath = new Path2D();
+        const areaPath = new Path2D();
+        let firstX = 0;
+        let lastX = 0;
+        for (let i = start; i < times.length; i++) {
+            const x = this.x(times[i]);
+            const y = this.y(values[i]);
+            if (i === start) {
+                firstX = x;
+                linePath.moveTo(x, y);
+                areaPath.moveTo(x, baseline);
+            } else {
+                linePath.lineTo(x, y);
+            }
+            areaPath.lineTo(x, y);
+            lastX = x;
+        }
+        areaPath.lineTo(lastX, baseline);
+        areaPath.lineTo(firstX, baseline);
+        areaPath.closePath();
+
+        ctx.fillStyle = 'rgba(0, 212, 255, 0.1)';
+        ctx.fill(areaPath);
+
+        ctx.strokeStyle = '#00d4ff';
+        ctx.lineWidth = 2;
+        ctx.stroke(linePath);
+
+        // A lone point has no segment to stroke
+        if (times.length - start === 1) {
+            ctx.fillStyle = '#00d4ff';
+            ctx.beginPath();
+            ctx.arc(firstX, this.y(values[start]), 3, 0, 2 * Math.PI);
+            ctx.fill();
+        }
+
+        ctx.restore();
+    }
+
+    /**
+     * 🥧 Allocation pie: slices = [{ label, percentage, color }]
+     */
+    renderPie(slices) {
+        const { ctx, canvas } = this;
+        const centerX = canvas.width / 2;
+        const centerY = canvas.height / 2;
+        const radius = Math.min(centerX, centerY) - 10;
+
+        ctx.clearRect(0, 0, canvas.width, canvas.height);
+
+        let startAngle = -Math.PI / 2; // Start at top
+
+        slices.forEach(slice => {
+            const sliceAngle = (slice.percentage / 100) * 2 * Math.PI;
+
+            // Draw slice
+            ctx.beginPath();
+            ctx.arc(centerX, centerY, radius, startAngle, startAngle + sliceAngle);
+            ctx.lineTo(centerX, centerY);
+            ctx.fillStyle = slice.color;
+            ctx.fill();
+
+            // Draw border
+            ctx.strokeStyle = '#1a1a1a';
+            ctx.lineWidth = 2;
+            ctx.stroke();
+
+            startAngle += sliceAngle;
+        });
+    }
+}
+
+// ===== WORKER SIDE =====
+if (typeof WorkerGlobalScope !== 'undefined' && self instanceof WorkerGlobalScope) {
+    // Charts whose canvases were transferred to this worker, keyed by chart id
+    const charts = new Map();
+
+    self.onmessage = (event) => {
+        const message = event.data;
+        try {
+            if (message.type === 'attach') {
+                charts.set(message.id, new ChartCore(message.canvas));
+            } else if (charts.has(message.id)) {
+                charts.get(message.id).handle(message);
+            }
+        } catch (error) {
+            console.error(`❌ Chart worker failed to draw ${message.id}:`, error);
+        }
+    };
+
+    // The page only hands canvases over once the worker script has actually loaded
+    self.postMessage({ type: 'ready' });
+}
+
+// ===== PAGE SIDE =====
+class ChartRenderer {
+    constructor(options = {}) {
+        this.workerUrl = options.workerUrl || 'js/chart-renderer.js';
+        this.worker = null;
+        this.workerReady = false;
+        this.readyTimeout = options.readyTimeout || 3000;
+        this.readyTimer = null;
+        this.offscreenAvailable = typeof Worker !== 'undefined' &&
+            typeof HTMLCanvasElement !== 'undefined' &&
+            typeof HTMLCanvasElement.prototype.transferControlToOffscreen === 'function';
+
+        // chart id → { canvas, core, queue } (core is set when drawing on the main thread,
+        // queue holds messages until the worker is up and the canvas has been transferred)
+        this.charts = new Map();
+
+        this.stats = { renders: 0, appends: 0 };
+    }
+
+    /**
+     * 🧵 Lazily start the drawing worker
+     */
+    ensureWorker() {
+        if (!this.offscreenAvailable || this.worker) return this.offscreenAvailable;
+
+        try {
+            this.worker = new Worker(this.workerUrl);
+            this.worker.onmessage = (event) => {
+                if (event.data && event.data.type === 'ready') this.handleWorkerReady();
+            };
+            this.worker.onerror = (event) => this.handleWorkerError(event.message);
+            this.readyTimer = setTimeout(() => this.handleWorkerError('worker did not start'), this.readyTimeout);
+            console.log('📉 Chart worker starting');
+        } catch (error) {
+            // e.g. file:// origins block workers - fall back to the main thread
+            console.warn('⚠️ Chart worker unavailable, drawing on main thread:', error.message);
+            this.offscreenAvailable = false;
+            this.worker = null;
+        }
+        return this.offscreenAvailable;
+    }
+
+    handleWorkerReady() {
+        clearTimeout(this.readyTimer);
+        this.workerReady = true;
+        console.log('📉 Chart worker ready');
+        this.charts.forEach((chart, id) => this.flush(id, chart));
+    }
+
+    /**
+     * 💥 The worker never came up (404, CSP, ...): draw queued charts on the main thread.
+     * Canvases are only transferred after 'ready', so none of them is lost to the dead worker.
+     */
+    handleWorkerError(reason) {
+        console.error('❌ Chart worker error:', reason);
+        if (this.workerReady || !this.worker) return;
+
+        clearTimeout(this.readyTimer);
+        this.worker.terminate();
+        this.worker = null;
+        this.offscreenAvailable = false;
+        console.warn('⚠️ Drawing charts on the main thread');
+
+        this.charts.forEach((chart, id) => {
+            if (!chart.queue) return;
+            chart.core = new ChartCore(chart.canvas);
+            this.flush(id, chart);
+        });
+    }
+
+    /**
+     * 🔗 Bind a chart id to its canvas; a canvas is handed to the worker once it is ready
+     */
+    attach(id, canvas) {
+        const existing = this.charts.get(id);
+        if (existing && existing.canvas === canvas) return existing;
+
+        const chart = { canvas, core: null, queue: null };
+        if (!this.ensureWorker()) {
+            chart.core = new ChartCore(canvas);
+        } else if (this.workerReady) {
+            this.transfer(id, chart);
+        } else {
+            chart.queue = [];
+        }
+
+        this.charts.set(id, chart);
+        return chart;
+    }
+
+    transfer(id, chart) {
+        try {
+            const offscreen = chart.canvas.transferControlToOffscreen();
+            this.worker.postMessage({ type: 'attach', id, canvas: offscreen }, [offscreen]);
+        } catch (error) {
+            // Canvases that already have a 2D context cannot be transferred
+            chart.core = new ChartCore(chart.canvas);
+        }
+    }
+
+    // Transfer a queued chart's canvas (unless it fell back to the main thread) and replay its messages
+    flush(id, chart) {
+        if (!chart.queue) return;
+        const queue = chart.queue;
+        chart.queue = null;
+        if (!chart.core) this.transfer(id, chart);
+        queue.forEach(({ message, transfer }) => this.send(chart, message, transfer));
+    }
+
+    send(chart, message, transfer = []) {
+        if (chart.core) {
+            chart.core.handle(message);
+        } else if (chart.queue) {
+            // A full redraw makes everything queued before it irrelevant
+            if (message.type !== 'append') chart.queue.length = 0;
+            chart.queue.push({ message, transfer });
+        } else {
+            this.worker.postMessage(message, transfer);
+        }
+    }
+
+    /**
+     * 📈 Draw a full series: { times, values (Float64Array), from, to, emptyText }
+     * The arrays are transferred to the worker - don't reuse them afterwards.
+     */
+    renderLine(id, canvas, spec) {
+        const chart = this.attach(id, canvas);
+        this.stats.renders++;
+        this.send(chart, { type: 'line', id, spec }, [spec.times.buffer, spec.values.buffer]);
+    }
+
+    /**
+     * ➕ Add or update the newest point of a line drawn by renderLine
+     */
+    appendPoint(id, point) {
+        const chart = this.charts.get(id);
+        if (!chart) return;
+        this.stats.appends++;
+        this.send(chart, { type: 'append', id, point: { timestamp: point.timestamp, value: point.value } });
+    }
+
+    renderPie(id, canvas, slices) {
+        const chart = this.attach(id, canvas);
+        this.stats.renders++;
+        this.send(chart, {
+            type: 'pie',
+            id,
+            slices: slices.map(({ label, percentage, color }) => ({ label, percentage, color }))
+        });
+    }
+
+    getStats() {
+        return { ...this.stats, offscreen: this.workerReady, charts: this.charts.size };
+    }
+}
+
+// Export for use in main application
+if (typeof window !== 'undefined') {
+    window.ChartCore = ChartCore;
+    window.ChartRenderer = ChartRenderer;
+}
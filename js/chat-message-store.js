@@ -0,0 +1,205 @@
+// 💬 Chat Message Store - Append-only transcript persistence in IndexedDB
+// Every chat message is written once, as its own record, when it is added -
+// nothing is re-serialized afterwards. Records are keyed by an auto-increment
+// sequence and indexed per user, so a transcript can be read back one page at
+// a time from the newest message backwards. Falls back to an in-memory list
+// (session only) when IndexedDB is unavailable.
+
+class ChatMessageStore {
+    constructor(options = {}) {
+        this.dbName = options.dbName || 'samcrypto_chat';
+        this.dbVersion = 1;
+        this.dbPromise = null;
+
+        this.pageSize = options.pageSize || 30;
+
+        // Appends made in the same tick share one transaction
+        this.pending = [];
+        this.flushPromise = null;
+
+        // Used when IndexedDB cannot be opened
+        this.memory = [];
+        this.memorySeq = 0;
+    }
+
+    /**
+     * 🔌 Open (and create) the database once
+     */
+    open() {
+        if (this.dbPromise) return this.dbPromise;
+
+        this.dbPromise = new Promise((resolve, reject) => {
+            if (typeof indexedDB === 'undefined') {
+                reject(new Error('IndexedDB not available'));
+                return;
+            }
+
+            const request = indexedDB.open(this.dbName, this.dbVersion);
+            request.onupgradeneeded = () => {
+                const db = request.result;
+                if (!db.objectStoreNames.contains('messages')) {
+                    const store = db.createObjectStore('messages', { keyPath: 'seq', autoIncrement: true });
+                    store.createIndex('byUser', ['userId', 'seq']);
+                }
+            };
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+
+        return this.dbPromise;
+    }
+
+    async tx(mode, work) {
+        const db = await this.open();
+        return new Promise((resolve, reject) => {
+            const transaction = db.transaction(['messages'], mode);
+            let result;
+            transaction.oncomplete = () => resolve(result);
+            transaction.onerror = () => reject(transaction.error);
+            transaction.onabort = () => reject(transaction.error);
+            result = work(transaction.objectStore('messages'));
+        });
+    }
+
+    async isAvailable() {
+        try {
+            await this.open();
+            return true;
+        } catch (error) {
+            return false;
+        }
+    }
+
+    /**
+     * ➕ Append one message - { userId, sender, content, html?, timestamp? }
+     */
+    append(message) {
+        this.pending.push({
+            userId: message.userId || 'guest',
+            sender: message.sender,
+            content: message.content,
+            html: !!message.html,
+            timestamp: message.timestamp || Date.now()
+        });
+
+        if (!this.flushPromise) {
+            this.flushPromise = new Promise(resolve => setTimeout(resolve, 0))
+                .then(() => this.flush());
+        }
+        return this.flushPromise;
+    }
+
+    /**
+     * 💾 Write every pending append in one transaction
+     */
+    async flush() {
+        const batch = this.pending;
+        this.pending = [];
+        this.flushPromise = null;
+        if (batch.length === 0) return;
+
+        if (!(await this.isAvailable())) {
+            batch.forEach(record => this.memory.push({ ...record, seq: ++this.memorySeq }));
+            return;
+        }
+
+        try {
+            await this.tx('readwrite', store => {
+                batch.forEach(record => store.add(record));
+            });
+        } catch (error) {
+            console.error('❌ Failed to persist chat messages:', error);
+        }
+    }
+
+    /**
+     * 📄 One page of a user's transcript, oldest → newest, ending before `before`
+     * @returns {Promise<{messages: Array, hasMore: boolean}>}
+     */
+    async loadPage(userId = 'guest', options = {}) {
+        const limit = options.limit || this.pageSize;
+        const before = options.before ?? Infinity;
+
+        // Messages appended a moment ago must be visible to the reader
+        await this.flush();
+
+        if (!(await this.isAvailable())) {
+            const all = this.memory.filter(record => record.userId === userId && record.seq < before);
+            return { messages: all.slice(-limit), hasMore: all.length > limit };
+        }
+
+        const messages = [];
+        let hasMore = false;
+        await this.tx('readonly', store => {
+            const range = IDBKeyRange.bound([userId, -Infinity], [userId, before], false, true);
+            const request = store.index('byUser').openCursor(range, 'prev');
+            request.onsuccess = () => {
+                const cursor = request.result;
+                if (!cursor) return;
+                if (messages.length === limit) {
+                    hasMore = true;
+                    return;
+                }
+                messages.push(cursor.value);
+                cursor.continue();
+            };
+        });
+
+        return { messages: messages.reverse(), hasMore };
+    }
+
+    /**
+     * 🗑️ Delete every message of a user
+     */
+    async clear(userId = 'guest') {
+        this.pending = this.pending.filter(record => record.userId !== userId);
+
+        if (!(await this.isAvailable())) {
+            this.memory = this.memory.filter(record => record.userId !== userId);
+            return;
+        }
+
+        await this.tx('readwrite', store => {
+            const range = IDBKeyRange.bound([userId, -Infinity], [userId, Infinity]);
+            const request = store.index('byUser').openCursor(range);
+            request.onsuccess = () => {
+                const cursor = request.result;
+                if (!cursor) return;
+                cursor.delete();
+                cursor.continue();
+            };
+        });
+    }
+
+    /**
+     * 📦 One-time import of the old localStorage 'chatHistory' blob (innerHTML per message)
+     */
+    async migrateLegacy(userId = 'guest') {
+        const saved = localStorage.getItem('chatHistory');
+        if (!saved) return 0;
+
+        let legacy = [];
+        try {
+            legacy = JSON.parse(saved) || [];
+        } catch (error) {
+            console.warn('⚠️ Discarding unreadable legacy chat history');
+        }
+
+        legacy.forEach(message => this.append({
+            userId: userId,
+            sender: message.sender,
+            content: message.content,
+            html: true,
+            timestamp: Date.parse(message.timestamp) || Date.now()
+        }));
+        await this.flush();
+
+        localStorage.removeItem('chatHistory');
+        console.log(`📦 Migrated ${legacy.length} messages from legacy chat history`);
+        return legacy.length;
+    }
+}
+
+// Export shared instance for use across modules
+window.ChatMessageStore = ChatMessageStore;
+window.chatMessageStore = new ChatMessageStore();
@@ -0,0 +1,275 @@
+// 🧮 Conversation Context Manager - Token-budgeted history with a rolling summary
+// Packs the chat history sent with each request into a token budget: the most
+// recent turns verbatim, then older turns ranked by relevance to the new
+// question. Turns that age out of the recent window are folded into a compact
+// extractive summary during idle time, so the request path never summarizes.
+
+class ConversationContextManager {
+    constructor(options = {}) {
+        // Token counting uses the same local estimator as the system prompt
+        this.estimate = options.estimateTokens || (text => PromptBuilder.estimateTokens(text));
+
+        this.recentTurns = options.recentTurns || 3;          // Always considered first, newest → oldest
+        this.maxMessageTokens = options.maxMessageTokens || 1200; // A single message is clipped beyond this
+        this.summaryBudget = options.summaryBudget || 400;    // Tokens the rolling summary may use
+        this.foldDelay = options.foldDelay || 500;
+
+        // message object → { content, tokens }
+        this.tokenCache = new WeakMap();
+
+        // Rolling summary: extractive lines for every message older than the recent window
+        this.summary = { lines: [], foldedUntil: 0 };
+        this.foldTimer = null;
+        this.onSummaryUpdated = options.onSummaryUpdated || null;
+
+        this.stats = {
+            packs: 0,
+            folds: 0,
+            foldedMessages: 0,
+            clipped: 0
+        };
+    }
+
+    /**
+     * 🔢 Token count for one message, cached until its content changes
+     */
+    countTokens(message) {
+        if (typeof message === 'string') return this.estimate(message);
+
+        const cached = this.tokenCache.get(message);
+        if (cached && cached.content === message.content) return cached.tokens;
+
+        const tokens = this.estimate(message.content || '') + 4; // Per-message framing overhead
+        this.tokenCache.set(message, { content: message.content, tokens });
+        return tokens;
+    }
+
+    /**
+     * 🧩 Group history into turns: a user message plus the replies/events after it
+     */
+    groupTurns(history) {
+        const turns = [];
+        let current = null;
+
+        history.forEach((message, index) => {
+            if (!message || !message.content) return;
+            if (message.role === 'user' || !current) {
+                current = { messages: [], index };
+                turns.push(current);
+            }
+            current.messages.push(message);
+        });
+        return turns;
+    }
+
+    /**
+     * 📦 Select the history to send, within `budget` tokens, in chronological order
+     * @returns {{messages: Array, tokens: number, omitted: number}}
+     */
+    pack(history, currentMessage, budget) {
+        this.stats.packs++;
+
+        const turns = this.groupTurns(history || []);
+        const selected = new Set();
+        let used = 0;
+
+        const take = (turn) => {
+            const entries = turn.messages.map(message => this.fitMessage(message));
+            const cost = entries.reduce((sum, entry) => sum + entry.tokens, 0);
+            if (used + cost > budget) return false;
+            used += cost;
+            turn.entries = entries;
+            selected.add(turn);
+            return true;
+        };
+
+        // 1. Recent turns, newest first - stop at the first one that doesn't fit
+        const recent = turns.slice(-this.recentTurns).reverse();
+        for (const turn of recent) {
+            if (take(turn)) continue;
+            // The newest turn always goes in, clipped to what is left
+            if (selected.size === 0) used += this.takeClipped(turn, budget, selected);
+            break;
+        }
+
+        // 2. Older turns ranked by relevance to the new question
+        const older = turns.slice(0, Math.max(0, turns.length - this.recentTurns));
+        if (older.length > 0 && used < budget) {
+            const keywords = this.extractKeywords(currentMessage);
+            older
+                .map((turn, position) => ({ turn, score: this.scoreTurn(turn, keywords, position / older.length) }))
+                .filter(candidate => candidate.score > 0.5)
+                .sort((a, b) => b.score - a.score)
+                .forEach(candidate => take(candidate.turn));
+        }
+
+        const messages = turns
+            .filter(turn => selected.has(turn))
+            .flatMap(turn => turn.entries.map(entry => ({ role: entry.role, content: entry.content })));
+
+        const total = history ? history.length : 0;
+        return { messages, tokens: used, omitted: total - messages.length };
+    }
+
+    fitMessage(message) {
+        const tokens = this.countTokens(message);
+        if (tokens <= this.maxMessageTokens) {
+            return { role: message.role, content: message.content, tokens };
+        }
+
+        this.stats.clipped++;
+        const content = PromptBuilder.truncateToTokens(message.content, this.maxMessageTokens);
+        return { role: message.role, content, tokens: this.estimate(content) + 4 };
+    }
+
+    takeClipped(turn, budget, selected) {
+        // The turn opens with the user's question: it is kept first (whole if it
+        // fits), and the replies after it get whatever budget is left, clipped
+        const entries = [];
+        let remaining = budget;
+        for (const message of turn.messages) {
+            const limit = Math.min(this.maxMessageTokens, remaining - 4);
+            if (limit < 20) break;
+            const content = this.countTokens(message) > limit
+                ? PromptBuilder.truncateToTokens(message.content, limit)
+                : message.content;
+            const tokens = this.estimate(content) + 4;
+            entries.push({ role: message.role, content, tokens });
+            remaining -= tokens;
+        }
+        if (entries.length === 0) return 0;
+
+        turn.entries = entries;
+        selected.add(turn);
+        return budget - remaining;
+    }
+
+    /**
+     * 🎯 Relevance of an older turn: keyword overlap, weighted towards recent turns
+     */
+    scoreTurn(turn, keywords, recency) {
+        if (keywords.size === 0) return 0;
+
+        const text = turn.messages.map(message => message.content).join(' ').toLowerCase();
+        let hits = 0;
+        keywords.forEach(keyword => {
+            if (text.includes(keyword)) hits++;
+        });
+        return hits === 0 ? 0 : hits + recency;
+    }
+
+    extractKeywords(text) {
+        const stopWords = ConversationContextManager.stopWords;
+        const keywords = new Set();
+        (String(text || '').toLowerCase().match(/[a-z0-9$]{3,}/g) || []).forEach(word => {
+            if (!stopWords.has(word)) keywords.add(word);
+        });
+        return keywords;
+    }
+
+    /**
+     * ⏳ Fold turns that left the recent window into the summary, during idle time
+     */
+    scheduleFold(history) {
+        this.pendingHistory = history;
+        if (this.foldTimer) return;
+
+        this.foldTimer = setTimeout(() => {
+            const run = () => {
+                this.foldTimer = null;
+                this.fold(this.pendingHistory);
+            };
+            if (typeof requestIdleCallback === 'function') {
+                requestIdleCallback(run, { timeout: 2000 });
+            } else {
+                run();
+            }
+        }, this.foldDelay);
+    }
+
+    /**
+     * 📝 Incrementally extend the summary with messages it hasn't covered yet
+     */
+    fold(history) {
+        if (!history || history.length === 0) return;
+
+        const turns = this.groupTurns(history);
+        const aged = turns.slice(0, Math.max(0, turns.length - this.recentTurns)).flatMap(turn => turn.messages);
+        const fresh = aged.filter(message => (message.timestamp || 0) > this.summary.foldedUntil);
+        if (fresh.length === 0) return;
+
+        fresh.forEach(message => {
+            const line = this.summarizeMessage(message);
+            if (line) this.summary.lines.push(line);
+        });
+        this.summary.foldedUntil = Math.max(...fresh.map(message => message.timestamp || 0), this.summary.foldedUntil);
+
+        // Oldest lines go first when the summary outgrows its budget
+        let tokens = this.summary.lines.reduce((sum, line) => sum + this.estimate(line) + 1, 0);
+        while (tokens > this.summaryBudget && this.summary.lines.length > 1) {
+            tokens -= this.estimate(this.summary.lines.shift()) + 1;
+        }
+
+        this.stats.folds++;
+        this.stats.foldedMessages += fresh.length;
+        if (this.onSummaryUpdated) this.onSummaryUpdated(this.getSummary());
+    }
+
+    /**
+     * ✂️ One extractive line per message: the question, or the answer's key figures
+     */
+    summarizeMessage(message) {
+        const text = String(message.content || '').replace(/[#*_`>]+/g, '').replace(/\s+/g, ' ').trim();
+        if (!text) return '';
+
+        const sentences = text.match(/[^.!?]+[.!?]*/g) || [text];
+        const clip = sentence => sentence.trim().length > 160 ? sentence.trim().slice(0, 157) + '...' : sentence.trim();
+
+        if (message.role === 'user') return `- User asked: "${clip(sentences[0])}"`;
+        if (message.role === 'system') return `- Event: ${clip(text)}`;
+
+        // Assistant: keep sentences carrying prices, levels or a recommendation
+        const keyPattern = /\$\d|\d%|\b(buy|sell|hold|wait|entry|target|stop|support|resistance|recommend)/i;
+        const key = sentences.filter(sentence => keyPattern.test(sentence)).slice(0, 2).map(clip);
+        return `- You answered: ${(key.length > 0 ? key : [clip(sentences[0])]).join(' ')}`;
+    }
+
+    getSummary() {
+        return this.summary.lines.join('\n');
+    }
+
+    /**
+     * 💾 Summary state is persisted with the conversation context
+     */
+    exportState() {
+        return { lines: [...this.summary.lines], foldedUntil: this.summary.foldedUntil };
+    }
+
+    importState(state) {
+        if (state && Array.isArray(state.lines)) {
+            this.summary = { lines: [...state.lines], foldedUntil: state.foldedUntil || 0 };
+        }
+    }
+
+    reset() {
+        clearTimeout(this.foldTimer);
+        this.foldTimer = null;
+        this.pendingHistory = null;
+        this.summary = { lines: [], foldedUntil: 0 };
+    }
+
+    getStats() {
+        return { ...this.stats, summaryLines: this.summary.lines.length };
+    }
+}
+
+ConversationContextManager.stopWords = new Set([
+    'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'her', 'was', 'one', 'our', 'out',
+    'what', 'with', 'this', 'that', 'have', 'from', 'they', 'will', 'would', 'there', 'their', 'about',
+    'which', 'when', 'make', 'like', 'just', 'into', 'your', 'some', 'them', 'than', 'then', 'now',
+    'how', 'why', 'who', 'should', 'could', 'does', 'did', 'its', 'it\'s', 'also', 'any', 'get', 'got',
+    'think', 'tell', 'please', 'thanks', 'thank', 'right', 'more', 'much', 'very', 'want', 'know'
+]);
+
+// Export for use in main application
+window.ConversationContextManager = ConversationContextManager;
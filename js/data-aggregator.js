@@ -11,15 +11,6 @@ class DataAggregator {
             alternative: 'https://api.alternative.me', // Fear & Greed Index
         };
 
-        // Cache for API responses
-        this.cache = {
-            prices: new Map(),
-            sentiment: new Map(),
-            orderBooks: new Map(),
-            onchain: new Map(),
-            social: new Map()
-        };
-
         // Cache TTL (Time To Live) in milliseconds
         this.cacheTTL = {
             prices: 30000,      // 30 seconds
@@ -28,6 +19,31 @@ class DataAggregator {
             onchain: 600000,    // 10 minutes
             social: 600000      // 10 minutes
         };
+
+        // How long an expired entry may still be served while it refreshes
+        this.staleTTL = {
+            prices: 300000,     // 5 minutes
+            sentiment: 900000,  // 15 minutes
+            orderBooks: 0,      // Order books are useless once stale
+            onchain: 1800000,   // 30 minutes
+            social: 1800000     // 30 minutes
+        };
+
+        // Shared per-host rate limiter for upstream requests
+        this.scheduler = window.fetchScheduler || new FetchScheduler();
+
+        // Local order books kept live from Binance diff-depth streams
+        this.orderBooks = window.orderBookEngine || (typeof OrderBookEngine !== 'undefined' ? new OrderBookEngine() : null);
+
+        // Shared TTL + LRU cache, one namespace per data type
+        this.cache = window.cacheManager || new CacheManager();
+        for (const [type, ttl] of Object.entries(this.cacheTTL)) {
+            this.cache.defineNamespace(this.cacheNamespace(type), { ttl, staleTTL: this.staleTTL[type] });
+        }
+    }
+
+    cacheNamespace(type) {
+        return `aggregator_${type}`;
     }
 
     /**
@@ -75,23 +91,13 @@ class DataAggregator {
      */
     async getPriceData(coinId) {
         const cacheKey = `price_${coinId}`;
-        
-        // Check cache first
-        if (this.isCacheValid(this.cache.prices, cacheKey, this.cacheTTL.prices)) {
-            return this.cache.prices.get(cacheKey).data;
-        }
 
         try {
-            // Try CoinGecko first (most reliable)
-            const data = await this.fetchCoinGeckoPrice(coinId);
-            
-            // Cache the result
-            this.cache.prices.set(cacheKey, {
-                data: data,
-                timestamp: Date.now()
-            });
-
-            return data;
+            // Stale prices are served instantly while a background refresh runs
+            return await this.cache.getOrFetch(this.cacheNamespace('prices'), cacheKey, () =>
+                // Try CoinGecko first (most reliable)
+                this.fetchCoinGeckoPrice(coinId)
+            );
         } catch (error) {
             console.error('Price data fetch error:', error);
             return null;
@@ -103,8 +109,10 @@ class DataAggregator {
      */
     async fetchCoinGeckoPrice(coinId) {
         try {
-            const response = await fetch(
-                `${this.sources.coingecko}/simple/price?ids=${coinId}&vs_currencies=usd&include_24hr_change=true&include_24hr_vol=true&include_market_cap=true`
+            const response = await this.scheduler.fetch(
+                `${this.sources.coingecko}/simple/price?ids=${coinId}&vs_currencies=usd&include_24hr_change=true&include_24hr_vol=true&include_market_cap=true`,
+                {},
+                { priority: 'normal' }
             );
 
             if (!response.ok) throw new Error('CoinGecko API error');
@@ -131,49 +139,44 @@ class DataAggregator {
      */
     async getSentimentData(coinId) {
         const cacheKey = `sentiment_${coinId}`;
-        
-        // Check cache
-        if (this.isCacheValid(this.cache.sentiment, cacheKey, this.cacheTTL.sentiment)) {
-            return this.cache.sentiment.get(cacheKey).data;
-        }
 
         try {
-            // Fetch Fear & Greed Index
-            const fearGreedData = await this.fetchFearGreedIndex();
-            
-            // Calculate social sentiment (simulated for now)
-            const socialSentiment = this.calculateSocialSentiment(coinId);
-            
-            // Calculate news sentiment
-            const newsSentiment = await this.calculateNewsSentiment(coinId);
-
-            const aggregatedSentiment = {
-                fearGreed: fearGreedData,
-                social: socialSentiment,
-                news: newsSentiment,
-                overall: this.calculateOverallSentiment(fearGreedData, socialSentiment, newsSentiment),
-                timestamp: Date.now()
-            };
-
-            // Cache the result
-            this.cache.sentiment.set(cacheKey, {
-                data: aggregatedSentiment,
-                timestamp: Date.now()
-            });
-
-            return aggregatedSentiment;
+            return await this.cache.getOrFetch(this.cacheNamespace('sentiment'), cacheKey, () =>
+                this.fetchSentimentData(coinId)
+            );
         } catch (error) {
             console.error('Sentiment data error:', error);
             return null;
         }
     }
 
+    async fetchSentimentData(coinId) {
+        // Fetch Fear & Greed Index
+        const fearGreedData = await this.fetchFearGreedIndex();
+        
+        // Calculate social sentiment (simulated for now)
+        const socialSentiment = this.calculateSocialSentiment(coinId);
+        
+        // Calculate news sentiment
+        const newsSentiment = await this.calculateNewsSentiment(coinId);
+
+        const aggregatedSentiment = {
+            fearGreed: fearGreedData,
+            social: socialSentiment,
+            news: newsSentiment,
+            overall: this.calculateOverallSentiment(fearGreedData, socialSentiment, newsSentiment),
+            timestamp: Date.now()
+        };
+
+        return aggregatedSentiment;
+    }
+
     /**
      * 😨 Fetch Fear & Greed Index
      */
     async fetchFearGreedIndex() {
         try {
-            const response = await fetch(`${this.sources.alternative}/fng/`);
+            const response = await this.scheduler.fetch(`${this.sources.alternative}/fng/`, {}, { priority: 'normal' });
             if (!response.ok) throw new Error('Fear & Greed API error');
 
             const data = await response.json();
@@ -282,34 +285,45 @@ class DataAggregator {
 
     /**
      * 📖 Get order book data
+     * Served from the live local book; the REST snapshot is only a fallback for
+     * when the depth stream cannot sync (e.g. WebSockets blocked).
      */
     async getOrderBookData(coinId) {
+        // Convert coinId to Binance symbol
+        const symbol = this.coinIdToSymbol(coinId);
+        if (!symbol) return null;
+
+        if (this.orderBooks) {
+            // A cold book gets a moment to sync while the socket is up; after that this resolves
+            // immediately. Disconnected, it cannot sync in time - go straight to REST.
+            const timeout = this.orderBooks.isStreaming() ? 1500 : 0;
+            const metrics = await this.orderBooks.getMetrics(symbol, { timeout });
+            if (metrics) return this.analyzeOrderBook(metrics, 'live');
+        }
+
         const cacheKey = `orderbook_${coinId}`;
         
         // Check cache
-        if (this.isCacheValid(this.cache.orderBooks, cacheKey, this.cacheTTL.orderBooks)) {
-            return this.cache.orderBooks.get(cacheKey).data;
+        const cached = this.cache.get(this.cacheNamespace('orderBooks'), cacheKey);
+        if (cached) {
+            return cached;
         }
 
         try {
-            // Convert coinId to Binance symbol
-            const symbol = this.coinIdToSymbol(coinId);
-            if (!symbol) return null;
-
-            const response = await fetch(
-                `${this.sources.binance}/depth?symbol=${symbol}&limit=100`
+            const response = await this.scheduler.fetch(
+                `${this.sources.binance}/depth?symbol=${symbol}&limit=100`,
+                {},
+                { priority: 'normal' }
             );
 
             if (!response.ok) throw new Error('Binance order book error');
 
             const data = await response.json();
-            const analysis = this.analyzeOrderBook(data);
+            const book = LocalOrderBook.fromSnapshot(symbol, data);
+            const analysis = this.analyzeOrderBook(book.metrics(), 'snapshot');
 
             // Cache the result
-            this.cache.orderBooks.set(cacheKey, {
-                data: analysis,
-                timestamp: Date.now()
-            });
+            this.cache.set(this.cacheNamespace('orderBooks'), cacheKey, analysis);
 
             return analysis;
         } catch (error) {
@@ -319,32 +333,29 @@ class DataAggregator {
     }
 
     /**
-     * 📊 Analyze order book
+     * 📊 Analyze order book metrics (from LocalOrderBook.metrics())
      */
-    analyzeOrderBook(orderBook) {
-        const bids = orderBook.bids.slice(0, 20); // Top 20 bids
-        const asks = orderBook.asks.slice(0, 20); // Top 20 asks
-
-        // Calculate total volume on each side
-        const bidVolume = bids.reduce((sum, bid) => sum + parseFloat(bid[1]), 0);
-        const askVolume = asks.reduce((sum, ask) => sum + parseFloat(ask[1]), 0);
+    analyzeOrderBook(metrics, source) {
+        // Volume in the top 20 levels on each side
+        const bidVolume = metrics.top.bidQuantity;
+        const askVolume = metrics.top.askQuantity;
 
         // Calculate bid/ask ratio
         const ratio = bidVolume / askVolume;
 
-        // Calculate spread
-        const bestBid = parseFloat(bids[0][0]);
-        const bestAsk = parseFloat(asks[0][0]);
-        const spread = ((bestAsk - bestBid) / bestBid) * 100;
-
         return {
             bidVolume: bidVolume,
             askVolume: askVolume,
             ratio: ratio,
-            spread: spread,
+            spread: metrics.spreadBps / 100,
             pressure: ratio > 1.1 ? 'bullish' : ratio < 0.9 ? 'bearish' : 'neutral',
             liquidity: bidVolume + askVolume > 1000 ? 'high' : 'medium',
-            timestamp: Date.now()
+            bestBid: metrics.bestBid,
+            bestAsk: metrics.bestAsk,
+            topImbalance: metrics.topImbalance,
+            depth: metrics.depth,
+            source: source,
+            timestamp: metrics.updatedAt || Date.now()
         };
     }
 
@@ -387,34 +398,7 @@ class DataAggregator {
      * 🔄 Convert coin ID to trading symbol
      */
     coinIdToSymbol(coinId) {
-        const mapping = {
-            'bitcoin': 'BTCUSDT',
-            'ethereum': 'ETHUSDT',
-            'solana': 'SOLUSDT',
-            'cardano': 'ADAUSDT',
-            'ripple': 'XRPUSDT',
-            'dogecoin': 'DOGEUSDT',
-            'polkadot': 'DOTUSDT',
-            'binancecoin': 'BNBUSDT',
-            'avalanche-2': 'AVAXUSDT',
-            'chainlink': 'LINKUSDT',
-            'polygon': 'MATICUSDT',
-            'litecoin': 'LTCUSDT'
-        };
-
-        return mapping[coinId] || null;
-    }
-
-    /**
-     * ✅ Check if cache is valid
-     */
-    isCacheValid(cache, key, ttl) {
-        if (!cache.has(key)) return false;
-        
-        const item = cache.get(key);
-        const age = Date.now() - item.timestamp;
-        
-        return age < ttl;
+        return window.symbolResolver ? window.symbolResolver.toBinanceSymbol(coinId) : null;
     }
 
     /**
@@ -479,7 +463,9 @@ class DataAggregator {
             formatted += `- Bid/Ask Ratio: ${aggregatedData.orderBook.ratio.toFixed(2)}\n`;
             formatted += `- Market Pressure: ${aggregatedData.orderBook.pressure}\n`;
             formatted += `- Liquidity: ${aggregatedData.orderBook.liquidity}\n`;
-            formatted += `- Spread: ${aggregatedData.orderBook.spread.toFixed(3)}%\n\n`;
+            formatted += `- Spread: ${aggregatedData.orderBook.spread.toFixed(3)}%\n`;
+            formatted += this.formatDepth(aggregatedData.orderBook);
+            formatted += '\n';
         }
 
         // On-Chain Data
@@ -503,6 +489,17 @@ class DataAggregator {
         return formatted;
     }
 
+    /**
+     * 📏 Depth and imbalance lines for the order book section
+     */
+    formatDepth(orderBook) {
+        let formatted = `- Top-of-Book Imbalance: ${(orderBook.topImbalance * 100).toFixed(1)}% (${orderBook.source === 'live' ? 'live book' : 'REST snapshot'})\n`;
+        Object.values(orderBook.depth || {}).forEach(depth => {
+            formatted += `- Depth ±${depth.bps}bps: bids $${this.formatNumber(depth.bidNotional)} / asks $${this.formatNumber(depth.askNotional)}, imbalance ${(depth.imbalance * 100).toFixed(1)}%\n`;
+        });
+        return formatted;
+    }
+
     /**
      * 💰 Format large numbers
      */
@@ -519,11 +516,7 @@ class DataAggregator {
      * 🧹 Clear cache
      */
     clearCache() {
-        this.cache.prices.clear();
-        this.cache.sentiment.clear();
-        this.cache.orderBooks.clear();
-        this.cache.onchain.clear();
-        this.cache.social.clear();
+        Object.keys(this.cacheTTL).forEach(type => this.cache.clear(this.cacheNamespace(type)));
         console.log('✅ Cache cleared');
     }
 
@@ -531,15 +524,22 @@ class DataAggregator {
      * 📊 Get cache statistics
      */
     getCacheStats() {
+        const stats = {};
+        let total = 0;
+        for (const type of Object.keys(this.cacheTTL)) {
+            stats[type] = this.cache.size(this.cacheNamespace(type));
+            total += stats[type];
+        }
+
         return {
-            prices: this.cache.prices.size,
-            sentiment: this.cache.sentiment.size,
-            orderBooks: this.cache.orderBooks.size,
-            onchain: this.cache.onchain.size,
-            social: this.cache.social.size,
-            total: this.cache.prices.size + this.cache.sentiment.size + 
-                  this.cache.orderBooks.size + this.cache.onchain.size + 
-                  this.cache.social.size
+            ...stats,
+            total: total,
+            // Shared cache counters (all namespaces)
+            hits: this.cache.stats.hits,
+            staleHits: this.cache.stats.staleHits,
+            misses: this.cache.stats.misses,
+            evictions: this.cache.stats.evictions,
+            bytes: this.cache.totalBytes
         };
     }
 }
@@ -0,0 +1,88 @@
+// 🖼️ DOM Scheduler - Coalesce high-frequency display updates into one write per frame
+// Price ticks can arrive several times a second per symbol. Each update is
+// keyed (e.g. 'ticker:BTC'); only the latest value per key is applied, and
+// all pending writes run together inside a single requestAnimationFrame.
+
+class DomScheduler {
+    constructor() {
+        // key → { value, apply } - later schedules overwrite earlier ones
+        this.pending = new Map();
+        this.frameRequested = false;
+
+        this.stats = {
+            frames: 0,
+            writes: 0,
+            coalesced: 0
+        };
+    }
+
+    /**
+     * 📝 Queue a write; replaces any not-yet-applied write for the same key
+     * @param {Function} apply - (value) => void, runs inside the next frame
+     */
+    schedule(key, value, apply) {
+        if (this.pending.has(key)) this.stats.coalesced++;
+        this.pending.set(key, { value, apply });
+        this.requestFrame();
+    }
+
+    requestFrame() {
+        if (this.frameRequested) return;
+        this.frameRequested = true;
+
+        if (typeof requestAnimationFrame === 'function') {
+            requestAnimationFrame(() => this.flush());
+        } else {
+            setTimeout(() => this.flush(), 16);
+        }
+    }
+
+    /**
+     * 🎬 Apply every pending write (writes only - callers must not read layout here)
+     */
+    flush() {
+        this.frameRequested = false;
+        if (this.pending.size === 0) return;
+
+        const batch = this.pending;
+        this.pending = new Map();
+
+        for (const { value, apply } of batch.values()) {
+            try {
+                apply(value);
+                this.stats.writes++;
+            } catch (error) {
+                console.error('DOM update failed:', error);
+            }
+        }
+        this.stats.frames++;
+    }
+
+    cancel(key) {
+        this.pending.delete(key);
+    }
+
+    /**
+     * ✨ Compositor-only pulse; no timers and no style writes left behind
+     */
+    static pulse(element, keyframes, duration = 300) {
+        if (typeof element.animate === 'function') {
+            element.animate(keyframes, { duration: duration, easing: 'ease' });
+        }
+    }
+
+    /**
+     * 🔤 Update a text node only when its content actually changes
+     */
+    static setText(node, text) {
+        if (node.data !== text) node.data = text;
+    }
+
+    getStats() {
+        return { ...this.stats, pending: this.pending.size };
+    }
+}
+
+// Export shared instance for use across modules
+window.DomScheduler = DomScheduler;
+window.domScheduler = new DomScheduler();
@@ -0,0 +1,286 @@
+// 🚦 Fetch Scheduler - Shared rate limiting, coalescing and retries for upstream APIs
+// Every module goes through one scheduler so per-host limits are respected
+// globally: token buckets sized to each provider's published limits,
+// identical in-flight GETs share one request, chat traffic jumps ahead of
+// background polls, and 429/503 retries back off with jitter and Retry-After.
+
+class FetchScheduler {
+    constructor(options = {}) {
+        // Token buckets per host: capacity (burst), refill per second, max parallel requests
+        this.hostLimits = {
+            'api.coingecko.com': { capacity: 8, refillPerSecond: 0.4, maxConcurrent: 4 },   // ~24 calls/min (free tier)
+            'api.binance.com': { capacity: 1200, refillPerSecond: 100, maxConcurrent: 10 },  // 6000 weight/min
+            'api.coincap.io': { capacity: 20, refillPerSecond: 3, maxConcurrent: 6 },        // 200 calls/min
+            'api.cerebras.ai': { capacity: 10, refillPerSecond: 0.5, maxConcurrent: 4, perKeyLimits: true }, // 429s are per API key
+            'api.perplexity.ai': { capacity: 5, refillPerSecond: 0.8, maxConcurrent: 2 },
+            default: { capacity: 20, refillPerSecond: 5, maxConcurrent: 6 },
+            ...(options.hostLimits || {})
+        };
+
+        // Background work may not spend the last 25% of a bucket
+        this.lowPriorityReserve = 0.25;
+        this.priorities = ['high', 'normal', 'low'];
+
+        this.baseRetryDelay = options.baseRetryDelay || 500;
+        this.maxRetryDelay = options.maxRetryDelay || 15000;
+        this.retryStatuses = new Set([429, 418, 503, 504]);
+
+        this.hosts = new Map();    // host → { tokens, lastRefill, active, blockedUntil, queues, timer }
+        this.inflight = new Map(); // 'GET url' → Promise<Response>
+
+        this.stats = {
+            requests: 0,
+            coalesced: 0,
+            retries: 0,
+            rateLimited: 0,
+            queuedMs: 0
+        };
+    }
+
+    /**
+     * 🌐 fetch() with scheduling
+     * @param {Object} schedule - { priority: 'high'|'normal'|'low', retries, weight, coalesce, onRetry }
+     */
+    fetch(url, init = {}, schedule = {}) {
+        const method = (init.method || 'GET').toUpperCase();
+        // Abortable requests are never shared - one caller's abort would cancel the others
+        const coalesce = schedule.coalesce !== false && method === 'GET' && !init.body && !init.signal;
+
+        if (coalesce) {
+            const key = `GET ${url}`;
+            if (this.inflight.has(key)) {
+                this.stats.coalesced++;
+                // Each caller gets its own readable body
+                return this.inflight.get(key).then(response => response.clone());
+            }
+
+            const promise = this.execute(url, init, schedule);
+            this.inflight.set(key, promise);
+            const release = () => this.inflight.delete(key);
+            promise.then(release, release);
+            return promise.then(response => response.clone());
+        }
+
+        return this.execute(url, init, schedule);
+    }
+
+    async execute(url, init, schedule) {
+        const retries = schedule.retries ?? 2;
+        const host = this.hostOf(url);
+
+        for (let attempt = 0; ; attempt++) {
+            await this.acquire(host, schedule.weight || this.weightFor(host, url), schedule.priority || 'normal', init.signal);
+
+            let response;
+            try {
+                this.stats.requests++;
+                response = await fetch(url, init);
+            } catch (error) {
+                this.release(host);
+                if (error.name === 'AbortError' || attempt >= retries) throw error;
+
+                const delay = this.backoffDelay(attempt);
+                this.stats.retries++;
+                console.warn(`⚠️ ${host} request failed (${error.message}), retrying in ${delay}ms`);
+                if (schedule.onRetry) schedule.onRetry(delay, attempt + 1);
+                await this.wait(delay, init.signal);
+                continue;
+            }
+            this.release(host);
+
+            if (!this.retryStatuses.has(response.status)) return response;
+
+            // Rate limited: pause the whole host, not just this request
+            const retryAfter = this.parseRetryAfter(response.headers.get('Retry-After'));
+            if (response.status === 429 || response.status === 418) {
+                this.stats.rateLimited++;
+                if (!this.limitsFor(host).perKeyLimits) this.block(host, retryAfter ?? this.backoffDelay(attempt));
+            }
+
+            if (attempt >= retries) return response;
+
+            const delay = retryAfter !== null ? retryAfter + Math.random() * 250 : this.backoffDelay(attempt);
+            this.stats.retries++;
+            console.warn(`⏰ ${host} responded ${response.status}, retrying in ${Math.round(delay)}ms`);
+            if (schedule.onRetry) schedule.onRetry(delay, attempt + 1);
+            await this.wait(delay, init.signal);
+        }
+    }
+
+    /**
+     * 🎫 Wait for a token (and a concurrency slot) on the host, by priority lane
+     */
+    acquire(host, weight, priority, signal) {
+        if (signal?.aborted) return Promise.reject(new DOMException('Aborted', 'AbortError'));
+
+        const state = this.hostState(host);
+        const lanePriority = state.queues[priority] ? priority : 'normal';
+        const lane = state.queues[lanePriority];
+
+        return new Promise((resolve, reject) => {
+            const ticket = { weight, priority: lanePriority, resolve, reject, enqueuedAt: Date.now() };
+            lane.push(ticket);
+
+            if (signal) {
+                ticket.onAbort = () => {
+                    const index = lane.indexOf(ticket);
+                    if (index !== -1) lane.splice(index, 1);
+                    reject(new DOMException('Aborted', 'AbortError'));
+                };
+                signal.addEventListener('abort', ticket.onAbort, { once: true });
+            }
+
+            this.drain(host);
+        });
+    }
+
+    release(host) {
+        const state = this.hostState(host);
+        state.active = Math.max(0, state.active - 1);
+        this.drain(host);
+    }
+
+    drain(host) {
+        const state = this.hostState(host);
+        const limits = this.limitsFor(host);
+        clearTimeout(state.timer);
+        state.timer = null;
+
+        while (true) {
+            const ticket = this.nextTicket(state);
+            if (!ticket) return;
+
+            const now = Date.now();
+            if (now < state.blockedUntil) {
+                state.timer = setTimeout(() => this.drain(host), state.blockedUntil - now);
+                return;
+            }
+            if (state.active >= limits.maxConcurrent) return; // release() drains again
+
+            this.refill(state, limits);
+            const reserve = ticket.priority === 'low' ? limits.capacity * this.lowPriorityReserve : 0;
+            const needed = Math.min(limits.capacity, Math.min(ticket.weight, limits.capacity) + reserve);
+            if (state.tokens < needed) {
+                const waitMs = Math.ceil(((needed - state.tokens) / limits.refillPerSecond) * 1000);
+                state.timer = setTimeout(() => this.drain(host), waitMs);
+                return;
+            }
+
+            state.queues[ticket.priority].shift();
+            state.tokens -= Math.min(ticket.weight, limits.capacity);
+            state.active++;
+            this.stats.queuedMs += now - ticket.enqueuedAt;
+            ticket.resolve();
+        }
+    }
+
+    nextTicket(state) {
+        for (const priority of this.priorities) {
+            if (state.queues[priority].length > 0) return state.queues[priority][0];
+        }
+        return null;
+    }
+
+    refill(state, limits) {
+        const now = Date.now();
+        state.tokens = Math.min(limits.capacity, state.tokens + ((now - state.lastRefill) / 1000) * limits.refillPerSecond);
+        state.lastRefill = now;
+    }
+
+    block(host, ms) {
+        const state = this.hostState(host);
+        state.blockedUntil = Math.max(state.blockedUntil, Date.now() + ms);
+        state.tokens = 0;
+        console.warn(`🚫 ${host} rate limited - pausing requests for ${Math.round(ms / 1000)}s`);
+    }
+
+    hostState(host) {
+        if (!this.hosts.has(host)) {
+            const limits = this.limitsFor(host);
+            this.hosts.set(host, {
+                tokens: limits.capacity,
+                lastRefill: Date.now(),
+                active: 0,
+                blockedUntil: 0,
+                timer: null,
+                queues: { high: [], normal: [], low: [] }
+            });
+        }
+        return this.hosts.get(host);
+    }
+
+    limitsFor(host) {
+        return this.hostLimits[host] || this.hostLimits.default;
+    }
+
+    hostOf(url) {
+        try {
+            return new URL(url, typeof location !== 'undefined' ? location.href : undefined).host;
+        } catch (error) {
+            return 'default';
+        }
+    }
+
+    /**
+     * ⚖️ Request weight - Binance charges by endpoint and symbol count
+     */
+    weightFor(host, url) {
+        if (host !== 'api.binance.com') return 1;
+
+        if (url.includes('/ticker/24hr')) {
+            if (url.includes('symbols=')) {
+                const count = (decodeURIComponent(url).match(/"[A-Z0-9]+"/g) || []).length;
+                return count <= 20 ? 2 : count <= 100 ? 40 : 80;
+            }
+            return url.includes('symbol=') ? 2 : 80;
+        }
+        if (url.includes('/ticker/price')) {
+            return url.includes('symbol') ? (url.includes('symbols=') ? 4 : 2) : 4;
+        }
+        if (url.includes('/depth')) {
+            const limit = parseInt((url.match(/limit=(\d+)/) || [])[1] || '100', 10);
+            return limit <= 100 ? 5 : limit <= 500 ? 25 : limit <= 1000 ? 50 : 250;
+        }
+        return 2;
+    }
+
+    parseRetryAfter(value) {
+        if (!value) return null;
+        const seconds = Number(value);
+        if (Number.isFinite(seconds)) return Math.max(0, seconds * 1000);
+        const date = Date.parse(value);
+        return Number.isNaN(date) ? null : Math.max(0, date - Date.now());
+    }
+
+    /**
+     * 🎲 Full-jitter exponential backoff
+     */
+    backoffDelay(attempt) {
+        const cap = Math.min(this.maxRetryDelay, this.baseRetryDelay * Math.pow(2, attempt + 1));
+        return Math.round(this.baseRetryDelay / 2 + Math.random() * cap);
+    }
+
+    wait(ms, signal) {
+        return new Promise((resolve, reject) => {
+            const timer = setTimeout(resolve, ms);
+            if (signal) {
+                signal.addEventListener('abort', () => {
+                    clearTimeout(timer);
+                    reject(new DOMException('Aborted', 'AbortError'));
+                }, { once: true });
+            }
+        });
+    }
+
+    getStats() {
+        const queued = {};
+        for (const [host, state] of this.hosts) {
+            queued[host] = this.priorities.reduce((sum, priority) => sum + state.queues[priority].length, 0);
+        }
+        return { ...this.stats, inflight: this.inflight.size, queued };
+    }
+}
+
+// Export shared instance for use across modules
+window.FetchScheduler = FetchScheduler;
+window.fetchScheduler = new FetchScheduler();
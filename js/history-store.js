@@ -0,0 +1,299 @@
+// 🗃️ History Store - Local OHLCV history in IndexedDB with incremental gap-fill
+// Price history is kept as per-coin, per-interval Float64Array chunks. A
+// coverage list records which time ranges are already local, so re-runs
+// only fetch the missing tail instead of the whole series.
+
+class HistoryStore {
+    constructor(options = {}) {
+        this.dbName = options.dbName || 'samcrypto_history';
+        this.dbVersion = 1;
+        this.dbPromise = null;
+
+        // Bucket size, chunk span and how old the newest range may get before a refresh
+        this.intervals = {
+            daily: { ms: 86400000, chunkSpan: 90 * 86400000, staleAfter: 3600000 },
+            hourly: { ms: 3600000, chunkSpan: 7 * 86400000, staleAfter: 300000 }
+        };
+
+        this.columns = ['timestamps', 'prices', 'volumes', 'marketCaps'];
+    }
+
+    /**
+     * 🔌 Open (and create) the database once
+     */
+    open() {
+        if (this.dbPromise) return this.dbPromise;
+
+        this.dbPromise = new Promise((resolve, reject) => {
+            if (typeof indexedDB === 'undefined') {
+                reject(new Error('IndexedDB not available'));
+                return;
+            }
+
+            const request = indexedDB.open(this.dbName, this.dbVersion);
+            request.onupgradeneeded = () => {
+                const db = request.result;
+                if (!db.objectStoreNames.contains('chunks')) {
+                    db.createObjectStore('chunks', { keyPath: 'key' });
+                }
+                if (!db.objectStoreNames.contains('coverage')) {
+                    db.createObjectStore('coverage', { keyPath: 'key' });
+                }
+            };
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+
+        // Allow a retry later if opening failed
+        this.dbPromise.catch(() => { this.dbPromise = null; });
+        return this.dbPromise;
+    }
+
+    async tx(storeNames, mode, work) {
+        const db = await this.open();
+        return new Promise((resolve, reject) => {
+            const transaction = db.transaction(storeNames, mode);
+            let result;
+            transaction.oncomplete = () => resolve(result);
+            transaction.onerror = () => reject(transaction.error);
+            transaction.onabort = () => reject(transaction.error);
+            result = work(transaction);
+        });
+    }
+
+    request(req) {
+        return new Promise((resolve, reject) => {
+            req.onsuccess = () => resolve(req.result);
+            req.onerror = () => reject(req.error);
+        });
+    }
+
+    /**
+     * 📈 Columnar series for [from, to], fetching only ranges not yet stored
+     * @param {Function} fetchRange - async (from, to) => { timestamps, prices, volumes, marketCaps }
+     */
+    async getSeries(coinId, interval, from, to, fetchRange) {
+        const config = this.intervals[interval];
+        if (!config) throw new Error(`Unsupported interval: ${interval}`);
+
+        const coverageKey = `${coinId}|${interval}`;
+        const coverage = await this.tx(['coverage'], 'readonly', t =>
+            this.request(t.objectStore('coverage').get(coverageKey))
+        );
+        let ranges = coverage ? coverage.ranges : [];
+
+        const gaps = this.findGaps(ranges, from, to, config);
+        if (gaps.length > 0) {
+            console.log(`📡 ${coinId} ${interval}: fetching ${gaps.length} missing range(s)`);
+        } else {
+            console.log(`📦 ${coinId} ${interval}: served entirely from local history`);
+        }
+
+        for (const gap of gaps) {
+            const raw = await fetchRange(gap.from, gap.to);
+            const bucketed = this.bucket(raw, config.ms);
+            await this.writePoints(coinId, interval, bucketed, config);
+            ranges = this.mergeRange(ranges, [gap.from, gap.to]);
+        }
+
+        if (gaps.length > 0) {
+            await this.tx(['coverage'], 'readwrite', t => {
+                t.objectStore('coverage').put({ key: coverageKey, ranges: ranges, updatedAt: Date.now() });
+            });
+        }
+
+        return this.readSeries(coinId, interval, from, to, config);
+    }
+
+    /**
+     * 🕳️ Sub-ranges of [from, to] not covered by stored ranges
+     */
+    findGaps(ranges, from, to, config) {
+        const gaps = [];
+        let cursor = from;
+
+        for (const [start, end] of ranges) {
+            if (end < cursor) continue;
+            if (start > to) break;
+            if (start - cursor > config.ms) gaps.push({ from: cursor, to: start });
+            cursor = Math.max(cursor, end);
+        }
+
+        // The open end of the series is refreshed once it is older than staleAfter
+        if (to - cursor > config.staleAfter) {
+            gaps.push({ from: Math.max(from, cursor - config.ms), to: to });
+        }
+        return gaps;
+    }
+
+    mergeRange(ranges, range) {
+        const all = [...ranges, range].sort((a, b) => a[0] - b[0]);
+        const merged = [];
+        for (const [start, end] of all) {
+            const last = merged[merged.length - 1];
+            if (last && start <= last[1]) {
+                last[1] = Math.max(last[1], end);
+            } else {
+                merged.push([start, end]);
+            }
+        }
+        return merged;
+    }
+
+    /**
+     * 🪣 Collapse raw points into interval buckets (last value per bucket wins)
+     */
+    bucket(raw, intervalMs) {
+        const n = raw.timestamps.length;
+        const out = {};
+        this.columns.forEach(column => { out[column] = new Float64Array(n); });
+
+        let count = 0;
+        let lastBucket = -Infinity;
+        for (let i = 0; i < n; i++) {
+            const bucketStart = Math.floor(raw.timestamps[i] / intervalMs) * intervalMs;
+            if (bucketStart !== lastBucket) {
+                count++;
+                lastBucket = bucketStart;
+            }
+            const j = count - 1;
+            out.timestamps[j] = bucketStart;
+            out.prices[j] = raw.prices[i];
+            out.volumes[j] = raw.volumes[i] || 0;
+            out.marketCaps[j] = raw.marketCaps[i] || 0;
+        }
+
+        this.columns.forEach(column => { out[column] = out[column].subarray(0, count); });
+        return out;
+    }
+
+    chunkKey(coinId, interval, chunkIndex) {
+        return [coinId, interval, chunkIndex];
+    }
+
+    /**
+     * 💾 Merge new points into the chunks they fall in (only touched chunks are rewritten)
+     */
+    async writePoints(coinId, interval, points, config) {
+        const n = points.timestamps.length;
+        if (n === 0) return;
+
+        // Group index ranges of the (sorted) new points by chunk
+        const groups = [];
+        let groupStart = 0;
+        for (let i = 1; i <= n; i++) {
+            const prevChunk = Math.floor(points.timestamps[i - 1] / config.chunkSpan);
+            if (i === n || Math.floor(points.timestamps[i] / config.chunkSpan) !== prevChunk) {
+                groups.push({ chunkIndex: prevChunk, start: groupStart, end: i });
+                groupStart = i;
+            }
+        }
+
+        await this.tx(['chunks'], 'readwrite', t => {
+            const store = t.objectStore('chunks');
+            groups.forEach(group => {
+                const key = this.chunkKey(coinId, interval, group.chunkIndex);
+                const slice = {};
+                this.columns.forEach(column => { slice[column] = points[column].subarray(group.start, group.end); });
+
+                store.get(key).onsuccess = (event) => {
+                    const existing = event.target.result;
+                    store.put({ key: key, ...this.mergeColumns(existing, slice) });
+                };
+            });
+        });
+    }
+
+    /**
+     * 🔀 Two-pointer merge of sorted columns; new points replace equal timestamps
+     */
+    mergeColumns(existing, incoming) {
+        if (!existing) {
+            const copy = {};
+            this.columns.forEach(column => { copy[column] = incoming[column].slice(); });
+            return copy;
+        }
+
+        const a = existing.timestamps;
+        const b = incoming.timestamps;
+        const out = {};
+        this.columns.forEach(column => { out[column] = new Float64Array(a.length + b.length); });
+
+        let i = 0, j = 0, k = 0;
+        while (i < a.length || j < b.length) {
+            let source, index;
+            if (j >= b.length || (i < a.length && a[i] < b[j])) {
+                source = existing; index = i++;
+            } else {
+                if (i < a.length && a[i] === b[j]) i++; // Replace stale point
+                source = incoming; index = j++;
+            }
+            this.columns.forEach(column => { out[column][k] = source[column][index]; });
+            k++;
+        }
+
+        this.columns.forEach(column => { out[column] = out[column].slice(0, k); });
+        return out;
+    }
+
+    /**
+     * 📖 Read [from, to] from the stored chunks into contiguous columns
+     */
+    async readSeries(coinId, interval, from, to, config) {
+        const range = IDBKeyRange.bound(
+            this.chunkKey(coinId, interval, Math.floor(from / config.chunkSpan)),
+            this.chunkKey(coinId, interval, Math.floor(to / config.chunkSpan))
+        );
+        const chunks = await this.tx(['chunks'], 'readonly', t =>
+            this.request(t.objectStore('chunks').getAll(range))
+        ) || [];
+
+        // Chunks come back in key order, so concatenation stays sorted
+        let total = 0;
+        chunks.forEach(chunk => { total += chunk.timestamps.length; });
+
+        const series = {};
+        this.columns.forEach(column => { series[column] = new Float64Array(total); });
+        let offset = 0;
+        chunks.forEach(chunk => {
+            this.columns.forEach(column => series[column].set(chunk[column], offset));
+            offset += chunk.timestamps.length;
+        });
+
+        const start = this.lowerBound(series.timestamps, from);
+        const end = this.lowerBound(series.timestamps, to + 1);
+        this.columns.forEach(column => { series[column] = series[column].subarray(start, end); });
+        series.length = end - start;
+        return series;
+    }
+
+    lowerBound(sorted, value) {
+        let lo = 0, hi = sorted.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >>> 1;
+            if (sorted[mid] < value) lo = mid + 1;
+            else hi = mid;
+        }
+        return lo;
+    }
+
+    /**
+     * 🧹 Drop all stored history for a coin (or everything)
+     */
+    async clear(coinId = null) {
+        await this.tx(['chunks', 'coverage'], 'readwrite', t => {
+            if (!coinId) {
+                t.objectStore('chunks').clear();
+                t.objectStore('coverage').clear();
+                return;
+            }
+            t.objectStore('chunks').delete(IDBKeyRange.bound([coinId], [coinId, []]));
+            Object.keys(this.intervals).forEach(interval => {
+                t.objectStore('coverage').delete(`${coinId}|${interval}`);
+            });
+        });
+    }
+}
+
+// Export for use in main application
+window.HistoryStore = HistoryStore;
@@ -0,0 +1,252 @@
+// 📐 Indicator Kernels - O(n) technical indicators on Float64Array
+// Rolling sums, Welford variance and Wilder smoothing: every kernel makes a
+// single pass and a single output allocation. Output arrays are aligned with
+// the input (same length); warm-up slots are NaN.
+// Loaded in the page and via importScripts() in backtest workers.
+
+class IndicatorKernels {
+    /**
+     * 🔢 Coerce numbers / {close|price} objects into a Float64Array (no copy if already one)
+     */
+    static toFloat64(values, field = null) {
+        if (values instanceof Float64Array) return values;
+
+        const out = new Float64Array(values.length);
+        for (let i = 0; i < values.length; i++) {
+            const v = values[i];
+            out[i] = typeof v === 'number' ? v :
+                field ? v[field] :
+                (v.close ?? v.price ?? NaN);
+        }
+        return out;
+    }
+
+    static last(series) {
+        return series.length > 0 ? series[series.length - 1] : NaN;
+    }
+
+    /**
+     * 📊 Simple moving average - rolling sum
+     */
+    static sma(prices, period) {
+        const n = prices.length;
+        const out = new Float64Array(n).fill(NaN);
+        let sum = 0;
+
+        for (let i = 0; i < n; i++) {
+            sum += prices[i];
+            if (i >= period) sum -= prices[i - period];
+            if (i >= period - 1) out[i] = sum / period;
+        }
+        return out;
+    }
+
+    /**
+     * 📐 Exponential moving average, seeded with the SMA of the first `period`
+     * finite values (leading NaNs are skipped, so EMA-of-EMA works)
+     */
+    static ema(prices, period) {
+        const n = prices.length;
+        const out = new Float64Array(n).fill(NaN);
+        const multiplier = 2 / (period + 1);
+
+        let start = 0;
+        while (start < n && !Number.isFinite(prices[start])) start++;
+
+        let sum = 0;
+        for (let i = start; i < n; i++) {
+            const offset = i - start;
+            if (offset < period) {
+                sum += prices[i];
+                if (offset === period - 1) out[i] = sum / period;
+            } else {
+                out[i] = (prices[i] - out[i - 1]) * multiplier + out[i - 1];
+            }
+        }
+        return out;
+    }
+
+    /**
+     * 📉 RSI with Wilder smoothing
+     */
+    static rsi(prices, period = 14) {
+        const n = prices.length;
+        const out = new Float64Array(n).fill(NaN);
+        if (n <= period) return out;
+
+        let avgGain = 0;
+        let avgLoss = 0;
+
+        for (let i = 1; i < n; i++) {
+            const change = prices[i] - prices[i - 1];
+            const gain = change > 0 ? change : 0;
+            const loss = change < 0 ? -change : 0;
+
+            if (i <= period) {
+                avgGain += gain / period;
+                avgLoss += loss / period;
+                if (i < period) continue;
+            } else {
+                avgGain = (avgGain * (period - 1) + gain) / period;
+                avgLoss = (avgLoss * (period - 1) + loss) / period;
+            }
+
+            out[i] = avgLoss === 0 ? 100 : 100 - (100 / (1 + avgGain / avgLoss));
+        }
+        return out;
+    }
+
+    /**
+     * 📊 MACD line, signal line and histogram in one buffer
+     */
+    static macd(prices, fast = 12, slow = 26, signal = 9) {
+        const n = prices.length;
+        const buffer = new Float64Array(n * 3).fill(NaN);
+        const macdLine = buffer.subarray(0, n);
+        const signalLine = buffer.subarray(n, 2 * n);
+        const histogram = buffer.subarray(2 * n, 3 * n);
+
+        const kFast = 2 / (fast + 1);
+        const kSlow = 2 / (slow + 1);
+        const kSignal = 2 / (signal + 1);
+        let emaFast = 0;
+        let emaSlow = 0;
+        let sumFast = 0;
+        let sumSlow = 0;
+        let sumSignal = 0;
+        let signalCount = 0;
+
+        for (let i = 0; i < n; i++) {
+            const price = prices[i];
+
+            if (i < fast) {
+                sumFast += price;
+                if (i === fast - 1) emaFast = sumFast / fast;
+            } else {
+                emaFast = (price - emaFast) * kFast + emaFast;
+            }
+
+            if (i < slow) {
+                sumSlow += price;
+                if (i === slow - 1) emaSlow = sumSlow / slow;
+                else continue;
+            } else {
+                emaSlow = (price - emaSlow) * kSlow + emaSlow;
+            }
+
+            const value = emaFast - emaSlow;
+            macdLine[i] = value;
+
+            // Signal line: EMA of the MACD line, seeded with its first `signal` values
+            if (signalCount < signal) {
+                sumSignal += value;
+                signalCount++;
+                if (signalCount === signal) signalLine[i] = sumSignal / signal;
+            } else {
+                signalLine[i] = (value - signalLine[i - 1]) * kSignal + signalLine[i - 1];
+            }
+
+            if (signalCount === signal) histogram[i] = value - signalLine[i];
+        }
+
+        return { macd: macdLine, signal: signalLine, histogram: histogram };
+    }
+
+    /**
+     * 🎯 Bollinger Bands - rolling Welford mean/variance (population std dev)
+     */
+    static bollinger(prices, period = 20, stdDev = 2) {
+        const n = prices.length;
+        const buffer = new Float64Array(n * 3).fill(NaN);
+        const upper = buffer.subarray(0, n);
+        const middle = buffer.subarray(n, 2 * n);
+        const lower = buffer.subarray(2 * n, 3 * n);
+
+        let count = 0;
+        let mean = 0;
+        let m2 = 0;
+
+        for (let i = 0; i < n; i++) {
+            // Add the new value
+            const x = prices[i];
+            count++;
+            let delta = x - mean;
+            mean += delta / count;
+            m2 += delta * (x - mean);
+
+            // Remove the value leaving the window
+            if (count > period) {
+                const y = prices[i - period];
+                count--;
+                delta = y - mean;
+                mean -= delta / count;
+                m2 -= delta * (y - mean);
+            }
+
+            if (count === period) {
+                const sd = Math.sqrt(Math.max(0, m2 / period));
+                middle[i] = mean;
+                upper[i] = mean + stdDev * sd;
+                lower[i] = mean - stdDev * sd;
+            }
+        }
+
+        return { upper, middle, lower };
+    }
+
+    /**
+     * 📊 Stochastic %K - monotonic deques give O(n) rolling high/low
+     */
+    static stochastic(highs, lows, closes, period = 14) {
+        const n = closes.length;
+        const out = new Float64Array(n).fill(NaN);
+        const maxDeque = new Int32Array(n);
+        const minDeque = new Int32Array(n);
+        let maxHead = 0, maxTail = 0;
+        let minHead = 0, minTail = 0;
+
+        for (let i = 0; i < n; i++) {
+            while (maxTail > maxHead && highs[maxDeque[maxTail - 1]] <= highs[i]) maxTail--;
+            maxDeque[maxTail++] = i;
+            while (minTail > minHead && lows[minDeque[minTail - 1]] >= lows[i]) minTail--;
+            minDeque[minTail++] = i;
+
+            if (maxDeque[maxHead] <= i - period) maxHead++;
+            if (minDeque[minHead] <= i - period) minHead++;
+
+            if (i >= period - 1) {
+                const highest = highs[maxDeque[maxHead]];
+                const lowest = lows[minDeque[minHead]];
+                const range = highest - lowest;
+                out[i] = range === 0 ? 50 : ((closes[i] - lowest) / range) * 100;
+            }
+        }
+        return out;
+    }
+
+    /**
+     * 🎯 Mean / std dev of simple returns (Welford, no intermediate array)
+     */
+    static returnStats(prices) {
+        let count = 0;
+        let mean = 0;
+        let m2 = 0;
+
+        for (let i = 1; i < prices.length; i++) {
+            const r = (prices[i] - prices[i - 1]) / prices[i - 1];
+            count++;
+            const delta = r - mean;
+            mean += delta / count;
+            m2 += delta * (r - mean);
+        }
+
+        return {
+            count: count,
+            mean: mean,
+            stdDev: count > 0 ? Math.sqrt(m2 / count) : 0
+        };
+    }
+}
+
+// Export for window and worker scopes
+self.IndicatorKernels = IndicatorKernels;
@@ -0,0 +1,111 @@
+// 🔎 Keyword Matcher - Aho-Corasick multi-pattern search with word boundaries
+// All patterns are compiled into one automaton, so a message is scanned once
+// regardless of how many keywords are registered. Matches must start at a word
+// boundary; whole-word patterns must also end at one ("op" never matches
+// inside "option"), stem patterns are prefixes that may run on ("consolidat"
+// matches "consolidation", "trade" matches "trader" but not "trading").
+
+class KeywordMatcher {
+    constructor() {
+        // Trie nodes: { next: Map<char, node>, fail: node, outputs: Array<pattern> }
+        this.root = this.createNode();
+        this.patterns = [];
+        this.compiled = false;
+    }
+
+    createNode() {
+        return { next: new Map(), fail: null, outputs: [] };
+    }
+
+    /**
+     * ➕ Register a pattern
+     * @param {string} text - Keyword or phrase (matched case-insensitively unless caseSensitive)
+     * @param {*} value - Payload returned with every match
+     * @param {Object} options - { wholeWord: true, caseSensitive: false }
+     */
+    add(text, value, options = {}) {
+        const pattern = {
+            text: String(text),
+            value: value,
+            length: String(text).length,
+            wholeWord: options.wholeWord !== false,
+            caseSensitive: !!options.caseSensitive
+        };
+
+        // Case-sensitive patterns still live in the lower-cased trie; the case check happens on match
+        let node = this.root;
+        for (const char of pattern.text.toLowerCase()) {
+            if (!node.next.has(char)) node.next.set(char, this.createNode());
+            node = node.next.get(char);
+        }
+        node.outputs.push(pattern);
+        this.patterns.push(pattern);
+        this.compiled = false;
+        return this;
+    }
+
+    /**
+     * 🏗️ Build failure links breadth-first and merge outputs along them
+     */
+    compile() {
+        const queue = [];
+        this.root.fail = this.root;
+        for (const child of this.root.next.values()) {
+            child.fail = this.root;
+            queue.push(child);
+        }
+
+        while (queue.length > 0) {
+            const node = queue.shift();
+            for (const [char, child] of node.next) {
+                let fail = node.fail;
+                while (fail !== this.root && !fail.next.has(char)) fail = fail.fail;
+                child.fail = fail.next.has(char) && fail.next.get(char) !== child ? fail.next.get(char) : this.root;
+                child.outputs = child.outputs.concat(child.fail.outputs);
+                queue.push(child);
+            }
+        }
+
+        this.compiled = true;
+        return this;
+    }
+
+    /**
+     * 🔍 Scan text once and return every boundary-respecting match in text order
+     * @returns {Array<{value, text, start, end}>}
+     */
+    scan(text) {
+        if (!this.compiled) this.compile();
+        if (!text) return [];
+
+        const source = String(text);
+        const lower = source.toLowerCase();
+        const matches = [];
+        let node = this.root;
+
+        // toLowerCase() keeps indices aligned for the scripts this app handles
+        for (let i = 0; i < lower.length; i++) {
+            const char = lower[i];
+            while (node !== this.root && !node.next.has(char)) node = node.fail;
+            node = node.next.get(char) || this.root;
+
+            for (const pattern of node.outputs) {
+                const start = i - pattern.length + 1;
+                const end = i + 1;
+                if (KeywordMatcher.isWordChar(lower[start - 1])) continue;
+                if (pattern.wholeWord && KeywordMatcher.isWordChar(lower[end])) continue;
+                if (pattern.caseSensitive && source.slice(start, end) !== pattern.text) continue;
+                matches.push({ value: pattern.value, text: source.slice(start, end), start, end });
+            }
+        }
+
+        return matches.sort((a, b) => a.start - b.start || b.end - a.end);
+    }
+
+    static isWordChar(char) {
+        return char !== undefined && /[a-z0-9]/.test(char);
+    }
+}
+
+// Export for use in main application
+window.KeywordMatcher = KeywordMatcher;
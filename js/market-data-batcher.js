@@ -0,0 +1,252 @@
+// ⚡ Batched Market Data Fan-Out
+// Resolves every coin of a query from one Binance all-ticker snapshot plus
+// single multi-id CoinGecko calls, instead of walking coins one at a time
+
+class MarketDataBatcher {
+    constructor(samCryptoAI) {
+        this.app = samCryptoAI;
+
+        // Max parallel per-coin fallback requests (CoinCap)
+        this.concurrency = 6;
+
+        // CoinGecko accepts long id lists, but keep URLs reasonably short
+        this.maxIdsPerRequest = 50;
+
+        // Coins with a background stale-while-revalidate refresh in flight
+        this.refreshing = new Set();
+    }
+
+    /**
+     * 🚀 Fetch price + technical data for many coins in ~one round-trip
+     * @param {Object} options - { signal }: aborting drops queued CoinGecko/CoinCap requests
+     */
+    async fetchMany(coins, options = {}) {
+        const signal = options.signal || null;
+        const uniqueCoins = [...new Set(coins)];
+        const startTime = Date.now();
+
+        // Technical data and prices come from independent endpoints - run both at once
+        const [prices, marketRows] = await Promise.all([
+            this.fetchPrices(uniqueCoins, signal),
+            this.fetchMarketRows(uniqueCoins, signal)
+        ]);
+
+        const marketData = {};
+        for (const coin of uniqueCoins) {
+            const data = prices[coin];
+            if (!data) continue;
+
+            const row = marketRows[this.toCoinGeckoId(coin)];
+            const technicalData = row ? this.app.buildTechnicalAnalysis(row, data) : {};
+            marketData[coin] = { ...data, ...technicalData };
+        }
+
+        console.log(`⚡ Batched market data for ${Object.keys(marketData).length}/${uniqueCoins.length} coins in ${Date.now() - startTime}ms`);
+        return marketData;
+    }
+
+    /**
+     * 💰 Resolve prices: cache (stale-while-revalidate) → Binance snapshot → CoinGecko batch → CoinCap
+     */
+    async fetchPrices(coins, signal = null) {
+        const prices = {};
+        const stale = [];
+        let missing = [];
+
+        for (const coin of coins) {
+            const cached = this.app.getStaleFromCache(`market_${coin}`);
+            if (cached) {
+                // Serve expired prices instantly, refresh them after this call
+                prices[coin] = cached.data;
+                if (cached.stale) stale.push(coin);
+            } else {
+                missing.push(coin);
+            }
+        }
+
+        if (stale.length > 0) {
+            this.refreshInBackground(stale);
+        }
+
+        if (missing.length > 0) {
+            await this.fetchMissingPrices(missing, prices, signal);
+        }
+
+        return prices;
+    }
+
+    async fetchMissingPrices(coins, prices, signal = null) {
+        let missing = coins;
+
+        // Step 1: one shared Binance all-ticker snapshot covers most coins
+        if (missing.length > 0) {
+            try {
+                const allTickerData = await this.app.getBinanceAllTickerSnapshot();
+                missing = missing.filter(coin => {
+                    const ticker = this.app.findBinanceTicker(allTickerData, coin);
+                    if (!ticker) return true;
+
+                    const data = this.app.formatBinanceTicker(ticker, 'Binance All-Ticker');
+                    this.storePrice(prices, coin, data, 'Binance All-Ticker');
+                    return false;
+                });
+            } catch (error) {
+                console.error('Binance all-ticker snapshot error:', error);
+            }
+        }
+
+        // Step 2: a single multi-id CoinGecko /simple/price request for the rest
+        if (missing.length > 0) {
+            const geckoPrices = await this.fetchCoinGeckoPrices(missing, signal);
+            missing = missing.filter(coin => {
+                const data = geckoPrices[this.toCoinGeckoId(coin)];
+                if (!data) return true;
+
+                this.storePrice(prices, coin, data, 'CoinGecko');
+                return false;
+            });
+        }
+
+        // Step 3: per-coin fallbacks under a bounded concurrency limit
+        if (missing.length > 0) {
+            if (signal?.aborted) throw new DOMException('Aborted', 'AbortError');
+            console.log(`⚠️ ${missing.length} coins not in batch sources, trying CoinCap...`);
+            await MarketDataBatcher.runWithConcurrency(missing, this.concurrency, async (coin) => {
+                const data = await this.app.fetchFromCoinCap(this.toCoinGeckoId(coin));
+                if (data) {
+                    this.storePrice(prices, coin, data, 'CoinCap');
+                } else {
+                    // Return mock data for demo purposes
+                    prices[coin] = this.app.getMockMarketData(coin);
+                }
+            });
+        }
+
+        return prices;
+    }
+
+    refreshInBackground(coins) {
+        const pending = coins.filter(coin => !this.refreshing.has(coin));
+        if (pending.length === 0) return;
+
+        pending.forEach(coin => this.refreshing.add(coin));
+        this.fetchMissingPrices(pending, {})
+            .catch(error => console.warn('⚠️ Background price refresh failed:', error?.message || error))
+            .finally(() => pending.forEach(coin => this.refreshing.delete(coin)));
+    }
+
+    storePrice(prices, coin, data, primarySource) {
+        // Add metadata for freshness tracking
+        data.fetchTime = Date.now();
+        data.primarySource = primarySource;
+
+        this.app.setCache(`market_${coin}`, data);
+        prices[coin] = data;
+    }
+
+    /**
+     * 🦎 CoinGecko /simple/price for many ids in one call
+     */
+    async fetchCoinGeckoPrices(coins, signal = null) {
+        const ids = [...new Set(coins.map(coin => this.toCoinGeckoId(coin)))];
+        const results = {};
+
+        await Promise.all(this.chunk(ids, this.maxIdsPerRequest).map(async (batch) => {
+            try {
+                const response = await this.app.fetchScheduler.fetch(`${this.app.coinGeckoAPI}/simple/price?ids=${batch.join(',')}&vs_currencies=usd&include_24hr_change=true&include_24hr_vol=true&include_market_cap=true&include_last_updated_at=true`, { signal }, { priority: this.app.fetchPriority() });
+                if (!response.ok) throw new Error('CoinGecko batch price API failed');
+
+                const data = await response.json();
+                for (const [id, coinData] of Object.entries(data)) {
+                    if (!coinData || coinData.usd === undefined) continue;
+                    results[id] = {
+                        price_usd: coinData.usd,
+                        change_24h: coinData.usd_24h_change,
+                        volume_24h: coinData.usd_24h_vol,
+                        market_cap: coinData.usd_market_cap,
+                        last_updated: coinData.last_updated_at * 1000, // Convert to milliseconds
+                        source: 'CoinGecko'
+                    };
+                }
+            } catch (error) {
+                if (error.name === 'AbortError') throw error;
+                console.error('CoinGecko batch price error:', error);
+            }
+        }));
+
+        return results;
+    }
+
+    /**
+     * 📊 CoinGecko /coins/markets rows (rank, 7d/30d change, ATH/ATL) for many ids
+     */
+    async fetchMarketRows(coins, signal = null) {
+        const rows = {};
+        const missing = [];
+
+        for (const id of new Set(coins.map(coin => this.toCoinGeckoId(coin)))) {
+            const cached = this.app.getFromCache(`markets_row_${id}`);
+            if (cached) {
+                rows[id] = cached;
+            } else {
+                missing.push(id);
+            }
+        }
+
+        await Promise.all(this.chunk(missing, this.maxIdsPerRequest).map(async (batch) => {
+            try {
+                const response = await this.app.fetchScheduler.fetch(`${this.app.coinGeckoAPI}/coins/markets?vs_currency=usd&ids=${batch.join(',')}&per_page=${batch.length}&price_change_percentage=7d,30d&sparkline=false`, { signal }, { priority: this.app.fetchPriority() });
+                if (!response.ok) throw new Error('CoinGecko markets API failed');
+
+                const data = await response.json();
+                for (const row of data) {
+                    rows[row.id] = row;
+                    this.app.setCache(`markets_row_${row.id}`, row);
+                }
+            } catch (error) {
+                if (error.name === 'AbortError') throw error;
+                console.error('CoinGecko markets batch error:', error);
+            }
+        }));
+
+        return rows;
+    }
+
+    toCoinGeckoId(coin) {
+        return this.app.symbolResolver.toCoinGeckoId(coin);
+    }
+
+    chunk(items, size) {
+        const chunks = [];
+        for (let i = 0; i < items.length; i += size) {
+            chunks.push(items.slice(i, i + size));
+        }
+        return chunks;
+    }
+
+    /**
+     * 🚦 Run an async worker over items with at most `limit` in flight
+     */
+    static async runWithConcurrency(items, limit, worker) {
+        const results = new Array(items.length);
+        let nextIndex = 0;
+
+        const runners = Array.from({ length: Math.min(limit, items.length) }, async () => {
+            while (nextIndex < items.length) {
+                const index = nextIndex++;
+                try {
+                    results[index] = await worker(items[index], index);
+                } catch (error) {
+                    console.error('Concurrent task failed:', error);
+                    results[index] = null;
+                }
+            }
+        });
+
+        await Promise.all(runners);
+        return results;
+    }
+}
+
+// Export for use in main application
+window.MarketDataBatcher = MarketDataBatcher;
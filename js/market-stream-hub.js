@@ -0,0 +1,311 @@
+// 📡 Market Stream Hub - One multiplexed Binance WebSocket for every live price consumer
+// Consumers (ticker, trades, holdings, paper positions, alerts) declare the
+// symbols they care about; the hub keeps a single combined-stream socket
+// subscribed to the union of those sets and fans ticks out to subscribers.
+
+class MarketStreamHub {
+    constructor(options = {}) {
+        this.baseUrl = options.baseUrl || 'wss://stream.binance.com:9443/stream';
+        this.streamSuffix = options.streamSuffix || '@ticker';
+        // Stream payload → event with a `symbol` (or null to ignore); defaults to 24h tickers
+        this.parseMessage = options.parseMessage || MarketStreamHub.parseTicker;
+
+        // Reconnect: full-jitter exponential backoff
+        this.baseDelay = options.baseDelay || 1000;
+        this.maxDelay = options.maxDelay || 30000;
+        this.reconnectAttempts = 0;
+        this.reconnectTimer = null;
+
+        // Binance allows 1024 streams per connection and ~5 control messages/s
+        this.maxStreams = 1024;
+        this.syncDelay = 250;
+        this.syncTimer = null;
+        this.requestId = 0;
+
+        this.ws = null;
+        this.isConnected = false;
+        this.closedByClient = false;
+
+        // owner → { symbols: Set, handler } - each consumer replaces its own set
+        this.owners = new Map();
+        // symbol → Set of handlers registered with subscribe()
+        this.listeners = new Map();
+        this.statusListeners = new Set();
+
+        // Streams the open socket is currently subscribed to
+        this.activeStreams = new Set();
+
+        // Latest tick per symbol (e.g. 'BTCUSDT')
+        this.latest = new Map();
+
+        this.stats = {
+            messages: 0,
+            reconnects: 0,
+            subscribeRequests: 0
+        };
+    }
+
+    normalizeSymbol(symbol) {
+        return symbol ? String(symbol).replace(/[^a-zA-Z0-9]/g, '').toUpperCase() : null;
+    }
+
+    streamName(symbol) {
+        return `${symbol.toLowerCase()}${this.streamSuffix}`;
+    }
+
+    /**
+     * 🎯 Declare the full symbol set for a consumer (replaces its previous set)
+     * @param {string} owner - e.g. 'trades', 'holdings', 'paper', 'alerts'
+     * @param {Function} handler - (tick) => void, called for ticks of these symbols
+     */
+    track(owner, symbols, handler = null) {
+        const normalized = new Set();
+        for (const symbol of symbols) {
+            const s = this.normalizeSymbol(symbol);
+            if (s) normalized.add(s);
+        }
+
+        const previous = this.owners.get(owner);
+        this.owners.set(owner, { symbols: normalized, handler: handler || previous?.handler || null });
+        this.scheduleSync();
+    }
+
+    untrack(owner) {
+        if (this.owners.delete(owner)) this.scheduleSync();
+    }
+
+    /**
+     * 🔔 Subscribe to one symbol; returns an unsubscribe function
+     */
+    subscribe(symbol, handler) {
+        const s = this.normalizeSymbol(symbol);
+        if (!s) return () => {};
+
+        if (!this.listeners.has(s)) this.listeners.set(s, new Set());
+        this.listeners.get(s).add(handler);
+        this.scheduleSync();
+
+        // Replay the last known tick so late subscribers render immediately
+        const last = this.latest.get(s);
+        if (last) handler(last);
+
+        return () => {
+            const set = this.listeners.get(s);
+            if (!set) return;
+            set.delete(handler);
+            if (set.size === 0) this.listeners.delete(s);
+            this.scheduleSync();
+        };
+    }
+
+    onStatus(handler) {
+        this.statusListeners.add(handler);
+        return () => this.statusListeners.delete(handler);
+    }
+
+    getLatest(symbol) {
+        return this.latest.get(this.normalizeSymbol(symbol)) || null;
+    }
+
+    /**
+     * 🧮 Union of every consumer's symbols
+     */
+    desiredSymbols() {
+        const desired = new Set(this.listeners.keys());
+        for (const { symbols } of this.owners.values()) {
+            symbols.forEach(symbol => desired.add(symbol));
+        }
+        return desired;
+    }
+
+    scheduleSync() {
+        if (this.syncTimer) return;
+        // Coalesce bursts of track/subscribe calls into one control message
+        this.syncTimer = setTimeout(() => {
+            this.syncTimer = null;
+            this.sync();
+        }, this.syncDelay);
+    }
+
+    /**
+     * 🔄 Diff desired vs active streams and (un)subscribe on the open socket
+     */
+    sync() {
+        const desiredStreams = new Set();
+        for (const symbol of this.desiredSymbols()) {
+            if (desiredStreams.size >= this.maxStreams) break;
+            desiredStreams.add(this.streamName(symbol));
+        }
+
+        if (desiredStreams.size === 0) {
+            if (this.ws) this.disconnect();
+            return;
+        }
+
+        if (!this.ws) {
+            this.connect();
+            return;
+        }
+        if (!this.isConnected) return; // onopen re-syncs
+
+        const toAdd = [...desiredStreams].filter(stream => !this.activeStreams.has(stream));
+        const toRemove = [...this.activeStreams].filter(stream => !desiredStreams.has(stream));
+
+        if (toRemove.length > 0) this.send('UNSUBSCRIBE', toRemove);
+        if (toAdd.length > 0) this.send('SUBSCRIBE', toAdd);
+
+        toRemove.forEach(stream => this.activeStreams.delete(stream));
+        toAdd.forEach(stream => this.activeStreams.add(stream));
+    }
+
+    send(method, params) {
+        try {
+            this.ws.send(JSON.stringify({ method: method, params: params, id: ++this.requestId }));
+            this.stats.subscribeRequests++;
+            console.log(`📡 ${method} ${params.length} stream(s)`);
+        } catch (error) {
+            console.error('WebSocket send failed:', error);
+        }
+    }
+
+    /**
+     * 🔌 Open the combined stream with the current symbol set in the URL
+     */
+    connect() {
+        if (this.ws) return;
+        this.closedByClient = false;
+        clearTimeout(this.reconnectTimer);
+        this.reconnectTimer = null;
+
+        const streams = [...this.desiredSymbols()].slice(0, this.maxStreams).map(symbol => this.streamName(symbol));
+        if (streams.length === 0) return;
+
+        try {
+            const ws = new WebSocket(`${this.baseUrl}?streams=${streams.join('/')}`);
+            this.ws = ws;
+
+            ws.onopen = () => {
+                console.log(`📡 Market stream connected (${streams.length} streams)`);
+                this.isConnected = true;
+                this.reconnectAttempts = 0;
+                this.activeStreams = new Set(streams);
+                this.emitStatus(true);
+                // Pick up anything that changed while connecting
+                this.sync();
+            };
+
+            ws.onmessage = (event) => this.handleMessage(event.data);
+
+            ws.onclose = () => {
+                if (this.ws === ws) this.handleDisconnect();
+            };
+
+            ws.onerror = (error) => {
+                console.error('WebSocket error:', error);
+            };
+        } catch (error) {
+            console.error('Failed to connect to Binance WebSocket:', error);
+            this.handleDisconnect();
+        }
+    }
+
+    handleDisconnect() {
+        const wasConnected = this.isConnected;
+        this.ws = null;
+        this.isConnected = false;
+        this.activeStreams.clear();
+        if (wasConnected || this.reconnectAttempts === 0) this.emitStatus(false);
+
+        if (this.closedByClient || this.desiredSymbols().size === 0) return;
+
+        const cap = Math.min(this.maxDelay, this.baseDelay * Math.pow(2, this.reconnectAttempts));
+        const delay = Math.round(Math.random() * cap);
+        this.reconnectAttempts++;
+        this.stats.reconnects++;
+
+        console.log(`🔁 Market stream reconnecting in ${delay}ms (attempt ${this.reconnectAttempts})`);
+        this.reconnectTimer = setTimeout(() => this.connect(), delay);
+    }
+
+    disconnect() {
+        this.closedByClient = true;
+        clearTimeout(this.reconnectTimer);
+        this.reconnectTimer = null;
+
+        const ws = this.ws;
+        this.ws = null;
+        this.isConnected = false;
+        this.activeStreams.clear();
+        if (ws) ws.close();
+    }
+
+    handleMessage(raw) {
+        let payload;
+        try {
+            payload = JSON.parse(raw);
+        } catch (e) {
+            console.error('Error parsing WebSocket message:', e);
+            return;
+        }
+
+        // Combined streams use { stream, data }; control replies are { result, id }
+        const data = payload && payload.data ? payload.data : payload;
+        if (!data || !data.s) return;
+
+        const tick = this.parseMessage(data);
+        if (!tick) return;
+
+        this.stats.messages++;
+        this.latest.set(tick.symbol, tick);
+        this.publish(tick);
+    }
+
+    static parseTicker(data) {
+        if (data.c === undefined) return null;
+        return {
+            symbol: data.s,
+            price: parseFloat(data.c),
+            changePercent: parseFloat(data.P),
+            high: parseFloat(data.h),
+            low: parseFloat(data.l),
+            volume: parseFloat(data.v),
+            quoteVolume: parseFloat(data.q),
+            eventTime: data.E || Date.now(),
+            raw: data
+        };
+    }
+
+    publish(tick) {
+        const handlers = this.listeners.get(tick.symbol);
+        if (handlers) handlers.forEach(handler => this.invoke(handler, tick));
+
+        for (const { symbols, handler } of this.owners.values()) {
+            if (handler && symbols.has(tick.symbol)) this.invoke(handler, tick);
+        }
+    }
+
+    invoke(handler, payload) {
+        try {
+            handler(payload);
+        } catch (error) {
+            console.error('Market stream subscriber failed:', error);
+        }
+    }
+
+    emitStatus(connected) {
+        this.statusListeners.forEach(handler => this.invoke(handler, connected));
+    }
+
+    getStats() {
+        return {
+            ...this.stats,
+            connected: this.isConnected,
+            streams: this.activeStreams.size,
+            consumers: this.owners.size + this.listeners.size
+        };
+    }
+}
+
+// Export shared instance for use across modules
+window.MarketStreamHub = MarketStreamHub;
+window.marketStreamHub = new MarketStreamHub();
@@ -0,0 +1,222 @@
+// 🧠 Message Analyzer - One pass over a message for coins, intents, topics and profile signals
+// Every keyword list the chat pipeline uses lives in a single dictionary that is
+// compiled into one KeywordMatcher, together with the coins of the shared
+// SymbolResolver registry. A message (or a multi-thousand-character
+// reply) is scanned once and the result is shared by coin extraction, intent
+// detection, topic tracking and profile/preference extraction.
+
+class MessageAnalyzer {
+    constructor(dictionary = MessageAnalyzer.dictionary, registry = window.symbolResolver) {
+        this.dictionary = dictionary;
+        // Coins come from the SymbolResolver registry unless the dictionary brings its own
+        this.coins = dictionary.coins || MessageAnalyzer.coinsFrom(registry);
+        this.matcher = new KeywordMatcher();
+
+        // alias (lower case) → coin entry
+        this.coinIndex = new Map();
+
+        // The same text is analyzed by several callers in a row
+        this.cache = new Map();
+        this.maxCacheEntries = 16;
+
+        this.stats = { scans: 0, cacheHits: 0 };
+
+        this.compile();
+    }
+
+    compile() {
+        const { ambiguousSymbols } = this.dictionary;
+
+        this.coins.forEach(coin => {
+            [coin.id, coin.symbol, ...(coin.aliases || [])].forEach(alias => {
+                this.coinIndex.set(alias.toLowerCase(), coin);
+            });
+
+            // Tickers that are also English words ("op", "near", "link") need CAPS or a $ prefix
+            const ambiguous = ambiguousSymbols.includes(coin.symbol);
+
+            // Names and unambiguous tickers match in any case
+            [coin.id, ...(coin.aliases || [])]
+                .filter(alias => !(ambiguous && alias === coin.symbol))
+                .forEach(alias => this.matcher.add(alias, { kind: 'coin', coin, alias }));
+
+            if (ambiguous) {
+                this.matcher.add(coin.symbol.toUpperCase(), { kind: 'coin', coin, alias: coin.symbol }, { caseSensitive: true });
+                this.matcher.add(`$${coin.symbol}`, { kind: 'coin', coin, alias: coin.symbol });
+            } else {
+                this.matcher.add(coin.symbol, { kind: 'coin', coin, alias: coin.symbol });
+            }
+        });
+
+        // Keyword groups match as stems (prefixes): "trade" covers "trader", not "trading"
+        Object.entries(this.dictionary.keywords).forEach(([group, labels]) => {
+            Object.entries(labels).forEach(([label, words]) => {
+                words.forEach(word => this.matcher.add(word, { kind: group, label }, { wholeWord: false }));
+            });
+        });
+
+        this.matcher.compile();
+    }
+
+    /**
+     * 🪙 Matcher entries for registry coins: lower-case symbol, name and aliases
+     */
+    static coinsFrom(registry) {
+        return registry.coins.map(coin => {
+            const symbol = coin.symbol.toLowerCase();
+            const aliases = [coin.name, ...(coin.aliases || [])]
+                .filter(Boolean)
+                .map(alias => alias.toLowerCase())
+                .filter((alias, index, all) => alias !== coin.id && alias !== symbol && all.indexOf(alias) === index);
+            return { id: coin.id, symbol, name: coin.name, aliases };
+        });
+    }
+
+    /**
+     * 🔍 Analyze a message
+     * @returns {{coins: Array, keywords: Object, matches: Array}}
+     *   coins - one entry per coin in order of first mention: { coin, alias }
+     *   keywords - group → label → matched words, e.g. keywords.intent.price_check
+     */
+    analyze(text) {
+        const key = String(text || '');
+        if (this.cache.has(key)) {
+            this.stats.cacheHits++;
+            return this.cache.get(key);
+        }
+
+        this.stats.scans++;
+        const matches = this.matcher.scan(key);
+        const coins = [];
+        const seenCoins = new Set();
+        const keywords = {};
+        // End of the last coin match - "bitcoin cash" must not also count as "bitcoin"
+        let coinEnd = 0;
+
+        matches.forEach(match => {
+            const { kind, coin, alias, label } = match.value;
+            if (kind === 'coin') {
+                if (match.start < coinEnd) return;
+                coinEnd = match.end;
+                if (!seenCoins.has(coin.id)) {
+                    seenCoins.add(coin.id);
+                    coins.push({ coin, alias });
+                }
+                return;
+            }
+
+            const group = keywords[kind] || (keywords[kind] = {});
+            const words = group[label] || (group[label] = []);
+            const word = match.text.toLowerCase();
+            if (!words.includes(word)) words.push(word);
+        });
+
+        const result = { coins, keywords, matches };
+        this.cache.set(key, result);
+        if (this.cache.size > this.maxCacheEntries) {
+            this.cache.delete(this.cache.keys().next().value);
+        }
+        return result;
+    }
+
+    /**
+     * 🏷️ First label of a group whose keywords matched, in dictionary priority order
+     */
+    firstLabel(result, group) {
+        const matched = result.keywords[group];
+        if (!matched) return null;
+        return Object.keys(this.dictionary.keywords[group]).find(label => matched[label]) || null;
+    }
+
+    has(result, group, label) {
+        return !!(result.keywords[group] && result.keywords[group][label]);
+    }
+
+    /**
+     * 🪙 Id the chat pipeline fetches a mention by: the coin id when the name was
+     * used ("bitcoin"), otherwise the ticker ("btc", "bnb" for "binance")
+     */
+    mentionId(mention) {
+        return mention.alias === mention.coin.id ? mention.coin.id : mention.coin.symbol;
+    }
+
+    lookupCoin(alias) {
+        return alias ? this.coinIndex.get(String(alias).toLowerCase()) || null : null;
+    }
+
+    getStats() {
+        return { ...this.stats, patterns: this.matcher.patterns.length };
+    }
+}
+
+MessageAnalyzer.dictionary = {
+    // Tickers that are ordinary words - only counted as "NEAR", "$near", ...
+    ambiguousSymbols: ['near', 'op', 'uni', 'atom', 'link', 'dot', 'render', 'ape', 'vet', 'algo'],
+
+    // group → label → stems; label order is the priority when labels conflict
+    keywords: {
+        intent: {
+            market_scan: ['scan', 'market scan', 'whole market', 'all market', 'all coins', 'across market', 'best trade', 'best setup', 'top pick', 'trade signal', 'signal for trade', 'find me a trade', 'find me a good trade', 'which coin has signal', 'which coin to trade', 'scan the market', 'scan market', 'analyze the market', 'analyze market'],
+            trade_advice: ['buy', 'sell', 'trade', 'trading', 'invest', 'should i', 'recommend', 'good time', 'entry', 'exit'],
+            price_check: ['price', 'cost', 'worth', 'value', 'how much'],
+            analysis: ['analyze', 'analysis', 'technical', 'chart', 'indicator', 'rsi', 'macd'],
+            portfolio: ['portfolio', 'holdings', 'my coins', 'balance', 'profit', 'loss', 'p&l'],
+            news: ['news', 'latest', 'update', 'happening', 'events'],
+            learning: ['how', 'what is', 'explain', 'teach', 'learn', 'understand', 'why'],
+            comparison: ['vs', 'versus', 'compare', 'better', 'difference between'],
+            prediction: ['predict', 'forecast', 'future', 'will', 'expect', 'outlook'],
+            risk: ['risk', 'safe', 'danger', 'volatile', 'secure', 'risky']
+        },
+        urgency: {
+            urgent: ['now', 'quickly', 'urgent', 'asap', 'immediately']
+        },
+        sentiment: {
+            positive: ['good', 'great', 'awesome', 'excellent', 'bullish'],
+            negative: ['bad', 'worry', 'scared', 'bearish', 'crash']
+        },
+        topic: {
+            price: ['price'], trend: ['trend'], support: ['support'], resistance: ['resistance'],
+            rsi: ['rsi'], volume: ['volume'], bull: ['bull'], bear: ['bear'], breakout: ['breakout'],
+            analysis: ['analysis'], trade: ['trade', 'trading'], setup: ['setup']
+        },
+
+        // extractUserProfile (conversation context)
+        profileExperience: {
+            beginner: ['beginner', 'new to', 'just started', 'first time'],
+            advanced: ['expert', 'professional', 'advanced', 'experienced']
+        },
+        profileRisk: {
+            low: ['safe', 'conservative', 'low risk', 'careful'],
+            high: ['aggressive', 'high risk', 'yolo', 'moon']
+        },
+        profileStyle: {
+            'long-term': ['long term', 'hold', 'hodl', 'invest'],
+            'short-term': ['day trad', 'short term', 'quick', 'scalp']
+        },
+        interest: {
+            DeFi: ['defi', 'decentralized finance'],
+            NFTs: ['nft', 'non fungible']
+        },
+
+        // extractAndSaveUserPreferences (persisted user preferences)
+        preferenceStyle: {
+            day_trader: ['day trading', 'scalping'],
+            swing_trader: ['swing trading', 'short term'],
+            long_term_investor: ['hodl', 'long term', 'buy and hold']
+        },
+        preferenceRisk: {
+            high: ['high risk', 'aggressive', 'leverag'],
+            low: ['low risk', 'safe', 'conservative'],
+            medium: ['moderate', 'balanced']
+        },
+        preferenceExperience: {
+            beginner: ['beginner', 'new to', 'just started'],
+            experienced: ['experienced', 'trading for', 'years'],
+            expert: ['expert', 'professional', 'advanced']
+        }
+    }
+};
+
+// Export shared instance for use across modules
+window.MessageAnalyzer = MessageAnalyzer;
+window.messageAnalyzer = new MessageAnalyzer();
@@ -0,0 +1,127 @@
+// ⌨️ Streaming Message Renderer - Append-only, frame-budgeted typewriter
+// Text is revealed into one live text node (appendData, no HTML reparsing),
+// a few characters per animation frame within a small time budget. The
+// markdown → HTML formatting runs exactly once, when the message is complete.
+// The same renderer accepts chunks as they arrive from a streaming response.
+
+class StreamingMessageRenderer {
+    constructor(element, options = {}) {
+        this.element = element;
+        this.container = options.container || null;
+        this.format = options.format || (text => text);
+        this.shouldScroll = options.shouldScroll || (() => true);
+
+        // ~5 chars/frame ≈ 300 chars/s at 60fps; large backlogs catch up within ~catchUpFrames
+        this.charsPerFrame = options.charsPerFrame || 5;
+        this.catchUpFrames = options.catchUpFrames || 45;
+        this.frameBudget = options.frameBudget || 6; // ms of work per frame
+
+        this.buffer = '';      // Everything received so far
+        this.revealed = 0;     // How much of buffer is on screen
+        this.ended = false;
+        this.cancelled = false;
+        this.finalized = false;
+        this.frameRequested = false;
+
+        this.liveText = document.createTextNode('');
+        const live = document.createElement('span');
+        live.className = 'streaming-text';
+        live.style.whiteSpace = 'pre-wrap';
+        live.appendChild(this.liveText);
+
+        this.cursor = document.createElement('span');
+        this.cursor.className = 'typing-cursor';
+        this.cursor.textContent = '|';
+
+        this.element.replaceChildren(live, this.cursor);
+
+        this.done = new Promise(resolve => { this.resolveDone = resolve; });
+    }
+
+    /**
+     * ➕ Queue more text (a whole message or a streamed chunk)
+     */
+    append(text) {
+        if (this.ended || this.cancelled || !text) return;
+        this.buffer += text;
+        this.requestFrame();
+    }
+
+    /**
+     * 🏁 No more text will arrive; resolves once formatted output is in place
+     */
+    finish() {
+        this.ended = true;
+        this.requestFrame();
+        return this.done;
+    }
+
+    /**
+     * ⏹️ Stop revealing and format whatever has arrived so far
+     */
+    cancel() {
+        this.cancelled = true;
+        this.finalize();
+    }
+
+    getText() {
+        return this.buffer;
+    }
+
+    requestFrame() {
+        if (this.frameRequested || this.cancelled) return;
+        this.frameRequested = true;
+
+        // rAF is paused in background tabs - don't leave the message half-typed
+        if (typeof document !== 'undefined' && document.hidden) {
+            setTimeout(() => this.frame(true), 50);
+        } else {
+            requestAnimationFrame(() => this.frame(false));
+        }
+    }
+
+    frame(revealAll) {
+        this.frameRequested = false;
+        if (this.cancelled) return;
+
+        const start = performance.now();
+        const backlog = this.buffer.length - this.revealed;
+        let quota = revealAll ? backlog : Math.max(this.charsPerFrame, Math.ceil(backlog / this.catchUpFrames));
+
+        // Append in slices so an oversized quota still respects the frame budget
+        while (quota > 0 && this.revealed < this.buffer.length) {
+            const size = Math.min(quota, 256, this.buffer.length - this.revealed);
+            this.liveText.appendData(this.buffer.slice(this.revealed, this.revealed + size));
+            this.revealed += size;
+            quota -= size;
+            if (!revealAll && performance.now() - start > this.frameBudget) break;
+        }
+
+        this.scroll();
+
+        if (this.revealed < this.buffer.length) {
+            this.requestFrame();
+        } else if (this.ended) {
+            this.finalize();
+        }
+    }
+
+    scroll() {
+        if (this.container && this.shouldScroll()) {
+            this.container.scrollTop = this.container.scrollHeight;
+        }
+    }
+
+    finalize() {
+        if (this.finalized) return;
+        this.finalized = true;
+
+        // One formatting pass for the complete message
+        this.element.innerHTML = this.format(this.buffer);
+        this.scroll();
+        this.resolveDone(this.buffer);
+    }
+}
+
+// Export for use in main application
+window.StreamingMessageRenderer = StreamingMessageRenderer;
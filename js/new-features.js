@@ -74,6 +74,7 @@ class NewFeatures {
 
     savePaperPortfolio() {
         localStorage.setItem('paper_portfolio', JSON.stringify(this.paperPortfolio));
+        if (this.priceUpdateInterval) this.syncPaperStreams();
     }
 
     async openPaperTrading() {
@@ -96,11 +97,12 @@ class NewFeatures {
             clearInterval(this.priceUpdateInterval);
             this.priceUpdateInterval = null;
         }
+        this.app.marketStream?.untrack('paper');
     }
 
     async loadAvailableCoins() {
         try {
-            const response = await fetch('https://api.binance.com/api/v3/ticker/24hr');
+            const response = await this.app.fetchScheduler.fetch('https://api.binance.com/api/v3/ticker/24hr', {}, { priority: 'high' });
             const data = await response.json();
             
             // Filter USDT pairs and sort by volume
@@ -149,6 +151,7 @@ class NewFeatures {
         
         this.selectedCoin = coin;
         this.updateCurrentPrice();
+        if (this.priceUpdateInterval) this.syncPaperStreams();
     }
 
     onOrderTypeChange(orderType) {
@@ -203,10 +206,37 @@ class NewFeatures {
     }
 
     async startLivePriceUpdates() {
-        // Update every 2 seconds
+        if (this.priceUpdateInterval) {
+            clearInterval(this.priceUpdateInterval);
+        }
+
+        // Ticks come from the shared market stream; REST only while it is down
         this.priceUpdateInterval = setInterval(async () => {
-            await this.updateLivePrices();
+            if (!this.app.marketStream?.isConnected) {
+                await this.updateLivePrices();
+            }
         }, 2000);
+        this.syncPaperStreams();
+    }
+
+    syncPaperStreams() {
+        const hub = this.app.marketStream;
+        if (!hub) return;
+
+        const symbols = this.paperPortfolio.positions.map(pos => pos.coin.toUpperCase() + 'USDT');
+        if (this.selectedCoin) symbols.push(this.selectedCoin.symbol);
+        hub.track('paper', symbols, (tick) => {
+            this.applyLivePrice(tick.symbol, tick.price);
+            this.schedulePaperRender();
+        });
+    }
+
+    schedulePaperRender() {
+        if (this.paperRenderTimer) return;
+        this.paperRenderTimer = setTimeout(() => {
+            this.paperRenderTimer = null;
+            this.updatePaperDisplay();
+        }, 500);
     }
 
     async updateLivePrices() {
@@ -222,40 +252,10 @@ class NewFeatures {
             });
             
             // Fetch latest prices from Binance
-            const response = await fetch('https://api.binance.com/api/v3/ticker/price?symbols=' + JSON.stringify(symbols));
+            const response = await this.app.fetchScheduler.fetch('https://api.binance.com/api/v3/ticker/price?symbols=' + JSON.stringify(symbols), {}, { priority: 'low' });
             const data = await response.json();
             
-            // Update selected coin price
-            if (this.selectedCoin) {
-                const coinData = data.find(d => d.symbol === this.selectedCoin.symbol);
-                if (coinData) {
-                    this.selectedCoin.price = parseFloat(coinData.price);
-                    this.updateCurrentPrice();
-                    this.calculateTotal();
-                }
-            }
-            
-            // Update position prices
-            this.paperPortfolio.positions.forEach(pos => {
-                const symbol = pos.coin.toUpperCase() + 'USDT';
-                const coinData = data.find(d => d.symbol === symbol);
-                if (coinData) {
-                    pos.currentPrice = parseFloat(coinData.price);
-                    
-                    // Calculate P&L
-                    const currentValue = pos.amount * pos.currentPrice;
-                    const entryValue = pos.amount * pos.entryPrice;
-                    pos.pnl = currentValue - entryValue;
-                    pos.pnlPercent = (pos.pnl / entryValue) * 100;
-                    
-                    // Check stop loss and take profit
-                    if (pos.stopLoss && pos.currentPrice <= pos.stopLoss) {
-                        this.autoClosePaperPosition(pos, 'Stop Loss Hit');
-                    } else if (pos.takeProfit && pos.currentPrice >= pos.takeProfit) {
-                        this.autoClosePaperPosition(pos, 'Take Profit Hit');
-                    }
-                }
-            });
+            data.forEach(coinData => this.applyLivePrice(coinData.symbol, parseFloat(coinData.price)));
             
             this.updatePaperDisplay();
             
@@ -264,6 +264,34 @@ class NewFeatures {
         }
     }
 
+    applyLivePrice(symbol, price) {
+        // Update selected coin price
+        if (this.selectedCoin && this.selectedCoin.symbol === symbol) {
+            this.selectedCoin.price = price;
+            this.updateCurrentPrice();
+            this.calculateTotal();
+        }
+        
+        // Update position prices (copy - auto-close removes positions while we iterate)
+        [...this.paperPortfolio.positions].forEach(pos => {
+            if (pos.coin.toUpperCase() + 'USDT' !== symbol) return;
+            pos.currentPrice = price;
+            
+            // Calculate P&L
+            const currentValue = pos.amount * pos.currentPrice;
+            const entryValue = pos.amount * pos.entryPrice;
+            pos.pnl = currentValue - entryValue;
+            pos.pnlPercent = (pos.pnl / entryValue) * 100;
+            
+            // Check stop loss and take profit
+            if (pos.stopLoss && pos.currentPrice <= pos.stopLoss) {
+                this.autoClosePaperPosition(pos, 'Stop Loss Hit');
+            } else if (pos.takeProfit && pos.currentPrice >= pos.takeProfit) {
+                this.autoClosePaperPosition(pos, 'Take Profit Hit');
+            }
+        });
+    }
+
     autoClosePaperPosition(position, reason) {
         const index = this.paperPortfolio.positions.indexOf(position);
         if (index !== -1) {
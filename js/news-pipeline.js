@@ -0,0 +1,350 @@
+// 📰 News Pipeline - Hedged multi-source ingestion with dedup and a keyword index
+// News sources are raced as hedged requests: the first starts at once and each
+// further one starts when the previous has failed, come back empty or stayed
+// silent for `hedgeDelay`. The first good answer wins; answers that arrive
+// later are still merged in. Articles are deduped across sources by URL or
+// title hash, and only never-seen articles are scanned and scored - one pass
+// of the compiled keyword automaton per article. Every scored article is
+// indexed by category, coin, topic keyword, sentiment and impact, so filters
+// and per-coin lookups touch only the matching articles.
+
+class NewsPipeline {
+    constructor(options = {}) {
+        // (article, analysis) => scored article; the app owns the scoring rules
+        this.score = options.score || null;
+        this.hedgeDelay = options.hedgeDelay || 800;
+        this.maxArticles = options.maxArticles || 300;
+
+        // Coins from the shared dictionary plus the news lexicon, in one automaton
+        this.analyzer = options.analyzer || new MessageAnalyzer({
+            ...MessageAnalyzer.dictionary,
+            keywords: NewsPipeline.lexicon
+        });
+
+        // id → scored article, in ingestion order (oldest first)
+        this.articles = new Map();
+        // dedup key (url:… / title:…) → id
+        this.keys = new Map();
+        // term (category:bitcoin, coin:solana, keyword:etf, …) → Set<id>
+        this.index = new Map();
+        // id → its terms, so eviction never re-scans
+        this.articleTerms = new Map();
+        this.sequence = 0;
+
+        this.stats = {
+            requests: 0,
+            wins: {},
+            lateMerges: 0,
+            ingested: 0,
+            duplicates: 0,
+            scored: 0,
+            evicted: 0,
+            lookups: 0
+        };
+    }
+
+    /**
+     * 🏁 Hedged fetch across sources: [{ name, fetch: () => Promise<Array<article>> }]
+     * @returns {Promise<{source, articles}|null>} the first source with articles, or null
+     */
+    fetchHedged(sources, options = {}) {
+        const hedgeDelay = options.hedgeDelay || this.hedgeDelay;
+
+        return new Promise(resolve => {
+            let next = 0;
+            let settled = 0;
+            let winner = null;
+            let timer = null;
+
+            const launch = () => {
+                clearTimeout(timer);
+                if (winner || next >= sources.length) return;
+
+                const source = sources[next++];
+                this.stats.requests++;
+                console.log(`📡 Requesting news from ${source.name}...`);
+
+                Promise.resolve()
+                    .then(() => source.fetch())
+                    .then(articles => {
+                        const stored = this.ingest(articles, source.name);
+                        if (stored.length === 0) {
+                            launch();
+                        } else if (winner) {
+                            this.stats.lateMerges++;
+                            console.log(`📥 Merged ${stored.length} late articles from ${source.name}`);
+                        } else {
+                            winner = source.name;
+                            clearTimeout(timer);
+                            this.stats.wins[source.name] = (this.stats.wins[source.name] || 0) + 1;
+                            resolve({ source: source.name, articles: stored });
+                        }
+                    })
+                    .catch(error => {
+                        console.log(`⚠️ News source ${source.name} failed:`, error.message);
+                        launch();
+                    })
+                    .finally(() => {
+                        settled++;
+                        if (!winner && settled === sources.length) resolve(null);
+                    });
+
+                // Hedge: start the next source if this one is slow to answer
+                if (next < sources.length) timer = setTimeout(launch, hedgeDelay);
+            };
+
+            if (sources.length === 0) resolve(null);
+            else launch();
+        });
+    }
+
+    /**
+     * 📥 Merge articles into the store; unseen ones are scanned, scored and indexed
+     * @returns {Array} the stored (scored) article for each distinct input, in input order
+     */
+    ingest(articles, source = null) {
+        const stored = [];
+        const returned = new Set();
+        let added = false;
+
+        for (const article of articles || []) {
+            if (!article || !article.title) continue;
+            this.stats.ingested++;
+
+            const keys = this.keysFor(article);
+            let id = keys.map(key => this.keys.get(key)).find(existing => existing !== undefined);
+            if (id === undefined) {
+                id = this.add(article, keys);
+                added = true;
+            } else {
+                this.stats.duplicates++;
+            }
+
+            if (!returned.has(id)) {
+                returned.add(id);
+                stored.push(this.articles.get(id));
+            }
+        }
+
+        if (added) this.evict();
+        if (source && stored.length > 0) console.log(`📰 ${source}: ${stored.length} articles (${this.articles.size} retained)`);
+        return stored;
+    }
+
+    add(article, keys) {
+        const id = ++this.sequence;
+        const analysis = this.analyzeArticle(article);
+        const scored = this.score ? this.score(article, analysis) : { ...article };
+        scored.newsId = id;
+        this.stats.scored++;
+
+        this.articles.set(id, scored);
+        keys.forEach(key => this.keys.set(key, id));
+
+        const terms = this.termsFor(scored, analysis);
+        this.articleTerms.set(id, terms);
+        terms.forEach(term => {
+            if (!this.index.has(term)) this.index.set(term, new Set());
+            this.index.get(term).add(id);
+        });
+        return id;
+    }
+
+    // Oldest articles leave the store and every index entry that points at them
+    evict() {
+        for (const [id, article] of this.articles) {
+            if (this.articles.size <= this.maxArticles) break;
+
+            this.articles.delete(id);
+            this.keysFor(article).forEach(key => {
+                if (this.keys.get(key) === id) this.keys.delete(key);
+            });
+            this.articleTerms.get(id).forEach(term => {
+                const ids = this.index.get(term);
+                ids.delete(id);
+                if (ids.size === 0) this.index.delete(term);
+            });
+            this.articleTerms.delete(id);
+            this.stats.evicted++;
+        }
+    }
+
+    /**
+     * 🔑 Dedup keys: normalized URL (when there is a real one) and a hash of the normalized title
+     */
+    keysFor(article) {
+        const keys = [];
+        const url = NewsPipeline.normalizeUrl(article.url);
+        if (url) keys.push(`url:${url}`);
+
+        const title = String(article.title || '').toLowerCase().replace(/[^a-z0-9]+/g, ' ').trim();
+        if (title) keys.push(`title:${NewsPipeline.hash(title)}`);
+        return keys;
+    }
+
+    termsFor(article, analysis) {
+        const terms = new Set();
+        ['category', 'sentiment', 'impact'].forEach(field => {
+            if (article[field]) terms.add(`${field}:${String(article[field]).toLowerCase()}`);
+        });
+        analysis.coins.forEach(coinId => terms.add(`coin:${coinId}`));
+        Object.values(analysis.words.topic || {}).forEach(words => {
+            words.forEach(word => terms.add(`keyword:${word}`));
+        });
+        return terms;
+    }
+
+    /**
+     * 🔍 Scan an article's title + description once
+     * @returns {{coins: Array<string>, words: Object, title: Object}}
+     *   words - group → label → matched words over the whole text
+     *   title - the same, restricted to matches inside the title
+     */
+    analyzeArticle(article) {
+        const title = String(article.title || '');
+        return this.analyze(`${title} ${article.description || ''}`, title.length);
+    }
+
+    analyze(text, titleLength = Infinity) {
+        const result = this.analyzer.analyze(text);
+        const words = {};
+        const title = {};
+
+        result.matches.forEach(match => {
+            const { kind, label } = match.value;
+            if (kind === 'coin') return;
+
+            const word = match.text.toLowerCase();
+            NewsPipeline.addWord(words, kind, label, word);
+            if (match.end <= titleLength) NewsPipeline.addWord(title, kind, label, word);
+        });
+
+        return { coins: result.coins.map(mention => mention.coin.id), words, title };
+    }
+
+    static addWord(groups, kind, label, word) {
+        const group = groups[kind] || (groups[kind] = {});
+        const words = group[label] || (group[label] = []);
+        if (!words.includes(word)) words.push(word);
+    }
+
+    /**
+     * 🏷️ First label of a lexicon group that matched, in lexicon priority order
+     */
+    firstLabel(groups, group) {
+        const matched = groups[group];
+        if (!matched) return null;
+        return Object.keys(NewsPipeline.lexicon[group]).find(label => matched[label]) || null;
+    }
+
+    matched(groups, group, label) {
+        return (groups[group] && groups[group][label]) || [];
+    }
+
+    /**
+     * 🗂️ Articles indexed under a term, newest first - only the matches are touched
+     */
+    lookup(term, limit = Infinity) {
+        this.stats.lookups++;
+        const ids = this.index.get(String(term).toLowerCase());
+        if (!ids) return [];
+
+        const matches = [];
+        ids.forEach(id => matches.push(this.articles.get(id)));
+        return NewsPipeline.newestFirst(matches).slice(0, limit);
+    }
+
+    byCoin(coinId, limit = Infinity) {
+        return this.lookup(`coin:${coinId}`, limit);
+    }
+
+    byCategory(category, limit = Infinity) {
+        return this.lookup(`category:${category}`, limit);
+    }
+
+    /**
+     * Every retained article, merged across sources, newest first
+     */
+    all() {
+        return NewsPipeline.newestFirst([...this.articles.values()]);
+    }
+
+    has(id) {
+        return this.articles.has(id);
+    }
+
+    static newestFirst(articles) {
+        const time = article => Date.parse(article.publishedAt) || 0;
+        return articles.sort((a, b) => time(b) - time(a));
+    }
+
+    static normalizeUrl(url) {
+        if (!url || url === '#') return null;
+        return String(url).trim().toLowerCase()
+            .replace(/^https?:\/\//, '')
+            .replace(/^www\./, '')
+            .replace(/[?#].*$/, '')
+            .replace(/\/+$/, '') || null;
+    }
+
+    // FNV-1a, 32-bit
+    static hash(text) {
+        let hash = 0x811c9dc5;
+        for (let i = 0; i < text.length; i++) {
+            hash ^= text.charCodeAt(i);
+            hash = Math.imul(hash, 0x01000193);
+        }
+        return (hash >>> 0).toString(16);
+    }
+
+    getStats() {
+        return {
+            ...this.stats,
+            articles: this.articles.size,
+            terms: this.index.size,
+            analyzer: this.analyzer.getStats()
+        };
+    }
+}
+
+// Matched as stems ("consolidat" covers "consolidation"); label order is priority order
+NewsPipeline.lexicon = {
+    topic: {
+        price: ['surge', 'rally', 'drop', 'crash', 'pump', 'dump', 'moon', 'dip', 'breakout', 'resistance', 'support'],
+        institutional: ['institutional', 'etf', 'sec', 'regulation', 'adoption', 'approval', 'wallstreet'],
+        tech: ['upgrade', 'fork', 'blockchain', 'defi', 'nft', 'layer2', 'scaling', 'security']
+    },
+    priceAction: {
+        bullish: ['surge', 'rally', 'moon', 'breakout'],
+        bearish: ['crash', 'drop', 'dump', 'fall'],
+        neutral: ['stable', 'consolidat', 'sideways']
+    },
+    marketImpact: {
+        high: ['billion', 'trillion', 'massive', 'major'],
+        medium: ['million', 'significant', 'notable']
+    },
+    impact: {
+        high: [
+            'breaking', 'urgent', 'major', 'massive', 'huge', 'billion', 'trillion',
+            'sec', 'regulation', 'ban', 'approval', 'etf', 'institutional', 'adoption',
+            'hack', 'exploit', 'crash', 'surge', 'all-time high', 'ath', 'record'
+        ],
+        medium: [
+            'announce', 'launch', 'partnership', 'integration', 'upgrade', 'update',
+            'million', 'investment', 'funding', 'exchange', 'listing', 'support'
+        ]
+    },
+    sentiment: {
+        positive: ['surge', 'rally', 'gain', 'bull', 'up', 'rise', 'growth', 'adoption', 'breakthrough'],
+        negative: ['crash', 'fall', 'bear', 'down', 'drop', 'decline', 'hack', 'ban', 'exploit']
+    },
+    category: {
+        bitcoin: ['bitcoin', 'btc'],
+        ethereum: ['ethereum', 'eth'],
+        regulation: ['regulation', 'sec', 'legal'],
+        market: ['market', 'price', 'trading']
+    }
+};
+
+// Export for use in main application
+window.NewsPipeline = NewsPipeline;
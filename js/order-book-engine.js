@@ -0,0 +1,440 @@
+// 📚 Order Book Engine - Local Binance order books kept live from diff-depth streams
+// Each watched symbol is bootstrapped from one REST snapshot and then kept in
+// sync by the @depth@100ms diff stream (Binance's documented procedure:
+// buffer diffs, fetch the snapshot, drop diffs it already covers, then require
+// every diff to continue the previous one - any gap triggers a resync). Levels
+// live in sorted typed arrays with the best price at the end, so best bid/ask
+// is O(1) and the updates near the top of the book shift almost nothing.
+
+class OrderBookSide {
+    /**
+     * @param {number} sign - +1 for bids, -1 for asks. Keys are sign * price, kept
+     * ascending, so the best level of either side is always the last one.
+     */
+    constructor(sign, maxLevels = 5000) {
+        this.sign = sign;
+        this.maxLevels = maxLevels;
+        this.keys = new Float64Array(256);
+        this.quantities = new Float64Array(256);
+        this.count = 0;
+    }
+
+    // First index whose key is >= key
+    lowerBound(key) {
+        let low = 0;
+        let high = this.count;
+        while (low < high) {
+            const mid = (low + high) >> 1;
+            if (this.keys[mid] < key) low = mid + 1;
+            else high = mid;
+        }
+        return low;
+    }
+
+    /**
+     * ✏️ Set the quantity at a price; 0 removes the level
+     */
+    update(price, quantity) {
+        const key = this.sign * price;
+        const index = this.lowerBound(key);
+        const exists = index < this.count && this.keys[index] === key;
+
+        if (exists) {
+            if (quantity > 0) {
+                this.quantities[index] = quantity;
+            } else {
+                this.keys.copyWithin(index, index + 1, this.count);
+                this.quantities.copyWithin(index, index + 1, this.count);
+                this.count--;
+            }
+            return;
+        }
+        if (quantity <= 0) return;
+
+        if (this.count === this.keys.length) this.grow();
+        this.keys.copyWithin(index + 1, index, this.count);
+        this.quantities.copyWithin(index + 1, index, this.count);
+        this.keys[index] = key;
+        this.quantities[index] = quantity;
+        this.count++;
+
+        // Far-from-touch levels are trimmed in chunks, not one shift per insert
+        if (this.count > this.maxLevels * 1.25) this.trim();
+    }
+
+    grow() {
+        const keys = new Float64Array(this.keys.length * 2);
+        const quantities = new Float64Array(this.quantities.length * 2);
+        keys.set(this.keys);
+        quantities.set(this.quantities);
+        this.keys = keys;
+        this.quantities = quantities;
+    }
+
+    trim() {
+        const excess = this.count - this.maxLevels;
+        this.keys.copyWithin(0, excess, this.count);
+        this.quantities.copyWithin(0, excess, this.count);
+        this.count = this.maxLevels;
+    }
+
+    get bestPrice() {
+        return this.count > 0 ? this.sign * this.keys[this.count - 1] : NaN;
+    }
+
+    get bestQuantity() {
+        return this.count > 0 ? this.quantities[this.count - 1] : 0;
+    }
+
+    /**
+     * 📏 Quantity and notional resting at prices no worse than `limitPrice`
+     */
+    depthTo(limitPrice) {
+        const limitKey = this.sign * limitPrice;
+        let quantity = 0;
+        let notional = 0;
+        for (let i = this.count - 1; i >= 0 && this.keys[i] >= limitKey; i--) {
+            quantity += this.quantities[i];
+            notional += this.quantities[i] * this.sign * this.keys[i];
+        }
+        return { quantity, notional };
+    }
+
+    // Quantity in the best `levels` levels
+    topQuantity(levels) {
+        let quantity = 0;
+        for (let i = this.count - 1; i >= 0 && i >= this.count - levels; i--) {
+            quantity += this.quantities[i];
+        }
+        return quantity;
+    }
+}
+
+class LocalOrderBook {
+    constructor(symbol, maxLevels = 5000) {
+        this.symbol = symbol;
+        this.bids = new OrderBookSide(1, maxLevels);
+        this.asks = new OrderBookSide(-1, maxLevels);
+        this.lastUpdateId = 0;
+        this.updatedAt = 0;
+    }
+
+    /**
+     * 📥 Load a REST /depth snapshot: { lastUpdateId, bids: [[price, qty]], asks }
+     */
+    static fromSnapshot(symbol, snapshot, maxLevels) {
+        const book = new LocalOrderBook(symbol, maxLevels);
+        book.applyLevels(book.bids, snapshot.bids);
+        book.applyLevels(book.asks, snapshot.asks);
+        book.lastUpdateId = snapshot.lastUpdateId;
+        book.updatedAt = Date.now();
+        return book;
+    }
+
+    // Price strings are parsed once, here, and never again
+    applyLevels(side, levels) {
+        for (let i = 0; i < levels.length; i++) {
+            side.update(parseFloat(levels[i][0]), parseFloat(levels[i][1]));
+        }
+    }
+
+    applyDiff(diff) {
+        this.applyLevels(this.bids, diff.bids);
+        this.applyLevels(this.asks, diff.asks);
+        this.lastUpdateId = diff.finalUpdateId;
+        this.updatedAt = diff.eventTime || Date.now();
+    }
+
+    get bestBid() {
+        return this.bids.bestPrice;
+    }
+
+    get bestAsk() {
+        return this.asks.bestPrice;
+    }
+
+    get mid() {
+        return (this.bestBid + this.bestAsk) / 2;
+    }
+
+    /**
+     * 📊 Depth on each side within `bps` basis points of the mid, and its imbalance
+     * imbalance = (bid - ask) / (bid + ask) by notional: +1 all bids, -1 all asks
+     */
+    depthWithin(bps) {
+        const mid = this.mid;
+        const bid = this.bids.depthTo(mid * (1 - bps / 10000));
+        const ask = this.asks.depthTo(mid * (1 + bps / 10000));
+        const total = bid.notional + ask.notional;
+        return {
+            bps: bps,
+            bidQuantity: bid.quantity,
+            askQuantity: ask.quantity,
+            bidNotional: bid.notional,
+            askNotional: ask.notional,
+            imbalance: total > 0 ? (bid.notional - ask.notional) / total : 0
+        };
+    }
+
+    /**
+     * 🧾 Everything the aggregator reports, from the live book
+     */
+    metrics(bpsLevels = [10, 50, 100], topLevels = 20) {
+        const bestBid = this.bestBid;
+        const bestAsk = this.bestAsk;
+        const bestBidQuantity = this.bids.bestQuantity;
+        const bestAskQuantity = this.asks.bestQuantity;
+        const topTotal = bestBidQuantity + bestAskQuantity;
+
+        const depth = {};
+        bpsLevels.forEach(bps => {
+            depth[bps] = this.depthWithin(bps);
+        });
+
+        return {
+            bestBid,
+            bestAsk,
+            bestBidQuantity,
+            bestAskQuantity,
+            mid: this.mid,
+            spreadBps: ((bestAsk - bestBid) / this.mid) * 10000,
+            topImbalance: topTotal > 0 ? (bestBidQuantity - bestAskQuantity) / topTotal : 0,
+            depth,
+            top: {
+                levels: topLevels,
+                bidQuantity: this.bids.topQuantity(topLevels),
+                askQuantity: this.asks.topQuantity(topLevels)
+            },
+            levels: { bids: this.bids.count, asks: this.asks.count },
+            lastUpdateId: this.lastUpdateId,
+            updatedAt: this.updatedAt
+        };
+    }
+}
+
+class OrderBookEngine {
+    constructor(options = {}) {
+        this.restUrl = options.restUrl || 'https://api.binance.com/api/v3/depth';
+        this.snapshotLimit = options.snapshotLimit || 1000;
+        this.maxLevels = options.maxLevels || 5000;
+        this.maxBufferedDiffs = options.maxBufferedDiffs || 1000;
+        this.retryDelay = options.retryDelay || 2000;
+        this.idleTimeout = options.idleTimeout || 5 * 60 * 1000;
+
+        this.scheduler = window.fetchScheduler || new FetchScheduler();
+
+        // Its own combined socket: depth diffs are far chattier than tickers
+        this.stream = options.stream || new MarketStreamHub({
+            streamSuffix: '@depth@100ms',
+            parseMessage: OrderBookEngine.parseDiff
+        });
+
+        // symbol → { book, status, buffer, snapshotPending, lastAccess, ready, resolveReady }
+        // status: 'syncing' (buffering diffs) → 'bridging' (snapshot loaded) → 'live'
+        this.books = new Map();
+
+        // Diff continuity is lost with the socket; every book resyncs on reconnect
+        this.stream.onStatus(connected => {
+            if (!connected) this.books.forEach(state => this.resync(state));
+        });
+
+        this.sweepTimer = null;
+
+        this.stats = {
+            diffs: 0,
+            snapshots: 0,
+            gaps: 0,
+            resyncs: 0
+        };
+    }
+
+    static parseDiff(data) {
+        if (data.e !== 'depthUpdate') return null;
+        return {
+            symbol: data.s,
+            eventTime: data.E,
+            firstUpdateId: data.U,
+            finalUpdateId: data.u,
+            bids: data.b,
+            asks: data.a
+        };
+    }
+
+    /**
+     * 👀 Start (or keep) maintaining a symbol's book
+     */
+    watch(symbol) {
+        let state = this.books.get(symbol);
+        if (!state) {
+            state = { symbol, book: null, status: 'syncing', buffer: [], snapshotPending: false, lastAccess: 0 };
+            state.ready = new Promise(resolve => { state.resolveReady = resolve; });
+            this.books.set(symbol, state);
+            this.trackSymbols();
+        }
+        state.lastAccess = Date.now();
+
+        if (!this.sweepTimer) {
+            this.sweepTimer = setInterval(() => this.sweepIdle(), 60000);
+        }
+        return state;
+    }
+
+    unwatch(symbol) {
+        if (this.books.delete(symbol)) this.trackSymbols();
+    }
+
+    trackSymbols() {
+        this.stream.track('orderbooks', [...this.books.keys()], (diff) => this.handleDiff(diff));
+    }
+
+    // Books nobody asked about for a while stop streaming
+    sweepIdle() {
+        const cutoff = Date.now() - this.idleTimeout;
+        for (const [symbol, state] of this.books) {
+            if (state.lastAccess < cutoff) this.books.delete(symbol);
+        }
+        this.trackSymbols();
+
+        if (this.books.size === 0) {
+            clearInterval(this.sweepTimer);
+            this.sweepTimer = null;
+        }
+    }
+
+    /**
+     * 📖 Live metrics for a symbol, waiting up to `timeout` for a fresh book to sync
+     * @returns {Promise<Object|null>} null when the book could not be synced in time
+     */
+    async getMetrics(symbol, options = {}) {
+        const state = this.watch(symbol);
+        const timeout = options.timeout ?? 4000;
+        if (state.status !== 'live' && timeout > 0) {
+            await Promise.race([state.ready, new Promise(resolve => setTimeout(resolve, timeout))]);
+        }
+        return state.status === 'live' ? state.book.metrics(options.bpsLevels) : null;
+    }
+
+    /**
+     * Whether the depth socket is up - without it a cold book cannot sync
+     */
+    isStreaming() {
+        return this.stream.isConnected;
+    }
+
+    handleDiff(diff) {
+        const state = this.books.get(diff.symbol);
+        if (!state) return;
+        this.stats.diffs++;
+
+        if (state.status === 'syncing') {
+            // Buffer until the snapshot arrives; fetching it only now guarantees the overlap
+            state.buffer.push(diff);
+            if (state.buffer.length > this.maxBufferedDiffs) state.buffer.shift();
+            this.fetchSnapshot(state);
+            return;
+        }
+
+        if (!this.apply(state, diff)) {
+            console.warn(`⚠️ ${state.symbol} depth gap (${state.book.lastUpdateId} → ${diff.firstUpdateId}), resyncing`);
+            this.stats.gaps++;
+            this.resync(state);
+            state.buffer.push(diff);
+            this.fetchSnapshot(state);
+        }
+    }
+
+    /**
+     * Apply one diff; false when it does not continue the book (a gap)
+     */
+    apply(state, diff) {
+        const book = state.book;
+
+        if (state.status === 'bridging') {
+            // Diffs the snapshot already contains are dropped; the first one kept must span it
+            if (diff.finalUpdateId <= book.lastUpdateId) return true;
+            if (diff.firstUpdateId > book.lastUpdateId + 1) return false;
+
+            book.applyDiff(diff);
+            state.status = 'live';
+            state.resolveReady();
+            console.log(`📚 ${state.symbol} order book live (${book.bids.count} bids / ${book.asks.count} asks)`);
+            return true;
+        }
+
+        if (diff.firstUpdateId !== book.lastUpdateId + 1) return false;
+        book.applyDiff(diff);
+        return true;
+    }
+
+    resync(state) {
+        if (state.status === 'live') {
+            this.stats.resyncs++;
+            state.ready = new Promise(resolve => { state.resolveReady = resolve; });
+        }
+        state.status = 'syncing';
+        state.buffer = [];
+    }
+
+    /**
+     * 📥 Bootstrap from one REST snapshot and replay the buffered diffs on top
+     */
+    async fetchSnapshot(state) {
+        if (state.snapshotPending || state.status !== 'syncing' || this.books.get(state.symbol) !== state) return;
+        state.snapshotPending = true;
+
+        try {
+            const response = await this.scheduler.fetch(
+                `${this.restUrl}?symbol=${state.symbol}&limit=${this.snapshotLimit}`,
+                {},
+                { priority: 'normal' }
+            );
+            if (!response.ok) throw new Error(`Binance depth snapshot error: ${response.status}`);
+            const snapshot = await response.json();
+            this.stats.snapshots++;
+            state.snapshotPending = false;
+
+            // Unwatched, or the socket dropped, while the snapshot was in flight
+            if (this.books.get(state.symbol) !== state || state.buffer.length === 0) return;
+
+            state.book = LocalOrderBook.fromSnapshot(state.symbol, snapshot, this.maxLevels);
+            state.status = 'bridging';
+
+            const buffered = state.buffer;
+            state.buffer = [];
+            for (const diff of buffered) {
+                if (!this.apply(state, diff)) {
+                    // Snapshot older than the buffered stream - take another one
+                    this.stats.gaps++;
+                    this.resync(state);
+                    this.retrySnapshot(state);
+                    return;
+                }
+            }
+        } catch (error) {
+            console.error(`❌ ${state.symbol} order book sync failed:`, error);
+            state.snapshotPending = false;
+            this.retrySnapshot(state);
+        }
+    }
+
+    // Later attempt - dropped if the symbol was unwatched (or re-watched as a new book) meanwhile
+    retrySnapshot(state) {
+        setTimeout(() => {
+            if (this.books.get(state.symbol) === state) this.fetchSnapshot(state);
+        }, this.retryDelay);
+    }
+
+    getStats() {
+        let live = 0;
+        this.books.forEach(state => {
+            if (state.status === 'live') live++;
+        });
+        return { ...this.stats, books: this.books.size, live, stream: this.stream.getStats() };
+    }
+}
+
+// Export shared instance for use across modules
+window.OrderBookSide = OrderBookSide;
+window.LocalOrderBook = LocalOrderBook;
+window.OrderBookEngine = OrderBookEngine;
+window.orderBookEngine = new OrderBookEngine();
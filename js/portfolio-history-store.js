@@ -0,0 +1,409 @@
+// 📈 Portfolio History Store - Columnar time series with minute/hour/day rollups
+// Portfolio snapshots are kept in fixed-size ring buffers of typed arrays, one
+// ring per resolution. A new snapshot updates the current bucket of each ring
+// (or opens a new one, evicting the oldest) in O(1), so recording stays cheap
+// however long the history gets. Range queries binary-search the numeric
+// timestamps. Buckets are persisted to IndexedDB one record each, written only
+// when they change - nothing is re-serialized. Falls back to memory (session
+// only) when IndexedDB is unavailable.
+
+class PortfolioHistoryStore {
+    constructor(options = {}) {
+        this.dbName = options.dbName || 'samcrypto_history';
+        this.dbVersion = 1;
+        this.dbPromise = null;
+
+        // step: bucket width in ms, capacity: buckets kept
+        this.resolutions = options.resolutions || {
+            minute: { step: 60 * 1000, capacity: 7 * 24 * 60 },      // 7 days
+            hour: { step: 60 * 60 * 1000, capacity: 90 * 24 },       // 90 days
+            day: { step: 24 * 60 * 60 * 1000, capacity: 5 * 365 }   // 5 years
+        };
+        this.fields = ['value', 'usdtBalance', 'holdingsValue', 'holdingsCount'];
+
+        this.userId = null;
+        this.loaded = false;
+        this.loadPromise = null;
+        this.loadingUserId = null;
+        this.series = this.createSeries();
+
+        // Snapshots recorded while a user's history is still loading
+        this.backlog = [];
+
+        // Bucket writes made in the same tick share one transaction
+        this.pending = new Map();
+        this.flushPromise = null;
+
+        this.stats = { records: 0, bucketsOpened: 0, queries: 0 };
+    }
+
+    createSeries() {
+        const series = {};
+        Object.entries(this.resolutions).forEach(([name, { step, capacity }]) => {
+            series[name] = {
+                step,
+                capacity,
+                start: 0,   // Physical index of the oldest bucket
+                length: 0,
+                times: new Float64Array(capacity),
+                value: new Float64Array(capacity),
+                usdtBalance: new Float64Array(capacity),
+                holdingsValue: new Float64Array(capacity),
+                holdingsCount: new Uint32Array(capacity)
+            };
+        });
+        return series;
+    }
+
+    /**
+     * 🔌 Open (and create) the database once
+     */
+    open() {
+        if (this.dbPromise) return this.dbPromise;
+
+        this.dbPromise = new Promise((resolve, reject) => {
+            if (typeof indexedDB === 'undefined') {
+                reject(new Error('IndexedDB not available'));
+                return;
+            }
+
+            const request = indexedDB.open(this.dbName, this.dbVersion);
+            request.onupgradeneeded = () => {
+                const db = request.result;
+                if (!db.objectStoreNames.contains('buckets')) {
+                    db.createObjectStore('buckets', { keyPath: ['userId', 'resolution', 't'] });
+                }
+            };
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+
+        return this.dbPromise;
+    }
+
+    async tx(mode, work) {
+        const db = await this.open();
+        return new Promise((resolve, reject) => {
+            const transaction = db.transaction(['buckets'], mode);
+            let result;
+            transaction.oncomplete = () => resolve(result);
+            transaction.onerror = () => reject(transaction.error);
+            transaction.onabort = () => reject(transaction.error);
+            result = work(transaction.objectStore('buckets'));
+        });
+    }
+
+    async isAvailable() {
+        try {
+            await this.open();
+            return true;
+        } catch (error) {
+            return false;
+        }
+    }
+
+    /**
+     * 📂 Load a user's history into the rings, dropping persisted buckets that no longer fit
+     */
+    load(userId = 'guest') {
+        // Repeated initialisation for the same user shares one load
+        if (this.loadPromise && this.loadingUserId === userId) return this.loadPromise;
+
+        this.loadingUserId = userId;
+        this.loadPromise = this.loadUser(userId);
+        return this.loadPromise;
+    }
+
+    async loadUser(userId) {
+        await this.flush();
+
+        this.userId = userId;
+        this.loaded = false;
+        this.series = this.createSeries();
+
+        if (await this.isAvailable()) {
+            try {
+                for (const name of Object.keys(this.series)) {
+                    await this.loadResolution(name);
+                }
+            } catch (error) {
+                console.error('❌ Failed to load portfolio history:', error);
+            }
+        }
+
+        this.loaded = true;
+        const backlog = this.backlog;
+        this.backlog = [];
+        backlog.forEach(sample => this.record(sample));
+    }
+
+    async loadResolution(name) {
+        const ring = this.series[name];
+        const rows = [];
+        let cutoff = null;
+
+        // Newest first, up to capacity; everything older is pruned
+        await this.tx('readwrite', store => {
+            const range = IDBKeyRange.bound([this.userId, name, -Infinity], [this.userId, name, Infinity]);
+            const request = store.openCursor(range, 'prev');
+            request.onsuccess = () => {
+                const cursor = request.result;
+                if (!cursor) return;
+                if (rows.length === ring.capacity) {
+                    cutoff = cursor.value.t;
+                    store.delete(IDBKeyRange.bound([this.userId, name, -Infinity], [this.userId, name, cutoff]));
+                    return;
+                }
+                rows.push(cursor.value);
+                cursor.continue();
+            };
+        });
+
+        for (let i = rows.length - 1; i >= 0; i--) {
+            this.writeBucket(ring, rows[i].t, rows[i]);
+        }
+    }
+
+    /**
+     * ➕ Record a snapshot: { timestamp (ms), value, usdtBalance, holdingsValue, holdingsCount }
+     * The latest snapshot within a bucket wins, as the old one-per-day history did.
+     */
+    record(sample) {
+        if (!this.loaded) {
+            this.backlog.push(sample);
+            return;
+        }
+
+        const timestamp = sample.timestamp || Date.now();
+        this.stats.records++;
+
+        Object.entries(this.series).forEach(([name, ring]) => {
+            const bucket = this.bucketStart(name, timestamp);
+            if (this.writeBucket(ring, bucket, sample)) {
+                this.persist(name, bucket, sample);
+            }
+        });
+    }
+
+    /**
+     * Update the newest bucket or open a new one; older buckets are immutable
+     */
+    writeBucket(ring, bucket, sample) {
+        let index;
+        if (ring.length > 0 && ring.times[this.physical(ring, ring.length - 1)] === bucket) {
+            index = this.physical(ring, ring.length - 1);
+        } else if (ring.length > 0 && bucket < ring.times[this.physical(ring, ring.length - 1)]) {
+            return false;
+        } else {
+            if (ring.length === ring.capacity) {
+                ring.start = (ring.start + 1) % ring.capacity;
+                ring.length--;
+            }
+            index = this.physical(ring, ring.length);
+            ring.length++;
+            ring.times[index] = bucket;
+            this.stats.bucketsOpened++;
+        }
+
+        this.fields.forEach(field => {
+            ring[field][index] = sample[field] || 0;
+        });
+        return true;
+    }
+
+    physical(ring, logicalIndex) {
+        return (ring.start + logicalIndex) % ring.capacity;
+    }
+
+    bucketStart(name, timestamp) {
+        // Days follow the local calendar, like the charts' "best day"
+        if (name === 'day') return new Date(timestamp).setHours(0, 0, 0, 0);
+        const step = this.resolutions[name].step;
+        return Math.floor(timestamp / step) * step;
+    }
+
+    persist(name, bucket, sample) {
+        const record = { userId: this.userId, resolution: name, t: bucket };
+        this.fields.forEach(field => {
+            record[field] = sample[field] || 0;
+        });
+        this.pending.set(`${name}:${bucket}`, record);
+
+        if (!this.flushPromise) {
+            this.flushPromise = new Promise(resolve => setTimeout(resolve, 0))
+                .then(() => this.flush());
+        }
+    }
+
+    /**
+     * 💾 Write every changed bucket in one transaction
+     */
+    async flush() {
+        const batch = [...this.pending.values()];
+        this.pending.clear();
+        this.flushPromise = null;
+        if (batch.length === 0 || !(await this.isAvailable())) return;
+
+        try {
+            await this.tx('readwrite', store => {
+                batch.forEach(record => store.put(record));
+            });
+        } catch (error) {
+            console.error('❌ Failed to persist portfolio history:', error);
+        }
+    }
+
+    /**
+     * 🔍 Points of one resolution with from <= timestamp <= to, oldest first
+     * @returns {Array<{timestamp, value, usdtBalance, holdingsValue, holdingsCount}>}
+     */
+    range(name, from, to = Infinity) {
+        this.stats.queries++;
+        const ring = this.series[name];
+        const first = this.lowerBound(ring, from);
+        const points = [];
+
+        for (let i = first; i < ring.length; i++) {
+            const index = this.physical(ring, i);
+            if (ring.times[index] > to) break;
+
+            const point = { timestamp: ring.times[index] };
+            this.fields.forEach(field => {
+                point[field] = ring[field][index];
+            });
+            points.push(point);
+        }
+        return points;
+    }
+
+    // First logical index whose bucket starts at or after `time`
+    lowerBound(ring, time) {
+        let low = 0;
+        let high = ring.length;
+        while (low < high) {
+            const mid = (low + high) >> 1;
+            if (ring.times[this.physical(ring, mid)] < time) low = mid + 1;
+            else high = mid;
+        }
+        return low;
+    }
+
+    /**
+     * 🎚️ Finest resolution that still covers `from` within `maxPoints` buckets
+     */
+    resolutionFor(from, to = Date.now(), maxPoints = 1500) {
+        const names = Object.keys(this.series);
+        return names.find(name => {
+            const ring = this.series[name];
+            const evicted = ring.length === ring.capacity && ring.times[ring.start] > from;
+            return !evicted && (to - from) / ring.step <= maxPoints;
+        }) || names[names.length - 1];
+    }
+
+    query(from, to = Date.now(), options = {}) {
+        const resolution = this.resolutionFor(from, to, options.maxPoints);
+        return { resolution, points: this.range(resolution, from, to) };
+    }
+
+    /**
+     * 📊 Same window as query(), as fresh Float64Array columns (safe to transfer to a worker)
+     */
+    queryColumns(from, to = Date.now(), options = {}) {
+        const resolution = this.resolutionFor(from, to, options.maxPoints);
+        const ring = this.series[resolution];
+        const first = this.lowerBound(ring, from);
+        let end = first;
+        while (end < ring.length && ring.times[this.physical(ring, end)] <= to) end++;
+
+        const times = new Float64Array(end - first);
+        const values = new Float64Array(end - first);
+        for (let i = first; i < end; i++) {
+            const index = this.physical(ring, i);
+            times[i - first] = ring.times[index];
+            values[i - first] = ring.value[index];
+        }
+        this.stats.queries++;
+        return { resolution, times, values };
+    }
+
+    /**
+     * Newest bucket of a resolution, or null
+     */
+    latest(name) {
+        const ring = this.series[name];
+        if (ring.length === 0) return null;
+        const index = this.physical(ring, ring.length - 1);
+        return { timestamp: ring.times[index], value: ring.value[index] };
+    }
+
+    /**
+     * 📦 One-time import of the old array-of-objects history ({ timestamp: ISO, totalValue, ... })
+     * Legacy points are older than anything recorded live, so each ring is rebuilt in time
+     * order rather than appended to (append-only rings would reject them). Buckets the store
+     * already holds win. Returns null when no user history is loaded - nothing was imported.
+     * @returns {{imported: number, invalid: number}|null}
+     */
+    importLegacy(snapshots) {
+        if (!this.loaded) return null;
+
+        const list = snapshots || [];
+        const samples = list
+            .map(snapshot => ({
+                timestamp: Date.parse(snapshot.timestamp),
+                value: snapshot.totalValue,
+                usdtBalance: snapshot.usdtBalance,
+                holdingsValue: snapshot.holdingsValue,
+                holdingsCount: snapshot.holdingsCount
+            }))
+            .filter(sample => Number.isFinite(sample.timestamp))
+            .sort((a, b) => a.timestamp - b.timestamp);
+
+        if (samples.length > 0) {
+            Object.entries(this.series).forEach(([name, ring]) => this.mergeIntoRing(name, ring, samples));
+            this.stats.records += samples.length;
+        }
+        return { imported: samples.length, invalid: list.length - samples.length };
+    }
+
+    mergeIntoRing(name, ring, samples) {
+        // bucket → sample; the latest legacy sample in a bucket wins, as record() does
+        const buckets = new Map();
+        samples.forEach(sample => buckets.set(this.bucketStart(name, sample.timestamp), sample));
+
+        const imported = new Set(buckets.keys());
+        for (let i = 0; i < ring.length; i++) {
+            const index = this.physical(ring, i);
+            const row = {};
+            this.fields.forEach(field => {
+                row[field] = ring[field][index];
+            });
+            buckets.set(ring.times[index], row);
+            imported.delete(ring.times[index]);
+        }
+
+        ring.start = 0;
+        ring.length = 0;
+        [...buckets.keys()].sort((a, b) => a - b).forEach(bucket => this.writeBucket(ring, bucket, buckets.get(bucket)));
+
+        // Persist only the new buckets that survived the ring's capacity
+        const oldest = ring.length > 0 ? ring.times[ring.start] : Infinity;
+        imported.forEach(bucket => {
+            if (bucket >= oldest) this.persist(name, bucket, buckets.get(bucket));
+        });
+    }
+
+    isLoaded() {
+        return this.loaded;
+    }
+
+    getStats() {
+        const buckets = {};
+        Object.entries(this.series).forEach(([name, ring]) => {
+            buckets[name] = ring.length;
+        });
+        return { ...this.stats, buckets };
+    }
+}
+
+// Export for use in main application
+window.PortfolioHistoryStore = PortfolioHistoryStore;
@@ -0,0 +1,207 @@
+// 💼 Portfolio Valuator - Batched pricing and one-pass P&L for the whole book
+// Every coin referenced by holdings, leveraged trades and paper positions is
+// priced from one snapshot: fresh stream ticks first, then the shared Binance
+// all-ticker snapshot, then a single multi-id CoinGecko call for whatever is
+// left. Holdings are then revalued in one pass over typed arrays, so a
+// 40-holding refresh costs one request instead of 40 sequential round-trips.
+
+class PortfolioValuator {
+    constructor(samCryptoAI, options = {}) {
+        this.app = samCryptoAI;
+
+        // Stream ticks younger than this are used without any request
+        this.streamMaxAge = options.streamMaxAge || 10000;
+
+        // Binance pairs whose price can be read as USD
+        this.usdQuotes = new Set(['USDT', 'USDC', 'FDUSD', 'BUSD', 'TUSD', 'USD']);
+
+        // Concurrent refreshes share one run
+        this.inflight = null;
+
+        this.stats = {
+            runs: 0,
+            priced: 0,
+            fromStream: 0,
+            fromSnapshot: 0,
+            fromCoinGecko: 0,
+            unpriced: 0
+        };
+    }
+
+    /**
+     * 🔄 Reprice holdings, open trades and paper positions together
+     * @returns {Promise<{totalValue, totalCost, totalPnL, totalPnLPercent}>}
+     */
+    revalue() {
+        if (!this.inflight) {
+            this.inflight = this.run().finally(() => { this.inflight = null; });
+        }
+        return this.inflight;
+    }
+
+    async run() {
+        this.stats.runs++;
+        const startTime = Date.now();
+
+        const holdings = this.app.portfolio.holdings || [];
+        const trades = (this.app.portfolio.trades || []).filter(trade => trade.status !== 'closed');
+        const paperPositions = this.app.newFeatures?.paperPortfolio?.positions || [];
+
+        const refs = new Set();
+        holdings.forEach(holding => refs.add(holding.coinId));
+        trades.forEach(trade => refs.add(this.tradeRef(trade)));
+        paperPositions.forEach(position => refs.add(this.paperRef(position)));
+
+        const prices = await this.priceSnapshot([...refs]);
+
+        const summary = this.valueHoldings(holdings, prices);
+
+        trades.forEach(trade => {
+            const quote = prices.get(this.tradeRef(trade));
+            if (quote) this.app.applyTradePrice(trade, quote.price);
+        });
+
+        if (paperPositions.length > 0) {
+            const paperSymbols = new Set(paperPositions.map(position => this.paperRef(position)));
+            paperSymbols.forEach(symbol => {
+                const quote = prices.get(symbol);
+                if (quote) this.app.newFeatures.applyLivePrice(symbol, quote.price);
+            });
+        }
+
+        console.log(`💼 Revalued ${holdings.length} holdings, ${trades.length} trades, ${paperPositions.length} paper positions (${prices.size}/${refs.size} prices) in ${Date.now() - startTime}ms`);
+        return summary;
+    }
+
+    tradeRef(trade) {
+        return this.app.tradeStreamSymbol(trade) || trade.coinId;
+    }
+
+    paperRef(position) {
+        return `${position.coin.toUpperCase()}USDT`;
+    }
+
+    /**
+     * 💰 Price every ref (coin id or Binance pair) with as few requests as possible
+     * @returns {Promise<Map<string, {price, change24h, source}>>}
+     */
+    async priceSnapshot(refs) {
+        const prices = new Map();
+        let missing = [];
+
+        // 1. Live stream ticks - no request at all
+        for (const ref of refs) {
+            const symbol = this.streamSymbol(ref);
+            const tick = symbol ? this.app.marketStream.getLatest(symbol) : null;
+            if (tick && Date.now() - tick.eventTime < this.streamMaxAge) {
+                prices.set(ref, { price: tick.price, change24h: tick.changePercent, source: 'Binance Stream' });
+                this.stats.fromStream++;
+            } else {
+                missing.push(ref);
+            }
+        }
+
+        // 2. The shared all-ticker snapshot (cached, one request for every coin)
+        if (missing.length > 0) {
+            try {
+                const tickers = await this.app.getBinanceAllTickerSnapshot();
+                missing = missing.filter(ref => {
+                    const ticker = this.app.symbolResolver.findTicker(ref, tickers);
+                    if (!ticker || !this.isUsdQuoted(ticker.symbol)) return true;
+
+                    prices.set(ref, {
+                        price: parseFloat(ticker.lastPrice),
+                        change24h: parseFloat(ticker.priceChangePercent),
+                        source: 'Binance All-Ticker'
+                    });
+                    this.stats.fromSnapshot++;
+                    return false;
+                });
+            } catch (error) {
+                console.error('Binance snapshot unavailable for valuation:', error);
+            }
+        }
+
+        // 3. One multi-id CoinGecko call for coins Binance doesn't list
+        if (missing.length > 0 && this.app.marketDataBatcher) {
+            const geckoPrices = await this.app.marketDataBatcher.fetchCoinGeckoPrices(missing);
+            missing = missing.filter(ref => {
+                const data = geckoPrices[this.app.symbolResolver.toCoinGeckoId(ref)];
+                if (!data || !data.price_usd) return true;
+
+                prices.set(ref, { price: data.price_usd, change24h: data.change_24h, source: 'CoinGecko' });
+                this.stats.fromCoinGecko++;
+                return false;
+            });
+        }
+
+        this.stats.priced += prices.size;
+        this.stats.unpriced += missing.length;
+        if (missing.length > 0) {
+            console.warn(`⚠️ No price for ${missing.join(', ')} - keeping last known values`);
+        }
+        return prices;
+    }
+
+    streamSymbol(ref) {
+        const upper = String(ref).toUpperCase();
+        const split = this.app.symbolResolver.splitSymbol(upper);
+        if (split && this.usdQuotes.has(split.quote)) return upper;
+        return this.app.symbolResolver.toBinanceSymbol(ref);
+    }
+
+    isUsdQuoted(symbol) {
+        const split = this.app.symbolResolver.splitSymbol(symbol);
+        return !!split && this.usdQuotes.has(split.quote);
+    }
+
+    /**
+     * 🧮 Value every holding in one pass over typed arrays
+     * Holdings without a fresh price keep their last known price.
+     */
+    valueHoldings(holdings, prices) {
+        const count = holdings.length;
+        const amounts = new Float64Array(count);
+        const costs = new Float64Array(count);
+        const currentPrices = new Float64Array(count);
+
+        for (let i = 0; i < count; i++) {
+            const holding = holdings[i];
+            const quote = prices.get(holding.coinId);
+            amounts[i] = holding.amount || 0;
+            costs[i] = amounts[i] * (holding.buyPrice || 0);
+            currentPrices[i] = quote ? quote.price : (holding.currentPrice || NaN);
+        }
+
+        let totalValue = 0;
+        let totalCost = 0;
+        for (let i = 0; i < count; i++) {
+            if (Number.isNaN(currentPrices[i])) continue;
+
+            const value = amounts[i] * currentPrices[i];
+            const pnl = value - costs[i];
+            totalValue += value;
+            totalCost += costs[i];
+
+            const holding = holdings[i];
+            holding.currentPrice = currentPrices[i];
+            holding.currentValue = value;
+            holding.pnl = pnl;
+            holding.pnlPercent = costs[i] > 0 ? (pnl / costs[i]) * 100 : 0;
+        }
+
+        return {
+            totalValue: totalValue,
+            totalCost: totalCost,
+            totalPnL: totalValue - totalCost,
+            totalPnLPercent: totalCost > 0 ? ((totalValue - totalCost) / totalCost) * 100 : 0
+        };
+    }
+
+    getStats() {
+        return { ...this.stats };
+    }
+}
+
+// Export for use in main application
+window.PortfolioValuator = PortfolioValuator;
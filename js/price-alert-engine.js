@@ -0,0 +1,158 @@
+// 🔔 Price Alert Engine - Event-driven alert evaluation with sorted trigger indexes
+// Alerts are indexed per symbol into threshold arrays, one per condition,
+// each sorted so the alerts a tick can reach sit at the end. A live tick
+// binary-searches each array for the boundary between "not reached" and
+// "reached" and truncates the reached tail, so a tick costs O(log n) plus the
+// alerts it actually fires, however many alerts are active. An alert is
+// marked triggered the moment it fires, so an index rebuild during the batch
+// window can't re-arm it; fired alerts are delivered as one batch.
+
+class PriceAlertEngine {
+    constructor(options = {}) {
+        this.onTrigger = options.onTrigger || null;      // (firedEntries) => void
+        this.batchDelay = options.batchDelay || 250;
+
+        // symbol → { above: [], below: [], change: [] }
+        // above/change sorted descending by threshold, below ascending - reached alerts are always a suffix
+        this.index = new Map();
+        this.pending = [];
+        this.flushTimer = null;
+
+        this.stats = {
+            ticks: 0,
+            fired: 0,
+            batches: 0
+        };
+    }
+
+    /**
+     * 🏗️ Rebuild the index from the untriggered alerts (when the alert list changes, not per tick)
+     * @param {Function} toSymbol - coinId → stream symbol, e.g. 'bitcoin' → 'BTCUSDT'
+     */
+    load(alerts, toSymbol) {
+        this.index.clear();
+        for (const alert of alerts) {
+            if (alert.triggered) continue;
+            // change alerts compare against |24h change %| - a negative threshold would fire on any tick
+            const threshold = alert.condition === 'change' ? Math.abs(Number(alert.value)) : Number(alert.value);
+            const conditions = this.emptyBook();
+            if (!Number.isFinite(threshold) || threshold <= 0 || !conditions[alert.condition]) continue;
+
+            const symbol = String(toSymbol(alert.coinId) || '').toUpperCase();
+            if (!symbol) continue;
+
+            if (!this.index.has(symbol)) this.index.set(symbol, conditions);
+            this.index.get(symbol)[alert.condition].push({ threshold, alert, symbol });
+        }
+
+        for (const book of this.index.values()) {
+            book.above.sort((a, b) => b.threshold - a.threshold);
+            book.below.sort((a, b) => a.threshold - b.threshold);
+            book.change.sort((a, b) => b.threshold - a.threshold);
+        }
+    }
+
+    emptyBook() {
+        return { above: [], below: [], change: [] };
+    }
+
+    symbols() {
+        return [...this.index.keys()];
+    }
+
+    /**
+     * ⚡ Evaluate one tick: { symbol, price, changePercent }
+     */
+    evaluate(tick) {
+        const book = this.index.get(tick.symbol);
+        if (!book) return;
+        this.stats.ticks++;
+
+        const fired = [];
+
+        // above: every threshold <= price has been reached
+        fired.push(...PriceAlertEngine.takeFrom(book.above, PriceAlertEngine.firstAtOrBelow(book.above, tick.price)));
+
+        // below: every threshold >= price has been reached
+        fired.push(...PriceAlertEngine.takeFrom(book.below, PriceAlertEngine.firstAtOrAbove(book.below, tick.price)));
+
+        // change: |24h change %| at or beyond the threshold
+        if (Number.isFinite(tick.changePercent)) {
+            const change = Math.abs(tick.changePercent);
+            fired.push(...PriceAlertEngine.takeFrom(book.change, PriceAlertEngine.firstAtOrBelow(book.change, change)));
+        }
+
+        if (fired.length === 0) return;
+
+        if (book.above.length + book.below.length + book.change.length === 0) {
+            this.index.delete(tick.symbol);
+        }
+
+        fired.forEach(entry => {
+            // Marked now, not at delivery: a load() before the batch flushes must skip it
+            entry.alert.triggered = true;
+            this.pending.push({ ...entry, price: tick.price, changePercent: tick.changePercent, time: Date.now() });
+        });
+        this.stats.fired += fired.length;
+        this.scheduleFlush();
+    }
+
+    scheduleFlush() {
+        if (this.flushTimer) return;
+        this.flushTimer = setTimeout(() => this.flush(), this.batchDelay);
+    }
+
+    /**
+     * 📬 Deliver everything that fired since the last batch
+     */
+    flush() {
+        clearTimeout(this.flushTimer);
+        this.flushTimer = null;
+        if (this.pending.length === 0) return;
+
+        const batch = this.pending;
+        this.pending = [];
+        this.stats.batches++;
+        if (this.onTrigger) this.onTrigger(batch);
+    }
+
+    // Remove and return entries[start..] - a tail, so nothing shifts
+    static takeFrom(entries, start) {
+        return start < entries.length ? entries.splice(start) : [];
+    }
+
+    // Descending thresholds: first index whose threshold is <= value
+    static firstAtOrBelow(entries, value) {
+        let low = 0;
+        let high = entries.length;
+        while (low < high) {
+            const mid = (low + high) >> 1;
+            if (entries[mid].threshold > value) low = mid + 1;
+            else high = mid;
+        }
+        return low;
+    }
+
+    // Ascending thresholds: first index whose threshold is >= value
+    static firstAtOrAbove(entries, value) {
+        let low = 0;
+        let high = entries.length;
+        while (low < high) {
+            const mid = (low + high) >> 1;
+            if (entries[mid].threshold < value) low = mid + 1;
+            else high = mid;
+        }
+        return low;
+    }
+
+    getStats() {
+        let active = 0;
+        for (const book of this.index.values()) {
+            active += book.above.length + book.below.length + book.change.length;
+        }
+        return { ...this.stats, active, symbols: this.index.size };
+    }
+}
+
+// Export for use in main application
+window.PriceAlertEngine = PriceAlertEngine;
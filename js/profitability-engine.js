@@ -28,7 +28,8 @@ class ProfitabilityEngine {
         this.opportunityThresholds = {
             minimumProfitScore: 70,      // Minimum score for opportunity alert
             minimumRiskReward: 2.0,      // Minimum R/R ratio
-            minimumConfidence: 0.65      // Minimum confidence level
+            minimumConfidence: 0.65,     // Minimum confidence level
+            minimumQuoteVolume: 1000000  // Screener skips pairs trading less (24h, quote asset)
         };
     }
 
@@ -36,52 +37,29 @@ class ProfitabilityEngine {
      * 🎯 Calculate Profitability Score for a Trading Opportunity
      */
     calculateProfitabilityScore(analysis, marketData, strategyType = 'mixed') {
-        let score = 0;
         const factors = {};
 
         // 1. Technical Strength (30%)
-        if (analysis.technical) {
-            const techScore = analysis.technical.score || 50;
-            factors.technicalStrength = techScore;
-            score += (techScore / 100) * this.profitabilityWeights.technicalStrength * 100;
-        }
+        const techScore = analysis.technical ? (analysis.technical.score || 50) : null;
+        if (techScore !== null) factors.technicalStrength = techScore;
 
         // 2. Risk/Reward Ratio (25%)
         const riskReward = this.calculateRiskRewardRatio(analysis);
         factors.riskReward = riskReward.ratio;
-        if (riskReward.ratio >= 3.0) {
-            score += 25; // Perfect R/R
-        } else if (riskReward.ratio >= 2.0) {
-            score += 20; // Good R/R
-        } else if (riskReward.ratio >= 1.5) {
-            score += 15; // Acceptable R/R
-        } else {
-            score += 10; // Poor R/R
-        }
 
         // 3. Entry Timing Quality (20%)
         const entryQuality = this.assessEntryTiming(analysis, marketData);
         factors.entryTiming = entryQuality.score;
-        score += (entryQuality.score / 100) * this.profitabilityWeights.entryTiming * 100;
 
         // 4. Market Conditions (15%)
         const marketScore = this.assessMarketConditions(marketData);
         factors.marketConditions = marketScore;
-        score += (marketScore / 100) * this.profitabilityWeights.marketConditions * 100;
 
         // 5. Volume Confirmation (10%)
         const volumeScore = this.assessVolumeConfirmation(marketData);
         factors.volumeConfirmation = volumeScore;
-        score += (volumeScore / 100) * this.profitabilityWeights.volumeConfirmation * 100;
 
-        // Strategy-specific bonus
-        if (this.strategyPerformance[strategyType]) {
-            const strategyBonus = this.strategyPerformance[strategyType].winRate * 10;
-            score += strategyBonus;
-        }
-
-        // Normalize to 0-100
-        score = Math.min(100, Math.max(0, score));
+        const score = this.combineScores(techScore, riskReward.ratio, entryQuality.score, marketScore, volumeScore, strategyType);
 
         return {
             score: Math.round(score),
@@ -94,6 +72,40 @@ class ProfitabilityEngine {
         };
     }
 
+    /**
+     * ⚖️ Weighted 0-100 score from the five factor scores
+     * Shared by calculateProfitabilityScore and the columnar screener.
+     * @param {number|null} technical - technical score, or null when there is none
+     */
+    combineScores(technical, ratio, timing, market, volume, strategyType = 'mixed') {
+        const weights = this.profitabilityWeights;
+        let score = 0;
+
+        if (technical !== null) score += (technical / 100) * weights.technicalStrength * 100;
+
+        if (ratio >= 3.0) {
+            score += 25; // Perfect R/R
+        } else if (ratio >= 2.0) {
+            score += 20; // Good R/R
+        } else if (ratio >= 1.5) {
+            score += 15; // Acceptable R/R
+        } else {
+            score += 10; // Poor R/R
+        }
+
+        score += (timing / 100) * weights.entryTiming * 100;
+        score += (market / 100) * weights.marketConditions * 100;
+        score += (volume / 100) * weights.volumeConfirmation * 100;
+
+        // Strategy-specific bonus
+        if (this.strategyPerformance[strategyType]) {
+            score += this.strategyPerformance[strategyType].winRate * 10;
+        }
+
+        // Normalize to 0-100
+        return Math.min(100, Math.max(0, score));
+    }
+
     /**
      * 💵 Calculate Risk/Reward Ratio
      */
@@ -111,10 +123,8 @@ class ProfitabilityEngine {
 
         if (risk === 0) return { ratio: 0, entry, stopLoss, target: primaryTarget };
 
-        const ratio = reward / risk;
-
         return {
-            ratio: parseFloat(ratio.toFixed(2)),
+            ratio: this.riskRewardRatio(entry, stopLoss, primaryTarget),
             entry: entry,
             stopLoss: stopLoss,
             target: primaryTarget,
@@ -123,17 +133,40 @@ class ProfitabilityEngine {
         };
     }
 
+    riskRewardRatio(entry, stopLoss, target) {
+        const risk = Math.abs(entry - stopLoss);
+        if (risk === 0) return 0;
+        return parseFloat((Math.abs(target - entry) / risk).toFixed(2));
+    }
+
     /**
      * ⏰ Assess Entry Timing Quality
      */
     assessEntryTiming(analysis, marketData) {
+        const currentPrice = marketData.price || marketData.current_price || 0;
+        // quickTechnicalAnalysis reports rsi as { value, signal }
+        const rsi = analysis.rsi && typeof analysis.rsi === 'object' ? analysis.rsi.value : analysis.rsi;
+        const momentumAligned = Boolean(analysis.momentum && analysis.trend &&
+            analysis.momentum.direction === analysis.trend.direction);
+
+        const timingScore = this.entryTimingScore(
+            currentPrice, analysis.supportLevel, analysis.resistanceLevel, rsi, momentumAligned
+        );
+
+        return {
+            score: timingScore,
+            quality: timingScore >= 70 ? 'excellent' : timingScore >= 60 ? 'good' : timingScore >= 50 ? 'fair' : 'poor',
+            notes: this.getTimingNotes(timingScore)
+        };
+    }
+
+    entryTimingScore(currentPrice, supportLevel, resistanceLevel, rsi, momentumAligned) {
         let timingScore = 50; // Base score
 
         // Check if we're at support/resistance
-        if (analysis.supportLevel && analysis.resistanceLevel) {
-            const currentPrice = marketData.price || marketData.current_price || 0;
-            const distanceToSupport = Math.abs(currentPrice - analysis.supportLevel) / currentPrice;
-            const distanceToResistance = Math.abs(currentPrice - analysis.resistanceLevel) / currentPrice;
+        if (supportLevel && resistanceLevel) {
+            const distanceToSupport = Math.abs(currentPrice - supportLevel) / currentPrice;
+            const distanceToResistance = Math.abs(currentPrice - resistanceLevel) / currentPrice;
 
             // Good timing if near support (for longs) or resistance (for shorts)
             if (distanceToSupport < 0.02) timingScore += 20; // Very close to support
@@ -142,52 +175,54 @@ class ProfitabilityEngine {
         }
 
         // Check RSI timing
-        if (analysis.rsi) {
-            if (analysis.rsi < 40 && analysis.rsi > 30) timingScore += 15; // Good oversold entry
-            if (analysis.rsi > 60 && analysis.rsi < 70) timingScore -= 10; // Overbought, poor entry
+        if (rsi) {
+            if (rsi < 40 && rsi > 30) timingScore += 15; // Good oversold entry
+            if (rsi > 60 && rsi < 70) timingScore -= 10; // Overbought, poor entry
         }
 
         // Check momentum alignment
-        if (analysis.momentum && analysis.trend) {
-            if (analysis.momentum.direction === analysis.trend.direction) {
-                timingScore += 10; // Momentum aligned with trend
-            }
-        }
+        if (momentumAligned) timingScore += 10; // Momentum aligned with trend
 
-        return {
-            score: Math.min(100, Math.max(0, timingScore)),
-            quality: timingScore >= 70 ? 'excellent' : timingScore >= 60 ? 'good' : timingScore >= 50 ? 'fair' : 'poor',
-            notes: this.getTimingNotes(timingScore)
-        };
+        return Math.min(100, Math.max(0, timingScore));
     }
 
     /**
      * 🌍 Assess Market Conditions
      */
     assessMarketConditions(marketData) {
+        const priceRange = marketData.high_24h && marketData.low_24h && marketData.price
+            ? (marketData.high_24h - marketData.low_24h) / marketData.price
+            : null;
+        const change = marketData.price_change_24h !== undefined ? marketData.price_change_24h : null;
+        return this.marketConditionsScore(marketData.volume_24h, priceRange, change);
+    }
+
+    /**
+     * @param {number|null} priceRange - (high - low) / price, or null when unknown
+     * @param {number|null} change - 24h % change, or null when unknown
+     */
+    marketConditionsScore(volume, priceRange, change) {
         let score = 50;
 
         // Volume analysis
-        if (marketData.volume_24h) {
-            const volume = marketData.volume_24h;
+        if (volume) {
             if (volume > 1000000000) score += 15; // High volume = good liquidity
             else if (volume > 100000000) score += 10;
             else if (volume < 10000000) score -= 10; // Low volume = risk
         }
 
         // Volatility assessment
-        if (marketData.high_24h && marketData.low_24h && marketData.price) {
-            const priceRange = (marketData.high_24h - marketData.low_24h) / marketData.price;
+        if (priceRange !== null) {
             if (priceRange > 0.15) score -= 15; // Too volatile
             else if (priceRange > 0.10) score -= 5;
             else if (priceRange < 0.03) score += 10; // Stable conditions
         }
 
         // Price momentum
-        if (marketData.price_change_24h !== undefined) {
-            const change = Math.abs(marketData.price_change_24h);
-            if (change > 15) score -= 10; // Extreme movement
-            else if (change > 5 && change < 15) score += 5; // Healthy momentum
+        if (change !== null) {
+            const absChange = Math.abs(change);
+            if (absChange > 15) score -= 10; // Extreme movement
+            else if (absChange > 5 && absChange < 15) score += 5; // Healthy momentum
         }
 
         return Math.min(100, Math.max(0, score));
@@ -197,19 +232,18 @@ class ProfitabilityEngine {
      * 📊 Assess Volume Confirmation
      */
     assessVolumeConfirmation(marketData) {
-        if (!marketData.volume_24h) return 50;
+        return this.volumeConfirmationScore(marketData.volume_24h);
+    }
 
-        const volume = marketData.volume_24h;
-        let score = 50;
+    volumeConfirmationScore(volume) {
+        if (!volume) return 50;
 
         // Volume tiers (normalized for different market caps)
-        if (volume > 5000000000) score = 90; // Extremely high volume
-        else if (volume > 1000000000) score = 80; // Very high volume
-        else if (volume > 100000000) score = 70; // High volume
-        else if (volume > 10000000) score = 60; // Moderate volume
-        else score = 40; // Low volume
-
-        return score;
+        if (volume > 5000000000) return 90; // Extremely high volume
+        if (volume > 1000000000) return 80; // Very high volume
+        if (volume > 100000000) return 70; // High volume
+        if (volume > 10000000) return 60; // Moderate volume
+        return 40; // Low volume
     }
 
     /**
@@ -293,6 +327,147 @@ class ProfitabilityEngine {
         return opportunities.slice(0, 5); // Top 5 opportunities
     }
 
+    /**
+     * 🛰️ Screen a whole Binance all-ticker snapshot in one pass
+     * Scores every USDT pair exactly like quickTechnicalAnalysis +
+     * calculateProfitabilityScore would, but over typed columns, keeping only
+     * the top `limit` by priority in a heap. Full objects are built for the
+     * winners only.
+     * @param {Array} tickers - /api/v3/ticker/24hr response
+     * @param {Object} options - { limit, quote, symbols (restrict to these pairs),
+     *   minQuoteVolume (defaults to opportunityThresholds.minimumQuoteVolume) }
+     */
+    screenMarket(tickers, options = {}) {
+        const limit = options.limit || 5;
+        const columns = this.buildScreenerColumns(tickers, options);
+        const { score, ratio } = this.scoreColumns(columns);
+
+        const { minimumProfitScore, minimumRiskReward } = this.opportunityThresholds;
+        const heap = new TopNHeap(limit);
+        for (let i = 0; i < columns.count; i++) {
+            if (score[i] >= minimumProfitScore && ratio[i] >= minimumRiskReward) {
+                heap.push(score[i] * ratio[i], i);
+            }
+        }
+
+        return heap.sorted().map(({ index }) => {
+            const marketData = this.screenerMarketData(columns, index);
+            const analysis = this.quickTechnicalAnalysis(marketData);
+            const profitability = this.calculateProfitabilityScore(analysis, marketData, 'mixed');
+            return {
+                coin: columns.bases[index],
+                symbol: columns.symbols[index],
+                profitability: profitability,
+                analysis: analysis,
+                marketData: marketData,
+                priority: this.calculateOpportunityPriority(profitability)
+            };
+        });
+    }
+
+    /**
+     * 📦 Lay the tradable pairs of one quote asset out in Float64Array columns
+     */
+    buildScreenerColumns(tickers, options = {}) {
+        const quote = options.quote || 'USDT';
+        const only = options.symbols ? new Set(options.symbols) : null;
+        const minQuoteVolume = options.minQuoteVolume ?? this.opportunityThresholds.minimumQuoteVolume;
+        // Leveraged tokens and stablecoins aren't opportunities. Leveraged tokens are
+        // matched on their underlying (BTCUP, ETHBEAR), so JUP or SYRUP are kept
+        const excluded = /^(BTC|ETH|BNB|XRP|ADA|DOT|LINK|LTC|TRX|EOS|XTZ|BCH|FIL|SXP|UNI|SUSHI|AAVE|YFI|XLM|1INCH)(UP|DOWN|BULL|BEAR)$|^(USDC|FDUSD|TUSD|BUSD|DAI|USDP|EUR|AEUR|USDE)$/;
+
+        const n = tickers.length;
+        const symbols = [];
+        const bases = [];
+        const price = new Float64Array(n);
+        const change = new Float64Array(n);
+        const volume = new Float64Array(n);
+        const high = new Float64Array(n);
+        const low = new Float64Array(n);
+
+        let count = 0;
+        for (let i = 0; i < n; i++) {
+            const ticker = tickers[i];
+            if (!ticker.symbol.endsWith(quote)) continue;
+            if (only && !only.has(ticker.symbol)) continue;
+
+            const base = ticker.symbol.slice(0, -quote.length);
+            const last = parseFloat(ticker.lastPrice);
+            const quoteVolume = parseFloat(ticker.quoteVolume);
+            if (!base || excluded.test(base) || !(last > 0) || !(quoteVolume > 0)) continue;
+            // Illiquid pairs can't be traded at the quoted levels
+            if (quoteVolume < minQuoteVolume) continue;
+
+            symbols.push(ticker.symbol);
+            bases.push(base);
+            price[count] = last;
+            change[count] = parseFloat(ticker.priceChangePercent) || 0;
+            volume[count] = quoteVolume;
+            high[count] = parseFloat(ticker.highPrice) || 0;
+            low[count] = parseFloat(ticker.lowPrice) || 0;
+            count++;
+        }
+
+        return {
+            count, symbols, bases,
+            price: price.subarray(0, count),
+            change: change.subarray(0, count),
+            volume: volume.subarray(0, count),
+            high: high.subarray(0, count),
+            low: low.subarray(0, count)
+        };
+    }
+
+    /**
+     * ⚡ quickTechnicalAnalysis + calculateProfitabilityScore ('mixed') for every row
+     * Runs the same scoring primitives as the scalar path on plain numbers, so
+     * no per-row analysis objects are built.
+     */
+    scoreColumns(columns) {
+        const n = columns.count;
+        const score = new Float64Array(n);
+        const ratio = new Float64Array(n);
+
+        for (let i = 0; i < n; i++) {
+            const price = columns.price[i];
+            const change24h = columns.change[i];
+            const volume = columns.volume[i];
+            const high24h = columns.high[i];
+            const low24h = columns.low[i];
+
+            // quickTechnicalAnalysis
+            const rsi = this.estimateRSI(change24h);
+            const levels = this.quickLevels(price, high24h, low24h);
+            const technical = this.calculateQuickTechnicalScore(change24h, rsi, volume, Math.abs(change24h)) || 50;
+
+            // Quick analysis momentum is its trend, so it is always aligned
+            const rr = this.riskRewardRatio(price, levels.stopLoss, levels.target1);
+            const timing = this.entryTimingScore(price, levels.supportLevel, levels.resistanceLevel, rsi, true);
+            const priceRange = high24h && low24h ? (high24h - low24h) / price : null;
+            const market = this.marketConditionsScore(volume, priceRange, change24h);
+
+            score[i] = Math.round(this.combineScores(technical, rr, timing, market, this.volumeConfirmationScore(volume)));
+            ratio[i] = rr;
+        }
+
+        return { score, ratio };
+    }
+
+    // Row → the marketData shape the scalar helpers read
+    screenerMarketData(columns, i) {
+        return {
+            symbol: columns.symbols[i],
+            price_usd: columns.price[i],
+            price: columns.price[i],
+            price_change_24h: columns.change[i],
+            change_24h: columns.change[i],
+            volume_24h: columns.volume[i],
+            volume: columns.volume[i],
+            high_24h: columns.high[i],
+            low_24h: columns.low[i]
+        };
+    }
+
     /**
      * 📊 Quick Technical Analysis for Opportunity Scanning
      */
@@ -300,36 +475,26 @@ class ProfitabilityEngine {
         const price = marketData.price_usd || marketData.price || marketData.current_price || 0;
         const change24h = marketData.price_change_24h || marketData.change_24h || 0;
         const volume = marketData.volume_24h || marketData.volume || 0;
-        const high24h = marketData.high_24h || price * 1.05;
-        const low24h = marketData.low_24h || price * 0.95;
 
         // Estimate RSI from price change
-        const rsiEstimate = 50 + (change24h * 2);
-        const rsiClamped = Math.max(0, Math.min(100, rsiEstimate));
+        const rsiClamped = this.estimateRSI(change24h);
 
         // Determine trend
         const trend = change24h > 3 ? 'bullish' : change24h < -3 ? 'bearish' : 'neutral';
         const trendStrength = Math.abs(change24h);
 
-        // Calculate support and resistance
-        const supportLevel = low24h * 0.98;
-        const resistanceLevel = high24h * 1.02;
-
-        // Suggest entry, targets, and stop-loss
-        const entry = price;
-        const stopLoss = supportLevel * 0.97; // 3% below support
-        const target1 = resistanceLevel * 0.98; // Near resistance
-        const target2 = resistanceLevel * 1.05; // Extended target
+        // Support, resistance, stop-loss and targets
+        const levels = this.quickLevels(price, marketData.high_24h, marketData.low_24h);
 
         return {
             price: price,
             trend: { direction: trend, strength: trendStrength },
             rsi: { value: rsiClamped, signal: rsiClamped > 70 ? 'overbought' : rsiClamped < 30 ? 'oversold' : 'neutral' },
-            supportLevel: supportLevel,
-            resistanceLevel: resistanceLevel,
-            entry: entry,
-            stopLoss: stopLoss,
-            targets: [target1, target2],
+            supportLevel: levels.supportLevel,
+            resistanceLevel: levels.resistanceLevel,
+            entry: price,
+            stopLoss: levels.stopLoss,
+            targets: [levels.target1, levels.target2],
             technical: {
                 score: this.calculateQuickTechnicalScore(change24h, rsiClamped, volume, trendStrength)
             },
@@ -340,6 +505,26 @@ class ProfitabilityEngine {
         };
     }
 
+    // RSI estimated from the 24h % change
+    estimateRSI(change24h) {
+        return Math.max(0, Math.min(100, 50 + (change24h * 2)));
+    }
+
+    /**
+     * 📐 Support/resistance from the 24h range (±5% of price when unknown)
+     */
+    quickLevels(price, high24h, low24h) {
+        const supportLevel = (low24h || price * 0.95) * 0.98;
+        const resistanceLevel = (high24h || price * 1.05) * 1.02;
+        return {
+            supportLevel: supportLevel,
+            resistanceLevel: resistanceLevel,
+            stopLoss: supportLevel * 0.97, // 3% below support
+            target1: resistanceLevel * 0.98, // Near resistance
+            target2: resistanceLevel * 1.05 // Extended target
+        };
+    }
+
     /**
      * 🎯 Calculate Quick Technical Score
      */
@@ -541,14 +726,78 @@ class ProfitabilityEngine {
             riskReward: prof.riskReward.ratio,
             expectedProfit: prof.expectedProfit.percentage + '%',
             recommendation: prof.recommendation,
-            entry: opportunity.analysis.entry?.toFixed(2),
-            stopLoss: opportunity.analysis.stopLoss?.toFixed(2),
-            target: opportunity.analysis.targets?.[0]?.toFixed(2)
+            entry: this.formatPrice(opportunity.analysis.entry),
+            stopLoss: this.formatPrice(opportunity.analysis.stopLoss),
+            target: this.formatPrice(opportunity.analysis.targets?.[0])
         };
     }
+
+    /**
+     * 💲 Price without the $ sign, with enough decimals for sub-cent coins
+     * Same tiers as the app's formatCryptoPrice.
+     */
+    formatPrice(price) {
+        if (price === null || price === undefined || !isFinite(price)) return undefined;
+        if (price === 0) return '0.00';
+        if (price >= 100) return price.toFixed(2);
+
+        const decimals = price < 0.01 ? 8 : price < 1 ? 6 : 4;
+        return price.toFixed(decimals).replace(/\.?0+$/, '');
+    }
+}
+
+/**
+ * 🏆 Fixed-size min-heap keeping the `limit` highest-priority rows
+ */
+class TopNHeap {
+    constructor(limit) {
+        this.limit = limit;
+        this.items = [];
+    }
+
+    push(priority, index) {
+        const items = this.items;
+        if (items.length < this.limit) {
+            items.push({ priority, index });
+            this.siftUp(items.length - 1);
+        } else if (priority > items[0].priority) {
+            items[0] = { priority, index };
+            this.siftDown(0);
+        }
+    }
+
+    siftUp(i) {
+        const items = this.items;
+        while (i > 0) {
+            const parent = (i - 1) >> 1;
+            if (items[parent].priority <= items[i].priority) break;
+            [items[parent], items[i]] = [items[i], items[parent]];
+            i = parent;
+        }
+    }
+
+    siftDown(i) {
+        const items = this.items;
+        for (;;) {
+            const left = 2 * i + 1;
+            const right = left + 1;
+            let smallest = i;
+            if (left < items.length && items[left].priority < items[smallest].priority) smallest = left;
+            if (right < items.length && items[right].priority < items[smallest].priority) smallest = right;
+            if (smallest === i) return;
+            [items[smallest], items[i]] = [items[i], items[smallest]];
+            i = smallest;
+        }
+    }
+
+    // Highest priority first
+    sorted() {
+        return [...this.items].sort((a, b) => b.priority - a.priority);
+    }
 }
 
 // Export for use in main application
 window.ProfitabilityEngine = ProfitabilityEngine;
+window.TopNHeap = TopNHeap;
 
 
@@ -39,29 +39,14 @@
         const proto = SamCryptoAI.prototype;
         const engine = window.profitabilityEngine;
 
-        // Store original method
-        proto._originalCreateAdvancedSystemPrompt = proto.createAdvancedSystemPrompt;
-
-        /**
-         * 💰 Enhanced System Prompt with Profitability Focus
-         */
-        proto.createAdvancedSystemPrompt = function(marketData, newsData, intent, userMessage, perplexityInsights = null) {
-            // Get original prompt
-            let prompt = proto._originalCreateAdvancedSystemPrompt.call(this, marketData, newsData, intent, userMessage, perplexityInsights);
-
-            // Add profitability enhancement section
-            const profitabilitySection = this.createProfitabilityEnhancementSection(marketData, userMessage);
-            
-            // Insert profitability section before the final instructions
-            prompt = prompt.replace(
-                /## REAL-TIME NEWS & EVENTS:/,
-                profitabilitySection + '\n\n## REAL-TIME NEWS & EVENTS:'
-            );
-
-            // Add profitability-focused instructions
-            const profitabilityInstructions = `
-
-💰 SHORT-TERM PROFITABILITY OPTIMIZATION MODULE:
+        // Profitability prompt layer: static instructions + per-request analysis
+        window.promptBuilder.register({
+            id: 'profitability_instructions',
+            static: true,
+            order: 50,
+            priority: 90,
+            build() {
+                return `💰 SHORT-TERM PROFITABILITY OPTIMIZATION MODULE:
 
 **Your Mission: Maximize SHORT-TERM Trading Profits**
 
@@ -142,14 +127,19 @@ You now have access to advanced profitability analysis that helps you provide MO
 - ALWAYS emphasize QUICK exits
 - ALWAYS warn against holding overnight
 - Never recommend a trade without clear profitability score, risk/reward, and position sizing
-- Prioritize SPEED and EXIT PLANS over large positions
-`;
-
-            // Append profitability instructions
-            prompt += profitabilityInstructions;
-
-            return prompt;
-        };
+- Prioritize SPEED and EXIT PLANS over large positions`;
+            }
+        });
+
+        window.promptBuilder.register({
+            id: 'profitability_analysis',
+            order: 120,
+            priority: 65,
+            truncate: true,
+            build(ctx) {
+                return this.createProfitabilityEnhancementSection(ctx.marketData, ctx.userMessage);
+            }
+        });
 
         /**
          * 💰 Create Profitability Enhancement Section for Prompt
@@ -161,56 +151,15 @@ You now have access to advanced profitability analysis that helps you provide MO
 
             let section = '\n## 💰 PROFITABILITY ANALYSIS:\n\n';
             const engine = window.profitabilityEngine;
+            const userCapital = (this.portfolio?.usdtBalance || 0) + (this.portfolio?.totalValue || 0);
 
             // Analyze each coin mentioned or in market data
             for (const [coinId, data] of Object.entries(marketData)) {
                 if (!data || typeof data !== 'object') continue;
 
-                // Quick profitability analysis
-                const analysis = engine.quickTechnicalAnalysis(data);
-                const profitability = engine.calculateProfitabilityScore(analysis, data, 'mixed');
-
-                // Calculate position sizing if user has capital
-                const userCapital = (this.portfolio?.usdtBalance || 0) + (this.portfolio?.totalValue || 0);
-                let positionSize = null;
-                if (userCapital > 0 && analysis.entry && analysis.stopLoss) {
-                    positionSize = engine.calculatePositionSize(
-                        userCapital,
-                        1.5, // 1.5% risk for short-term trading
-                        analysis.entry,
-                        analysis.stopLoss
-                    );
-                }
-
-                // Suggest profit targets
-                const targets = engine.suggestProfitTargets(
-                    analysis.entry,
-                    analysis.stopLoss,
-                    analysis.trend?.direction || 'neutral',
-                    analysis.resistanceLevel
-                );
-
-                section += `### ${coinId.toUpperCase()} Profitability Analysis:\n\n`;
-                section += `**Profitability Score: ${profitability.score}/100** (${profitability.rating.level} ${profitability.rating.emoji})\n`;
-                section += `- Risk/Reward Ratio: 1:${profitability.riskReward.ratio}\n`;
-                section += `- Expected Profit: ${profitability.expectedProfit.percentage}% (Conservative: ${profitability.expectedProfit.riskAdjusted}%)\n`;
-                section += `- Entry Timing: ${profitability.entryQuality.quality.toUpperCase()} (${profitability.entryQuality.score}/100)\n`;
-                section += `- Time Frame: ${profitability.expectedProfit.timeFrame}\n\n`;
-
-                if (positionSize && positionSize.size > 0) {
-                    section += `**Optimal Position Size (1.5% risk for SHORT-TERM):**\n`;
-                    section += `- Position Size: ${positionSize.size} ${coinId.toUpperCase()}\n`;
-                    section += `- USDT Value: $${positionSize.usdtValue.toFixed(2)}\n`;
-                    section += `- Risk Amount: $${positionSize.riskAmount.toFixed(2)} (SMALL for quick exit)\n\n`;
-                }
-
-                section += `**Profit Targets:**\n`;
-                section += `- Target 1 (Conservative 2:1 R/R): $${targets.conservative.price} (+${targets.conservative.rewardPercent}%) - ${targets.conservative.action}\n`;
-                section += `- Target 2 (Moderate 3:1 R/R): $${targets.moderate.price} (+${targets.moderate.rewardPercent}%) - ${targets.moderate.action}\n`;
-                section += `- Target 3 (Aggressive 4:1+ R/R): $${targets.aggressive.price} (+${targets.aggressive.rewardPercent}%) - ${targets.aggressive.action}\n\n`;
-
-                section += `**Recommendation:** ${profitability.recommendation}\n\n`;
-                section += `---\n\n`;
+                // Cached per coin until its market data or the user's capital changes
+                section += this.promptBuilder.memo('profitability', `${coinId}|${PromptBuilder.dataVersion(data)}|${userCapital}`,
+                    () => this.formatProfitabilityBlock(coinId, data, userCapital));
             }
 
             // Portfolio optimization suggestions
@@ -246,53 +195,80 @@ You now have access to advanced profitability analysis that helps you provide MO
             return section;
         };
 
+        /**
+         * 💰 Profitability Block for One Coin
+         */
+        proto.formatProfitabilityBlock = function(coinId, data, userCapital) {
+            const engine = window.profitabilityEngine;
+
+            // Quick profitability analysis
+            const analysis = engine.quickTechnicalAnalysis(data);
+            const profitability = engine.calculateProfitabilityScore(analysis, data, 'mixed');
+
+            // Calculate position sizing if user has capital
+            let positionSize = null;
+            if (userCapital > 0 && analysis.entry && analysis.stopLoss) {
+                positionSize = engine.calculatePositionSize(
+                    userCapital,
+                    1.5, // 1.5% risk for short-term trading
+                    analysis.entry,
+                    analysis.stopLoss
+                );
+            }
+
+            // Suggest profit targets
+            const targets = engine.suggestProfitTargets(
+                analysis.entry,
+                analysis.stopLoss,
+                analysis.trend?.direction || 'neutral',
+                analysis.resistanceLevel
+            );
+
+            let block = `### ${coinId.toUpperCase()} Profitability Analysis:\n\n`;
+            block += `**Profitability Score: ${profitability.score}/100** (${profitability.rating.level} ${profitability.rating.emoji})\n`;
+            block += `- Risk/Reward Ratio: 1:${profitability.riskReward.ratio}\n`;
+            block += `- Expected Profit: ${profitability.expectedProfit.percentage}% (Conservative: ${profitability.expectedProfit.riskAdjusted}%)\n`;
+            block += `- Entry Timing: ${profitability.entryQuality.quality.toUpperCase()} (${profitability.entryQuality.score}/100)\n`;
+            block += `- Time Frame: ${profitability.expectedProfit.timeFrame}\n\n`;
+
+            if (positionSize && positionSize.size > 0) {
+                block += `**Optimal Position Size (1.5% risk for SHORT-TERM):**\n`;
+                block += `- Position Size: ${positionSize.size} ${coinId.toUpperCase()}\n`;
+                block += `- USDT Value: $${positionSize.usdtValue.toFixed(2)}\n`;
+                block += `- Risk Amount: $${positionSize.riskAmount.toFixed(2)} (SMALL for quick exit)\n\n`;
+            }
+
+            block += `**Profit Targets:**\n`;
+            block += `- Target 1 (Conservative 2:1 R/R): $${targets.conservative.price} (+${targets.conservative.rewardPercent}%) - ${targets.conservative.action}\n`;
+            block += `- Target 2 (Moderate 3:1 R/R): $${targets.moderate.price} (+${targets.moderate.rewardPercent}%) - ${targets.moderate.action}\n`;
+            block += `- Target 3 (Aggressive 4:1+ R/R): $${targets.aggressive.price} (+${targets.aggressive.rewardPercent}%) - ${targets.aggressive.action}\n\n`;
+
+            block += `**Recommendation:** ${profitability.recommendation}\n\n`;
+            block += `---\n\n`;
+
+            return block;
+        };
+
         /**
          * 🔍 Scan for High-Profitability Opportunities
+         * Screens every USDT pair from one Binance all-ticker snapshot; pass coin
+         * ids to restrict the screen to those coins.
          */
-        proto.scanProfitabilityOpportunities = async function(coinIds = ['bitcoin', 'ethereum', 'solana', 'cardano', 'binancecoin']) {
+        proto.scanProfitabilityOpportunities = async function(coinIds = null) {
             const engine = window.profitabilityEngine;
             
             console.log('🔍 Scanning for high-profitability opportunities...');
 
             try {
-                // Fetch market data for all coins
-                const marketDataPromises = coinIds.map(async (coinId) => {
-                    try {
-                        const response = await fetch(
-                            `https://api.coingecko.com/api/v3/simple/price?ids=${coinId}&vs_currencies=usd&include_24hr_change=true&include_24hr_vol=true&include_market_cap=true&include_24hr_high=true&include_24hr_low=true`
-                        );
-                        if (!response.ok) return null;
-                        const data = await response.json();
-                        return { coinId, data: data[coinId] };
-                    } catch (error) {
-                        console.error(`Error fetching ${coinId}:`, error);
-                        return null;
-                    }
-                });
-
-                const results = await Promise.all(marketDataPromises);
-                const marketDataMap = {};
-                
-                results.forEach(result => {
-                    if (result && result.data) {
-                        // Convert to standard format
-                        marketDataMap[result.coinId] = {
-                            price_usd: result.data.usd,
-                            price: result.data.usd,
-                            price_change_24h: result.data.usd_24h_change,
-                            change_24h: result.data.usd_24h_change,
-                            volume_24h: result.data.usd_24h_vol,
-                            volume: result.data.usd_24h_vol,
-                            market_cap: result.data.usd_market_cap,
-                            market_cap_usd: result.data.usd_market_cap,
-                            high_24h: result.data.usd_24h_high,
-                            low_24h: result.data.usd_24h_low
-                        };
-                    }
-                });
-
-                // Scan for opportunities
-                const opportunities = await engine.scanOpportunities(coinIds, marketDataMap);
+                // One request for the whole market (cached and shared with other callers)
+                const tickers = await this.getBinanceAllTickerSnapshot();
+                const symbols = coinIds
+                    ? coinIds.map(coinId => this.symbolResolver.toBinanceSymbol(coinId)).filter(Boolean)
+                    : null;
+
+                const startTime = performance.now();
+                const opportunities = engine.screenMarket(tickers, { limit: 5, symbols: symbols });
+                console.log(`🛰️ Screened ${tickers.length} tickers in ${(performance.now() - startTime).toFixed(1)}ms, ${opportunities.length} opportunities`);
                 
                 return opportunities.map(opp => engine.formatOpportunity(opp));
             } catch (error) {
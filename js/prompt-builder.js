@@ -0,0 +1,263 @@
+// 🧱 Prompt Builder - Layered, memoized system-prompt assembly with a token budget
+// The app and its integration modules register prompt sections once. Each
+// request composes them in a fixed order: static instruction blocks first (built
+// once, byte-identical across requests so provider-side prefix caching can hit),
+// then per-request sections. Per-coin blocks are memoized by data version, and
+// low-priority sections are trimmed or dropped when the prompt exceeds its budget.
+
+class PromptBuilder {
+    constructor(options = {}) {
+        this.maxTokens = options.maxTokens || 6000;
+        this.separator = '\n\n';
+
+        // id → { id, order, priority, static, required, truncate, build }
+        this.sections = new Map();
+        this.orderedSections = null;
+
+        // Static sections are built once; memo() blocks are keyed by data version
+        this.staticCache = new Map();
+        this.memoCache = new Map();
+        this.maxMemoEntries = options.maxMemoEntries || 200;
+
+        // A truncated section keeps at least this many tokens, otherwise it is dropped
+        this.minSectionTokens = 80;
+
+        this.stats = {
+            builds: 0,
+            staticHits: 0,
+            memoHits: 0,
+            memoMisses: 0,
+            trimmed: 0
+        };
+    }
+
+    /**
+     * ➕ Register (or replace) a prompt section
+     * @param {Object} section - { id, order, priority, static, required, truncate, build(ctx) }
+     *   build runs with `this` bound to ctx.app. Static sections must not read request data.
+     */
+    register(section) {
+        if (!section || !section.id || typeof section.build !== 'function') {
+            throw new Error('Prompt section needs an id and a build function');
+        }
+
+        this.sections.set(section.id, {
+            order: 100,
+            priority: 50,
+            static: false,
+            required: false,
+            truncate: false,
+            ...section
+        });
+        this.staticCache.delete(section.id);
+        this.orderedSections = null;
+    }
+
+    /**
+     * ➖ Remove sections (e.g. when an integration replaces the base layer)
+     */
+    remove(...ids) {
+        ids.forEach(id => {
+            this.sections.delete(id);
+            this.staticCache.delete(id);
+        });
+        this.orderedSections = null;
+    }
+
+    has(id) {
+        return this.sections.has(id);
+    }
+
+    /**
+     * 🗂️ Fixed composition order: every static section precedes every dynamic one
+     */
+    getOrderedSections() {
+        if (!this.orderedSections) {
+            this.orderedSections = [...this.sections.values()].sort((a, b) =>
+                (a.static === b.static ? 0 : a.static ? -1 : 1) || a.order - b.order
+            );
+        }
+        return this.orderedSections;
+    }
+
+    /**
+     * 🧩 Memoize a block (e.g. one coin's market section) by namespace + data version
+     */
+    memo(namespace, version, compute) {
+        const key = `${namespace}:${version}`;
+        if (this.memoCache.has(key)) {
+            const value = this.memoCache.get(key);
+            // Refresh LRU position
+            this.memoCache.delete(key);
+            this.memoCache.set(key, value);
+            this.stats.memoHits++;
+            return value;
+        }
+
+        const value = compute();
+        this.memoCache.set(key, value);
+        this.stats.memoMisses++;
+        if (this.memoCache.size > this.maxMemoEntries) {
+            this.memoCache.delete(this.memoCache.keys().next().value);
+        }
+        return value;
+    }
+
+    /**
+     * 🏗️ Compose the prompt for one request
+     * @param {Object} ctx - { app, marketData, newsData, intent, userMessage, perplexityInsights }
+     * @returns {{prompt: string, tokens: number, staticTokens: number, sections: Array, trimmed: Array, dropped: Array}}
+     */
+    build(ctx, options = {}) {
+        const maxTokens = options.maxTokens || this.maxTokens;
+        this.stats.builds++;
+
+        const parts = [];
+        for (const section of this.getOrderedSections()) {
+            const built = this.buildSection(section, ctx);
+            if (built && built.text) parts.push({ section, ...built });
+        }
+
+        const separatorTokens = PromptBuilder.estimateTokens(this.separator);
+        let total = parts.reduce((sum, part) => sum + part.tokens, 0) + separatorTokens * Math.max(0, parts.length - 1);
+
+        const trimmed = [];
+        const dropped = [];
+        if (total > maxTokens) {
+            // Lowest priority first; required sections are never touched
+            const candidates = parts.filter(part => !part.section.required)
+                .sort((a, b) => a.section.priority - b.section.priority);
+
+            for (const part of candidates) {
+                if (total <= maxTokens) break;
+                const excess = total - maxTokens;
+
+                if (part.section.truncate && part.tokens - excess >= this.minSectionTokens) {
+                    part.text = PromptBuilder.truncateToTokens(part.text, part.tokens - excess);
+                    const tokens = PromptBuilder.estimateTokens(part.text);
+                    total -= part.tokens - tokens;
+                    part.tokens = tokens;
+                    trimmed.push(part.section.id);
+                } else {
+                    total -= part.tokens + separatorTokens;
+                    part.text = '';
+                    dropped.push(part.section.id);
+                }
+            }
+            this.stats.trimmed += trimmed.length + dropped.length;
+        }
+
+        const kept = parts.filter(part => part.text);
+        const staticTokens = kept.filter(part => part.section.static && !trimmed.includes(part.section.id))
+            .reduce((sum, part) => sum + part.tokens, 0);
+
+        return {
+            prompt: kept.map(part => part.text).join(this.separator),
+            tokens: total,
+            staticTokens: staticTokens,
+            sections: kept.map(part => ({ id: part.section.id, tokens: part.tokens })),
+            trimmed: trimmed,
+            dropped: dropped
+        };
+    }
+
+    buildSection(section, ctx) {
+        if (section.static && this.staticCache.has(section.id)) {
+            this.stats.staticHits++;
+            return { ...this.staticCache.get(section.id) };
+        }
+
+        let text;
+        try {
+            text = section.build.call(ctx.app, ctx);
+        } catch (error) {
+            console.error(`Prompt section "${section.id}" failed:`, error);
+            return null;
+        }
+        if (!text) return null;
+
+        const built = { text: String(text), tokens: PromptBuilder.estimateTokens(String(text)) };
+        if (section.static) this.staticCache.set(section.id, built);
+        return { ...built };
+    }
+
+    /**
+     * 🔢 Approximate BPE token count
+     * Words cost ~1 token per 6 letters, digits group in threes, punctuation
+     * runs pair up, and astral characters (emoji) cost two tokens each.
+     */
+    static estimateTokens(text) {
+        if (!text) return 0;
+
+        let tokens = 0;
+        const pattern = /[A-Za-z]+|\d+|\n+|[ \t]+|[!-/:-@[-`{-~]+|[^\x00-\x7F]/gu;
+        let match;
+        while ((match = pattern.exec(text)) !== null) {
+            const piece = match[0];
+            const first = piece.charCodeAt(0);
+
+            if ((first >= 65 && first <= 90) || (first >= 97 && first <= 122)) {
+                tokens += Math.ceil(piece.length / 6);
+            } else if (first >= 48 && first <= 57) {
+                tokens += Math.ceil(piece.length / 3);
+            } else if (first === 10) {
+                tokens += 1;
+            } else if (first === 32 || first === 9) {
+                // A single space merges into the following word
+                tokens += piece.length > 1 ? 1 : 0;
+            } else if (first < 128) {
+                tokens += Math.ceil(piece.length / 2);
+            } else {
+                tokens += piece.codePointAt(0) > 0xFFFF ? 2 : 1;
+            }
+        }
+        return tokens;
+    }
+
+    /**
+     * ✂️ Cut text at a line boundary so it fits in roughly maxTokens
+     */
+    static truncateToTokens(text, maxTokens) {
+        const marker = '\n[...trimmed for length]';
+        const budget = maxTokens - PromptBuilder.estimateTokens(marker);
+        const lines = text.split('\n');
+
+        let used = 0;
+        let end = 0;
+        for (; end < lines.length; end++) {
+            const cost = PromptBuilder.estimateTokens(lines[end]) + 1;
+            if (used + cost > budget) break;
+            used += cost;
+        }
+        return lines.slice(0, end).join('\n').trimEnd() + marker;
+    }
+
+    /**
+     * 🏷️ Version of a coin's market data - changes whenever the underlying numbers do
+     */
+    static dataVersion(data) {
+        if (!data || typeof data !== 'object') return 'none';
+        const stamp = data.fetchTime ?? data.timestamp ?? data.last_updated_at ?? data.last_updated ?? '';
+        const price = data.price_usd ?? data.price ?? data.current_price ?? '';
+        const change = data.change_24h ?? data.price_change_percentage_24h ?? '';
+        return `${stamp}|${price}|${change}|${data.volume_24h ?? ''}`;
+    }
+
+    clearCache() {
+        this.staticCache.clear();
+        this.memoCache.clear();
+    }
+
+    getStats() {
+        return {
+            ...this.stats,
+            sections: this.sections.size,
+            cachedStatic: this.staticCache.size,
+            cachedBlocks: this.memoCache.size
+        };
+    }
+}
+
+// Export shared instance for use across modules
+window.PromptBuilder = PromptBuilder;
+window.promptBuilder = new PromptBuilder();
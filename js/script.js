@@ -26,7 +26,9 @@ class SamCryptoAI {
             userProfile: {}
         };
         this.maxContextMessages = 10; // Reduced from 20 to 10 for speed
-        this.contextWindowSize = 8000; // Reduced from 15000 for faster processing
+        this.contextWindowSize = 8000; // Token budget for system prompt + packed chat history
+        this.minHistoryTokens = 1200; // History always gets at least this much of the window
+        this.maxHistoryMessages = 40; // Older turns live on in the rolling summary
         
         // Enhanced Multi-Source Crypto Price APIs
         this.coinGeckoAPI = 'https://api.coingecko.com/api/v3';
@@ -85,66 +87,81 @@ class SamCryptoAI {
         this.isDarkTheme = true;
         this.sentimentData = {};
         this.backtestResults = {};
-        this.tradeUpdateInterval = null;
-        this.symbolToCoinId = {
-            BTC: 'bitcoin',
-            ETH: 'ethereum',
-            SOL: 'solana',
-            BNB: 'binancecoin',
-            XRP: 'ripple',
-            ADA: 'cardano',
-            DOGE: 'dogecoin',
-            MATIC: 'polygon',
-            DOT: 'polkadot',
-            LTC: 'litecoin',
-            AVAX: 'avalanche-2',
-            LINK: 'chainlink',
-            TRX: 'tron',
-            XLM: 'stellar',
-            ATOM: 'cosmos',
-            ALGO: 'algorand',
-            FIL: 'filecoin',
-            VET: 'vechain',
-            APT: 'aptos',
-            INJ: 'injective-protocol',
-            NEAR: 'near',
-            OP: 'optimism',
-            ARB: 'arbitrum',
-            SEI: 'sei-network',
-            SUI: 'sui',
-            RENDER: 'render-token',
-            WLD: 'worldcoin-wld',
-            PEPE: 'pepe',
-            SHIB: 'shiba-inu',
-            BCHA: 'ecash'
-        };
-        this.coinToBinanceSymbol = {
-            bitcoin: 'BTCUSDT', btc: 'BTCUSDT',
-            ethereum: 'ETHUSDT', eth: 'ETHUSDT',
-            solana: 'SOLUSDT', sol: 'SOLUSDT',
-            binancecoin: 'BNBUSDT', bnb: 'BNBUSDT',
-            ripple: 'XRPUSDT', xrp: 'XRPUSDT',
-            cardano: 'ADAUSDT', ada: 'ADAUSDT',
-            dogecoin: 'DOGEUSDT', doge: 'DOGEUSDT',
-            chainlink: 'LINKUSDT', link: 'LINKUSDT',
-            polygon: 'MATICUSDT', matic: 'MATICUSDT',
-            polkadot: 'DOTUSDT', dot: 'DOTUSDT',
-            litecoin: 'LTCUSDT', ltc: 'LTCUSDT',
-            avalanche: 'AVAXUSDT', 'avalanche-2': 'AVAXUSDT', avax: 'AVAXUSDT',
-            cosmos: 'ATOMUSDT', atom: 'ATOMUSDT',
-            near: 'NEARUSDT',
-            arbitrum: 'ARBUSDT', arb: 'ARBUSDT',
-            optimism: 'OPUSDT', op: 'OPUSDT'
+        this.backtestEngine = new BacktestEngine();
+        this.historyStore = new HistoryStore();
+        this.backtestSweepGrids = {
+            rsi: { period: [7, 14, 21], oversold: [20, 25, 30, 35], overbought: [65, 70, 75, 80] },
+            macd: { fast: [8, 12, 16], slow: [21, 26, 34], signal: [7, 9, 12] },
+            ema: { fast: [5, 9, 12, 20], slow: [26, 50, 100, 200] },
+            bollinger: { period: [10, 20, 30], stdDev: [1.5, 2, 2.5, 3] }
         };
+        this.tradeUpdateInterval = null;
+        this.tradesRenderTimer = null;
+        // Shared coin registry + indexed Binance ticker lookups
+        this.symbolResolver = window.symbolResolver || new SymbolResolver();
+        // One compiled keyword automaton for coins, intents, topics and profile signals
+        this.messageAnalyzer = window.messageAnalyzer || new MessageAnalyzer();
         this.currentAIPowersCoin = 'bitcoin';
         this.aiPowersCache = new Map();
         
-        // API caching and rate limiting
-        this.cache = new Map();
-        this.cacheTTL = 30000; // 30 seconds cache TTL
+        // API caching (shared TTL + LRU cache) and rate limiting
+        this.cacheManager = window.cacheManager || new CacheManager();
+        this.cacheTTL = 30000; // 30 seconds default cache TTL
+        this.cacheManager.defineNamespace('market', { ttl: 30000, staleTTL: 300000 });
+        this.cacheManager.defineNamespace('marketsRow', { ttl: 60000, staleTTL: 600000 });
+        this.cacheManager.defineNamespace('binance', { ttl: 30000, staleTTL: 0 });
+        this.cacheManager.defineNamespace('news', { ttl: 120000, staleTTL: 600000 });
+        this.cacheManager.defineNamespace('default', { ttl: this.cacheTTL, staleTTL: 0 });
         this.pendingRequests = new Map();
-        this.requestQueue = [];
-        this.maxConcurrentRequests = 3;
+        
+        // Shared per-host rate limiter / request coalescer for every upstream fetch
+        this.fetchScheduler = window.fetchScheduler || new FetchScheduler();
+        
+        // One multiplexed Binance stream for ticker, trades, holdings and alerts
+        this.marketStream = window.marketStreamHub || new MarketStreamHub();
+        
+        // Price alerts are evaluated on live ticks through a per-symbol sorted trigger index
+        this.alertEngine = new PriceAlertEngine({
+            onTrigger: (fired) => this.notifyAlertsTriggered(fired)
+        });
+        
+        // Frame-batched DOM writes + cached ticker/price elements
+        this.domScheduler = window.domScheduler || new DomScheduler();
+        this.tickerElements = new Map();
+        this.displayElements = new Map();
+        
+        // Batched market-data fan-out for multi-coin queries
+        this.marketDataBatcher = typeof MarketDataBatcher !== 'undefined' ? new MarketDataBatcher(this) : null;
+        
+        // One batched price snapshot for holdings, trades and paper positions
+        this.portfolioValuator = new PortfolioValuator(this);
+        
+        // Hedged news ingestion: deduped across sources, scored once, keyword-indexed
+        this.newsPipeline = new NewsPipeline({ score: (article, analysis) => this.scoreNewsArticle(article, analysis) });
+        
+        // Portfolio equity curve: typed-array rings at minute/hour/day resolution
+        this.portfolioHistoryStore = new PortfolioHistoryStore();
+        
+        // Portfolio/allocation charts are drawn in a worker when OffscreenCanvas is available
+        this.chartRenderer = new ChartRenderer();
+        
+        // Sentiment / order book / on-chain signals, gathered alongside market data
+        this.dataAggregator = typeof DataAggregator !== 'undefined' ? (window.dataAggregator || new DataAggregator()) : null;
+        
+        // Latency deadline per context source (ms); late sources are left out of the prompt
+        this.contextDeadlines = {
+            marketData: 8000,
+            perplexityInsights: 8000,
+            newsData: 3000,
+            aggregatedData: 2500
+        };
+        this.currentContext = null;
+        
+        // Speculative prefetch: warm caches for the coins named in the draft while the user types
+        this.prefetchDebounce = 350;
+        this.prefetchMinLength = 3;
+        this.prefetchTimer = null;
+        this.prefetchRun = null; // { key, controller }
         
         // Message sending flag to prevent duplicates
         this.isSending = false;
@@ -155,6 +172,26 @@ class SamCryptoAI {
         // Abort controller for stopping AI responses
         this.abortController = null;
         
+        // Stream completions token-by-token (SSE) into the chat view
+        this.streamingEnabled = typeof SSEStreamReader !== 'undefined';
+        this.streamingMessage = null;
+        
+        // Layered system prompt: static prefix first, dynamic sections trimmed to the budget
+        this.promptBuilder = window.promptBuilder || new PromptBuilder();
+        this.promptTokenBudget = 6000;
+        this.lastPromptBuild = null;
+        this.registerPromptSections();
+        
+        // Token-budgeted chat history with a rolling summary of older turns
+        this.contextManager = new ConversationContextManager({
+            onSummaryUpdated: (summary) => this.handleSummaryUpdated(summary)
+        });
+        
+        // Append-only message persistence (IndexedDB) and a windowed chat DOM
+        this.chatStore = window.chatMessageStore || new ChatMessageStore();
+        this.transcript = null;
+        this.oldestLoadedSeq = null;
+        
         // Professional greeting messages
         this.greetingMessages = [
             "Welcome to SamCrypto AI. Ready for focused market analysis.",
@@ -237,7 +274,7 @@ class SamCryptoAI {
     mapPairToCoinId(pair) {
         if (!pair) return null;
         if (pair.quote === 'USDT') {
-            const mapped = this.symbolToCoinId[pair.base];
+            const mapped = this.symbolResolver.coinIdForSymbol(pair.base);
             if (mapped) return mapped;
         }
         const fallback = pair.base.toLowerCase();
@@ -534,15 +571,16 @@ class SamCryptoAI {
 
     async fetchTradePrice(trade) {
         try {
-            const cacheKey = `trade_price_${trade.coinId}`;
-            const cached = this.getFromCache(cacheKey);
-            if (cached) return cached;
+            // Stream tick → shared all-ticker snapshot → CoinGecko, via the valuation snapshot
+            const ref = this.portfolioValuator.tradeRef(trade);
+            const quote = (await this.portfolioValuator.priceSnapshot([ref])).get(ref);
+            if (!quote) return null;
 
-            const data = await this.fetchMarketData(trade.coinId);
-            if (data) {
-                this.setCache(cacheKey, data);
-            }
-            return data;
+            return {
+                price_usd: quote.price,
+                change_24h: quote.change24h,
+                source: quote.source
+            };
         } catch (error) {
             console.error('Error fetching trade price:', error);
             return null;
@@ -563,35 +601,26 @@ class SamCryptoAI {
     async updateTradesPrices(force = false) {
         if (!this.portfolio.trades || this.portfolio.trades.length === 0) return;
 
-        for (const trade of this.portfolio.trades) {
-            if (trade.status === 'closed') continue;
-
+        const staleTrades = this.portfolio.trades.filter(trade => {
+            if (trade.status === 'closed') return false;
             const lastUpdate = trade.lastUpdated ? new Date(trade.lastUpdated).getTime() : 0;
-            if (!force && Date.now() - lastUpdate < 10000) {
-                continue;
-            }
-
-            const priceData = await this.fetchTradePrice(trade);
-            if (!priceData || !priceData.price_usd) continue;
-
-            const pnlInfo = this.calculateTradePnL(trade, priceData.price_usd);
-            trade.currentPrice = priceData.price_usd;
-            trade.pnl = pnlInfo.pnl;
-            trade.pnlPercent = pnlInfo.pnlPercent;
-            trade.lastUpdated = new Date().toISOString();
-
-            // Auto-close if TP/SL hit
-            if (trade.takeProfit && ((trade.side === 'long' && trade.currentPrice >= trade.takeProfit) ||
-                (trade.side === 'short' && trade.currentPrice <= trade.takeProfit))) {
-                this.notifyTradeTargetHit(trade, 'Take-Profit');
-            }
+            return force || Date.now() - lastUpdate >= 10000;
+        });
 
-            if (trade.stopLoss && ((trade.side === 'long' && trade.currentPrice <= trade.stopLoss) ||
-                (trade.side === 'short' && trade.currentPrice >= trade.stopLoss))) {
-                this.notifyTradeTargetHit(trade, 'Stop-Loss');
-            }
+        if (staleTrades.length > 0) {
+            // Every stale trade priced from one snapshot
+            const refs = [...new Set(staleTrades.map(trade => this.portfolioValuator.tradeRef(trade)))];
+            const prices = await this.portfolioValuator.priceSnapshot(refs);
+            staleTrades.forEach(trade => {
+                const quote = prices.get(this.portfolioValuator.tradeRef(trade));
+                if (quote) this.applyTradePrice(trade, quote.price);
+            });
         }
 
+        this.refreshTradesView();
+    }
+
+    refreshTradesView() {
         this.savePortfolio();
         this.renderTrades();
         const summary = this.calculateTradesSummary();
@@ -618,11 +647,92 @@ class SamCryptoAI {
             clearInterval(this.tradeUpdateInterval);
         }
 
+        // Live prices arrive from the market stream; REST polling only covers outages
+        this.syncMarketStreams();
         this.tradeUpdateInterval = setInterval(() => {
-            this.updateTradesPrices();
+            if (!this.marketStream.isConnected) {
+                this.updateTradesPrices();
+            }
         }, 15000);
     }
 
+    /**
+     * 📡 Point the shared market stream at every symbol we currently track
+     */
+    syncMarketStreams() {
+        const toSymbol = (coinId) => this.symbolResolver.toBinanceSymbol(coinId);
+
+        const tradeSymbols = (this.portfolio.trades || [])
+            .filter(trade => trade.status !== 'closed')
+            .map(trade => this.tradeStreamSymbol(trade));
+        this.marketStream.track('trades', tradeSymbols, (tick) => this.applyTradeTick(tick));
+
+        this.marketStream.track('holdings', (this.portfolio.holdings || []).map(holding => toSymbol(holding.coinId)));
+        // Only symbols with untriggered alerts stay subscribed
+        this.marketStream.track('alerts', this.alertEngine.symbols(), (tick) => this.alertEngine.evaluate(tick));
+    }
+
+    /**
+     * 🔔 Rebuild the alert trigger index - only when the alert list changes, never per save or tick
+     */
+    syncAlertIndex() {
+        this.alertEngine.load(this.alerts || [], (coinId) => this.symbolResolver.toBinanceSymbol(coinId));
+        this.marketStream.track('alerts', this.alertEngine.symbols(), (tick) => this.alertEngine.evaluate(tick));
+    }
+
+    tradeStreamSymbol(trade) {
+        return trade.quote === 'USDT' && trade.base ? `${trade.base}USDT` : this.symbolResolver.toBinanceSymbol(trade.coinId);
+    }
+
+    /**
+     * ⚡ Apply a live tick to open trades on that symbol
+     */
+    applyTradeTick(tick) {
+        let changed = false;
+        for (const trade of this.portfolio.trades || []) {
+            if (trade.status === 'closed') continue;
+            if (this.tradeStreamSymbol(trade) !== tick.symbol) continue;
+
+            this.applyTradePrice(trade, tick.price);
+            changed = true;
+        }
+
+        if (changed) this.scheduleTradesRender();
+    }
+
+    applyTradePrice(trade, price) {
+        const pnlInfo = this.calculateTradePnL(trade, price);
+        trade.currentPrice = price;
+        trade.pnl = pnlInfo.pnl;
+        trade.pnlPercent = pnlInfo.pnlPercent;
+        trade.lastUpdated = new Date().toISOString();
+
+        // Notify once per target per trade - price often crosses a level back and forth
+        let target = null;
+        if (trade.takeProfit && ((trade.side === 'long' && price >= trade.takeProfit) ||
+            (trade.side === 'short' && price <= trade.takeProfit))) {
+            target = 'Take-Profit';
+        } else if (trade.stopLoss && ((trade.side === 'long' && price <= trade.stopLoss) ||
+            (trade.side === 'short' && price >= trade.stopLoss))) {
+            target = 'Stop-Loss';
+        }
+
+        const notified = trade.notifiedTargets || [];
+        if (target && !notified.includes(target)) {
+            trade.notifiedTargets = [...notified, target];
+            this.notifyTradeTargetHit(trade, target);
+        }
+    }
+
+    scheduleTradesRender() {
+        if (this.tradesRenderTimer) return;
+        // Ticks arrive every second per symbol - repaint and persist at most once a second
+        this.tradesRenderTimer = setTimeout(() => {
+            this.tradesRenderTimer = null;
+            this.refreshTradesView();
+        }, 1000);
+    }
+
     stopTradeUpdates() {
         if (this.tradeUpdateInterval) {
             clearInterval(this.tradeUpdateInterval);
@@ -691,7 +801,7 @@ class SamCryptoAI {
 
             const sentimentPrompt = `Analyze the overall crypto market sentiment from these recent news headlines:\n\n${newsText}\n\nProvide: 1) Overall sentiment (Bullish/Bearish/Neutral) with confidence %, 2) Key themes, 3) Which coins are mentioned most, 4) Trading implications. Be concise.`;
 
-            const response = await fetch(`${this.cerebrasAPI}`, {
+            const response = await this.fetchScheduler.fetch(`${this.cerebrasAPI}`, {
                 method: 'POST',
                 headers: { 
                     'Content-Type': 'application/json',
@@ -712,7 +822,7 @@ class SamCryptoAI {
                     temperature: 0.7,
                     max_tokens: 1000
                 })
-            });
+            }, { priority: 'high' });
 
             const data = await response.json();
             const analysis = data.choices?.[0]?.message?.content || 'Could not analyze sentiment.';
@@ -749,8 +859,11 @@ class SamCryptoAI {
             // Load user's alerts
             this.alerts = currentUser.alerts || [];
             
-            // Load user's chat history
+            // Load user's chat history and its rolling summary
             this.conversationHistory = currentUser.chatHistory || [];
+            this.contextManager.reset();
+            this.contextManager.importState(currentUser.chatSummary);
+            this.contextManager.scheduleFold(this.conversationHistory);
             
             // Load user's memory and preferences
             this.userMemory = currentUser.conversationMemory || {
@@ -787,6 +900,7 @@ class SamCryptoAI {
             };
             this.alerts = [];
             this.conversationHistory = [];
+            this.contextManager.reset();
             this.userMemory = {
                 conversations: [],
                 userProfile: {},
@@ -802,6 +916,9 @@ class SamCryptoAI {
                 interests: []
             };
         }
+
+        // A new alert list - index it once here; saves keep it current after this
+        this.syncAlertIndex();
     }
 
     // Configure API key based on user login status
@@ -1099,6 +1216,76 @@ class SamCryptoAI {
             // Enable/disable send button
             sendButton.disabled = input.value.trim().length === 0;
         });
+        
+        // Debounced: the network phase can finish before the send button is pressed
+        const messageInput = document.getElementById('messageInput');
+        if (messageInput) this.scheduleSpeculativePrefetch(messageInput.value);
+    }
+
+    scheduleSpeculativePrefetch(text) {
+        clearTimeout(this.prefetchTimer);
+        this.prefetchTimer = null;
+
+        const draft = (text || '').trim();
+        if (draft.length < this.prefetchMinLength || this.isSending) return;
+
+        this.prefetchTimer = setTimeout(() => {
+            this.prefetchTimer = null;
+            this.speculativePrefetch(draft);
+        }, this.prefetchDebounce);
+    }
+
+    /**
+     * 🔮 Warm the market, technical-analysis and news caches for a draft message
+     * Results land in the shared caches that sendMessage reads from. A new plan
+     * (different coins / news need) aborts the previous run: its queued market
+     * requests are dropped before spending rate-limit tokens. The news stage is
+     * shared with sendMessage through the cache, so it is only skipped, never aborted.
+     */
+    async speculativePrefetch(draft) {
+        const intent = this.detectIntent(draft);
+        const coins = this.resolveQueryCoins(draft, intent, { includeDefaults: false });
+        const wantsNews = this.isNewsRelatedQuery(draft) || intent.topic === 'news';
+        if (coins.length === 0 && !wantsNews) return;
+
+        // Same plan as the run in progress (the user is still typing the same question)
+        const key = `${coins.join(',')}|${wantsNews}`;
+        if (this.prefetchRun && this.prefetchRun.key === key) return;
+
+        this.cancelSpeculativePrefetch();
+        const run = { key: key, controller: new AbortController() };
+        this.prefetchRun = run;
+        const signal = run.controller.signal;
+
+        try {
+            if (coins.length > 0) {
+                console.log(`🔮 Prefetching ${coins.length} coin${coins.length > 1 ? 's' : ''} from draft:`, coins);
+                if (this.marketDataBatcher) {
+                    // Prices plus /coins/markets rows - the technical-analysis inputs
+                    await this.marketDataBatcher.fetchMany(coins, { signal });
+                } else {
+                    await Promise.all(coins.map(coin => this.fetchMarketData(coin)));
+                }
+            }
+
+            if (wantsNews && !signal.aborted) {
+                await this.fetchCoinDeskNews();
+            }
+        } catch (error) {
+            if (error?.name === 'AbortError') return;
+            console.warn('⚠️ Speculative prefetch failed:', error?.message || error);
+        } finally {
+            if (this.prefetchRun === run) this.prefetchRun = null;
+        }
+    }
+
+    cancelSpeculativePrefetch() {
+        clearTimeout(this.prefetchTimer);
+        this.prefetchTimer = null;
+        if (this.prefetchRun) {
+            this.prefetchRun.controller.abort();
+            this.prefetchRun = null;
+        }
     }
 
     handleKeyDown(e) {
@@ -1124,6 +1311,10 @@ class SamCryptoAI {
         this.isSending = true;
         console.log('📤 Sending message:', message);
         
+        // A pending draft prefetch is superseded; one already running keeps warming the cache
+        clearTimeout(this.prefetchTimer);
+        this.prefetchTimer = null;
+        
         // Add loading animation to send button
         sendButton.classList.add('sending');
         const sendIcon = sendButton.querySelector('.send-icon');
@@ -1168,19 +1359,23 @@ class SamCryptoAI {
         this.abortController = new AbortController();
         
         try {
-            // Get market data for crypto-related queries
-            const marketData = await this.getMarketDataForQuery(message);
+            // Market data, web insights, news and aggregated signals - all at once, each with a deadline
+            const context = await this.gatherContext(message);
             
             // Generate AI response
-            const response = await this.generateAIResponse(message, marketData);
+            const response = await this.generateAIResponse(message, context.marketData, context);
             
             // Safety check - ensure we have a valid response
             if (!response || response.trim() === '') {
                 throw new Error('Empty response received');
             }
             
-            // Add AI response
-            this.addMessage(response, 'ai');
+            // Add AI response (streamed responses are already on screen - just finish them)
+            if (this.streamingMessage) {
+                await this.completeStreamingMessage(response);
+            } else {
+                this.addMessage(response, 'ai');
+            }
             this.addToConversationHistory('assistant', response);
             
             // Hide indicators immediately after message is added
@@ -1199,6 +1394,7 @@ class SamCryptoAI {
             
             console.error('❌ Error generating response:', error);
             console.error('❌ Error stack:', error.stack);
+            this.discardStreamingMessage();
             
             // Generate a fallback response using demo
             try {
@@ -1249,6 +1445,41 @@ class SamCryptoAI {
 
     async getMarketDataForQuery(query) {
         const intent = this.detectIntent(query);
+        const cryptoMentions = this.resolveQueryCoins(query, intent);
+        
+        // Show search indicator message
+        const indicatorText = intent.type === 'market_scan'
+            ? `Analyzing ${cryptoMentions.length} coins for best opportunities...`
+            : `Fetching live market data for ${cryptoMentions.length} coin${cryptoMentions.length > 1 ? 's' : ''}...`;
+        this.showSearchIndicator(indicatorText);
+        
+        let marketData = {};
+        
+        if (this.marketDataBatcher) {
+            // One all-ticker snapshot + one multi-id CoinGecko call for every coin
+            marketData = await this.marketDataBatcher.fetchMany(cryptoMentions);
+        } else {
+            for (const crypto of cryptoMentions) {
+                try {
+                    const data = await this.fetchMarketDataWithIndicator(crypto);
+                    // Add technical analysis data
+                    const technicalData = await this.getTechnicalAnalysis(crypto, data);
+                    marketData[crypto] = { ...data, ...technicalData };
+                } catch (error) {
+                    console.error(`Error fetching data for ${crypto}:`, error);
+                }
+            }
+        }
+        
+        // Hide search indicator after data is fetched
+        setTimeout(() => this.hideSearchIndicator(), 500);
+        
+        return marketData;
+    }
+
+    // Coins a query needs data for: its mentions, the scan list, or popular defaults
+    resolveQueryCoins(query, intent, options = {}) {
+        const includeDefaults = options.includeDefaults !== false;
         // Extract cryptocurrency mentions from the query
         let cryptoMentions = this.extractCryptoMentions(query);
         
@@ -1266,41 +1497,19 @@ class SamCryptoAI {
                 'sui', 'aptos', 'render', 'worldcoin', 'pepe'
             ];
             console.log('🚀 Market Scan: Analyzing 30 top cryptocurrencies for best trade signals...');
-        } else if (cryptoMentions.length === 0) {
+        } else if (cryptoMentions.length === 0 && includeDefaults) {
             // If no specific crypto mentioned, fetch popular coins for context
             cryptoMentions = ['bitcoin', 'ethereum', 'solana']; // Always get real data for top coins
             console.log('🔄 No specific coins mentioned, fetching popular cryptocurrencies for context...');
         }
         
-        // Show search indicator message
-        const indicatorText = intent.type === 'market_scan'
-            ? `Analyzing ${cryptoMentions.length} coins for best opportunities...`
-            : `Fetching live market data for ${cryptoMentions.length} coin${cryptoMentions.length > 1 ? 's' : ''}...`;
-        this.showSearchIndicator(indicatorText);
-        
-        const marketData = {};
-        
-        for (const crypto of cryptoMentions) {
-            try {
-                const data = await this.fetchMarketDataWithIndicator(crypto);
-                // Add technical analysis data
-                const technicalData = await this.getTechnicalAnalysis(crypto, data);
-                marketData[crypto] = { ...data, ...technicalData };
-            } catch (error) {
-                console.error(`Error fetching data for ${crypto}:`, error);
-            }
-        }
-        
-        // Hide search indicator after data is fetched
-        setTimeout(() => this.hideSearchIndicator(), 500);
-        
-        return marketData;
+        return cryptoMentions;
     }
 
     async getTechnicalAnalysis(coinId, marketData) {
         try {
             // Get additional technical data from CoinGecko
-            const response = await fetch(`${this.coinGeckoAPI}/coins/${coinId}?localization=false&tickers=false&market_data=true&community_data=false&developer_data=false&sparkline=false`);
+            const response = await this.fetchScheduler.fetch(`${this.coinGeckoAPI}/coins/${coinId}?localization=false&tickers=false&market_data=true&community_data=false&developer_data=false&sparkline=false`, {}, { priority: this.fetchPriority() });
             
             if (!response.ok) {
                 throw new Error('Technical analysis API failed');
@@ -1313,41 +1522,60 @@ class SamCryptoAI {
                 return {};
             }
             
-            // Calculate technical indicators
-            const currentPrice = marketDataInfo.current_price?.usd || marketData.price_usd;
-            const priceChange24h = marketDataInfo.price_change_percentage_24h || marketData.change_24h;
-            const marketCap = marketDataInfo.market_cap?.usd || marketData.market_cap;
-            const volume24h = marketDataInfo.total_volume?.usd || marketData.volume_24h;
-            
-            // Calculate RSI approximation based on price change
-            const rsi = this.estimateRSIFromChange(priceChange24h);
-            
-            // Calculate support and resistance levels
-            const support = currentPrice * 0.95; // 5% below current price
-            const resistance = currentPrice * 1.05; // 5% above current price
-            
-            return {
-                technical_indicators: {
-                    rsi: rsi,
-                    support_level: support,
-                    resistance_level: resistance,
-                    market_cap_rank: data.market_cap_rank || 'N/A',
-                    price_change_7d: marketDataInfo.price_change_percentage_7d || 0,
-                    price_change_30d: marketDataInfo.price_change_percentage_30d || 0,
-                    ath: marketDataInfo.ath?.usd || 0,
-                    atl: marketDataInfo.atl?.usd || 0,
-                    ath_change_percentage: marketDataInfo.ath_change_percentage?.usd || 0,
-                    atl_change_percentage: marketDataInfo.atl_change_percentage?.usd || 0
-                },
-                market_sentiment: this.calculateMarketSentiment(priceChange24h, volume24h, marketCap),
-                volatility: this.calculateVolatility(priceChange24h, marketDataInfo.price_change_percentage_7d)
-            };
+            // Normalize to the /coins/markets row shape used by the batched path
+            return this.buildTechnicalAnalysis({
+                current_price: marketDataInfo.current_price?.usd,
+                price_change_percentage_24h: marketDataInfo.price_change_percentage_24h,
+                market_cap: marketDataInfo.market_cap?.usd,
+                total_volume: marketDataInfo.total_volume?.usd,
+                market_cap_rank: data.market_cap_rank,
+                price_change_percentage_7d_in_currency: marketDataInfo.price_change_percentage_7d,
+                price_change_percentage_30d_in_currency: marketDataInfo.price_change_percentage_30d,
+                ath: marketDataInfo.ath?.usd,
+                atl: marketDataInfo.atl?.usd,
+                ath_change_percentage: marketDataInfo.ath_change_percentage?.usd,
+                atl_change_percentage: marketDataInfo.atl_change_percentage?.usd
+            }, marketData);
         } catch (error) {
             console.error('Technical analysis error:', error);
             return {};
         }
     }
 
+    // Build technical indicators from a CoinGecko /coins/markets row
+    buildTechnicalAnalysis(row, marketData = {}) {
+        // Calculate technical indicators
+        const currentPrice = row.current_price || marketData.price_usd;
+        const priceChange24h = row.price_change_percentage_24h ?? marketData.change_24h;
+        const marketCap = row.market_cap || marketData.market_cap;
+        const volume24h = row.total_volume || marketData.volume_24h;
+        const priceChange7d = row.price_change_percentage_7d_in_currency || 0;
+        
+        // Calculate RSI approximation based on price change
+        const rsi = this.estimateRSIFromChange(priceChange24h);
+        
+        // Calculate support and resistance levels
+        const support = currentPrice * 0.95; // 5% below current price
+        const resistance = currentPrice * 1.05; // 5% above current price
+        
+        return {
+            technical_indicators: {
+                rsi: rsi,
+                support_level: support,
+                resistance_level: resistance,
+                market_cap_rank: row.market_cap_rank || 'N/A',
+                price_change_7d: priceChange7d,
+                price_change_30d: row.price_change_percentage_30d_in_currency || 0,
+                ath: row.ath || 0,
+                atl: row.atl || 0,
+                ath_change_percentage: row.ath_change_percentage || 0,
+                atl_change_percentage: row.atl_change_percentage || 0
+            },
+            market_sentiment: this.calculateMarketSentiment(priceChange24h, volume24h, marketCap),
+            volatility: this.calculateVolatility(priceChange24h, priceChange7d)
+        };
+    }
+
     estimateRSIFromChange(priceChange24h) {
         // Simplified RSI estimation based on 24h price change
         // This is a quick approximation, not true RSI calculation
@@ -1391,31 +1619,19 @@ class SamCryptoAI {
 
     extractCryptoMentions(query) {
         const mentionedCryptos = [];
+        const knownCoins = new Set();
         
-        // Known crypto mappings (for popular coins)
-        const knownCryptoMap = {
-            'bitcoin': 'bitcoin', 'btc': 'btc',
-            'ethereum': 'ethereum', 'eth': 'eth', 
-            'binance': 'bnb', 'bnb': 'bnb',
-            'cardano': 'cardano', 'ada': 'ada',
-            'solana': 'solana', 'sol': 'sol',
-            'polkadot': 'polkadot', 'dot': 'dot',
-            'chainlink': 'chainlink', 'link': 'link',
-            'litecoin': 'litecoin', 'ltc': 'ltc',
-            'ripple': 'ripple', 'xrp': 'xrp',
-            'dogecoin': 'dogecoin', 'doge': 'doge'
-        };
-        
-        const queryLower = query.toLowerCase();
+        // Method 1: Known coins from the shared dictionary (whole words, one entry per coin)
+        this.messageAnalyzer.analyze(query).coins.forEach(mention => {
+            knownCoins.add(mention.coin.id);
+            mentionedCryptos.push(this.messageAnalyzer.mentionId(mention));
+        });
         
-        // Method 1: Find known crypto names
-        for (const [mention, coinSymbol] of Object.entries(knownCryptoMap)) {
-            if (queryLower.includes(mention)) {
-                if (!mentionedCryptos.includes(coinSymbol)) {
-                    mentionedCryptos.push(coinSymbol);
-                }
-            }
-        }
+        // Symbols below that name a coin already found (e.g. "BTC" after "Bitcoin") are skipped
+        const isKnownCoin = (symbol) => {
+            const coin = this.messageAnalyzer.lookupCoin(symbol);
+            return !!coin && knownCoins.has(coin.id);
+        };
         
         // Method 2: Extract trading pairs like "SUL/USDT", "BTC/USD", etc.
         const tradingPairPattern = /([A-Z]{2,6})[\/\-]?(?:USDT|USD|BUSD|BTC|ETH)\b/gi;
@@ -1423,7 +1639,7 @@ class SamCryptoAI {
         if (tradingPairMatches) {
             tradingPairMatches.forEach(match => {
                 const coinSymbol = match.replace(/[\/\-]?(USDT|USD|BUSD|BTC|ETH)/gi, '').toUpperCase();
-                if (coinSymbol.length >= 2 && coinSymbol.length <= 6) {
+                if (coinSymbol.length >= 2 && coinSymbol.length <= 6 && !isKnownCoin(coinSymbol)) {
                     if (!mentionedCryptos.includes(coinSymbol.toLowerCase())) {
                         mentionedCryptos.push(coinSymbol.toLowerCase());
                         console.log(`🎯 Extracted trading pair: ${match} → ${coinSymbol}`);
@@ -1441,7 +1657,7 @@ class SamCryptoAI {
                 const excludeWords = ['USD', 'US', 'API', 'CEO', 'AI', 'APP', 'BOT', 'CPU', 'GPU', 'RAM', 'SSD', 'VPN', 'URL', 'HTML', 'CSS', 'JS'];
                 if (!excludeWords.includes(symbol) && symbol.length >= 2 && symbol.length <= 6) {
                     const symbolLower = symbol.toLowerCase();
-                    if (!mentionedCryptos.includes(symbolLower)) {
+                    if (!mentionedCryptos.includes(symbolLower) && !isKnownCoin(symbolLower)) {
                         mentionedCryptos.push(symbolLower);
                         console.log(`🔍 Extracted potential symbol: ${symbol}`);
                     }
@@ -1450,11 +1666,11 @@ class SamCryptoAI {
         }
         
         // Method 4: Extract from common formats like "SYMBOL price", "buy SYMBOL", etc.
-        const contextPattern = /(?:price of|buy|sell|about|think about|analysis of|trading)\s+([a-zA-Z]{2,6})/gi;
+        const contextPattern = /\b(?:price of|buy|sell|about|think about|analysis of|trading)\s+([a-zA-Z]{2,6})\b/gi;
         let contextMatch;
         while ((contextMatch = contextPattern.exec(query)) !== null) {
             const symbol = contextMatch[1].toLowerCase();
-            if (!mentionedCryptos.includes(symbol)) {
+            if (!mentionedCryptos.includes(symbol) && !isKnownCoin(symbol)) {
                 mentionedCryptos.push(symbol);
                 console.log(`📝 Extracted from context: ${symbol}`);
             }
@@ -1555,106 +1771,17 @@ class SamCryptoAI {
 
     async fetchFromBinanceAllTicker(coinId) {
         try {
-            // Check if we have recent all-ticker data cached
-            const allTickerCache = this.getFromCache('binance_all_ticker');
-            let allTickerData = allTickerCache;
-            
-            if (!allTickerData) {
-                console.log('🔄 Fetching ALL Binance ticker data...');
-                const response = await fetch('https://api.binance.com/api/v3/ticker/24hr');
-                
-                if (!response.ok) {
-                    throw new Error('Binance all-ticker API failed');
-                }
-                
-                allTickerData = await response.json();
-                console.log(`✅ Fetched ${allTickerData.length} Binance tickers`);
-                
-                // Cache for 30 seconds
-                this.setCache('binance_all_ticker', allTickerData);
-            } else {
-                console.log(`📦 Using cached Binance all-ticker data (${allTickerData.length} tickers)`);
-            }
-            
-            // Dynamic symbol detection - search for ANY coin on Binance
-            let tickerData = null;
-            let binanceSymbol = null;
-            
-            // Method 1: Try known mappings first (for common coins)
-            const commonSymbolMap = {
-                'bitcoin': 'BTCUSDT', 'btc': 'BTCUSDT',
-                'ethereum': 'ETHUSDT', 'eth': 'ETHUSDT',
-                'binancecoin': 'BNBUSDT', 'bnb': 'BNBUSDT',
-                'cardano': 'ADAUSDT', 'ada': 'ADAUSDT',
-                'solana': 'SOLUSDT', 'sol': 'SOLUSDT',
-                'polkadot': 'DOTUSDT', 'dot': 'DOTUSDT',
-                'chainlink': 'LINKUSDT', 'link': 'LINKUSDT',
-                'litecoin': 'LTCUSDT', 'ltc': 'LTCUSDT',
-                'ripple': 'XRPUSDT', 'xrp': 'XRPUSDT',
-                'dogecoin': 'DOGEUSDT', 'doge': 'DOGEUSDT'
-            };
-            
-            const knownSymbol = commonSymbolMap[coinId.toLowerCase()];
-            if (knownSymbol) {
-                tickerData = allTickerData.find(ticker => ticker.symbol === knownSymbol);
-                binanceSymbol = knownSymbol;
-                console.log(`✅ Found ${coinId} using known mapping: ${binanceSymbol}`);
-            }
-            
-            // Method 2: Dynamic search - try different variations for ANY coin
-            if (!tickerData) {
-                const coinUpper = coinId.toUpperCase();
-                const searchPatterns = [
-                    `${coinUpper}USDT`,     // Direct: SULUSDT
-                    `${coinUpper}USD`,      // USD variant
-                    `${coinUpper}BUSD`,     // BUSD variant
-                    `${coinUpper}BTC`,      // BTC pair
-                    `${coinUpper}ETH`       // ETH pair
-                ];
-                
-                for (const pattern of searchPatterns) {
-                    const found = allTickerData.find(ticker => ticker.symbol === pattern);
-                    if (found) {
-                        tickerData = found;
-                        binanceSymbol = pattern;
-                        console.log(`✅ Found ${coinId} dynamically: ${binanceSymbol}`);
-                        break;
-                    }
-                }
-            }
-            
-            // Method 3: Fuzzy search through ALL symbols (for partial matches)
-            if (!tickerData) {
-                const coinPattern = coinId.replace(/[^a-zA-Z0-9]/g, '').toUpperCase();
-                const fuzzyMatch = allTickerData.find(ticker => {
-                    const symbol = ticker.symbol;
-                    return symbol.includes(coinPattern + 'USDT') || 
-                           symbol.includes(coinPattern + 'USD') ||
-                           symbol.startsWith(coinPattern);
-                });
-                
-                if (fuzzyMatch) {
-                    tickerData = fuzzyMatch;
-                    binanceSymbol = fuzzyMatch.symbol;
-                    console.log(`✅ Found ${coinId} via fuzzy search: ${binanceSymbol}`);
-                }
-            }
+            const allTickerData = await this.getBinanceAllTickerSnapshot();
+            if (!allTickerData) return null;
             
+            const tickerData = this.findBinanceTicker(allTickerData, coinId);
             if (!tickerData) {
                 console.log(`❌ ${coinId} not found in any Binance trading pairs`);
                 console.log(`🔍 Searched ${allTickerData.length} Binance symbols for: ${coinId}`);
                 return null;
             }
             
-            // Convert to our standard format
-            return {
-                price_usd: parseFloat(tickerData.lastPrice),
-                change_24h: parseFloat(tickerData.priceChangePercent),
-                volume_24h: parseFloat(tickerData.volume) * parseFloat(tickerData.lastPrice),
-                market_cap: 0, // Binance doesn't provide market cap
-                last_updated: tickerData.closeTime,
-                source: 'Binance All-Ticker'
-            };
+            return this.formatBinanceTicker(tickerData, 'Binance All-Ticker');
             
         } catch (error) {
             console.error('Binance all-ticker fetch error:', error);
@@ -1662,88 +1789,125 @@ class SamCryptoAI {
         }
     }
 
-    async preloadBinanceData() {
-        try {
-            console.log('🚀 Preloading Binance all-ticker data for faster responses...');
-            await this.fetchFromBinanceAllTicker('bitcoin'); // This will cache all ticker data
-            console.log('✅ Binance all-ticker data preloaded successfully');
-        } catch (error) {
-            console.log('⚠️ Binance preload failed, will fetch on-demand:', error.message);
-        }
-    }
-
-    async fetchMarketData(coinId) {
-        // Check cache first
-        const cacheKey = `market_${coinId}`;
-        const cached = this.getFromCache(cacheKey);
+    // Shared 30s snapshot of every Binance 24h ticker (one request for all coins)
+    async getBinanceAllTickerSnapshot() {
+        const cached = this.getFromCache('binance_all_ticker');
         if (cached) {
-            console.log(`Using cached data for ${coinId}`);
+            console.log(`📦 Using cached Binance all-ticker data (${cached.length} tickers)`);
             return cached;
         }
         
-        // Check if there's already a pending request for this coin
-        if (this.pendingRequests.has(cacheKey)) {
-            console.log(`Waiting for pending request for ${coinId}`);
-            return await this.pendingRequests.get(cacheKey);
+        // Share one in-flight request between concurrent callers
+        if (this.pendingRequests.has('binance_all_ticker')) {
+            return await this.pendingRequests.get('binance_all_ticker');
         }
         
-        // Create new request with multiple real-time APIs
         const requestPromise = (async () => {
             try {
-                console.log(`🔄 Fetching real-time data for ${coinId} from multiple sources...`);
-                
-                const [coinGeckoData, binanceData, coinCapData] = await Promise.allSettled([
-                    this.fetchFromCoinGecko(coinId),
-                    this.fetchFromBinance(coinId),
-                    this.fetchFromCoinCap(coinId)
-                ]);
-                
-                let result;
-                let primarySource = null;
+                console.log('🔄 Fetching ALL Binance ticker data...');
+                const response = await this.fetchScheduler.fetch('https://api.binance.com/api/v3/ticker/24hr', {}, { priority: this.fetchPriority() });
                 
-                // Use the best available source with preference order
-                if (coinGeckoData.status === 'fulfilled' && coinGeckoData.value) {
-                    result = coinGeckoData.value;
-                    primarySource = 'CoinGecko';
-                } else if (binanceData.status === 'fulfilled' && binanceData.value) {
-                    result = binanceData.value;
-                    primarySource = 'Binance';
-                } else if (coinCapData.status === 'fulfilled' && coinCapData.value) {
-                    result = coinCapData.value;
-                    primarySource = 'CoinCap';
-                } else {
-                    throw new Error('All real-time API sources failed');
+                if (!response.ok) {
+                    throw new Error('Binance all-ticker API failed');
                 }
                 
-                console.log(`✅ Real-time data from ${primarySource}: $${result.price_usd.toFixed(2)} (${result.change_24h > 0 ? '+' : ''}${result.change_24h.toFixed(2)}%)`);
-                
-                // Add timestamp for freshness tracking
-                result.fetchTime = Date.now();
-                result.primarySource = primarySource;
+                const allTickerData = await response.json();
+                console.log(`✅ Fetched ${allTickerData.length} Binance tickers`);
                 
-                // Cache the result
-                this.setCache(cacheKey, result);
-                return result;
+                // Build the symbol index once per snapshot refresh
+                this.symbolResolver.indexTickers(allTickerData);
                 
-            } catch (error) {
-                console.error('Real-time market data fetch error:', error);
-                // Return mock data for demo purposes
-                return this.getMockMarketData(coinId);
+                // Cache for 30 seconds
+                this.setCache('binance_all_ticker', allTickerData);
+                return allTickerData;
             } finally {
-                // Remove from pending requests
-                this.pendingRequests.delete(cacheKey);
+                this.pendingRequests.delete('binance_all_ticker');
             }
         })();
         
-        // Store pending request
-        this.pendingRequests.set(cacheKey, requestPromise);
-        
+        this.pendingRequests.set('binance_all_ticker', requestPromise);
         return requestPromise;
     }
 
+    findBinanceTicker(allTickerData, coinId) {
+        // O(1) lookup via the resolver's per-snapshot symbol/base/quote indexes
+        const tickerData = this.symbolResolver.findTicker(coinId, allTickerData);
+        if (tickerData) {
+            console.log(`✅ Found ${coinId} on Binance: ${tickerData.symbol}`);
+        }
+        return tickerData;
+    }
+
+    formatBinanceTicker(tickerData, source) {
+        // Convert to our standard format
+        return {
+            price_usd: parseFloat(tickerData.lastPrice),
+            change_24h: parseFloat(tickerData.priceChangePercent),
+            volume_24h: parseFloat(tickerData.volume) * parseFloat(tickerData.lastPrice),
+            market_cap: 0, // Binance doesn't provide market cap
+            last_updated: tickerData.closeTime,
+            source: source
+        };
+    }
+
+    async preloadBinanceData() {
+        try {
+            console.log('🚀 Preloading Binance all-ticker data for faster responses...');
+            await this.fetchFromBinanceAllTicker('bitcoin'); // This will cache all ticker data
+            console.log('✅ Binance all-ticker data preloaded successfully');
+        } catch (error) {
+            console.log('⚠️ Binance preload failed, will fetch on-demand:', error.message);
+        }
+    }
+
+    async fetchMarketData(coinId) {
+        try {
+            // Fresh → cached, stale → cached now + background refresh, miss → shared fetch
+            return await this.cacheManager.getOrFetch('market', `market_${coinId}`, () => this.fetchMarketDataFromSources(coinId));
+        } catch (error) {
+            console.error('Real-time market data fetch error:', error);
+            // Return mock data for demo purposes
+            return this.getMockMarketData(coinId);
+        }
+    }
+
+    async fetchMarketDataFromSources(coinId) {
+        console.log(`🔄 Fetching real-time data for ${coinId} from multiple sources...`);
+        
+        const [coinGeckoData, binanceData, coinCapData] = await Promise.allSettled([
+            this.fetchFromCoinGecko(coinId),
+            this.fetchFromBinance(coinId),
+            this.fetchFromCoinCap(coinId)
+        ]);
+        
+        let result;
+        let primarySource = null;
+        
+        // Use the best available source with preference order
+        if (coinGeckoData.status === 'fulfilled' && coinGeckoData.value) {
+            result = coinGeckoData.value;
+            primarySource = 'CoinGecko';
+        } else if (binanceData.status === 'fulfilled' && binanceData.value) {
+            result = binanceData.value;
+            primarySource = 'Binance';
+        } else if (coinCapData.status === 'fulfilled' && coinCapData.value) {
+            result = coinCapData.value;
+            primarySource = 'CoinCap';
+        } else {
+            throw new Error('All real-time API sources failed');
+        }
+        
+        console.log(`✅ Real-time data from ${primarySource}: $${result.price_usd.toFixed(2)} (${result.change_24h > 0 ? '+' : ''}${result.change_24h.toFixed(2)}%)`);
+        
+        // Add timestamp for freshness tracking
+        result.fetchTime = Date.now();
+        result.primarySource = primarySource;
+        return result;
+    }
+
     async fetchFromCoinGecko(coinId) {
         try {
-            const response = await fetch(`${this.coinGeckoAPI}/simple/price?ids=${coinId}&vs_currencies=usd&include_24hr_change=true&include_24hr_vol=true&include_market_cap=true&include_last_updated_at=true`);
+            const response = await this.fetchScheduler.fetch(`${this.coinGeckoAPI}/simple/price?ids=${coinId}&vs_currencies=usd&include_24hr_change=true&include_24hr_vol=true&include_market_cap=true&include_last_updated_at=true`, {}, { priority: this.fetchPriority() });
             
             if (!response.ok) {
                 throw new Error('CoinGecko API failed');
@@ -1772,26 +1936,12 @@ class SamCryptoAI {
 
     async fetchFromBinance(coinId) {
         try {
-            // Map coin IDs to Binance symbols
-            const symbolMap = {
-                'bitcoin': 'BTCUSDT',
-                'ethereum': 'ETHUSDT',
-                'binancecoin': 'BNBUSDT',
-                'cardano': 'ADAUSDT',
-                'solana': 'SOLUSDT',
-                'polkadot': 'DOTUSDT',
-                'chainlink': 'LINKUSDT',
-                'litecoin': 'LTCUSDT',
-                'bitcoin-cash': 'BCHUSDT',
-                'stellar': 'XLMUSDT'
-            };
-            
-            const symbol = symbolMap[coinId];
+            const symbol = this.symbolResolver.toBinanceSymbol(coinId);
             if (!symbol) {
                 throw new Error('Symbol not found for Binance');
             }
             
-            const response = await fetch(`https://api.binance.com/api/v3/ticker/24hr?symbol=${symbol}`);
+            const response = await this.fetchScheduler.fetch(`https://api.binance.com/api/v3/ticker/24hr?symbol=${symbol}`, {}, { priority: this.fetchPriority() });
             
             if (!response.ok) {
                 throw new Error('Binance API failed');
@@ -1852,7 +2002,7 @@ class SamCryptoAI {
         }
 
         try {
-            const response = await fetch(`${this.coinCapAPI}/assets/${coinCapId}`);
+            const response = await this.fetchScheduler.fetch(`${this.coinCapAPI}/assets/${coinCapId}`, {}, { priority: this.fetchPriority() });
 
             if (!response.ok) {
                 console.warn(`CoinCap API response not ok for ${coinId}: ${response.status}`);
@@ -1900,36 +2050,44 @@ class SamCryptoAI {
     // Enhanced News Integration Methods
     async fetchCoinDeskNews() {
         try {
-            // Try multiple news sources for comprehensive coverage
-            const [coinDeskData, cryptoNewsData] = await Promise.allSettled([
-                this.fetchFromCoinDesk(),
-                this.fetchFromCryptoNews()
-            ]);
-            
-            let allNews = [];
-            
-            if (coinDeskData.status === 'fulfilled' && coinDeskData.value) {
-                allNews = allNews.concat(coinDeskData.value);
-            }
-            
-            if (cryptoNewsData.status === 'fulfilled' && cryptoNewsData.value) {
-                allNews = allNews.concat(cryptoNewsData.value);
-            }
-            
-            // Sort by recency and return top 5
-            return allNews
-                .sort((a, b) => new Date(b.publishedAt) - new Date(a.publishedAt))
-                .slice(0, 5);
-                
+            // Shared with the draft prefetch - a warm entry makes this free on send
+            const news = await this.cacheManager.getOrFetch('news', 'chat_news', () => this.fetchNewsFromSources());
+            return news || [];
         } catch (error) {
             console.error('Error fetching news:', error);
             return this.getMockNewsData();
         }
     }
 
+    async fetchNewsFromSources() {
+        // Try multiple news sources for comprehensive coverage
+        const [coinDeskData, cryptoNewsData] = await Promise.allSettled([
+            this.fetchFromCoinDesk(),
+            this.fetchFromCryptoNews()
+        ]);
+        
+        let allNews = [];
+        
+        if (coinDeskData.status === 'fulfilled' && coinDeskData.value) {
+            allNews = allNews.concat(coinDeskData.value);
+        }
+        
+        if (cryptoNewsData.status === 'fulfilled' && cryptoNewsData.value) {
+            allNews = allNews.concat(cryptoNewsData.value);
+        }
+        
+        // Nothing to cache if every source came back empty
+        if (allNews.length === 0) return null;
+        
+        // Deduped, scored and indexed with the news feed - per-coin prompt lookups read the index
+        return this.newsPipeline.ingest(allNews)
+            .sort((a, b) => new Date(b.publishedAt) - new Date(a.publishedAt))
+            .slice(0, 5);
+    }
+
     async fetchFromCoinDesk() {
         try {
-            const response = await fetch(`${this.coinDeskAPI}/news/`);
+            const response = await this.fetchScheduler.fetch(`${this.coinDeskAPI}/news/`, {}, { priority: this.fetchPriority() });
             
             if (!response.ok) {
                 throw new Error('CoinDesk API request failed');
@@ -1958,7 +2116,7 @@ class SamCryptoAI {
     async fetchFromCryptoNews() {
         try {
             // Using a free crypto news API
-            const response = await fetch('https://api.coinpaprika.com/v1/events');
+            const response = await this.fetchScheduler.fetch('https://api.coinpaprika.com/v1/events', {}, { priority: this.fetchPriority() });
             
             if (!response.ok) {
                 throw new Error('CryptoNews API request failed');
@@ -1987,7 +2145,7 @@ class SamCryptoAI {
     async fetchCoinDeskMarketData() {
         try {
             // CoinDesk Bitcoin Price Index API
-            const response = await fetch(`${this.coinDeskAPI}/bpi/currentprice.json`);
+            const response = await this.fetchScheduler.fetch(`${this.coinDeskAPI}/bpi/currentprice.json`, {}, { priority: this.fetchPriority() });
             
             if (!response.ok) {
                 throw new Error('CoinDesk market data request failed');
@@ -2081,10 +2239,10 @@ class SamCryptoAI {
     }
 
     // 🌐 HYBRID AI: Fetch real-time insights from Perplexity AI
-    async fetchPerplexityInsights(userMessage, marketData) {
+    async fetchPerplexityInsights(userMessage, coinIds = [], onDelta = null) {
         try {
-            // Extract crypto names from market data
-            const cryptoNames = Object.keys(marketData || {})
+            // Readable names for the coins in the question (runs before market data arrives)
+            const cryptoNames = coinIds
                 .map(id => {
                     // Convert ID to readable name (e.g., 'bitcoin' -> 'Bitcoin')
                     return id.charAt(0).toUpperCase() + id.slice(1).replace(/-/g, ' ');
@@ -2098,7 +2256,7 @@ class SamCryptoAI {
             
             console.log('🌐 Querying Perplexity AI:', perplexityQuery);
             
-            const response = await fetch(this.perplexityAPI, {
+            const response = await this.fetchScheduler.fetch(this.perplexityAPI, {
                 method: 'POST',
                 headers: {
                     'Authorization': `Bearer ${this.perplexityApiKey}`,
@@ -2121,9 +2279,11 @@ class SamCryptoAI {
                     top_p: 0.9,
                     search_domain_filter: ['coindesk.com', 'cointelegraph.com', 'decrypt.co', 'theblock.co', 'bloomberg.com'],
                     return_citations: true,
-                    search_recency_filter: 'week' // Focus on recent information
-                })
-            });
+                    search_recency_filter: 'week', // Focus on recent information
+                    stream: this.streamingEnabled
+                }),
+                signal: this.abortController?.signal
+            }, { priority: 'high', retries: 1 });
 
             if (!response.ok) {
                 const errorText = await response.text();
@@ -2131,15 +2291,15 @@ class SamCryptoAI {
                 throw new Error(`Perplexity API error: ${response.status}`);
             }
 
-            const data = await response.json();
+            const completion = await this.readCompletionResponse(response, onDelta);
             
-            if (!data.choices || !data.choices[0] || !data.choices[0].message) {
-                console.error('❌ Invalid Perplexity response structure:', data);
+            if (!completion) {
+                console.error('❌ Invalid Perplexity response structure');
                 return null;
             }
 
-            const insights = data.choices[0].message.content;
-            const citations = data.citations || [];
+            const insights = completion.content;
+            const citations = completion.citations;
             
             console.log('✅ Perplexity insights length:', insights.length, 'chars');
             console.log('📚 Citations:', citations.length);
@@ -2151,12 +2311,193 @@ class SamCryptoAI {
             };
             
         } catch (error) {
+            if (error.name === 'AbortError') throw error;
             console.error('❌ Error fetching Perplexity insights:', error);
             return null;
         }
     }
 
-    async generateAIResponse(userMessage, marketData) {
+    /**
+     * 🌊 Read a chat completion - SSE stream when the server streams, plain JSON otherwise
+     * @returns {Promise<{content, finishReason, citations}|null>}
+     */
+    async readCompletionResponse(response, onDelta = null) {
+        if (this.streamingEnabled && SSEStreamReader.isEventStream(response)) {
+            const completion = await SSEStreamReader.readChatCompletion(response, onDelta);
+            return completion.content ? completion : null;
+        }
+
+        const data = await response.json();
+        if (!data.choices || !data.choices[0] || !data.choices[0].message) {
+            console.error('❌ Invalid response structure:', data);
+            return null;
+        }
+
+        const content = data.choices[0].message.content;
+        if (onDelta && content) onDelta(content, content);
+        return {
+            content: content,
+            finishReason: data.choices[0].finish_reason,
+            citations: data.citations || []
+        };
+    }
+
+    /**
+     * 💬 Forward streamed tokens into a live AI message (created on the first token)
+     */
+    streamToChat(delta) {
+        if (!this.streamingMessage) {
+            this.streamingMessage = this.beginStreamingMessage();
+        }
+        this.streamingMessage.renderer.append(delta);
+    }
+
+    beginStreamingMessage() {
+        const { messageDiv, messageText, messagesContainer, item } = this.createMessageElement('ai');
+        this.getTranscript().pin(item);
+        const renderer = this.createMessageRenderer(messageText, messagesContainer);
+
+        // First token is here: drop the thinking dots but keep the stop button
+        const chatIndicator = document.getElementById('chatTypingIndicator');
+        if (chatIndicator) {
+            chatIndicator.classList.add('hidden');
+            chatIndicator.style.display = 'none';
+        }
+
+        console.log('🌊 First token received - streaming response');
+        return { messageDiv, renderer, item };
+    }
+
+    async completeStreamingMessage(finalText) {
+        const stream = this.streamingMessage;
+        this.streamingMessage = null;
+        if (!stream) return;
+
+        // A retry/fallback may have produced different text than what was streamed
+        if (finalText && finalText !== stream.renderer.getText()) {
+            this.getTranscript().remove(stream.item);
+            this.addMessage(finalText, 'ai');
+            return;
+        }
+
+        const content = await stream.renderer.finish();
+        stream.item.content = content;
+        this.getTranscript().unpin(stream.item);
+        this.persistMessage(content, 'ai');
+    }
+
+    discardStreamingMessage() {
+        const stream = this.streamingMessage;
+        this.streamingMessage = null;
+        if (!stream) return;
+        stream.renderer.cancel();
+        this.getTranscript().remove(stream.item);
+    }
+
+    /**
+     * 🧵 Start every context source at once, each bounded by its own deadline
+     * Sources that miss their deadline (or fail) are listed in `missing` and flagged in the prompt.
+     */
+    async gatherContext(userMessage, options = {}) {
+        const intent = this.detectIntent(userMessage);
+        const signal = this.abortController?.signal;
+        const coinIds = this.extractCryptoMentions(userMessage);
+        const started = Date.now();
+
+        const tasks = {
+            marketData: options.marketData !== undefined
+                ? Promise.resolve(options.marketData)
+                : this.getMarketDataForQuery(userMessage)
+        };
+
+        // 🌐 HYBRID AI: Perplexity runs in parallel instead of ahead of everything else
+        if (this.useHybridAI && this.shouldUsePerplexity(userMessage, intent)) {
+            console.log('🌐 Using Perplexity AI for real-time insights...');
+            this.showUserMessage('🌐 Searching the web with Perplexity AI for real-time information...', 3000);
+            tasks.perplexityInsights = this.fetchPerplexityInsights(userMessage, coinIds);
+        }
+
+        if (this.isNewsRelatedQuery(userMessage) || intent.topic === 'news') {
+            tasks.newsData = this.fetchCoinDeskNews();
+        }
+
+        if (this.dataAggregator && coinIds.length > 0) {
+            const geckoIds = [...new Set(coinIds.map(coin => this.symbolResolver.toCoinGeckoId(coin)))];
+            tasks.aggregatedData = this.fetchAggregatedData(geckoIds.slice(0, 3));
+        }
+
+        const results = await Promise.all(Object.entries(tasks).map(([source, promise]) =>
+            this.withDeadline(promise, this.contextDeadlines[source], signal).then(result => [source, result])
+        ));
+
+        if (signal && signal.aborted) {
+            throw new DOMException('Aborted', 'AbortError');
+        }
+
+        const context = {
+            intent: intent,
+            marketData: null,
+            perplexityInsights: null,
+            newsData: null,
+            aggregatedData: null,
+            missing: []
+        };
+
+        for (const [source, result] of results) {
+            if (result.status === 'fulfilled' && result.value) {
+                context[source] = result.value;
+            } else {
+                const reason = result.status === 'timeout'
+                    ? `no response within ${this.contextDeadlines[source] / 1000}s`
+                    : 'unavailable right now';
+                context.missing.push({ source: source, reason: reason });
+            }
+        }
+
+        // An empty object (not null) so the prompt never falls back to demo prices
+        context.marketData = context.marketData || {};
+
+        if (context.perplexityInsights && context.perplexityInsights.insights) {
+            this.showUserMessage('✅ Real-time web data retrieved from Perplexity AI!', 2000);
+        }
+
+        console.log(`🧵 Context gathered in ${Date.now() - started}ms`, context.missing.length > 0 ? { missing: context.missing } : '');
+        this.currentContext = context;
+        return context;
+    }
+
+    /**
+     * ⏱️ Settle a promise as fulfilled / rejected / timeout - never rejects, never waits past `ms`
+     * The underlying request keeps running (and warms the caches) after a timeout.
+     */
+    withDeadline(promise, ms, signal = null) {
+        return new Promise(resolve => {
+            const timer = setTimeout(() => resolve({ status: 'timeout' }), ms);
+            const settle = (result) => {
+                clearTimeout(timer);
+                resolve(result);
+            };
+
+            if (signal) signal.addEventListener('abort', () => settle({ status: 'aborted' }), { once: true });
+
+            Promise.resolve(promise).then(
+                value => settle({ status: 'fulfilled', value: value }),
+                error => settle({ status: 'rejected', error: error })
+            );
+        });
+    }
+
+    async fetchAggregatedData(coinIds) {
+        const results = await Promise.all(coinIds.map(coinId => this.dataAggregator.aggregateMarketData(coinId)));
+
+        const aggregated = {};
+        results.forEach((data, index) => {
+            if (data) aggregated[coinIds[index]] = data;
+        });
+        return Object.keys(aggregated).length > 0 ? aggregated : null;
+    }
+
+    async generateAIResponse(userMessage, marketData, context = null) {
         console.log('🤖 Generating AI response for:', userMessage);
         
         // Automatic load distribution - rotate keys every message
@@ -2172,50 +2513,22 @@ class SamCryptoAI {
         }
 
         try {
-            // Detect user intent for smarter responses
-            const intent = this.detectIntent(userMessage);
+            // Context normally arrives pre-gathered from sendMessage; gather it here otherwise
+            const gathered = context || await this.gatherContext(userMessage, { marketData: marketData });
+            const intent = gathered.intent;
             console.log('🎯 Detected intent:', intent);
             
-            // 🌐 HYBRID AI: Check if we should use Perplexity for real-time data
-            let perplexityInsights = null;
-            if (this.useHybridAI && this.shouldUsePerplexity(userMessage, intent)) {
-                console.log('🌐 Using Perplexity AI for real-time insights...');
-                
-                // Show user that Perplexity is being used
-                this.showUserMessage('🌐 Searching the web with Perplexity AI for real-time information...', 3000);
-                
-                try {
-                    perplexityInsights = await this.fetchPerplexityInsights(userMessage, marketData);
-                    console.log('✅ Perplexity insights received');
-                    
-                    // Notify user that web search was successful
-                    if (perplexityInsights && perplexityInsights.insights) {
-                        this.showUserMessage('✅ Real-time web data retrieved from Perplexity AI!', 2000);
-                    }
-                } catch (error) {
-                    console.warn('⚠️ Perplexity API error, continuing with Cerebras only:', error);
-                }
-            }
-            
-            // Gather comprehensive context
-            const isNewsQuery = this.isNewsRelatedQuery(userMessage);
-            let newsData = null;
-            
-            if (isNewsQuery || intent.topic === 'news') {
-                newsData = await this.fetchCoinDeskNews();
-            }
-            
             // Build enhanced system prompt (with Perplexity insights if available)
-            const systemPrompt = this.createAdvancedSystemPrompt(marketData, newsData, intent, userMessage, perplexityInsights);
+            const systemPrompt = this.createAdvancedSystemPrompt(marketData, gathered.newsData, intent, userMessage, gathered.perplexityInsights, gathered);
             console.log('📏 System prompt length:', systemPrompt.length, 'characters');
             
             // Build conversation history for multi-turn context
             const conversationContents = this.buildConversationHistory(systemPrompt, userMessage);
             console.log('📝 Conversation contents prepared, messages:', conversationContents.length);
             
-            // Calculate approximate token usage (4 chars ≈ 1 token)
-            const estimatedInputTokens = Math.ceil(systemPrompt.length / 4);
-            console.log('🎯 Estimated input tokens:', estimatedInputTokens);
+            // Token estimate from the prompt builder (static prefix is cacheable upstream)
+            const estimatedInputTokens = this.lastPromptBuild ? this.lastPromptBuild.tokens : PromptBuilder.estimateTokens(systemPrompt);
+            console.log('🎯 Estimated input tokens:', estimatedInputTokens, `(static prefix: ${this.lastPromptBuild ? this.lastPromptBuild.staticTokens : 0})`);
             
             // Dynamic generation config based on intent
             const generationConfig = this.getOptimalGenerationConfig(intent);
@@ -2225,8 +2538,8 @@ class SamCryptoAI {
             // Convert Gemini format to Cerebras/OpenAI format
             const cerebrasMessages = this.convertToCerebrasFormat(conversationContents);
             
-            // Smart retry with exponential backoff
-            const response = await this.fetchWithRetry(`${this.cerebrasAPI}`, {
+            // Scheduled request: jittered backoff that honours Retry-After
+            const response = await this.fetchScheduler.fetch(`${this.cerebrasAPI}`, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
@@ -2237,10 +2550,15 @@ class SamCryptoAI {
                     messages: cerebrasMessages,
                     temperature: generationConfig.temperature || 0.9,
                     max_tokens: generationConfig.maxOutputTokens || 8192,
-                    top_p: generationConfig.topP || 0.95
+                    top_p: generationConfig.topP || 0.95,
+                    stream: this.streamingEnabled
                 }),
                 signal: this.abortController?.signal
-            }, 3); // 3 retries
+            }, {
+                priority: 'high',
+                retries: 2,
+                onRetry: (delay) => this.showUserMessage(`⏰ API busy, retrying in ${Math.ceil(delay / 1000)}s...`, delay)
+            });
 
             console.log('📡 Response status:', response.status);
 
@@ -2268,16 +2586,16 @@ class SamCryptoAI {
                 throw new Error(`API request failed: ${response.status} - ${errorText}`);
             }
 
-            const data = await response.json();
-            console.log('✅ API response received:', data);
+            // Tokens are rendered as they arrive when the server streams
+            const completion = await this.readCompletionResponse(response, (delta) => this.streamToChat(delta));
+            console.log('✅ API response received');
             
-            if (!data.choices || !data.choices[0] || !data.choices[0].message) {
-                console.error('❌ Invalid response structure:', data);
+            if (!completion) {
                 throw new Error('Invalid API response - no choices');
             }
             
             // Check if response was truncated
-            const finishReason = data.choices[0].finish_reason;
+            const finishReason = completion.finishReason;
             if (finishReason) {
                 console.log('⚠️ Finish reason:', finishReason);
                 if (finishReason === 'length' || finishReason === 'stop') {
@@ -2285,7 +2603,7 @@ class SamCryptoAI {
                 }
             }
             
-            const aiResponse = data.choices[0].message.content;
+            const aiResponse = completion.content;
             console.log('✅ AI response generated successfully');
             console.log('📝 Response length:', aiResponse.length, 'characters');
             console.log('📝 Response ends with:', aiResponse.slice(-100)); // Last 100 characters
@@ -2310,7 +2628,11 @@ class SamCryptoAI {
             return aiResponse;
             
         } catch (error) {
+            // User pressed stop - keep whatever was streamed, no fallback answer
+            if (error.name === 'AbortError') throw error;
+            
             console.error('❌ Cerebras API error:', error);
+            this.discardStreamingMessage();
             
             // Handle specific error types
             if (error.message === 'API_OVERLOADED' || error.message.includes('503') || error.message.includes('overloaded')) {
@@ -2394,6 +2716,9 @@ class SamCryptoAI {
                     return response;
                 }
             } catch (error) {
+                // Stop pressed mid-rotation - cancel, don't fall back to a canned answer
+                if (error.name === 'AbortError') throw error;
+                
                 console.log(`❌ Key ${this.currentKeyIndex + 1} also failed:`, error.message);
                 
                 // If this key is also rate limited, continue to next
@@ -2411,23 +2736,18 @@ class SamCryptoAI {
     }
 
     async attemptAIRequest(userMessage, marketData) {
-        // Simplified request attempt - core logic only
-        const intent = this.detectIntent(userMessage);
-        const isNewsQuery = this.isNewsRelatedQuery(userMessage);
-        let newsData = null;
-        
-        if (isNewsQuery || intent.topic === 'news') {
-            newsData = await this.fetchCoinDeskNews();
-        }
+        // Simplified request attempt - reuses the context gathered for this message
+        const context = this.currentContext || await this.gatherContext(userMessage, { marketData: marketData });
+        const intent = context.intent;
         
-        const systemPrompt = this.createAdvancedSystemPrompt(marketData, newsData, intent, userMessage, null);
+        const systemPrompt = this.createAdvancedSystemPrompt(marketData, context.newsData, intent, userMessage, context.perplexityInsights, context);
         const conversationContents = this.buildConversationHistory(systemPrompt, userMessage);
         const generationConfig = this.getOptimalGenerationConfig(intent);
         
         // Convert Gemini format to Cerebras/OpenAI format
         const cerebrasMessages = this.convertToCerebrasFormat(conversationContents);
         
-        const response = await fetch(`${this.cerebrasAPI}`, {
+        const response = await this.fetchScheduler.fetch(`${this.cerebrasAPI}`, {
             method: 'POST',
             headers: { 
                 'Content-Type': 'application/json',
@@ -2438,9 +2758,11 @@ class SamCryptoAI {
                 messages: cerebrasMessages,
                 temperature: generationConfig.temperature || 0.9,
                 max_tokens: generationConfig.maxOutputTokens || 8192,
-                top_p: generationConfig.topP || 0.95
-            })
-        });
+                top_p: generationConfig.topP || 0.95,
+                stream: this.streamingEnabled
+            }),
+            signal: this.abortController?.signal
+        }, { priority: 'high', retries: 0 }); // Key rotation handles 429s here
         
         if (!response.ok) {
             if (response.status === 429) {
@@ -2449,13 +2771,13 @@ class SamCryptoAI {
             throw new Error(`API_ERROR_${response.status}`);
         }
         
-        const data = await response.json();
+        const completion = await this.readCompletionResponse(response, (delta) => this.streamToChat(delta));
         
-        if (!data.choices || !data.choices[0] || !data.choices[0].message) {
+        if (!completion) {
             throw new Error('Invalid API response');
         }
         
-        return data.choices[0].message.content;
+        return completion.content;
     }
 
     async handleAPIOverload(userMessage, marketData) {
@@ -2465,42 +2787,24 @@ class SamCryptoAI {
     }
 
     detectIntent(message) {
-        const messageLower = message.toLowerCase();
-        
-        // Intent categories
-        const intents = {
-            market_scan: ['scan', 'market scan', 'whole market', 'all market', 'all coins', 'across market', 'best trade', 'best setup', 'top pick', 'trade signal', 'signal for trade', 'find me a trade', 'find me a good trade', 'which coin has signal', 'which coin to trade', 'scan the market', 'scan market', 'analyze the market', 'analyze market'],
-            trade_advice: ['buy', 'sell', 'trade', 'invest', 'should i', 'recommend', 'good time', 'entry', 'exit'],
-            price_check: ['price', 'cost', 'worth', 'value', 'how much'],
-            analysis: ['analyze', 'analysis', 'technical', 'chart', 'indicator', 'rsi', 'macd'],
-            portfolio: ['portfolio', 'holdings', 'my coins', 'balance', 'profit', 'loss', 'p&l'],
-            news: ['news', 'latest', 'update', 'happening', 'events'],
-            learning: ['how', 'what is', 'explain', 'teach', 'learn', 'understand', 'why'],
-            comparison: ['vs', 'versus', 'compare', 'better', 'difference between'],
-            prediction: ['predict', 'forecast', 'future', 'will', 'expect', 'outlook'],
-            risk: ['risk', 'safe', 'danger', 'volatile', 'secure', 'risky']
-        };
+        const analysis = this.messageAnalyzer.analyze(message);
+        const matchedIntents = analysis.keywords.intent || {};
         
+        // Intent with the most distinct keyword hits; ties go to the earlier category
         let detectedIntent = 'general';
         let confidence = 0;
         
-        for (const [intent, keywords] of Object.entries(intents)) {
-            const matches = keywords.filter(keyword => messageLower.includes(keyword));
+        for (const intent of Object.keys(MessageAnalyzer.dictionary.keywords.intent)) {
+            const matches = matchedIntents[intent] || [];
             if (matches.length > confidence) {
                 confidence = matches.length;
                 detectedIntent = intent;
             }
         }
         
-        // Detect urgency
-        const urgencyKeywords = ['now', 'quickly', 'urgent', 'asap', 'immediately'];
-        const isUrgent = urgencyKeywords.some(kw => messageLower.includes(kw));
-        
-        // Detect sentiment
-        const positiveWords = ['good', 'great', 'awesome', 'excellent', 'bullish'];
-        const negativeWords = ['bad', 'worry', 'scared', 'bearish', 'crash'];
-        const sentiment = positiveWords.some(w => messageLower.includes(w)) ? 'positive' :
-                         negativeWords.some(w => messageLower.includes(w)) ? 'negative' : 'neutral';
+        // Detect urgency and sentiment from the same scan
+        const isUrgent = this.messageAnalyzer.has(analysis, 'urgency', 'urgent');
+        const sentiment = this.messageAnalyzer.firstLabel(analysis, 'sentiment') || 'neutral';
         
         return {
             type: detectedIntent,
@@ -2529,8 +2833,13 @@ class SamCryptoAI {
             parts: [{ text: 'I understand! I\'m SamCrypto AI with full memory of our conversations. I remember your preferences, trading history, and past discussions. I\'ll provide personalized advice based on what I know about you and continue our conversation naturally.' }]
         });
         
-        // Add recent conversation history with better context (last 5 messages for speed)
-        const recentHistory = this.conversationHistory.slice(-5);
+        // Pack history into whatever the context window leaves after the system prompt
+        const systemTokens = this.contextManager.countTokens(enhancedSystemPrompt);
+        const historyBudget = Math.max(this.minHistoryTokens, this.contextWindowSize - systemTokens);
+        const packed = this.contextManager.pack(this.conversationHistory, currentMessage, historyBudget);
+        console.log(`🧮 History packed: ${packed.messages.length} messages, ${packed.tokens}/${historyBudget} tokens (${packed.omitted} omitted)`);
+        
+        const recentHistory = packed.messages;
         for (const msg of recentHistory) {
             contents.push({
                 role: msg.role === 'user' ? 'user' : 'model',
@@ -2697,11 +3006,6 @@ ${this.getRecentTradingContext()}
             this.trackAIMentions(message);
         }
         
-        // Generate conversation summary periodically
-        if (this.conversationContext.messages.length % 10 === 0) {
-            this.generateConversationSummary();
-        }
-        
         // Save context to localStorage
         this.saveConversationContext();
     }
@@ -2726,31 +3030,15 @@ ${this.getRecentTradingContext()}
     }
     
     trackTopics(message, role = 'user') {
-        const lowerMsg = message.toLowerCase();
+        const analysis = this.messageAnalyzer.analyze(message);
         const topics = new Set(this.conversationContext.keyPoints);
         
-        // Comprehensive crypto list
-        const cryptos = [
-            'bitcoin', 'btc', 'ethereum', 'eth', 'solana', 'sol', 'cardano', 'ada',
-            'ripple', 'xrp', 'dogecoin', 'doge', 'polkadot', 'dot', 'avalanche', 'avax',
-            'shiba', 'matic', 'polygon', 'link', 'chainlink', 'litecoin', 'ltc',
-            'uniswap', 'uni', 'cosmos', 'atom', 'stellar', 'xlm', 'monero', 'xmr',
-            'tron', 'trx', 'binance', 'bnb', 'near', 'arbitrum', 'arb', 'optimism', 'op',
-            'injective', 'inj', 'sei', 'sui', 'aptos', 'apt', 'render', 'pepe'
-        ];
-        
         // Track ALL crypto mentions
-        cryptos.forEach(crypto => {
-            if (lowerMsg.includes(crypto)) {
-                const normalized = this.normalizeCoinName(crypto);
-                topics.add(normalized);
-            }
-        });
+        analysis.coins.forEach(mention => topics.add(mention.coin.name));
         
         // Track trading topics
-        const tradingTopics = ['price', 'trend', 'support', 'resistance', 'rsi', 'volume', 'bull', 'bear', 'breakout', 'analysis', 'trade', 'setup'];
-        tradingTopics.forEach(topic => {
-            if (lowerMsg.includes(topic)) {
+        Object.keys(MessageAnalyzer.dictionary.keywords.topic).forEach(topic => {
+            if (this.messageAnalyzer.has(analysis, 'topic', topic)) {
                 topics.add(topic);
             }
         });
@@ -2760,29 +3048,8 @@ ${this.getRecentTradingContext()}
     }
     
     normalizeCoinName(coin) {
-        const mapping = {
-            'btc': 'Bitcoin', 'bitcoin': 'Bitcoin',
-            'eth': 'Ethereum', 'ethereum': 'Ethereum',
-            'sol': 'Solana', 'solana': 'Solana',
-            'ada': 'Cardano', 'cardano': 'Cardano',
-            'xrp': 'Ripple', 'ripple': 'Ripple',
-            'doge': 'Dogecoin', 'dogecoin': 'Dogecoin',
-            'dot': 'Polkadot', 'polkadot': 'Polkadot',
-            'avax': 'Avalanche', 'avalanche': 'Avalanche',
-            'bnb': 'BNB', 'binance': 'BNB',
-            'matic': 'Polygon', 'polygon': 'Polygon',
-            'link': 'Chainlink', 'chainlink': 'Chainlink',
-            'ltc': 'Litecoin', 'litecoin': 'Litecoin',
-            'uni': 'Uniswap', 'uniswap': 'Uniswap',
-            'atom': 'Cosmos', 'cosmos': 'Cosmos',
-            'xlm': 'Stellar', 'stellar': 'Stellar',
-            'near': 'NEAR', 'arb': 'Arbitrum', 'arbitrum': 'Arbitrum',
-            'op': 'Optimism', 'optimism': 'Optimism',
-            'inj': 'Injective', 'injective': 'Injective',
-            'sei': 'SEI', 'sui': 'SUI', 'apt': 'Aptos', 'aptos': 'Aptos',
-            'render': 'Render', 'pepe': 'PEPE'
-        };
-        return mapping[coin.toLowerCase()] || coin.toUpperCase();
+        const entry = this.messageAnalyzer.lookupCoin(coin);
+        return entry ? entry.name : coin.toUpperCase();
     }
     
     trackAIMentions(message) {
@@ -2791,7 +3058,6 @@ ${this.getRecentTradingContext()}
             this.conversationContext.aiMentionedCoins = [];
         }
         
-        const lowerMsg = message.toLowerCase();
         const coins = [];
         
         // Look for price patterns like "$105,064.21 USD" or "Bitcoin (BTC) is trading"
@@ -2811,11 +3077,9 @@ ${this.getRecentTradingContext()}
             }
         });
         
-        // Also check for explicit mentions
-        ['BTC', 'ETH', 'SOL', 'Bitcoin', 'Ethereum', 'Solana'].forEach(coin => {
-            if (message.includes(coin)) {
-                coins.push(coin);
-            }
+        // Also check for explicit mentions (one scan, however long the reply)
+        this.messageAnalyzer.analyze(message).coins.forEach(mention => {
+            coins.push(mention.coin.name);
         });
         
         // Store unique coins mentioned in last response
@@ -2839,56 +3103,52 @@ ${this.getRecentTradingContext()}
     }
     
     extractUserProfile(message) {
-        const lowerMsg = message.toLowerCase();
+        const analysis = this.messageAnalyzer.analyze(message);
+        const profile = this.conversationContext.userProfile;
         
         // Track experience level
-        if (lowerMsg.match(/beginner|new to|just started|first time/)) {
-            this.conversationContext.userProfile.experienceLevel = 'beginner';
-        } else if (lowerMsg.match(/expert|professional|advanced|experienced/)) {
-            this.conversationContext.userProfile.experienceLevel = 'advanced';
-        }
+        const experienceLevel = this.messageAnalyzer.firstLabel(analysis, 'profileExperience');
+        if (experienceLevel) profile.experienceLevel = experienceLevel;
         
         // Track risk tolerance
-        if (lowerMsg.match(/safe|conservative|low risk|careful/)) {
-            this.conversationContext.userProfile.riskTolerance = 'low';
-        } else if (lowerMsg.match(/aggressive|high risk|yolo|moon/)) {
-            this.conversationContext.userProfile.riskTolerance = 'high';
-        }
+        const riskTolerance = this.messageAnalyzer.firstLabel(analysis, 'profileRisk');
+        if (riskTolerance) profile.riskTolerance = riskTolerance;
         
         // Track trading goals
-        if (lowerMsg.match(/long term|hold|hodl|invest/)) {
-            this.conversationContext.userProfile.tradingStyle = 'long-term';
-        } else if (lowerMsg.match(/day trad|short term|quick|scalp/)) {
-            this.conversationContext.userProfile.tradingStyle = 'short-term';
-        }
+        const tradingStyle = this.messageAnalyzer.firstLabel(analysis, 'profileStyle');
+        if (tradingStyle) profile.tradingStyle = tradingStyle;
         
         // Track interests
-        if (lowerMsg.match(/defi|decentralized finance/)) {
-            if (!this.conversationContext.userProfile.interests) {
-                this.conversationContext.userProfile.interests = [];
-            }
-            if (!this.conversationContext.userProfile.interests.includes('DeFi')) {
-                this.conversationContext.userProfile.interests.push('DeFi');
-            }
-        }
-        if (lowerMsg.match(/nft|non fungible/)) {
-            if (!this.conversationContext.userProfile.interests) {
-                this.conversationContext.userProfile.interests = [];
+        Object.keys(analysis.keywords.interest || {}).forEach(interest => {
+            if (!profile.interests) {
+                profile.interests = [];
             }
-            if (!this.conversationContext.userProfile.interests.includes('NFTs')) {
-                this.conversationContext.userProfile.interests.push('NFTs');
+            if (!profile.interests.includes(interest)) {
+                profile.interests.push(interest);
             }
-        }
+        });
     }
     
     generateConversationSummary() {
-        const messages = this.conversationContext.messages.slice(-10);
-        const topics = this.conversationContext.keyPoints;
-        const intent = this.conversationContext.userIntent;
+        // Normally folded during idle time; this forces it for the current history
+        this.contextManager.fold(this.conversationHistory);
+        this.conversationContext.summary = this.contextManager.getSummary();
+        
+        console.log('📝 Conversation summary generated:', this.contextManager.getStats().summaryLines, 'lines');
+    }
+    
+    handleSummaryUpdated(summary) {
+        this.conversationContext.summary = summary;
+        this.saveConversationContext();
         
-        this.conversationContext.summary = `Recent discussion about ${topics.join(', ')}. User is ${intent}. ${messages.length} messages in context.`;
+        // Persist with the user so the summary survives the history cap and reloads
+        const currentUser = this.userManager && this.userManager.getCurrentUser();
+        if (currentUser) {
+            currentUser.chatSummary = this.contextManager.exportState();
+            this.userManager.saveUsers(currentUser.id);
+        }
         
-        console.log('📝 Conversation summary generated:', this.conversationContext.summary);
+        console.log('📝 Conversation summary updated:', this.contextManager.getStats().summaryLines, 'lines');
     }
     
     saveConversationContext() {
@@ -2989,39 +3249,11 @@ ${this.getRecentTradingContext()}
 
     // ===== SMART RETRY WITH EXPONENTIAL BACKOFF =====
     
-    async fetchWithRetry(url, options, maxRetries = 3) {
-        for (let attempt = 1; attempt <= maxRetries; attempt++) {
-            try {
-                console.log(`🔄 API Request attempt ${attempt}/${maxRetries}...`);
-                
-                const response = await fetch(url, options);
-                
-                // If success or non-retryable error, return immediately
-                if (response.ok || (response.status !== 503 && response.status !== 429)) {
-                    return response;
-                }
-                
-                // If this is the last attempt, return the error response
-                if (attempt === maxRetries) {
-                    console.error(`❌ All ${maxRetries} attempts failed`);
-                    return response;
-                }
-                
-                // Calculate backoff delay (exponential: 1s, 2s, 4s)
-                const delay = Math.pow(2, attempt - 1) * 1000;
-                console.log(`⏰ API busy, waiting ${delay/1000}s before retry ${attempt + 1}...`);
-                this.showUserMessage(`⏰ API busy, retrying in ${delay/1000}s...`, delay);
-                
-                await this.delay(delay);
-                
-            } catch (error) {
-                if (attempt === maxRetries) {
-                    throw error;
-                }
-                console.error(`⚠️ Request attempt ${attempt} failed:`, error.message);
-                await this.delay(Math.pow(2, attempt - 1) * 1000);
-            }
-        }
+    /**
+     * 🚦 Chat-driven requests jump ahead of background polling
+     */
+    fetchPriority() {
+        return this.isSending ? 'high' : 'normal';
     }
     
     delay(ms) {
@@ -3086,12 +3318,51 @@ ${this.getRecentTradingContext()}
         }
     }
 
-    createAdvancedSystemPrompt(marketData, newsData, intent, userMessage, perplexityInsights = null) {
-        const currentTime = new Date().toISOString();
-        const userPortfolio = this.portfolio;
-        const userAlerts = this.alerts;
-        
-        let prompt = `You are SamCrypto AI, an advanced crypto trading intelligence assistant powered by real-time market data and sophisticated analysis. You combine the conversational excellence of ChatGPT with elite trading expertise.
+    /**
+     * 🧱 Register the base prompt layer
+     * Static sections come first and are built once; integrations may replace or extend this layer.
+     */
+    registerPromptSections() {
+        const builder = this.promptBuilder;
+
+        builder.register({ id: 'core_identity', static: true, order: 10, required: true, build() { return this.getCoreIdentityPrompt(); } });
+        builder.register({ id: 'trading_rules', static: true, order: 20, priority: 70, build() { return this.getTradingRulesPrompt(); } });
+        builder.register({ id: 'response_craft', static: true, order: 30, priority: 20, truncate: true, build() { return this.getResponseCraftPrompt(); } });
+
+        builder.register({ id: 'portfolio', order: 100, priority: 80, build() { return this.createPortfolioPromptSection(); } });
+        builder.register({ id: 'context_gaps', order: 105, priority: 85, build(ctx) { return this.createContextGapsPromptSection(ctx.missing); } });
+        builder.register({ id: 'market_data', order: 110, required: true, build(ctx) { return this.createMarketDataPromptSection(ctx.marketData, ctx.userMessage); } });
+        builder.register({ id: 'aggregated_data', order: 115, priority: 45, truncate: true, build(ctx) { return this.createAggregatedDataPromptSection(ctx.aggregatedData); } });
+        builder.register({ id: 'web_insights', order: 120, priority: 75, truncate: true, build(ctx) { return this.createWebInsightsPromptSection(ctx.perplexityInsights); } });
+        builder.register({ id: 'news', order: 130, priority: 40, build(ctx) { return this.createNewsPromptSection(ctx.newsData, ctx.userMessage); } });
+        builder.register({ id: 'intent_guidance', order: 140, priority: 60, build(ctx) { return this.createIntentGuidancePromptSection(ctx.intent); } });
+    }
+
+    /**
+     * 🧠 Compose the system prompt from the registered sections within the token budget
+     */
+    createAdvancedSystemPrompt(marketData, newsData, intent, userMessage, perplexityInsights = null, context = null) {
+        const result = this.promptBuilder.build({
+            app: this,
+            marketData: marketData,
+            newsData: newsData,
+            intent: intent || {},
+            userMessage: userMessage,
+            perplexityInsights: perplexityInsights,
+            aggregatedData: context ? context.aggregatedData : null,
+            missing: context ? context.missing : []
+        }, { maxTokens: this.promptTokenBudget });
+
+        if (result.trimmed.length > 0 || result.dropped.length > 0) {
+            console.log('✂️ Prompt trimmed to budget - truncated:', result.trimmed, 'dropped:', result.dropped);
+        }
+
+        this.lastPromptBuild = result;
+        return result.prompt;
+    }
+
+    getCoreIdentityPrompt() {
+        return `You are SamCrypto AI, an advanced crypto trading intelligence assistant powered by real-time market data and sophisticated analysis. You combine the conversational excellence of ChatGPT with elite trading expertise.
 
 🎯 YOUR CORE IDENTITY & PERSONALITY:
 
@@ -3236,45 +3507,11 @@ Your primary goal is to help users MAKE PROFITABLE SHORT-TERM TRADES. Every reco
 - Real-Time Order Flow Engine (Level 2 depth + recent trades) from Binance public APIs
 - On-Chain Intelligence Analyst (active addresses, tx count, network fees via Blockchair/Helius and other public endpoints)
 - Global News & Sentiment API (CryptoPanic headlines + Alternative.me Fear & Greed Index)
-- Always cross-check signals against these data streams before making recommendations
-
-📊 YOUR CURRENT PORTFOLIO:
-
-💰 AVAILABLE CAPITAL:
-- USDT Balance: $${(userPortfolio.usdtBalance || 0).toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2})}
-- Holdings Value: $${userPortfolio.totalValue.toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2})}
-- Total Capital: $${((userPortfolio.usdtBalance || 0) + userPortfolio.totalValue).toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2})}
-
-📈 PERFORMANCE:
-- Total P&L: ${userPortfolio.totalPnL >= 0 ? '+' : ''}$${userPortfolio.totalPnL.toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2})} (${userPortfolio.totalPnLPercent.toFixed(2)}%)
-- Active Price Alerts: ${userAlerts.length}
-
-💼 YOUR HOLDINGS (${userPortfolio.holdings.length} coins):
-${userPortfolio.holdings.length > 0 ? userPortfolio.holdings.map(h => {
-    const coinName = h.coinId.toUpperCase();
-    const amount = h.amount.toFixed(8);
-    const buyPrice = h.buyPrice.toFixed(2);
-    const currentPrice = h.currentPrice ? h.currentPrice.toFixed(2) : 'Calculating...';
-    const currentValue = h.currentValue ? h.currentValue.toFixed(2) : '0.00';
-    const pnl = h.pnl ? h.pnl.toFixed(2) : '0.00';
-    const pnlPercent = h.pnlPercent ? h.pnlPercent.toFixed(2) : '0.00';
-    return `
-- ${coinName}: ${amount} coins
-  • Buy Price: $${buyPrice} | Current Price: $${currentPrice}
-  • Current Value: $${currentValue}
-  • P&L: ${h.pnl >= 0 ? '+' : ''}$${pnl} (${pnlPercent}%)`;
-}).join('\n') : '- No holdings yet (all capital is in USDT)'}
-
-🎯 SHORT-TERM TRADING RECOMMENDATIONS:
-- Available USDT: $${(userPortfolio.usdtBalance || 0).toFixed(2)} (use for quick trades)
-- Focus on LIQUID coins (BTC, ETH) for fast entry/exit
-- Suggest SMALLER position sizes for quick trades (1-2% risk max)
-- Prioritize SPEED and EXIT PLANS over large positions
-- Use 1-2% risk per short-term trade (NOT 2-3%)
-- Keep 70%+ in cash for quick opportunities
-- Exit current holdings if they're not moving quickly
+- Always cross-check signals against these data streams before making recommendations`;
+    }
 
-🛡️ SHORT-TERM TRADING RULES (NEVER BREAK THESE):
+    getTradingRulesPrompt() {
+        return `🛡️ SHORT-TERM TRADING RULES (NEVER BREAK THESE):
 
 1. **TRADING TIME RESTRICTIONS**:
    ⏰ BEST TIMES: High volume hours (market open, news events)
@@ -3318,118 +3555,330 @@ ${userPortfolio.holdings.length > 0 ? userPortfolio.holdings.map(h => {
    ⏰ Maximum: 4-6 hours
    ❌ NEVER hold overnight unless stop is at break-even
    ❌ Exit if position hasn't moved in 2 hours
-   🔥 QUICK IN, QUICK OUT = PROFITABLE SHORT-TERM TRADING
+   🔥 QUICK IN, QUICK OUT = PROFITABLE SHORT-TERM TRADING`;
+    }
 
-🔥 ===== VERIFIED LIVE MARKET DATA ===== 🔥
-⚠️ WARNING: ONLY USE THE PRICES BELOW - DO NOT GUESS OR ESTIMATE!
-📅 Data Retrieved: ${currentTime}
-🎯 MANDATORY: Quote exact prices from this verified data:
+    getResponseCraftPrompt() {
+        return `💡 HOW TO CRAFT EXCEPTIONAL RESPONSES:
 
-═══════════════════════════════════════════════════════════════`;
+**Natural Conversation Framework:**
 
-        if (marketData) {
-            for (const [coinId, data] of Object.entries(marketData)) {
-                const coinName = coinId.charAt(0).toUpperCase() + coinId.slice(1).replace('-', ' ');
-                const volumeFormatted = data.volume_24h ? `$${(data.volume_24h / 1000000000).toFixed(2)}B` : 'N/A';
-                const marketCapFormatted = data.market_cap ? `$${(data.market_cap / 1000000000).toFixed(2)}B` : 'N/A';
-                const source = data.source || 'Unknown';
-                
-                // Calculate data freshness
-                const dataAge = data.fetchTime ? Date.now() - data.fetchTime : 0;
-                const dataFreshness = dataAge < 30000 ? 'LIVE' : dataAge < 60000 ? 'FRESH' : 'CACHED';
-                const primarySource = data.primarySource || source;
-                
-                prompt += `
+When providing trading analysis or signals, structure your responses like a knowledgeable friend having a conversation:
 
-🎯 **${coinName.toUpperCase()} - VERIFIED PRICE DATA**
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-💰 EXACT PRICE: ${this.formatCryptoPrice(data.price_usd)} USD
-📊 24h Change: ${data.change_24h > 0 ? '+' : ''}${data.change_24h.toFixed(2)}%
-📈 Volume (24h): ${volumeFormatted}
-🏆 Market Cap: ${marketCapFormatted}
-⏱️ FRESHNESS: ${dataFreshness} (${Math.round(dataAge/1000)}s ago from ${primarySource})
-🔗 SOURCE: ${primarySource} API
+**Opening (Natural & Context-Aware):**
+- Acknowledge their question specifically and naturally
+- Example: "Great question about Bitcoin! Let me break down what's happening right now..."
+- Or: "I see you're looking at Ethereum - interesting timing actually..."
+- Avoid robotic greetings like "Hello user" or formulaic openings
 
-⚠️ MANDATORY: Use EXACTLY ${this.formatCryptoPrice(data.price_usd)} when quoting ${coinName} price`;
-                
-                // Add technical indicators if available
-                if (data.technical_indicators) {
-                    const ti = data.technical_indicators;
-                    prompt += `\n\n📈 TECHNICAL ANALYSIS:
-- RSI: ${ti.rsi ? ti.rsi.toFixed(2) : 'N/A'} ${ti.rsi < 30 ? '(OVERSOLD - BUY SIGNAL)' : ti.rsi > 70 ? '(OVERBOUGHT - SELL SIGNAL)' : '(NEUTRAL)'}
-- Support Level: $${ti.support_level ? ti.support_level.toLocaleString() : 'N/A'}
-- Resistance Level: $${ti.resistance_level ? ti.resistance_level.toLocaleString() : 'N/A'}
-- Market Cap Rank: #${ti.market_cap_rank || 'N/A'}
-- 7d Change: ${ti.price_change_7d ? (ti.price_change_7d > 0 ? '+' : '') + ti.price_change_7d.toFixed(2) + '%' : 'N/A'}
-- 30d Change: ${ti.price_change_30d ? (ti.price_change_30d > 0 ? '+' : '') + ti.price_change_30d.toFixed(2) + '%' : 'N/A'}
-- All-Time High: $${ti.ath ? ti.ath.toLocaleString() : 'N/A'} (${ti.ath_change_percentage ? ti.ath_change_percentage.toFixed(2) : 'N/A'}% from ATH)
-- All-Time Low: $${ti.atl ? ti.atl.toLocaleString() : 'N/A'} (${ti.atl_change_percentage ? '+' + ti.atl_change_percentage.toFixed(2) : 'N/A'}% from ATL)`;
-                }
-                
-                // Add market sentiment if available
-                if (data.market_sentiment) {
-                    const sentiment = data.market_sentiment.sentiment.replace('_', ' ').toUpperCase();
-                    const strength = data.market_sentiment.strength.toUpperCase();
-                    prompt += `\n- Market Sentiment: ${sentiment} (${strength} confidence)`;
-                }
-                
-                // Add volatility if available
-                if (data.volatility) {
-                    const vol = data.volatility.replace('_', ' ').toUpperCase();
-                    prompt += `\n- Volatility: ${vol}`;
-                }
-            }
-        } else {
-            // If no specific market data, use mock data for demonstration
-            console.log('⚠️ No market data provided, using mock data for demo');
-            
-            // Extract crypto mentions to provide relevant mock data
-            const cryptoMentions = this.extractCryptoMentions(userMessage || 'bitcoin ethereum solana');
-            const mockData = {};
-            
-            cryptoMentions.forEach(coinId => {
-                mockData[coinId] = this.getMockMarketData(coinId);
-                mockData[coinId].fetchTime = Date.now();
-                mockData[coinId].primarySource = 'Demo Data';
-            });
-            
-            // If no crypto mentioned, provide popular coins
-            if (Object.keys(mockData).length === 0) {
-                ['bitcoin', 'ethereum', 'solana'].forEach(coinId => {
-                    mockData[coinId] = this.getMockMarketData(coinId);
-                    mockData[coinId].fetchTime = Date.now();
-                    mockData[coinId].primarySource = 'Demo Data';
-                });
-            }
-            
-            // Add the mock data to the prompt in the same format
-            for (const [coinId, data] of Object.entries(mockData)) {
-                const coinName = coinId.charAt(0).toUpperCase() + coinId.slice(1).replace('-', ' ');
-                const volumeFormatted = data.volume_24h ? `$${(data.volume_24h / 1000000000).toFixed(2)}B` : 'N/A';
-                const marketCapFormatted = data.market_cap ? `$${(data.market_cap / 1000000000).toFixed(2)}B` : 'N/A';
-                
-                const dataAge = data.fetchTime ? Date.now() - data.fetchTime : 0;
-                const dataFreshness = 'LIVE';
-                const primarySource = data.primarySource || 'Demo';
-                
-                prompt += `
+**Market Context (Tell the Story):**
+- Explain the current market situation in narrative form
+- Example: "Bitcoin's been having an interesting day. It's currently trading at $43,521.45 (just pulled from CoinGecko), and here's what's catching my attention..."
+- Weave in the technical data naturally: "The RSI at 65 suggests strong momentum, though it's approaching overbought territory"
+- Connect the dots: "This aligns with what we're seeing in the volume - it spiked 40% in the last hour"
 
-🎯 **${coinName.toUpperCase()} - VERIFIED PRICE DATA**
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-💰 EXACT PRICE: ${this.formatCryptoPrice(data.price_usd)} USD
+**Analysis & Recommendation (Thoughtful & Nuanced):**
+- Present your analysis as a discussion, not a rigid template
+- Show your reasoning process: "Looking at the technicals, three things stand out to me..."
+- Be specific but conversational: "If you're thinking about entering a position, I'd suggest waiting for a pullback to around $42,800 - that's where we have strong support"
+- Include both bullish and bearish factors for balanced analysis
+
+**Trade Details (When Applicable - Natural Format):**
+- Weave numbers into natural sentences rather than bullet lists
+- "For your available USDT balance, I'd recommend allocating around $XXX to this trade"
+- "Set your stop-loss at $X,XXX - that's just below the support level, giving you a good safety margin"
+- "Your first target would be $X,XXX (about 8% gain), where you might want to take some profit"
+
+**Risk Discussion (Honest & Protective):**
+- Discuss risks conversationally: "Now, here's what could go wrong..."
+- "The main thing to watch is... if that happens, you'll want to..."  
+- "I'm not going to lie - this setup isn't perfect because... but here's why it might still work..."
+
+**Closing (Actionable & Encouraging):**
+- Summarize the key actionable insight
+- Example: "Bottom line: This looks like a solid opportunity if you're comfortable with moderate risk. The setup's there, just watch that support level."
+- Or: "Honestly? I'd wait on this one. The signals aren't aligned enough for my comfort level."
+- Invite follow-up naturally: "Let me know if you want me to dig deeper into any of this!"
+
+**FLEXIBILITY IS KEY:**
+- Don't force every response into the same template
+- Adapt based on the question complexity
+- For simple questions, give simple (but quality) answers  
+- For complex analysis requests, go deep with detailed reasoning
+- Match the user's tone and expertise level
+
+**Examples of Natural vs. Robotic:**
+
+❌ Robotic: "Signal: BUY. Entry: $42,000. Target: $45,000. Stop: $40,000."
+
+✅ Natural: "I'm leaning towards a buy here, but timing matters. If you can get in around $42,000, you're looking at a potential run to $45,000 based on the resistance levels I'm seeing. Just make sure you're protected with a stop at $40,000 - that's right below the key support zone."
+
+❌ Robotic: "Current Price: $43,521.45 USD — updated 12s ago from CoinGecko."
+
+✅ Natural: "Bitcoin's sitting at $43,521.45 right now (literally just checked CoinGecko). What's interesting is..."
+
+**CRITICAL RULES FOR ELITE SIGNALS:**
+
+1. ⚡ **ACCURACY OVER SPEED**
+   - Don't rush signals - wait for 3+ confirmations
+   - Better to miss a trade than take a bad one
+   - "WAIT" is a valid signal when setup isn't perfect
+
+2. 🎯 **PRECISION REQUIRED**
+   - Use EXACT live prices from data provided
+   - Calculate EXACT risk/reward ratios
+   - Provide SPECIFIC entry, targets, and stop-loss prices
+   - No vague advice like "might go up" - give concrete numbers!
+
+3. 🛡️ **CAPITAL PROTECTION FIRST**
+   - ALWAYS include stop-loss (MANDATORY!)
+   - Never risk more than 3% per trade
+   - Validate risk/reward is at least 1:2
+   - If ratio is bad, signal is NO TRADE
+
+4. 📊 **USE ALL AVAILABLE DATA**
+   - Reference live market data (price, RSI, volume)
+   - Check technical indicators
+   - Analyze trend direction
+   - Consider news impact
+   - Apply proven strategies (8 strategies provided)
+
+5. 💰 **RESPECT THEIR CAPITAL**
+   - CHECK their USDT balance (see YOUR CURRENT PORTFOLIO)
+   - Suggest affordable position sizes
+   - Consider their existing holdings (listed in YOUR CURRENT PORTFOLIO)
+   - Account for their total portfolio and P&L
+
+6. 🚫 **WHEN TO SAY NO**
+   - Choppy/sideways market → WAIT
+   - Low volume → WAIT
+   - Against higher timeframe trend → NO TRADE
+   - Risk/reward < 1:2 → NO TRADE
+   - Less than 3 confirmations → WAIT
+   - Any red flags present → NO TRADE
+
+7. ✅ **QUALITY SIGNALS ONLY**
+   - HIGH confidence (80%+) = Strong BUY/SELL signal
+   - MEDIUM confidence (60-80%) = Cautious signal with tight stop
+   - LOW confidence (<60%) = WAIT for better setup
+   - Protect their capital - say NO when uncertain!
+
+8. 📈 **ALWAYS PROVIDE**
+   - Entry price (exact)
+   - Two profit targets (50% scale out strategy)
+   - Stop-loss (mandatory!)
+   - Position size (affordable amount)
+   - Risk & reward amounts ($)
+   - Trade plan (step-by-step)
+   - Risk warnings (what could go wrong)
+
+**YOUR MINDSET:**
+You are an ELITE trader protecting someone's hard-earned money. Every signal must be backed by solid analysis. It's better to keep them in cash (safe) than push them into bad trades (losses). Your reputation is built on HIGH-ACCURACY signals and PROTECTING capital. Be confident when setup is perfect, be cautious when it's not. Never gamble with their money!
+
+🎯 GOAL: Maximum profits + Minimum losses = Long-term success! 💰🚀
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+🎯 FINAL QUALITY CHECKLIST (ChatGPT-5 Standard):
+
+Before sending your response, ensure:
+
+**Accuracy & Data:**
+✅ Used exact prices from verified live market data (never approximate)
+✅ Naturally cited sources: "Bitcoin's at $43,521.45 (CoinGecko, updated 12s ago)"  
+✅ If lacking data, honestly explain limitations while still being helpful
+
+**Conversational Quality:**
+✅ Sounds natural and friendly, not robotic or templated
+✅ Adapted tone to match user's expertise level
+✅ Provided context and reasoning, not just facts
+✅ Used engaging structure with natural flow
+
+**Value & Insight:**
+✅ Answered their actual question (not just what I wanted to say)
+✅ Included actionable insights they can use
+✅ Anticipated and addressed likely follow-up questions
+✅ Balanced optimism with realistic risk assessment
+
+**Professional Care:**
+✅ Protected their capital (recommended safe position sizes)
+✅ Included necessary risk warnings without being preachy
+✅ Encouraged smart decisions without pressuring trades
+✅ Left them feeling informed, capable, and supported
+
+**Remember:** You're combining ChatGPT's conversational excellence with elite trading expertise. Every response should feel like advice from a knowledgeable, trustworthy friend who genuinely cares about their success.
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━`;
+    }
+
+    createPortfolioPromptSection() {
+        const userPortfolio = this.portfolio;
+        const userAlerts = this.alerts;
+
+        return `📊 YOUR CURRENT PORTFOLIO:
+
+💰 AVAILABLE CAPITAL:
+- USDT Balance: $${(userPortfolio.usdtBalance || 0).toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2})}
+- Holdings Value: $${userPortfolio.totalValue.toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2})}
+- Total Capital: $${((userPortfolio.usdtBalance || 0) + userPortfolio.totalValue).toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2})}
+
+📈 PERFORMANCE:
+- Total P&L: ${userPortfolio.totalPnL >= 0 ? '+' : ''}$${userPortfolio.totalPnL.toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2})} (${userPortfolio.totalPnLPercent.toFixed(2)}%)
+- Active Price Alerts: ${userAlerts.length}
+
+💼 YOUR HOLDINGS (${userPortfolio.holdings.length} coins):
+${userPortfolio.holdings.length > 0 ? userPortfolio.holdings.map(h => {
+    const coinName = h.coinId.toUpperCase();
+    const amount = h.amount.toFixed(8);
+    const buyPrice = h.buyPrice.toFixed(2);
+    const currentPrice = h.currentPrice ? h.currentPrice.toFixed(2) : 'Calculating...';
+    const currentValue = h.currentValue ? h.currentValue.toFixed(2) : '0.00';
+    const pnl = h.pnl ? h.pnl.toFixed(2) : '0.00';
+    const pnlPercent = h.pnlPercent ? h.pnlPercent.toFixed(2) : '0.00';
+    return `
+- ${coinName}: ${amount} coins
+  • Buy Price: $${buyPrice} | Current Price: $${currentPrice}
+  • Current Value: $${currentValue}
+  • P&L: ${h.pnl >= 0 ? '+' : ''}$${pnl} (${pnlPercent}%)`;
+}).join('\n') : '- No holdings yet (all capital is in USDT)'}
+
+🎯 SHORT-TERM TRADING RECOMMENDATIONS:
+- Available USDT: $${(userPortfolio.usdtBalance || 0).toFixed(2)} (use for quick trades)
+- Focus on LIQUID coins (BTC, ETH) for fast entry/exit
+- Suggest SMALLER position sizes for quick trades (1-2% risk max)
+- Prioritize SPEED and EXIT PLANS over large positions
+- Use 1-2% risk per short-term trade (NOT 2-3%)
+- Keep 70%+ in cash for quick opportunities
+- Exit current holdings if they're not moving quickly`;
+    }
+
+    /**
+     * 🔥 Verified market data - per-coin blocks are cached until the coin's data changes
+     */
+    createMarketDataPromptSection(marketData, userMessage) {
+        let section = `🔥 ===== VERIFIED LIVE MARKET DATA ===== 🔥
+⚠️ WARNING: ONLY USE THE PRICES BELOW - DO NOT GUESS OR ESTIMATE!
+📅 Data Retrieved: ${new Date().toISOString()}
+🎯 MANDATORY: Quote exact prices from this verified data:
+
+═══════════════════════════════════════════════════════════════`;
+
+        if (marketData) {
+            for (const [coinId, data] of Object.entries(marketData)) {
+                if (!data || typeof data !== 'object') continue;
+
+                const block = this.promptBuilder.memo('market', `${coinId}|${PromptBuilder.dataVersion(data)}`,
+                    () => this.formatVerifiedPriceBlock(coinId, data, false));
+
+                // Freshness is the only part that changes between builds
+                const dataAge = data.fetchTime ? Date.now() - data.fetchTime : 0;
+                const dataFreshness = dataAge < 30000 ? 'LIVE' : dataAge < 60000 ? 'FRESH' : 'CACHED';
+                section += `${block.head}
+⏱️ FRESHNESS: ${dataFreshness} (${Math.round(dataAge/1000)}s ago from ${block.primarySource})${block.tail}`;
+            }
+        } else {
+            // If no specific market data, use mock data for demonstration
+            console.log('⚠️ No market data provided, using mock data for demo');
+
+            // Extract crypto mentions to provide relevant mock data
+            let coinIds = this.extractCryptoMentions(userMessage || 'bitcoin ethereum solana');
+            // If no crypto mentioned, provide popular coins
+            if (coinIds.length === 0) coinIds = ['bitcoin', 'ethereum', 'solana'];
+
+            coinIds.forEach(coinId => {
+                const data = this.getMockMarketData(coinId);
+                data.primarySource = 'Demo Data';
+                const block = this.formatVerifiedPriceBlock(coinId, data, true);
+                section += `${block.head}
+⏱️ FRESHNESS: LIVE (0s ago from ${block.primarySource})${block.tail}`;
+            });
+        }
+
+        return section;
+    }
+
+    formatVerifiedPriceBlock(coinId, data, isDemo) {
+        const coinName = coinId.charAt(0).toUpperCase() + coinId.slice(1).replace('-', ' ');
+        const volumeFormatted = data.volume_24h ? `$${(data.volume_24h / 1000000000).toFixed(2)}B` : 'N/A';
+        const marketCapFormatted = data.market_cap ? `$${(data.market_cap / 1000000000).toFixed(2)}B` : 'N/A';
+        const primarySource = data.primarySource || data.source || (isDemo ? 'Demo' : 'Unknown');
+
+        const head = `
+
+🎯 **${coinName.toUpperCase()} - VERIFIED PRICE DATA**
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+💰 EXACT PRICE: ${this.formatCryptoPrice(data.price_usd)} USD
 📊 24h Change: ${data.change_24h > 0 ? '+' : ''}${data.change_24h.toFixed(2)}%
 📈 Volume (24h): ${volumeFormatted}
-🏆 Market Cap: ${marketCapFormatted}
-⏱️ FRESHNESS: ${dataFreshness} (${Math.round(dataAge/1000)}s ago from ${primarySource})
-🔗 SOURCE: ${primarySource}
+🏆 Market Cap: ${marketCapFormatted}`;
+
+        let tail = `
+🔗 SOURCE: ${primarySource}${isDemo ? '' : ' API'}
 
 ⚠️ MANDATORY: Use EXACTLY ${this.formatCryptoPrice(data.price_usd)} when quoting ${coinName} price`;
-            }
+
+        if (isDemo) return { head, tail, primarySource };
+
+        // Add technical indicators if available
+        if (data.technical_indicators) {
+            const ti = data.technical_indicators;
+            tail += `\n\n📈 TECHNICAL ANALYSIS:
+- RSI: ${ti.rsi ? ti.rsi.toFixed(2) : 'N/A'} ${ti.rsi < 30 ? '(OVERSOLD - BUY SIGNAL)' : ti.rsi > 70 ? '(OVERBOUGHT - SELL SIGNAL)' : '(NEUTRAL)'}
+- Support Level: $${ti.support_level ? ti.support_level.toLocaleString() : 'N/A'}
+- Resistance Level: $${ti.resistance_level ? ti.resistance_level.toLocaleString() : 'N/A'}
+- Market Cap Rank: #${ti.market_cap_rank || 'N/A'}
+- 7d Change: ${ti.price_change_7d ? (ti.price_change_7d > 0 ? '+' : '') + ti.price_change_7d.toFixed(2) + '%' : 'N/A'}
+- 30d Change: ${ti.price_change_30d ? (ti.price_change_30d > 0 ? '+' : '') + ti.price_change_30d.toFixed(2) + '%' : 'N/A'}
+- All-Time High: $${ti.ath ? ti.ath.toLocaleString() : 'N/A'} (${ti.ath_change_percentage ? ti.ath_change_percentage.toFixed(2) : 'N/A'}% from ATH)
+- All-Time Low: $${ti.atl ? ti.atl.toLocaleString() : 'N/A'} (${ti.atl_change_percentage ? '+' + ti.atl_change_percentage.toFixed(2) : 'N/A'}% from ATL)`;
+        }
+
+        // Add market sentiment if available
+        if (data.market_sentiment) {
+            const sentiment = data.market_sentiment.sentiment.replace('_', ' ').toUpperCase();
+            const strength = data.market_sentiment.strength.toUpperCase();
+            tail += `\n- Market Sentiment: ${sentiment} (${strength} confidence)`;
         }
 
+        // Add volatility if available
+        if (data.volatility) {
+            const vol = data.volatility.replace('_', ' ').toUpperCase();
+            tail += `\n- Volatility: ${vol}`;
+        }
+
+        return { head, tail, primarySource };
+    }
+
+    createContextGapsPromptSection(missing) {
+        if (!missing || missing.length === 0) return '';
+
+        const labels = {
+            marketData: 'Live market data',
+            perplexityInsights: 'Real-time web insights (Perplexity)',
+            newsData: 'Latest news',
+            aggregatedData: 'Sentiment / order book / on-chain data'
+        };
+        const lines = missing.map(gap => `- ${labels[gap.source] || gap.source}: ${gap.reason}`);
+
+        return `⚠️ CONTEXT GAPS - these sources are NOT included in this prompt:
+${lines.join('\n')}
+Do not invent this information. If the user asks for it, say it is temporarily unavailable.`;
+    }
+
+    createAggregatedDataPromptSection(aggregatedData) {
+        if (!aggregatedData || !this.dataAggregator) return '';
+
+        return Object.entries(aggregatedData)
+            .map(([coinId, data]) => `### ${coinId.toUpperCase()}${this.dataAggregator.formatForAI(data)}`)
+            .join('\n');
+    }
+
+    createWebInsightsPromptSection(perplexityInsights) {
+        let section = '';
+
         // 🌐 HYBRID AI: Add Perplexity insights if available
         if (perplexityInsights && perplexityInsights.insights) {
-            prompt += `\n\n🌐 ===== REAL-TIME WEB INSIGHTS (PERPLEXITY AI) ===== 🌐
+            section += `🌐 ===== REAL-TIME WEB INSIGHTS (PERPLEXITY AI) ===== 🌐
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 ⚡ LATEST MARKET INTELLIGENCE FROM THE WEB:
 📅 Retrieved: ${perplexityInsights.timestamp}
@@ -3439,13 +3888,13 @@ ${perplexityInsights.insights}`;
 
             // Add citations if available
             if (perplexityInsights.citations && perplexityInsights.citations.length > 0) {
-                prompt += `\n\n📚 SOURCES & CITATIONS:`;
+                section += `\n\n📚 SOURCES & CITATIONS:`;
                 perplexityInsights.citations.slice(0, 5).forEach((citation, index) => {
-                    prompt += `\n${index + 1}. ${citation}`;
+                    section += `\n${index + 1}. ${citation}`;
                 });
             }
             
-            prompt += `\n\n⚠️ IMPORTANT INSTRUCTIONS FOR RESPONDING:
+            section += `\n\n⚠️ IMPORTANT INSTRUCTIONS FOR RESPONDING:
 1. START your response by mentioning you're using Perplexity AI for real-time web data
 2. CLEARLY state that this information comes from live web search
 3. Include the citations in your response to show sources
@@ -3457,22 +3906,60 @@ Example opening: "🌐 I'm using Perplexity AI to search the web in real-time fo
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━`;
         }
 
+        return section;
+    }
+
+    createNewsPromptSection(newsData, userMessage = '') {
+        let section = '';
+        const listed = new Set();
+
         if (newsData && newsData.length > 0) {
-            prompt += `\n\nLATEST CRYPTO NEWS:`;
+            section += `LATEST CRYPTO NEWS:`;
             newsData.slice(0, 5).forEach((article, index) => {
                 const title = article.title || article.headline;
                 const source = article.source?.name || 'CoinDesk';
                 const publishedAt = article.publishedAt || article.pubDate;
-                prompt += `\n${index + 1}. ${title} (${source}) - ${publishedAt}`;
+                section += `\n${index + 1}. ${title} (${source}) - ${publishedAt}`;
+                listed.add(title);
             });
         }
 
+        const coinNews = this.createCoinNewsPromptSection(userMessage, listed);
+        return section && coinNews ? `${section}\n\n${coinNews}` : section || coinNews;
+    }
+
+    /**
+     * 📰 Headlines about the coins the user asked about, straight from the news index
+     * Shared by every `news` prompt section, whichever layer registered it.
+     * @param {Set} listed - titles the section already shows
+     */
+    createCoinNewsPromptSection(userMessage, listed = new Set()) {
+        const mentions = userMessage ? this.messageAnalyzer.analyze(userMessage).coins : [];
+        const blocks = [];
+
+        mentions.slice(0, 3).forEach(({ coin }) => {
+            const articles = this.newsPipeline.byCoin(coin.id, 3).filter(article => !listed.has(article.title));
+            if (articles.length === 0) return;
+
+            let block = `${coin.name.toUpperCase()} NEWS:`;
+            articles.forEach(article => {
+                block += `\n- ${article.title} (${article.source?.name || 'News'}) - ${article.publishedAt}`;
+            });
+            blocks.push(block);
+        });
+
+        return blocks.join('\n\n');
+    }
+
+    createIntentGuidancePromptSection(intent) {
+        const userPortfolio = this.portfolio;
+
         // Add intent-specific guidance
         let intentGuidance = '';
         if (intent.type === 'trade_advice') {
             const availableUSDT = userPortfolio.usdtBalance || 0;
             const maxRisk = availableUSDT * 0.03; // 3% max risk
-            intentGuidance = `\n\n🎯 USER INTENT: They want POWERFUL TRADING SIGNAL
+            intentGuidance = `🎯 USER INTENT: They want POWERFUL TRADING SIGNAL
 
 ⚡ SIGNAL GENERATION PROCESS:
 
@@ -3515,7 +4002,7 @@ CRITICAL: Only give BUY/SELL signals when you have HIGH confidence (3+ confirmat
         } else if (intent.type === 'market_scan') {
             const availableUSDT = userPortfolio.usdtBalance || 0;
             const recommendedPosition = (availableUSDT * 0.03).toFixed(2);
-            intentGuidance = `\n\n🎯 USER INTENT: Market Scan - Find THE BEST Trade Setup from 30 Coins
+            intentGuidance = `🎯 USER INTENT: Market Scan - Find THE BEST Trade Setup from 30 Coins
 
 ⚡ YOUR TASK:
 You have scanned 30 top coins. Analyze ALL the provided market data and identify the SINGLE BEST trading opportunity.
@@ -3569,21 +4056,21 @@ CRITICAL RULES:
 - Show Risk/Reward ratio (minimum 1:2)
 - If no setup meets criteria, explicitly say WAIT`;
         } else if (intent.type === 'analysis') {
-            intentGuidance = `\n\n🎯 USER INTENT: They want TECHNICAL ANALYSIS
+            intentGuidance = `🎯 USER INTENT: They want TECHNICAL ANALYSIS
 - Deep dive into RSI, MACD, support/resistance
 - Explain current trend and momentum
 - Identify chart patterns
 - Provide multi-timeframe perspective
 - Use the technical indicators data provided`;
         } else if (intent.type === 'learning') {
-            intentGuidance = `\n\n🎯 USER INTENT: They want to LEARN
+            intentGuidance = `🎯 USER INTENT: They want to LEARN
 - Explain concepts in simple, clear language
 - Use examples from current market data
 - Break down complex ideas step-by-step
 - Relate to their portfolio when possible
 - End with practical takeaways`;
         } else if (intent.type === 'prediction') {
-            intentGuidance = `\n\n🎯 USER INTENT: They want PREDICTIONS
+            intentGuidance = `🎯 USER INTENT: They want PREDICTIONS
 - Analyze current trends and momentum
 - Reference technical indicators
 - Mention key support/resistance levels
@@ -3591,7 +4078,7 @@ CRITICAL RULES:
         } else if (intent.type === 'portfolio') {
             const availableUSDT = userPortfolio.usdtBalance || 0;
             const totalCapital = availableUSDT + userPortfolio.totalValue;
-            intentGuidance = `\n\n🎯 USER INTENT: Portfolio Management
+            intentGuidance = `🎯 USER INTENT: Portfolio Management
 - SHOW COMPLETE PICTURE: $${availableUSDT.toFixed(2)} USDT + $${userPortfolio.totalValue.toFixed(2)} holdings = $${totalCapital.toFixed(2)} total
 - Review their current holdings and individual P&L
 - Analyze overall portfolio performance
@@ -3599,168 +4086,16 @@ CRITICAL RULES:
 - Identify opportunities to deploy unused USDT
 - Reference their actual portfolio data (both USDT and holdings)`;
         } else if (intent.type === 'news') {
-            intentGuidance = `\n\n🎯 USER INTENT: Market News
+            intentGuidance = `🎯 USER INTENT: Market News
 - Summarize the latest news provided
 - Explain how it affects crypto prices
 - Connect news to trading opportunities
 - Discuss market sentiment impact`;
         }
 
-        prompt += intentGuidance;
-
-        prompt += `\n\n💡 HOW TO CRAFT EXCEPTIONAL RESPONSES:
-
-**Natural Conversation Framework:**
-
-When providing trading analysis or signals, structure your responses like a knowledgeable friend having a conversation:
-
-**Opening (Natural & Context-Aware):**
-- Acknowledge their question specifically and naturally
-- Example: "Great question about Bitcoin! Let me break down what's happening right now..."
-- Or: "I see you're looking at Ethereum - interesting timing actually..."
-- Avoid robotic greetings like "Hello user" or formulaic openings
-
-**Market Context (Tell the Story):**
-- Explain the current market situation in narrative form
-- Example: "Bitcoin's been having an interesting day. It's currently trading at $43,521.45 (just pulled from CoinGecko), and here's what's catching my attention..."
-- Weave in the technical data naturally: "The RSI at 65 suggests strong momentum, though it's approaching overbought territory"
-- Connect the dots: "This aligns with what we're seeing in the volume - it spiked 40% in the last hour"
-
-**Analysis & Recommendation (Thoughtful & Nuanced):**
-- Present your analysis as a discussion, not a rigid template
-- Show your reasoning process: "Looking at the technicals, three things stand out to me..."
-- Be specific but conversational: "If you're thinking about entering a position, I'd suggest waiting for a pullback to around $42,800 - that's where we have strong support"
-- Include both bullish and bearish factors for balanced analysis
-
-**Trade Details (When Applicable - Natural Format):**
-- Weave numbers into natural sentences rather than bullet lists
-- "For your $${(userPortfolio.usdtBalance || 0).toFixed(2)} USDT balance, I'd recommend allocating around $XXX to this trade"
-- "Set your stop-loss at $X,XXX - that's just below the support level, giving you a good safety margin"
-- "Your first target would be $X,XXX (about 8% gain), where you might want to take some profit"
-
-**Risk Discussion (Honest & Protective):**
-- Discuss risks conversationally: "Now, here's what could go wrong..."
-- "The main thing to watch is... if that happens, you'll want to..."  
-- "I'm not going to lie - this setup isn't perfect because... but here's why it might still work..."
-
-**Closing (Actionable & Encouraging):**
-- Summarize the key actionable insight
-- Example: "Bottom line: This looks like a solid opportunity if you're comfortable with moderate risk. The setup's there, just watch that support level."
-- Or: "Honestly? I'd wait on this one. The signals aren't aligned enough for my comfort level."
-- Invite follow-up naturally: "Let me know if you want me to dig deeper into any of this!"
-
-**FLEXIBILITY IS KEY:**
-- Don't force every response into the same template
-- Adapt based on the question complexity
-- For simple questions, give simple (but quality) answers  
-- For complex analysis requests, go deep with detailed reasoning
-- Match the user's tone and expertise level
-
-**Examples of Natural vs. Robotic:**
-
-❌ Robotic: "Signal: BUY. Entry: $42,000. Target: $45,000. Stop: $40,000."
-
-✅ Natural: "I'm leaning towards a buy here, but timing matters. If you can get in around $42,000, you're looking at a potential run to $45,000 based on the resistance levels I'm seeing. Just make sure you're protected with a stop at $40,000 - that's right below the key support zone."
-
-❌ Robotic: "Current Price: $43,521.45 USD — updated 12s ago from CoinGecko."
-
-✅ Natural: "Bitcoin's sitting at $43,521.45 right now (literally just checked CoinGecko). What's interesting is..."
-
-**CRITICAL RULES FOR ELITE SIGNALS:**
-
-1. ⚡ **ACCURACY OVER SPEED**
-   - Don't rush signals - wait for 3+ confirmations
-   - Better to miss a trade than take a bad one
-   - "WAIT" is a valid signal when setup isn't perfect
-
-2. 🎯 **PRECISION REQUIRED**
-   - Use EXACT live prices from data provided
-   - Calculate EXACT risk/reward ratios
-   - Provide SPECIFIC entry, targets, and stop-loss prices
-   - No vague advice like "might go up" - give concrete numbers!
-
-3. 🛡️ **CAPITAL PROTECTION FIRST**
-   - ALWAYS include stop-loss (MANDATORY!)
-   - Never risk more than 3% per trade
-   - Validate risk/reward is at least 1:2
-   - If ratio is bad, signal is NO TRADE
-
-4. 📊 **USE ALL AVAILABLE DATA**
-   - Reference live market data (price, RSI, volume)
-   - Check technical indicators
-   - Analyze trend direction
-   - Consider news impact
-   - Apply proven strategies (8 strategies provided)
-
-5. 💰 **RESPECT THEIR CAPITAL**
-   - CHECK their USDT balance: $${(userPortfolio.usdtBalance || 0).toFixed(2)}
-   - Suggest affordable position sizes
-   - Consider their existing holdings: ${userPortfolio.holdings.length} coins
-   - Account for their total portfolio and P&L
-
-6. 🚫 **WHEN TO SAY NO**
-   - Choppy/sideways market → WAIT
-   - Low volume → WAIT
-   - Against higher timeframe trend → NO TRADE
-   - Risk/reward < 1:2 → NO TRADE
-   - Less than 3 confirmations → WAIT
-   - Any red flags present → NO TRADE
-
-7. ✅ **QUALITY SIGNALS ONLY**
-   - HIGH confidence (80%+) = Strong BUY/SELL signal
-   - MEDIUM confidence (60-80%) = Cautious signal with tight stop
-   - LOW confidence (<60%) = WAIT for better setup
-   - Protect their capital - say NO when uncertain!
-
-8. 📈 **ALWAYS PROVIDE**
-   - Entry price (exact)
-   - Two profit targets (50% scale out strategy)
-   - Stop-loss (mandatory!)
-   - Position size (affordable amount)
-   - Risk & reward amounts ($)
-   - Trade plan (step-by-step)
-   - Risk warnings (what could go wrong)
-
-**YOUR MINDSET:**
-You are an ELITE trader protecting someone's hard-earned money. Every signal must be backed by solid analysis. It's better to keep them in cash (safe) than push them into bad trades (losses). Your reputation is built on HIGH-ACCURACY signals and PROTECTING capital. Be confident when setup is perfect, be cautious when it's not. Never gamble with their money!
-
-🎯 GOAL: Maximum profits + Minimum losses = Long-term success! 💰🚀
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-🎯 FINAL QUALITY CHECKLIST (ChatGPT-5 Standard):
-
-Before sending your response, ensure:
-
-**Accuracy & Data:**
-✅ Used exact prices from verified live market data (never approximate)
-✅ Naturally cited sources: "Bitcoin's at $43,521.45 (CoinGecko, updated 12s ago)"  
-✅ If lacking data, honestly explain limitations while still being helpful
-
-**Conversational Quality:**
-✅ Sounds natural and friendly, not robotic or templated
-✅ Adapted tone to match user's expertise level
-✅ Provided context and reasoning, not just facts
-✅ Used engaging structure with natural flow
-
-**Value & Insight:**
-✅ Answered their actual question (not just what I wanted to say)
-✅ Included actionable insights they can use
-✅ Anticipated and addressed likely follow-up questions
-✅ Balanced optimism with realistic risk assessment
-
-**Professional Care:**
-✅ Protected their capital (recommended safe position sizes)
-✅ Included necessary risk warnings without being preachy
-✅ Encouraged smart decisions without pressuring trades
-✅ Left them feeling informed, capable, and supported
-
-**Remember:** You're combining ChatGPT's conversational excellence with elite trading expertise. Every response should feel like advice from a knowledgeable, trustworthy friend who genuinely cares about their success.
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━`;
-
-        return prompt;
+        return intentGuidance;
     }
+
     getDemoMemoryPrefix() {
         const hist = this.conversationHistory || [];
         const recent = hist.slice(-4);
@@ -4091,8 +4426,38 @@ Bitcoin, Ethereum, Solana, Cardano, Ripple, Dogecoin, Polkadot, Avalanche, Polyg
 *Tip: Now powered by Cerebras GPT-OSS-120B for superior AI-powered analysis!*`;
     }
 
-    addMessage(content, sender, saveToHistory = true) {
+    addMessage(content, sender, saveToHistory = true) {
+        const { messageText, messagesContainer, item } = this.createMessageElement(sender, content);
+        
+        // Use typewriter effect for AI messages, instant display for user messages
+        if (sender === 'ai') {
+            // Kept in the DOM until the typewriter is done with it
+            const transcript = this.getTranscript();
+            transcript.pin(item);
+            this.typewriterEffect(content, messageText, messagesContainer).then(() => transcript.unpin(item));
+        } else {
+            messageText.innerHTML = this.formatMessage(content);
+            // Only auto-scroll for user messages if near bottom and not actively scrolling
+            if (this.isNearBottom && !this.isUserScrolling) {
+                this.smoothScrollToBottom(messagesContainer);
+            }
+        }
+        
+        // Save to chat history if requested
+        if (saveToHistory) {
+            this.persistMessage(content, sender);
+        }
+    }
+
+    createMessageElement(sender, content = '') {
         const messagesContainer = document.getElementById('chatMessages');
+        const { messageDiv, messageText } = this.buildMessageElement(sender);
+        const item = this.getTranscript().append({ sender: sender, content: content }, messageDiv);
+        
+        return { messageDiv, messageText, messagesContainer, item };
+    }
+
+    buildMessageElement(sender) {
         const messageDiv = document.createElement('div');
         messageDiv.className = `message ${sender}-message`;
         
@@ -4111,75 +4476,63 @@ Bitcoin, Ethereum, Solana, Cardano, Ripple, Dogecoin, Polkadot, Avalanche, Polyg
         messageContent.appendChild(messageText);
         
         messageDiv.appendChild(messageContent);
-        messagesContainer.appendChild(messageDiv);
-        
-        // Use typewriter effect for AI messages, instant display for user messages
-        if (sender === 'ai') {
-            this.typewriterEffect(content, messageText, messagesContainer);
-        } else {
-            messageText.innerHTML = this.formatMessage(content);
-            // Only auto-scroll for user messages if near bottom and not actively scrolling
-            if (this.isNearBottom && !this.isUserScrolling) {
-                this.smoothScrollToBottom(messagesContainer);
-            }
-        }
         
-        // Save to chat history if requested
-        if (saveToHistory) {
-            setTimeout(() => this.saveChatHistory(), 100);
+        return { messageDiv, messageText };
+    }
+
+    /**
+     * 🪟 Windowed transcript over #chatMessages (created on first use)
+     */
+    getTranscript() {
+        if (!this.transcript) {
+            this.transcript = new VirtualTranscript(document.getElementById('chatMessages'), {
+                renderItem: (item) => this.renderTranscriptItem(item)
+            });
         }
+        return this.transcript;
+    }
+
+    // Rebuild a message that scrolls back into view (no typewriter, no animation)
+    renderTranscriptItem(item) {
+        const { messageDiv, messageText } = this.buildMessageElement(item.sender);
+        messageText.innerHTML = item.html ? item.content : this.formatMessage(item.content || '');
+        return messageDiv;
+    }
+
+    persistMessage(content, sender) {
+        // One record per message, written once
+        this.chatStore.append({
+            userId: this.getChatUserId(),
+            sender: sender,
+            content: content
+        });
+    }
+
+    getChatUserId() {
+        const currentUser = this.userManager && this.userManager.getCurrentUser();
+        return currentUser ? currentUser.id : 'guest';
     }
 
     typewriterEffect(content, messageElement, container) {
-        const formattedContent = this.formatMessage(content);
-        let i = 0;
-        let currentText = '';
-        
-        // Add typing cursor
-        const cursor = document.createElement('span');
-        cursor.className = 'typing-cursor';
-        cursor.textContent = '|';
-        messageElement.appendChild(cursor);
-        
-        const type = () => {
-            if (i < formattedContent.length) {
-                // Handle HTML tags properly
-                if (formattedContent[i] === '<') {
-                    // Find the end of the HTML tag
-                    let tagEnd = formattedContent.indexOf('>', i);
-                    if (tagEnd !== -1) {
-                        currentText += formattedContent.substring(i, tagEnd + 1);
-                        i = tagEnd + 1;
-                    } else {
-                        currentText += formattedContent[i];
-                        i++;
-                    }
-                } else {
-                    currentText += formattedContent[i];
-                    i++;
-                }
-                
-                // Update the content (excluding the cursor)
-                messageElement.innerHTML = currentText + '<span class="typing-cursor">|</span>';
-                
-                // Only auto-scroll if user is near bottom and not actively scrolling
-                if (this.isNearBottom && !this.isUserScrolling) {
-                    this.smoothScrollToBottom(container);
-                }
-                
-                // Variable typing speed for more natural feel
-                const baseDelay = 2;
-                const randomDelay = Math.random() * 2;
-                const delay = baseDelay + randomDelay;
-                
-                setTimeout(type, delay);
-            } else {
-                // Remove cursor when typing is complete
-                messageElement.innerHTML = currentText;
-            }
-        };
-        
-        type();
+        // Pre-built HTML (charts, widgets) is shown as-is rather than typed out as text
+        if (/<[a-z][^>]*>/i.test(content)) {
+            messageElement.innerHTML = this.formatMessage(content);
+            this.smoothScrollToBottom(container);
+            return Promise.resolve(content);
+        }
+
+        const renderer = this.createMessageRenderer(messageElement, container);
+        renderer.append(content);
+        return renderer.finish();
+    }
+
+    createMessageRenderer(messageElement, container) {
+        // Append-only reveal into a live text node; formatting runs once at the end
+        return new StreamingMessageRenderer(messageElement, {
+            container: container,
+            format: (text) => this.formatMessage(text),
+            shouldScroll: () => this.isNearBottom && !this.isUserScrolling
+        });
     }
 
     scrollToBottom(force = false) {
@@ -4347,6 +4700,14 @@ Bitcoin, Ethereum, Solana, Cardano, Ripple, Dogecoin, Polkadot, Avalanche, Polyg
             this.abortController = null;
         }
         
+        // Keep whatever was streamed so far, formatted
+        if (this.streamingMessage) {
+            const partial = this.streamingMessage.renderer.getText();
+            this.streamingMessage.renderer.cancel();
+            this.streamingMessage = null;
+            if (partial) this.addToConversationHistory('assistant', partial);
+        }
+        
         // Reset states
         this.isThinking = false;
         this.isSending = false;
@@ -4369,6 +4730,8 @@ Bitcoin, Ethereum, Solana, Cardano, Ripple, Dogecoin, Polkadot, Avalanche, Polyg
         
         // Keep only the first AI message
         const firstMessage = messagesContainer.querySelector('.ai-message');
+        this.getTranscript().reset();
+        this.getTranscript().onReachTop = null;
         messagesContainer.innerHTML = '';
         
         // Re-add the typing indicator if it exists
@@ -4408,9 +4771,14 @@ Bitcoin, Ethereum, Solana, Cardano, Ripple, Dogecoin, Polkadot, Avalanche, Polyg
         // Clear session memory but keep persistent memory
         this.conversationHistory = [];
         this.sessionMemory = [];
+        this.contextManager.reset();
+        this.conversationContext.summary = '';
+        const currentUser = this.userManager.getCurrentUser();
+        if (currentUser) currentUser.chatSummary = null;
         
         // Clear saved chat history
-        localStorage.removeItem('chatHistory');
+        this.chatStore.clear(this.getChatUserId()).catch(error => console.error('❌ Failed to clear chat history:', error));
+        this.oldestLoadedSeq = null;
         
         // Save the cleared state
         this.saveUserMemory();
@@ -4564,6 +4932,10 @@ Bitcoin, Ethereum, Solana, Cardano, Ripple, Dogecoin, Polkadot, Avalanche, Polyg
             this.runBacktest();
         });
         
+        document.getElementById('runBacktestSweep')?.addEventListener('click', () => {
+            this.runBacktestSweep();
+        });
+        
         document.getElementById('refreshChart')?.addEventListener('click', () => {
             this.initializeChart();
         });
@@ -4596,11 +4968,13 @@ Bitcoin, Ethereum, Solana, Cardano, Ripple, Dogecoin, Polkadot, Avalanche, Polyg
         // Connect to Binance WebSocket for real-time data
         this.connectToBinanceWebSocket();
         
-        // Fallback: Update prices every 3 seconds using REST API
+        // Fallback: Update prices every 3 seconds via REST while the stream is down
         this.fallbackInterval = setInterval(() => {
-            this.updateMarketPricesFallback();
-            // Keep animation alive
-            this.restartTickerAnimation();
+            if (!this.isConnected) {
+                this.updateMarketPricesFallback();
+            }
+            // Keep animation alive (only restarts if it actually stopped)
+            this.ensureTickerAnimation();
         }, 3000);
     }
 
@@ -4609,13 +4983,11 @@ Bitcoin, Ethereum, Solana, Cardano, Ripple, Dogecoin, Polkadot, Avalanche, Polyg
         const coins = ['BTC', 'ETH', 'SOL'];
         
         ticker.innerHTML = '';
+        this.tickerElements.clear();
         
         // Create multiple sets for smooth scrolling with immediate prices
         for (let set = 0; set < 4; set++) {
             coins.forEach(coin => {
-                const tickerItem = document.createElement('div');
-                tickerItem.classList.add('ticker-item');
-                
                 // Show immediate realistic prices
                 let price, change;
                 switch(coin) {
@@ -4636,11 +5008,7 @@ Bitcoin, Ethereum, Solana, Cardano, Ripple, Dogecoin, Polkadot, Avalanche, Polyg
                 const changeClass = change > 0 ? 'positive' : change < 0 ? 'negative' : 'neutral';
                 const changeSign = change > 0 ? '+' : '';
                 
-                tickerItem.innerHTML = `
-                    ${coin}: $${price} 
-                    <span class="price-change ${changeClass}">${changeSign}${change}%</span>
-                `;
-                ticker.appendChild(tickerItem);
+                ticker.appendChild(this.createTickerItem(coin, `$${price}`, `${changeSign}${change}%`, changeClass));
             });
         }
         
@@ -4654,7 +5022,7 @@ Bitcoin, Ethereum, Solana, Cardano, Ripple, Dogecoin, Polkadot, Avalanche, Polyg
     async fetchRealPricesImmediately() {
         try {
             // Use Binance REST API for immediate prices
-            const response = await fetch('https://api.binance.com/api/v3/ticker/24hr?symbols=["BTCUSDT","ETHUSDT","SOLUSDT"]');
+            const response = await this.fetchScheduler.fetch('https://api.binance.com/api/v3/ticker/24hr?symbols=["BTCUSDT","ETHUSDT","SOLUSDT"]', {}, { priority: 'normal' });
             const data = await response.json();
             
             data.forEach(item => {
@@ -4728,76 +5096,59 @@ Bitcoin, Ethereum, Solana, Cardano, Ripple, Dogecoin, Polkadot, Avalanche, Polyg
         const coins = ['BTC', 'ETH', 'SOL'];
         
         ticker.innerHTML = '';
+        this.tickerElements.clear();
         
         // Create multiple sets for smooth scrolling
         for (let set = 0; set < 4; set++) {
             coins.forEach(coin => {
-                const tickerItem = document.createElement('div');
-                tickerItem.classList.add('ticker-item');
-                tickerItem.innerHTML = `
-                    ${coin}: Loading... 
-                    <span class="price-change neutral">--</span>
-                `;
-                ticker.appendChild(tickerItem);
+                ticker.appendChild(this.createTickerItem(coin, 'Loading...', '--', 'neutral'));
             });
         }
     }
 
+    /**
+     * 🧱 Build a ticker item from text nodes and remember them for in-place updates
+     */
+    createTickerItem(coinCode, priceText, changeText, changeClass) {
+        const item = document.createElement('div');
+        item.classList.add('ticker-item');
+
+        const priceNode = document.createTextNode(priceText);
+        const changeElement = document.createElement('span');
+        changeElement.className = `price-change ${changeClass}`;
+        const changeNode = document.createTextNode(changeText);
+        changeElement.appendChild(changeNode);
+
+        item.append(`${coinCode}: `, priceNode, ' ', changeElement);
+
+        if (!this.tickerElements.has(coinCode)) this.tickerElements.set(coinCode, []);
+        this.tickerElements.get(coinCode).push({ item, priceNode, changeElement, changeNode });
+        return item;
+    }
+
     connectToBinanceWebSocket() {
-        try {
-            // Binance WebSocket stream for BTC, ETH, SOL
-            this.ws = new WebSocket('wss://stream.binance.com:9443/stream?streams=btcusdt@ticker/ethusdt@ticker/solusdt@ticker');
-            
-            this.ws.onopen = () => {
-                console.log('Connected to Binance WebSocket');
-                this.isConnected = true;
-                // Stop REST API fallback if it was running
-                if (this.restApiInterval) {
+        // Ticker bar symbols ride on the shared market stream with everything else
+        this.marketStream.track('ticker', ['BTCUSDT', 'ETHUSDT', 'SOLUSDT'], (tick) => {
+            this.updatePriceFromWebSocket(tick.raw);
+        });
+
+        if (!this.marketStreamStatusHandler) {
+            this.marketStreamStatusHandler = (connected) => {
+                this.isConnected = connected;
+                if (connected && this.restApiInterval) {
+                    // Stop REST API fallback once the stream is back
                     clearInterval(this.restApiInterval);
                     this.restApiInterval = null;
                     console.log('Stopped REST API fallback after WS connect');
-                }
-            };
-            
-            this.ws.onmessage = (event) => {
-                try {
-                    const payload = JSON.parse(event.data);
-                    // Combined streams use { stream, data }, single stream sends the data directly
-                    const msg = payload && payload.data ? payload.data : payload;
-                    this.updatePriceFromWebSocket(msg);
-                } catch (e) {
-                    console.error('Error parsing WebSocket message:', e);
-                }
-            };
-            
-            this.ws.onclose = () => {
-                console.log('WebSocket connection closed');
-                this.isConnected = false;
-                // Attempt to reconnect after 2 seconds (faster reconnection)
-                setTimeout(() => {
-                    this.connectToBinanceWebSocket();
-                }, 2000);
-                // Start REST fallback while reconnecting
-                if (!this.restApiInterval) {
-                    this.startRestApiFallback();
-                }
-            };
-            
-            this.ws.onerror = (error) => {
-                console.error('WebSocket error:', error);
-                this.isConnected = false;
-                // Start REST API fallback on error
-                if (!this.restApiInterval) {
+                } else if (!connected && !this.restApiInterval) {
+                    // Start REST fallback while the hub reconnects with backoff
                     this.startRestApiFallback();
                 }
             };
-            
-        } catch (error) {
-            console.error('Failed to connect to Binance WebSocket:', error);
-            this.isConnected = false;
-            // Start REST API fallback
-            this.startRestApiFallback();
+            this.marketStream.onStatus(this.marketStreamStatusHandler);
         }
+
+        this.syncMarketStreams();
     }
     
     // REST API fallback when WebSocket fails
@@ -4824,7 +5175,7 @@ Bitcoin, Ethereum, Solana, Cardano, Ripple, Dogecoin, Polkadot, Avalanche, Polyg
     
     async fetchPricesViaRestAPI() {
         try {
-            const response = await fetch('https://api.binance.com/api/v3/ticker/24hr?symbols=["BTCUSDT","ETHUSDT","SOLUSDT"]');
+            const response = await this.fetchScheduler.fetch('https://api.binance.com/api/v3/ticker/24hr?symbols=["BTCUSDT","ETHUSDT","SOLUSDT"]', {}, { priority: 'low' });
             const data = await response.json();
             
             data.forEach(ticker => {
@@ -4868,74 +5219,80 @@ Bitcoin, Ethereum, Solana, Cardano, Ripple, Dogecoin, Polkadot, Avalanche, Polyg
     }
 
     updateTickerItem(coinCode, price, changePercent) {
-        const ticker = document.getElementById('crypto-ticker');
-        const tickerItems = ticker.querySelectorAll('.ticker-item');
+        // Coalesce ticks per coin; the latest value is written once per frame
+        this.domScheduler.schedule(`ticker:${coinCode}`, { price, changePercent }, (update) => {
+            this.renderTickerItem(coinCode, update.price, update.changePercent);
+        });
+    }
+
+    renderTickerItem(coinCode, price, changePercent) {
+        const entries = this.tickerElements.get(coinCode);
+        if (!entries) return;
+
+        const formattedPrice = price >= 1 ? price.toFixed(2) : price.toFixed(4);
+        const isPositive = changePercent > 0;
+        const isNeutral = Math.abs(changePercent) < 0.01;
         
-        tickerItems.forEach(item => {
-            if (item.textContent.includes(`${coinCode}:`)) {
-                const formattedPrice = price >= 1 ? price.toFixed(2) : price.toFixed(4);
-                const isPositive = changePercent > 0;
-                const isNeutral = Math.abs(changePercent) < 0.01;
-                
-                const changeClass = isNeutral ? 'neutral' : (isPositive ? 'positive' : 'negative');
-                const changeSign = isPositive ? '+' : '';
-                
-                item.innerHTML = `
-                    ${coinCode}: $${formattedPrice} 
-                    <span class="price-change ${changeClass}">${changeSign}${changePercent.toFixed(2)}%</span>
-                `;
-                
-                // Add a subtle animation when price updates
-                item.style.transition = 'all 0.3s ease';
-                item.style.transform = 'scale(1.02)';
-                setTimeout(() => {
-                    item.style.transform = 'scale(1)';
-                }, 300);
-            }
+        const changeClass = `price-change ${isNeutral ? 'neutral' : (isPositive ? 'positive' : 'negative')}`;
+        const changeText = `${isPositive ? '+' : ''}${changePercent.toFixed(2)}%`;
+        
+        entries.forEach(({ item, priceNode, changeElement, changeNode }) => {
+            if (priceNode.data === `$${formattedPrice}` && changeNode.data === changeText) return;
+
+            DomScheduler.setText(priceNode, `$${formattedPrice}`);
+            DomScheduler.setText(changeNode, changeText);
+            if (changeElement.className !== changeClass) changeElement.className = changeClass;
+            
+            // Add a subtle animation when price updates
+            DomScheduler.pulse(item, [{ transform: 'scale(1.02)' }, { transform: 'scale(1)' }]);
         });
     }
 
-    updatePriceDisplay(priceId, price) {
-        const priceElement = document.getElementById(priceId);
-        if (priceElement) {
-            const formattedPrice = price >= 1 ? price.toFixed(2) : price.toFixed(4);
-            this.animatePriceChange(priceElement, formattedPrice);
+    getDisplayElement(id) {
+        let element = this.displayElements.get(id);
+        if (!element || !element.isConnected) {
+            element = document.getElementById(id);
+            if (element) this.displayElements.set(id, element);
         }
+        return element;
+    }
+
+    updatePriceDisplay(priceId, price) {
+        this.domScheduler.schedule(`price:${priceId}`, price, (latest) => {
+            const priceElement = this.getDisplayElement(priceId);
+            if (priceElement) {
+                const formattedPrice = latest >= 1 ? latest.toFixed(2) : latest.toFixed(4);
+                this.animatePriceChange(priceElement, formattedPrice);
+            }
+        });
     }
 
     updateChangeDisplay(changeId, change24h) {
-        const changeElement = document.getElementById(changeId);
-        if (changeElement) {
-            const isPositive = change24h > 0;
-            const isNeutral = Math.abs(change24h) < 0.1;
-            
-            changeElement.textContent = `${isPositive ? '+' : ''}${change24h.toFixed(2)}%`;
-            changeElement.className = `price-change ${isNeutral ? 'neutral' : (isPositive ? 'positive' : 'negative')}`;
-            
-            // Animate the change
-            changeElement.style.transition = 'all 0.3s ease';
-            changeElement.style.transform = 'scale(1.1)';
-            
-            setTimeout(() => {
-                changeElement.style.transform = 'scale(1)';
-            }, 300);
-        }
+        this.domScheduler.schedule(`change:${changeId}`, change24h, (latest) => {
+            const changeElement = this.getDisplayElement(changeId);
+            if (changeElement) {
+                const isPositive = latest > 0;
+                const isNeutral = Math.abs(latest) < 0.1;
+                
+                changeElement.textContent = `${isPositive ? '+' : ''}${latest.toFixed(2)}%`;
+                changeElement.className = `price-change ${isNeutral ? 'neutral' : (isPositive ? 'positive' : 'negative')}`;
+                
+                // Animate the change
+                DomScheduler.pulse(changeElement, [{ transform: 'scale(1.1)' }, { transform: 'scale(1)' }]);
+            }
+        });
     }
 
     animatePriceChange(element, newPrice) {
-        element.style.transition = 'color 0.3s ease';
-        element.style.color = '#00ff88';
+        if (element.textContent === newPrice) return;
         element.textContent = newPrice;
-        
-        setTimeout(() => {
-            element.style.color = '';
-        }, 1000);
+        DomScheduler.pulse(element, [{ color: '#00ff88' }, { color: '#00ff88', offset: 0.3 }, {}], 1000);
     }
 
     async updateMarketPricesFallback() {
         try {
             // Use Binance REST API as fallback
-            const response = await fetch('https://api.binance.com/api/v3/ticker/24hr?symbols=["BTCUSDT","ETHUSDT","SOLUSDT"]');
+            const response = await this.fetchScheduler.fetch('https://api.binance.com/api/v3/ticker/24hr?symbols=["BTCUSDT","ETHUSDT","SOLUSDT"]', {}, { priority: 'low' });
             const data = await response.json();
             
             data.forEach(item => {
@@ -4990,6 +5347,14 @@ Bitcoin, Ethereum, Solana, Cardano, Ripple, Dogecoin, Polkadot, Avalanche, Polyg
         this.restartTickerAnimation();
     }
 
+    ensureTickerAnimation() {
+        const ticker = document.getElementById('crypto-ticker');
+        if (!ticker) return;
+        const running = typeof ticker.getAnimations === 'function' &&
+            ticker.getAnimations().some(animation => animation.playState === 'running');
+        if (!running) this.restartTickerAnimation();
+    }
+
     // Restart CSS marquee animation reliably
     restartTickerAnimation() {
         const ticker = document.getElementById('crypto-ticker');
@@ -5085,11 +5450,14 @@ Bitcoin, Ethereum, Solana, Cardano, Ripple, Dogecoin, Polkadot, Avalanche, Polyg
             timestamp: Date.now()
         });
         
-        // Keep only last 10 messages to avoid overwhelming the API (optimized for speed)
-        if (this.conversationHistory.length > 10) {
-            this.conversationHistory = this.conversationHistory.slice(-10);
+        // Bounded retention; what is sent per request is packed to the token budget
+        if (this.conversationHistory.length > this.maxHistoryMessages) {
+            this.conversationHistory = this.conversationHistory.slice(-this.maxHistoryMessages);
         }
         
+        // Fold turns leaving the recent window into the summary, off the request path
+        this.contextManager.scheduleFold(this.conversationHistory);
+        
         // Save to user profile if logged in
         if (this.userManager && this.userManager.getCurrentUser()) {
             this.userManager.getCurrentUser().chatHistory = this.conversationHistory;
@@ -5111,7 +5479,6 @@ Bitcoin, Ethereum, Solana, Cardano, Ripple, Dogecoin, Polkadot, Avalanche, Polyg
     }
 
     extractAndSaveUserPreferences(content) {
-        const contentLower = content.toLowerCase();
         const currentUser = this.userManager.getCurrentUser();
         if (!currentUser) return;
 
@@ -5123,32 +5490,16 @@ Bitcoin, Ethereum, Solana, Cardano, Ripple, Dogecoin, Polkadot, Avalanche, Polyg
             this.userPreferences.favoriteCoins = Array.from(currentFavorites).slice(0, 10); // Limit to 10
         }
 
-        // Extract trading style
-        if (contentLower.includes('day trading') || contentLower.includes('scalping')) {
-            this.userPreferences.tradingStyle = 'day_trader';
-        } else if (contentLower.includes('swing trading') || contentLower.includes('short term')) {
-            this.userPreferences.tradingStyle = 'swing_trader';
-        } else if (contentLower.includes('hodl') || contentLower.includes('long term') || contentLower.includes('buy and hold')) {
-            this.userPreferences.tradingStyle = 'long_term_investor';
-        }
+        // Extract trading style, risk tolerance and experience level from the same scan
+        const analysis = this.messageAnalyzer.analyze(content);
+        const tradingStyle = this.messageAnalyzer.firstLabel(analysis, 'preferenceStyle');
+        if (tradingStyle) this.userPreferences.tradingStyle = tradingStyle;
 
-        // Extract risk tolerance
-        if (contentLower.includes('high risk') || contentLower.includes('aggressive') || contentLower.includes('leverag')) {
-            this.userPreferences.riskTolerance = 'high';
-        } else if (contentLower.includes('low risk') || contentLower.includes('safe') || contentLower.includes('conservative')) {
-            this.userPreferences.riskTolerance = 'low';
-        } else if (contentLower.includes('moderate') || contentLower.includes('balanced')) {
-            this.userPreferences.riskTolerance = 'medium';
-        }
+        const riskTolerance = this.messageAnalyzer.firstLabel(analysis, 'preferenceRisk');
+        if (riskTolerance) this.userPreferences.riskTolerance = riskTolerance;
 
-        // Extract experience level
-        if (contentLower.includes('beginner') || contentLower.includes('new to') || contentLower.includes('just started')) {
-            this.userPreferences.experienceLevel = 'beginner';
-        } else if (contentLower.includes('experienced') || contentLower.includes('trading for') || contentLower.includes('years')) {
-            this.userPreferences.experienceLevel = 'experienced';
-        } else if (contentLower.includes('expert') || contentLower.includes('professional') || contentLower.includes('advanced')) {
-            this.userPreferences.experienceLevel = 'expert';
-        }
+        const experienceLevel = this.messageAnalyzer.firstLabel(analysis, 'preferenceExperience');
+        if (experienceLevel) this.userPreferences.experienceLevel = experienceLevel;
 
         // Save to user memory
         this.userManager.updateConversationMemory('preferences', this.userPreferences);
@@ -5503,55 +5854,72 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
         }
     }
 
-    loadPreviousConversation() {
+    async loadPreviousConversation() {
         // Method to manually load previous conversation if user wants to
-        const savedHistory = localStorage.getItem('chatHistory');
-        if (savedHistory) {
-            const chatHistory = JSON.parse(savedHistory);
-            const chatMessages = document.getElementById('chatMessages');
-            const welcomeMessage = document.getElementById('welcomeMessage');
-            
-            // Preserve typing indicator
-            const typingIndicator = document.getElementById('chatTypingIndicator');
-            
-            // Clear existing messages except welcome message
-            chatMessages.innerHTML = '';
-            
-            // Re-add typing indicator
-            if (typingIndicator) {
-                chatMessages.appendChild(typingIndicator);
-                typingIndicator.classList.add('hidden');
-            } else {
-                // Recreate if missing
-                const newIndicator = document.createElement('div');
-                newIndicator.id = 'chatTypingIndicator';
-                newIndicator.className = 'chat-typing-indicator hidden';
-                newIndicator.innerHTML = `
-                    <div class="typing-bubble">
-                        <span class="typing-text">Thinking</span>
-                        <span class="thinking-dots">
-                            <span class="dot"></span>
-                            <span class="dot"></span>
-                            <span class="dot"></span>
-                        </span>
-                    </div>
-                `;
-                chatMessages.appendChild(newIndicator);
-            }
-            
-            if (welcomeMessage) {
-                chatMessages.appendChild(welcomeMessage);
-            }
-            
-            // If there's chat history, hide welcome message and load messages
-            if (chatHistory.length > 0) {
-                this.hideWelcomeMessage();
-                
-                // Load saved messages
-                chatHistory.forEach(msg => {
-                    this.addMessage(msg.content, msg.sender, false);
-                });
-            }
+        const userId = this.getChatUserId();
+        const page = await this.chatStore.loadPage(userId);
+        if (page.messages.length === 0) return;
+        
+        this.resetChatContainer();
+        const transcript = this.getTranscript();
+        
+        // If there's chat history, hide welcome message and load messages
+        this.hideWelcomeMessage();
+        
+        // Newest page first; older pages load as the user scrolls up
+        transcript.prepend(page.messages);
+        this.oldestLoadedSeq = page.messages[0].seq;
+        transcript.onReachTop = page.hasMore ? () => this.loadOlderMessages(userId) : null;
+        this.scrollToBottom(true);
+    }
+
+    async loadOlderMessages(userId) {
+        const page = await this.chatStore.loadPage(userId, { before: this.oldestLoadedSeq });
+        if (page.messages.length === 0) return false;
+        
+        this.getTranscript().prepend(page.messages);
+        this.oldestLoadedSeq = page.messages[0].seq;
+        console.log(`📜 Loaded ${page.messages.length} older messages`);
+        return page.hasMore;
+    }
+
+    // Empty #chatMessages back to the typing indicator + welcome message
+    resetChatContainer() {
+        const chatMessages = document.getElementById('chatMessages');
+        const welcomeMessage = document.getElementById('welcomeMessage');
+        
+        // Preserve typing indicator
+        const typingIndicator = document.getElementById('chatTypingIndicator');
+        
+        // Clear existing messages except welcome message
+        this.getTranscript().reset();
+        this.getTranscript().onReachTop = null;
+        chatMessages.innerHTML = '';
+        
+        // Re-add typing indicator
+        if (typingIndicator) {
+            chatMessages.appendChild(typingIndicator);
+            typingIndicator.classList.add('hidden');
+        } else {
+            // Recreate if missing
+            const newIndicator = document.createElement('div');
+            newIndicator.id = 'chatTypingIndicator';
+            newIndicator.className = 'chat-typing-indicator hidden';
+            newIndicator.innerHTML = `
+                <div class="typing-bubble">
+                    <span class="typing-text">Thinking</span>
+                    <span class="thinking-dots">
+                        <span class="dot"></span>
+                        <span class="dot"></span>
+                        <span class="dot"></span>
+                    </span>
+                </div>
+            `;
+            chatMessages.appendChild(newIndicator);
+        }
+        
+        if (welcomeMessage) {
+            chatMessages.appendChild(welcomeMessage);
         }
     }
 
@@ -5597,63 +5965,18 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
     }
 
     saveChatHistory() {
-        const messages = document.querySelectorAll('.message');
-        const chatHistory = [];
-        
-        messages.forEach(message => {
-            const messageText = message.querySelector('.message-text');
-            const isAI = message.classList.contains('ai-message');
-            const sender = isAI ? 'ai' : 'user';
-            
-            if (messageText && !message.id) { // Don't save the welcome message
-                chatHistory.push({
-                    content: messageText.innerHTML,
-                    sender: sender,
-                    timestamp: new Date().toISOString()
-                });
-            }
-        });
-        
-        localStorage.setItem('chatHistory', JSON.stringify(chatHistory));
+        // Messages are persisted as they are added; just write anything still queued
+        return this.chatStore.flush();
     }
 
     loadChatHistory() {
         // Don't automatically load chat history on page refresh
         // This keeps the conversation data stored but shows a fresh chat interface
-        const chatMessages = document.getElementById('chatMessages');
-        const welcomeMessage = document.getElementById('welcomeMessage');
-        
-        // Preserve typing indicator
-        const typingIndicator = document.getElementById('chatTypingIndicator');
-        
-        // Clear existing messages and show welcome message
-        chatMessages.innerHTML = '';
-        
-        // Re-add typing indicator
-        if (typingIndicator) {
-            chatMessages.appendChild(typingIndicator);
-            typingIndicator.classList.add('hidden');
-        } else {
-            // Recreate if missing
-            const newIndicator = document.createElement('div');
-            newIndicator.id = 'chatTypingIndicator';
-            newIndicator.className = 'chat-typing-indicator hidden';
-            newIndicator.innerHTML = `
-                <div class="typing-bubble">
-                    <span class="typing-text">Thinking</span>
-                    <span class="thinking-dots">
-                        <span class="dot"></span>
-                        <span class="dot"></span>
-                        <span class="dot"></span>
-                    </span>
-                </div>
-            `;
-            chatMessages.appendChild(newIndicator);
-        }
+        this.resetChatContainer();
         
-        if (welcomeMessage) {
-            chatMessages.appendChild(welcomeMessage);
-        }
+        // Move the old localStorage transcript (if any) into the message store
+        this.chatStore.migrateLegacy(this.getChatUserId())
+            .catch(error => console.warn('⚠️ Legacy chat history migration failed:', error));
         
         // Show welcome message on page refresh
         this.showWelcomeMessage();
@@ -5663,9 +5986,9 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
         // Save chat history before cleanup
         this.saveChatHistory();
         
-        // Close WebSocket connection
-        if (this.ws) {
-            this.ws.close();
+        // Close the shared market stream
+        if (this.marketStream) {
+            this.marketStream.disconnect();
         }
         
         // Clear fallback interval
@@ -5720,6 +6043,7 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
     }
 
     savePortfolio() {
+        this.syncMarketStreams();
         try {
             // Save to user's data if logged in
             if (this.userManager && this.userManager.isLoggedIn()) {
@@ -5808,30 +6132,12 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
     }
 
     async calculatePortfolioValue() {
-        let totalValue = 0;
-        let totalCost = 0;
-
-        for (const holding of this.portfolio.holdings) {
-            try {
-                const marketData = await this.fetchMarketData(holding.coinId);
-                const currentValue = holding.amount * marketData.price_usd;
-                const cost = holding.amount * holding.buyPrice;
-                
-                totalValue += currentValue;
-                totalCost += cost;
-                
-                holding.currentValue = currentValue;
-                holding.currentPrice = marketData.price_usd;
-                holding.pnl = currentValue - cost;
-                holding.pnlPercent = ((currentValue - cost) / cost) * 100;
-            } catch (error) {
-                console.error(`Error calculating value for ${holding.coinId}:`, error);
-            }
-        }
+        // Holdings, open trades and paper positions are repriced together in one batch
+        const summary = await this.portfolioValuator.revalue();
         
-        this.portfolio.totalValue = totalValue;
-        this.portfolio.totalPnL = totalValue - totalCost;
-        this.portfolio.totalPnLPercent = totalCost > 0 ? ((totalValue - totalCost) / totalCost) * 100 : 0;
+        this.portfolio.totalValue = summary.totalValue;
+        this.portfolio.totalPnL = summary.totalPnL;
+        this.portfolio.totalPnLPercent = summary.totalPnLPercent;
     }
 
     async updatePortfolioDisplay() {
@@ -5853,10 +6159,17 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
         this.renderHoldings();
         this.renderTrades();
         
+        // Intraday equity curve - recording only touches the current buckets
+        this.recordPortfolioSnapshot();
+        
         // Update charts
-        if (this.portfolioHistory) {
+        if (this.portfolioHistoryStore.isLoaded()) {
             const activeTimeframe = document.querySelector('.timeframe-btn.active')?.dataset.period || '7d';
-            this.updatePortfolioChart(activeTimeframe);
+            if (this.portfolioChartView && this.portfolioChartView.period === activeTimeframe) {
+                this.appendPortfolioChartPoint();
+            } else {
+                this.updatePortfolioChart(activeTimeframe);
+            }
             this.updateAllocationChart();
         }
     }
@@ -5956,7 +6269,7 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
 
     async loadChartData(coinId) {
         try {
-            const response = await fetch(`${this.coinGeckoAPI}/coins/${coinId}/market_chart?vs_currency=usd&days=7&interval=daily`);
+            const response = await this.fetchScheduler.fetch(`${this.coinGeckoAPI}/coins/${coinId}/market_chart?vs_currency=usd&days=7&interval=daily`, {}, { priority: 'normal' });
             const data = await response.json();
             
             return {
@@ -5988,6 +6301,7 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
     }
 
     saveAlerts() {
+        this.syncAlertIndex();
         try {
             // Save to user's data if logged in
             if (this.userManager && this.userManager.isLoggedIn()) {
@@ -6002,21 +6316,96 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
             console.error('❌ Error saving alerts:', error);
         }
     }
-
-    toggleAlerts() {
+
+    toggleAlerts() {
+        const panel = document.getElementById('alertsPanel');
+        panel.classList.toggle('hidden');
+        if (!panel.classList.contains('hidden')) {
+            this.updateAlertsDisplay();
+            this.populateCoinSelects();
+        }
+    }
+
+    updateAlertsDisplay() {
+        document.getElementById('alertCount').textContent = this.alerts.length;
+        this.renderAlerts();
+    }
+
+    addAlert() {
+        const coinId = document.getElementById('alertCoinSelect')?.value;
+        const condition = document.getElementById('alertCondition')?.value || 'above';
+        const valueInput = document.getElementById('alertValue');
+        // "% change" alerts fire on |24h change|, so -5 and 5 mean the same threshold
+        const rawValue = parseFloat(valueInput?.value);
+        const value = condition === 'change' ? Math.abs(rawValue) : rawValue;
+        
+        if (!coinId) {
+            this.showUserMessage('⚠️ Select a coin for the alert', 2500);
+            return;
+        }
+        if (!Number.isFinite(value) || value <= 0) {
+            this.showUserMessage('⚠️ Enter a valid target value', 2500);
+            return;
+        }
+        
+        this.alerts.push({
+            id: Date.now().toString(36) + Math.random().toString(36).slice(2, 6),
+            coinId: coinId,
+            condition: condition,
+            value: value,
+            createdAt: new Date().toISOString(),
+            triggered: false
+        });
+        this.saveAlerts();
+        this.updateAlertsDisplay();
+        if (valueInput) valueInput.value = '';
+        
+        // Ask once, so triggered alerts can notify while the tab is in the background
+        if (typeof Notification !== 'undefined' && Notification.permission === 'default') {
+            Notification.requestPermission().catch(() => {});
+        }
+    }
+    
+    removeAlert(index) {
+        if (index < 0 || index >= this.alerts.length) return;
+        this.alerts.splice(index, 1);
+        this.saveAlerts();
+        this.updateAlertsDisplay();
+    }
+    
+    /**
+     * 🔔 One notification for every alert that fired in the same batch
+     */
+    notifyAlertsTriggered(fired) {
+        fired.forEach(({ alert, price }) => {
+            alert.triggered = true;
+            alert.triggeredAt = new Date().toISOString();
+            alert.triggeredPrice = price;
+        });
+        this.saveAlerts();
+        
+        const lines = fired.map(({ alert, price, changePercent }) => {
+            const coin = alert.coinId.toUpperCase();
+            return alert.condition === 'change'
+                ? `- **${coin}** moved ${changePercent.toFixed(2)}% in 24h (alert at ±${alert.value}%)`
+                : `- **${coin}** is ${alert.condition} $${alert.value} - now ${this.formatCryptoPrice(price)}`;
+        });
+        const message = `🔔 **Price alert${fired.length > 1 ? 's' : ''} triggered:**\n${lines.join('\n')}`;
+        
+        this.addMessage(message, 'ai');
+        this.addToConversationHistory('assistant', message);
+        this.showUserMessage(`🔔 ${fired.length} price alert${fired.length > 1 ? 's' : ''} triggered`, 4000);
+        
+        if (typeof Notification !== 'undefined' && Notification.permission === 'granted' && document.hidden) {
+            new Notification('SamCrypto AI price alert', { body: lines.join('\n').replace(/\*\*/g, '') });
+        }
+        
         const panel = document.getElementById('alertsPanel');
-        panel.classList.toggle('hidden');
-        if (!panel.classList.contains('hidden')) {
+        if (panel && !panel.classList.contains('hidden')) {
             this.updateAlertsDisplay();
-            this.populateCoinSelects();
         }
     }
 
-    updateAlertsDisplay() {
-        document.getElementById('alertCount').textContent = this.alerts.length;
-        this.renderAlerts();
-    }
-
     renderAlerts() {
         const alertsList = document.getElementById('alertsList');
         alertsList.innerHTML = '';
@@ -6027,9 +6416,9 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
             alertDiv.innerHTML = `
                 <div class="alert-info">
                     <div class="alert-coin">${alert.coinId.toUpperCase()}</div>
-                    <div class="alert-condition">${alert.condition} $${alert.value}</div>
+                    <div class="alert-condition">${alert.condition} ${alert.condition === 'change' ? `±${alert.value}%` : `$${alert.value}`}</div>
                 </div>
-                <div class="alert-value">Active</div>
+                <div class="alert-value">${alert.triggered ? 'Triggered' : 'Active'}</div>
                 <div class="alert-actions">
                     <button onclick="samCryptoAI.removeAlert(${index})">Delete</button>
                 </div>
@@ -6231,7 +6620,7 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
         `;
     }
 
-    async fetchHistoricalData(coinId, period) {
+    async fetchHistoricalData(coinId, period, interval = 'daily') {
         try {
             // Convert period to days
             const daysMap = {
@@ -6244,28 +6633,22 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
             };
             
             const days = daysMap[period] || 30;
+            const to = Date.now();
+            const from = to - days * 86400000;
             
-            // Fetch historical data from CoinGecko
-            const response = await fetch(
-                `${this.coinGeckoAPI}/coins/${coinId}/market_chart?vs_currency=usd&days=${days}&interval=daily`
-            );
-            
-            if (!response.ok) {
-                throw new Error(`Failed to fetch historical data: ${response.status}`);
+            // Columnar series: { timestamps, prices, volumes, marketCaps } Float64Arrays
+            let historicalData;
+            try {
+                // Local IndexedDB history; only the missing ranges hit CoinGecko
+                historicalData = await this.historyStore.getSeries(coinId, interval, from, to,
+                    (rangeFrom, rangeTo) => this.fetchHistoricalRange(coinId, rangeFrom, rangeTo));
+            } catch (storeError) {
+                console.warn('⚠️ History store unavailable, fetching directly:', storeError.message);
+                historicalData = await this.fetchHistoricalRange(coinId, from, to);
+                historicalData.length = historicalData.timestamps.length;
             }
             
-            const data = await response.json();
-            
-            // Process the data into our format
-            const historicalData = data.prices.map((priceData, index) => ({
-                timestamp: priceData[0],
-                date: new Date(priceData[0]),
-                price: priceData[1],
-                volume: data.total_volumes[index] ? data.total_volumes[index][1] : 0,
-                marketCap: data.market_caps[index] ? data.market_caps[index][1] : 0
-            }));
-            
-            console.log(`Fetched ${historicalData.length} days of data for ${coinId}`);
+            console.log(`Loaded ${historicalData.length} ${interval} points for ${coinId}`);
             return historicalData;
             
         } catch (error) {
@@ -6274,258 +6657,125 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
         }
     }
 
-    async executeStrategy(strategy, historicalData, initialCapital) {
-        console.log(`Executing ${strategy} strategy with ${historicalData.length} data points`);
-        
-        let trades = [];
-        let currentCapital = initialCapital;
-        let position = 0; // 0 = no position, 1 = long position
-        let entryPrice = 0;
-        let maxCapital = initialCapital;
-        let maxDrawdown = 0;
-        
-        // Calculate technical indicators
-        const indicators = this.calculateTechnicalIndicators(historicalData);
-        
-        // Execute strategy
-        for (let i = 1; i < historicalData.length; i++) {
-            const currentPrice = historicalData[i].price;
-            const signal = this.getTradingSignal(strategy, indicators, i);
-            
-            if (signal === 'BUY' && position === 0) {
-                // Enter long position
-                position = 1;
-                entryPrice = currentPrice;
-                const shares = currentCapital / currentPrice;
-                currentCapital = 0;
-                
-                trades.push({
-                    type: 'BUY',
-                    date: historicalData[i].date,
-                    price: currentPrice,
-                    shares: shares,
-                    capital: initialCapital - currentCapital
-                });
-                
-            } else if (signal === 'SELL' && position === 1) {
-                // Exit long position
-                position = 0;
-                const shares = trades[trades.length - 1].shares;
-                currentCapital = shares * currentPrice;
-                
-                trades.push({
-                    type: 'SELL',
-                    date: historicalData[i].date,
-                    price: currentPrice,
-                    shares: shares,
-                    capital: currentCapital
-                });
-                
-                // Update max capital and drawdown
-                if (currentCapital > maxCapital) {
-                    maxCapital = currentCapital;
-                }
-                
-                const currentDrawdown = ((maxCapital - currentCapital) / maxCapital) * 100;
-                if (currentDrawdown > maxDrawdown) {
-                    maxDrawdown = currentDrawdown;
-                }
-            }
-        }
-        
-        // Close any remaining position
-        if (position === 1 && trades.length > 0) {
-            const lastTrade = trades[trades.length - 1];
-            const finalPrice = historicalData[historicalData.length - 1].price;
-            currentCapital = lastTrade.shares * finalPrice;
-            
-            trades.push({
-                type: 'SELL',
-                date: historicalData[historicalData.length - 1].date,
-                price: finalPrice,
-                shares: lastTrade.shares,
-                capital: currentCapital
-            });
-        }
-        
-        // Calculate performance metrics
-        const totalReturn = ((currentCapital - initialCapital) / initialCapital) * 100;
-        const winningTrades = trades.filter(trade => trade.type === 'SELL' && trade.capital > 0).length;
-        const totalTrades = Math.floor(trades.length / 2); // Buy/Sell pairs
-        const winRate = totalTrades > 0 ? (winningTrades / totalTrades) * 100 : 0;
+    async fetchHistoricalRange(coinId, from, to) {
+        // Fetch historical data from CoinGecko
+        const response = await this.fetchScheduler.fetch(
+            `${this.coinGeckoAPI}/coins/${coinId}/market_chart/range?vs_currency=usd&from=${Math.floor(from / 1000)}&to=${Math.ceil(to / 1000)}`,
+            {},
+            { priority: 'normal' }
+        );
         
-        // Calculate Sharpe ratio (simplified)
-        const returns = [];
-        for (let i = 1; i < trades.length; i += 2) {
-            if (trades[i] && trades[i-1]) {
-                const return_pct = ((trades[i].capital - trades[i-1].capital) / trades[i-1].capital) * 100;
-                returns.push(return_pct);
-            }
+        if (!response.ok) {
+            throw new Error(`Failed to fetch historical data: ${response.status}`);
         }
         
-        const avgReturn = returns.reduce((a, b) => a + b, 0) / returns.length || 0;
-        const returnStdDev = Math.sqrt(returns.reduce((sum, ret) => sum + Math.pow(ret - avgReturn, 2), 0) / returns.length) || 1;
-        const sharpeRatio = returnStdDev > 0 ? avgReturn / returnStdDev : 0;
-        
-        return {
-            totalReturn: totalReturn,
-            winRate: winRate,
-            maxDrawdown: maxDrawdown,
-            sharpeRatio: sharpeRatio,
-            totalTrades: totalTrades,
-            finalCapital: currentCapital,
-            trades: trades,
-            initialCapital: initialCapital
-        };
-    }
-
-    calculateTechnicalIndicators(data) {
-        const prices = data.map(d => d.price);
-        const indicators = {
-            prices: prices,
-            rsi: this.calculateRSI(prices, 14),
-            sma20: this.calculateSMA(prices, 20),
-            sma50: this.calculateSMA(prices, 50),
-            ema12: this.calculateEMA(prices, 12),
-            ema26: this.calculateEMA(prices, 26),
-            macd: this.calculateMACD(prices),
-            bollinger: this.calculateBollingerBands(prices, 20, 2)
+        const data = await response.json();
+        const n = data.prices.length;
+        const series = {
+            timestamps: new Float64Array(n),
+            prices: new Float64Array(n),
+            volumes: new Float64Array(n),
+            marketCaps: new Float64Array(n)
         };
         
-        return indicators;
-    }
-
-    calculateRSI(prices, period = 14) {
-        const rsi = [];
-        for (let i = period; i < prices.length; i++) {
-            let gains = 0;
-            let losses = 0;
-            
-            for (let j = i - period + 1; j <= i; j++) {
-                const change = prices[j] - prices[j - 1];
-                if (change > 0) gains += change;
-                else losses -= change;
-            }
-            
-            const avgGain = gains / period;
-            const avgLoss = losses / period;
-            const rs = avgLoss === 0 ? 100 : avgGain / avgLoss;
-            const rsiValue = 100 - (100 / (1 + rs));
-            
-            rsi.push(rsiValue);
+        for (let i = 0; i < n; i++) {
+            series.timestamps[i] = data.prices[i][0];
+            series.prices[i] = data.prices[i][1];
+            series.volumes[i] = data.total_volumes[i] ? data.total_volumes[i][1] : 0;
+            series.marketCaps[i] = data.market_caps[i] ? data.market_caps[i][1] : 0;
         }
         
-        return rsi;
+        return series;
     }
 
-    calculateSMA(prices, period) {
-        const sma = [];
-        for (let i = period - 1; i < prices.length; i++) {
-            const sum = prices.slice(i - period + 1, i + 1).reduce((a, b) => a + b, 0);
-            sma.push(sum / period);
-        }
-        return sma;
-    }
-
-    calculateEMA(prices, period) {
-        const ema = [];
-        const multiplier = 2 / (period + 1);
-        
-        // First EMA is SMA
-        const firstSMA = prices.slice(0, period).reduce((a, b) => a + b, 0) / period;
-        ema.push(firstSMA);
-        
-        for (let i = period; i < prices.length; i++) {
-            const emaValue = (prices[i] * multiplier) + (ema[ema.length - 1] * (1 - multiplier));
-            ema.push(emaValue);
-        }
+    async executeStrategy(strategy, historicalData, initialCapital, params = {}) {
+        console.log(`Executing ${strategy} strategy with ${historicalData.length} data points`);
         
-        return ema;
+        // Backtest loop runs in the worker pool (main-thread fallback inside the engine)
+        return this.backtestEngine.run(strategy, historicalData, initialCapital, params);
     }
 
-    calculateMACD(prices) {
-        const ema12 = this.calculateEMA(prices, 12);
-        const ema26 = this.calculateEMA(prices, 26);
-        
-        const macd = [];
-        const signal = [];
+    /**
+     * 🔬 Sweep the selected strategy's parameter grid across several coins
+     */
+    async runBacktestSweep() {
+        const strategy = document.getElementById('backtestStrategy').value;
+        const coin = document.getElementById('backtestCoin').value;
+        const period = document.getElementById('backtestPeriod').value;
+        const capital = parseFloat(document.getElementById('initialCapital').value);
+        const resultsDiv = document.getElementById('backtestResults');
         
-        for (let i = 0; i < Math.min(ema12.length, ema26.length); i++) {
-            macd.push(ema12[i] - ema26[i]);
+        if (!strategy || !coin || !period || !capital) {
+            alert('Please fill in all backtest parameters');
+            return;
         }
         
-        // Calculate signal line (9-period EMA of MACD)
-        const signalEMA = this.calculateEMA(macd, 9);
+        const coins = [...new Set([coin, 'bitcoin', 'ethereum', 'solana'])];
         
-        return { macd, signal: signalEMA };
-    }
-
-    calculateBollingerBands(prices, period = 20, stdDev = 2) {
-        const bands = [];
-        
-        for (let i = period - 1; i < prices.length; i++) {
-            const slice = prices.slice(i - period + 1, i + 1);
-            const sma = slice.reduce((a, b) => a + b, 0) / period;
+        try {
+            resultsDiv.innerHTML = '<div class="loading">Fetching historical data for parameter sweep...</div>';
+            
+            const datasets = {};
+            await Promise.all(coins.map(async (coinId) => {
+                try {
+                    datasets[coinId] = await this.fetchHistoricalData(coinId, period);
+                } catch (error) {
+                    console.warn(`Skipping ${coinId} in sweep:`, error.message);
+                }
+            }));
             
-            const variance = slice.reduce((sum, price) => sum + Math.pow(price - sma, 2), 0) / period;
-            const standardDeviation = Math.sqrt(variance);
+            if (Object.keys(datasets).length === 0) {
+                throw new Error('No historical data available');
+            }
             
-            bands.push({
-                upper: sma + (stdDev * standardDeviation),
-                middle: sma,
-                lower: sma - (stdDev * standardDeviation)
+            const ranked = await this.backtestEngine.sweep({
+                datasets: datasets,
+                strategies: { [strategy]: this.backtestSweepGrids[strategy] },
+                initialCapital: capital,
+                onProgress: (result, rankedSoFar, done, total) => {
+                    this.displaySweepResults(rankedSoFar, done, total);
+                }
             });
+            
+            this.backtestResults.sweep = ranked;
+            this.displaySweepResults(ranked, ranked.length, ranked.length);
+            
+        } catch (error) {
+            console.error('Backtest sweep error:', error);
+            resultsDiv.innerHTML = `<div class="error">Error running parameter sweep: ${error.message}</div>`;
         }
-        
-        return bands;
     }
 
-    getTradingSignal(strategy, indicators, index) {
-        const prices = indicators.prices || [];
-        const currentPrice = prices[index] || 0;
-        
-        switch (strategy) {
-            case 'rsi':
-                if (index < indicators.rsi.length) {
-                    const rsi = indicators.rsi[index];
-                    if (rsi < 30) return 'BUY';
-                    if (rsi > 70) return 'SELL';
-                }
-                break;
-                
-            case 'macd':
-                if (index < indicators.macd.macd.length && index > 0) {
-                    const macd = indicators.macd.macd[index];
-                    const prevMacd = indicators.macd.macd[index - 1];
-                    const signal = indicators.macd.signal[index];
-                    
-                    if (macd > signal && prevMacd <= indicators.macd.signal[index - 1]) return 'BUY';
-                    if (macd < signal && prevMacd >= indicators.macd.signal[index - 1]) return 'SELL';
-                }
-                break;
-                
-            case 'ema':
-                if (index < indicators.ema12.length && index < indicators.ema26.length) {
-                    const ema12 = indicators.ema12[index];
-                    const ema26 = indicators.ema26[index];
-                    const prevEma12 = indicators.ema12[index - 1];
-                    const prevEma26 = indicators.ema26[index - 1];
-                    
-                    if (ema12 > ema26 && prevEma12 <= prevEma26) return 'BUY';
-                    if (ema12 < ema26 && prevEma12 >= prevEma26) return 'SELL';
-                }
-                break;
-                
-            case 'bollinger':
-                if (index < indicators.bollinger.length) {
-                    const bands = indicators.bollinger[index];
-                    if (currentPrice <= bands.lower) return 'BUY';
-                    if (currentPrice >= bands.upper) return 'SELL';
-                }
-                break;
-        }
+    displaySweepResults(ranked, done, total) {
+        // Throttle streamed redraws to one per frame
+        this.pendingSweepRender = { ranked, done, total };
+        if (this.sweepRenderScheduled) return;
+        this.sweepRenderScheduled = true;
         
-        return 'HOLD';
+        requestAnimationFrame(() => {
+            this.sweepRenderScheduled = false;
+            const { ranked, done, total } = this.pendingSweepRender;
+            const resultsDiv = document.getElementById('backtestResults');
+            
+            resultsDiv.innerHTML = `
+            <div class="backtest-summary">
+                <h4>Parameter Sweep ${done < total ? `(${done}/${total})` : `- ${total} runs`}</h4>
+            </div>
+            <div class="trades-summary">
+                <h5>Top Results (by Sharpe, then Drawdown)</h5>
+                <div class="trades-list">
+                    ${ranked.slice(0, 10).map((result, index) => `
+                        <div class="trade-item ${result.totalReturn >= 0 ? 'buy' : 'sell'}">
+                            <span class="trade-type">#${index + 1} ${result.coin}</span>
+                            <span class="trade-date">${Object.entries(result.params).map(([key, value]) => `${key}=${value}`).join(', ')}</span>
+                            <span class="trade-price">Sharpe ${result.sharpeRatio.toFixed(2)} · DD -${result.maxDrawdown.toFixed(1)}%</span>
+                            <span class="trade-capital">${result.totalReturn >= 0 ? '+' : ''}${result.totalReturn.toFixed(2)}%</span>
+                        </div>
+                    `).join('')}
+                </div>
+            </div>
+        `;
+        });
     }
 
     // Utility Methods
@@ -6677,7 +6927,10 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
 
     initializePortfolioCharts() {
         // Initialize portfolio performance tracking
-        this.portfolioHistory = this.loadPortfolioHistory();
+        this.historyReady = this.loadPortfolioHistory().then(() => {
+            const activeTimeframe = document.querySelector('.timeframe-btn.active')?.dataset.period || '7d';
+            this.updatePortfolioChart(activeTimeframe);
+        });
         
         // Add event listeners for timeframe buttons
         document.querySelectorAll('.timeframe-btn').forEach(btn => {
@@ -6693,190 +6946,135 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
             });
         });
 
+        // Sample the equity curve once a minute while holdings are open
+        if (!this.historySampleInterval) {
+            this.historySampleInterval = setInterval(() => this.samplePortfolioValue(), 60000);
+        }
+
         // Initial chart render
         this.updatePortfolioChart('7d');
         this.updateAllocationChart();
     }
 
-    loadPortfolioHistory() {
+    async loadPortfolioHistory() {
         try {
-            if (this.userManager && this.userManager.isLoggedIn()) {
-                const currentUser = this.userManager.getCurrentUser();
-                return currentUser.portfolioHistory || [];
-            } else {
-                const stored = localStorage.getItem('crypto_portfolio_history');
-                return stored ? JSON.parse(stored) : [];
-            }
+            await this.portfolioHistoryStore.load(this.getChatUserId());
+            this.migrateLegacyPortfolioHistory();
         } catch (error) {
             console.error('Error loading portfolio history:', error);
-            return [];
         }
     }
 
-    savePortfolioHistory() {
-        try {
-            if (this.userManager && this.userManager.isLoggedIn()) {
-                const currentUser = this.userManager.getCurrentUser();
-                currentUser.portfolioHistory = this.portfolioHistory;
-                this.userManager.saveUsers();
-            } else {
-                localStorage.setItem('crypto_portfolio_history', JSON.stringify(this.portfolioHistory));
+    // The old history was one array of objects rewritten on every snapshot
+    migrateLegacyPortfolioHistory() {
+        if (this.userManager && this.userManager.isLoggedIn()) {
+            const currentUser = this.userManager.getCurrentUser();
+            if (!currentUser.portfolioHistory) return;
+
+            // Keep the legacy copy until the store has actually taken it
+            if (!this.portfolioHistoryStore.importLegacy(currentUser.portfolioHistory)) return;
+            delete currentUser.portfolioHistory;
+            this.userManager.saveUsers();
+        } else {
+            const stored = localStorage.getItem('crypto_portfolio_history');
+            if (!stored) return;
+
+            let snapshots;
+            try {
+                snapshots = JSON.parse(stored);
+            } catch (error) {
+                console.warn('⚠️ Discarding unreadable legacy portfolio history');
+                localStorage.removeItem('crypto_portfolio_history');
+                return;
             }
-        } catch (error) {
-            console.error('Error saving portfolio history:', error);
+            if (!this.portfolioHistoryStore.importLegacy(snapshots)) return;
+            localStorage.removeItem('crypto_portfolio_history');
         }
     }
 
-    recordPortfolioSnapshot() {
-        const now = new Date();
-        const totalValue = (this.portfolio.usdtBalance || 0) + (this.portfolio.totalValue || 0);
-        
-        // Remove old snapshots (keep last 365 days)
-        const oneYearAgo = new Date(now.getTime() - 365 * 24 * 60 * 60 * 1000);
-        this.portfolioHistory = this.portfolioHistory.filter(snapshot => 
-            new Date(snapshot.timestamp) > oneYearAgo
-        );
+    async samplePortfolioValue() {
+        if (document.hidden || !(this.portfolio.holdings || []).length) return;
+        await this.calculatePortfolioValue();
+        this.recordPortfolioSnapshot();
+    }
 
-        // Add new snapshot
-        this.portfolioHistory.push({
-            timestamp: now.toISOString(),
-            totalValue: totalValue,
+    recordPortfolioSnapshot() {
+        // O(1): updates the current minute/hour/day buckets and persists just those
+        this.portfolioHistoryStore.record({
+            timestamp: Date.now(),
+            value: (this.portfolio.usdtBalance || 0) + (this.portfolio.totalValue || 0),
             usdtBalance: this.portfolio.usdtBalance || 0,
             holdingsValue: this.portfolio.totalValue || 0,
             holdingsCount: this.portfolio.holdings ? this.portfolio.holdings.length : 0
         });
-
-        // Keep only the most recent snapshot per day
-        const dailySnapshots = {};
-        this.portfolioHistory.forEach(snapshot => {
-            const date = new Date(snapshot.timestamp).toDateString();
-            if (!dailySnapshots[date] || new Date(snapshot.timestamp) > new Date(dailySnapshots[date].timestamp)) {
-                dailySnapshots[date] = snapshot;
-            }
-        });
-        
-        this.portfolioHistory = Object.values(dailySnapshots);
-        this.savePortfolioHistory();
     }
 
     updatePortfolioChart(period = '7d') {
         const canvas = document.getElementById('portfolioChart');
         if (!canvas) return;
 
-        const ctx = canvas.getContext('2d');
-        const data = this.getChartData(period);
-
-        // Clear canvas
-        ctx.clearRect(0, 0, canvas.width, canvas.height);
+        const now = Date.now();
+        const startTime = now - this.chartPeriodDays(period) * 24 * 60 * 60 * 1000;
 
-        if (data.length === 0) {
-            // Show "No data" message
-            ctx.fillStyle = '#888';
-            ctx.font = '14px Arial';
-            ctx.textAlign = 'center';
-            ctx.fillText('Add holdings to see chart', canvas.width / 2, canvas.height / 2);
-            return;
+        // Full-resolution columns; the renderer downsamples them to the canvas width
+        let { resolution, times, values } = this.portfolioHistoryStore.queryColumns(startTime, now, { maxPoints: 20000 });
+        if (times.length === 0) {
+            const currentValue = (this.portfolio.usdtBalance || 0) + (this.portfolio.totalValue || 0);
+            if (currentValue > 0) {
+                times = Float64Array.of(now);
+                values = Float64Array.of(currentValue);
+            }
         }
 
-        // Calculate chart dimensions
-        const padding = 20;
-        const chartWidth = canvas.width - 2 * padding;
-        const chartHeight = canvas.height - 2 * padding;
-
-        // Find min/max values
-        const values = data.map(d => d.value);
-        const minValue = Math.min(...values);
-        const maxValue = Math.max(...values);
-        const valueRange = maxValue - minValue || 1;
+        this.portfolioChartView = { period, resolution };
+        this.chartRenderer.renderLine('portfolio', canvas, {
+            times,
+            values,
+            from: startTime,
+            to: now,
+            emptyText: 'Add holdings to see chart'
+        });
 
-        // Draw grid lines
-        ctx.strokeStyle = 'rgba(255, 255, 255, 0.1)';
-        ctx.lineWidth = 1;
-        for (let i = 0; i <= 4; i++) {
-            const y = padding + (i * chartHeight / 4);
-            ctx.beginPath();
-            ctx.moveTo(padding, y);
-            ctx.lineTo(padding + chartWidth, y);
-            ctx.stroke();
-        }
+        // Update stats - best/worst/average day come from the daily rollup
+        this.updatePortfolioStats(this.getChartData(period, 'day'));
+    }
 
-        // Draw chart line
-        ctx.strokeStyle = '#00d4ff';
-        ctx.lineWidth = 2;
-        ctx.beginPath();
+    // A new snapshot only repaints the end of the curve
+    appendPortfolioChartPoint() {
+        const { period, resolution } = this.portfolioChartView;
+        const latest = this.portfolioHistoryStore.latest(resolution);
+        if (!latest) return;
 
-        data.forEach((point, index) => {
-            const x = padding + (index * chartWidth / (data.length - 1));
-            const y = padding + chartHeight - ((point.value - minValue) / valueRange * chartHeight);
-            
-            if (index === 0) {
-                ctx.moveTo(x, y);
-            } else {
-                ctx.lineTo(x, y);
-            }
-        });
+        this.chartRenderer.appendPoint('portfolio', latest);
+        this.updatePortfolioStats(this.getChartData(period, 'day'));
+    }
 
-        ctx.stroke();
+    chartPeriodDays(period) {
+        return { '1d': 1, '7d': 7, '30d': 30, '90d': 90, '1y': 365 }[period] || 7;
+    }
 
-        // Draw area under curve
-        ctx.fillStyle = 'rgba(0, 212, 255, 0.1)';
-        ctx.beginPath();
-        ctx.moveTo(padding, padding + chartHeight);
-        
-        data.forEach((point, index) => {
-            const x = padding + (index * chartWidth / (data.length - 1));
-            const y = padding + chartHeight - ((point.value - minValue) / valueRange * chartHeight);
-            ctx.lineTo(x, y);
-        });
-        
-        ctx.lineTo(padding + chartWidth, padding + chartHeight);
-        ctx.closePath();
-        ctx.fill();
+    getChartData(period, resolution = null) {
+        const now = Date.now();
+        const startTime = now - this.chartPeriodDays(period) * 24 * 60 * 60 * 1000;
 
-        // Update stats
-        this.updatePortfolioStats(data);
-    }
+        // Binary search over the finest rollup that fits the window
+        const points = resolution
+            ? this.portfolioHistoryStore.range(resolution, startTime, now)
+            : this.portfolioHistoryStore.query(startTime, now).points;
 
-    getChartData(period) {
-        if (this.portfolioHistory.length === 0) {
+        if (points.length === 0) {
             // Generate sample data if no history exists
             const currentValue = (this.portfolio.usdtBalance || 0) + (this.portfolio.totalValue || 0);
             if (currentValue > 0) {
                 return [{
-                    timestamp: new Date().toISOString(),
+                    timestamp: now,
                     value: currentValue
                 }];
             }
             return [];
         }
 
-        const now = new Date();
-        let startDate;
-
-        switch (period) {
-            case '7d':
-                startDate = new Date(now.getTime() - 7 * 24 * 60 * 60 * 1000);
-                break;
-            case '30d':
-                startDate = new Date(now.getTime() - 30 * 24 * 60 * 60 * 1000);
-                break;
-            case '90d':
-                startDate = new Date(now.getTime() - 90 * 24 * 60 * 60 * 1000);
-                break;
-            case '1y':
-                startDate = new Date(now.getTime() - 365 * 24 * 60 * 60 * 1000);
-                break;
-            default:
-                startDate = new Date(now.getTime() - 7 * 24 * 60 * 60 * 1000);
-        }
-
-        return this.portfolioHistory
-            .filter(snapshot => new Date(snapshot.timestamp) >= startDate)
-            .map(snapshot => ({
-                timestamp: snapshot.timestamp,
-                value: snapshot.totalValue
-            }))
-            .sort((a, b) => new Date(a.timestamp) - new Date(b.timestamp));
+        return points;
     }
 
     updatePortfolioStats(data) {
@@ -6924,16 +7122,11 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
         const canvas = document.getElementById('allocationChart');
         if (!canvas) return;
 
-        const ctx = canvas.getContext('2d');
         const holdings = this.portfolio.holdings || [];
 
-        // Clear canvas
-        ctx.clearRect(0, 0, canvas.width, canvas.height);
-
         if (holdings.length === 0) {
             // Show USDT only
-            this.drawPieChart(ctx, [{ label: 'USDT', value: 100, color: '#26a69a' }]);
-            this.updateAllocationLegend([{ label: 'USDT', value: this.portfolio.usdtBalance || 0, percentage: 100, color: '#26a69a' }]);
+            this.renderAllocation(canvas, [{ label: 'USDT', value: this.portfolio.usdtBalance || 0, percentage: 100, color: '#26a69a' }]);
             return;
         }
 
@@ -6964,34 +7157,17 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
             }
         });
 
-        this.drawPieChart(ctx, allocations);
-        this.updateAllocationLegend(allocations);
+        this.renderAllocation(canvas, allocations);
     }
 
-    drawPieChart(ctx, data) {
-        const centerX = ctx.canvas.width / 2;
-        const centerY = ctx.canvas.height / 2;
-        const radius = Math.min(centerX, centerY) - 10;
-
-        let startAngle = -Math.PI / 2; // Start at top
-
-        data.forEach(slice => {
-            const sliceAngle = (slice.percentage / 100) * 2 * Math.PI;
-
-            // Draw slice
-            ctx.beginPath();
-            ctx.arc(centerX, centerY, radius, startAngle, startAngle + sliceAngle);
-            ctx.lineTo(centerX, centerY);
-            ctx.fillStyle = slice.color;
-            ctx.fill();
-
-            // Draw border
-            ctx.strokeStyle = '#1a1a1a';
-            ctx.lineWidth = 2;
-            ctx.stroke();
+    renderAllocation(canvas, allocations) {
+        // Repaint the pie and legend only when an allocation actually changed
+        const signature = allocations.map(a => `${a.label}:${a.value.toFixed(2)}:${a.color}`).join('|');
+        if (signature === this.allocationSignature && this.chartRenderer.charts.has('allocation')) return;
+        this.allocationSignature = signature;
 
-            startAngle += sliceAngle;
-        });
+        this.chartRenderer.renderPie('allocation', canvas, allocations);
+        this.updateAllocationLegend(allocations);
     }
 
     updateAllocationLegend(allocations) {
@@ -7015,26 +7191,30 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
         });
     }
 
-    // Cache management methods
+    // Cache management methods (backed by the shared CacheManager)
+    cacheNamespaceFor(key) {
+        if (key.startsWith('markets_row_')) return 'marketsRow';
+        if (key.startsWith('market_')) return 'market';
+        if (key.startsWith('binance_')) return 'binance';
+        if (key.endsWith('_news')) return 'news';
+        return 'default';
+    }
+
     getFromCache(key) {
-        const cached = this.cache.get(key);
-        if (!cached) return null;
-        
-        const now = Date.now();
-        if (now - cached.timestamp > this.cacheTTL) {
-            // Cache expired
-            this.cache.delete(key);
-            return null;
-        }
-        
-        return cached.data;
+        return this.cacheManager.get(this.cacheNamespaceFor(key), key);
+    }
+
+    // Cached value even if past its TTL (within the namespace's stale window)
+    getStaleFromCache(key) {
+        return this.cacheManager.lookup(this.cacheNamespaceFor(key), key);
     }
 
     setCache(key, data) {
-        this.cache.set(key, {
-            data: data,
-            timestamp: Date.now()
-        });
+        this.cacheManager.set(this.cacheNamespaceFor(key), key, data);
+    }
+
+    getCacheStats() {
+        return this.cacheManager.getStats();
     }
 
     // News functionality
@@ -7069,7 +7249,7 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
             // Hide loading and display news
             newsLoading.classList.add('hidden');
             this.displayNews(newsData);
-            this.currentNewsData = newsData; // Store for filtering
+            this.setCurrentNews(newsData); // Store for filtering
             
         } catch (error) {
             console.error('❌ Error loading news:', error);
@@ -7078,31 +7258,34 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
             // Show fallback news
             const fallbackNews = this.getFallbackNews();
             this.displayNews(fallbackNews);
-            this.currentNewsData = fallbackNews;
+            this.setCurrentNews(fallbackNews);
         }
     }
 
+    setCurrentNews(newsData) {
+        this.currentNewsData = newsData;
+        // Feed position of each indexed article, so filtered lookups keep the feed's order.
+        // Fallback articles are never indexed and are filtered the slow way.
+        const indexed = newsData.every(article => this.newsPipeline.has(article.newsId));
+        this.currentNewsRanks = indexed ? new Map(newsData.map((article, rank) => [article.newsId, rank])) : null;
+    }
+
     async fetchCryptoNews() {
         try {
-            // Try multiple real news sources
-            const sources = [
-                () => this.fetchFromCryptoCompare(),
-                () => this.fetchFromNewsAPI(),
-                () => this.fetchFromCoinGeckoNews()
-            ];
+            // Hedged: the next source starts when the previous one fails or is slow; first good answer wins
+            const result = await this.newsPipeline.fetchHedged([
+                { name: 'CryptoCompare', fetch: () => this.fetchFromCryptoCompare() },
+                { name: 'CoinGecko', fetch: () => this.fetchFromNewsAPI() },
+                { name: 'CoinPaprika', fetch: () => this.fetchFromCoinGeckoNews() }
+            ]);
             
-            for (let i = 0; i < sources.length; i++) {
-                try {
-                    console.log(`📡 Trying news source ${i + 1}/${sources.length}...`);
-                    const news = await sources[i]();
-                    if (news && news.length > 0) {
-                        console.log(`✅ Got ${news.length} real news articles from source ${i + 1}`);
-                        const enhancedNews = this.enhanceNewsWithImpact(news);
-                        return this.filterHighQualityNews(enhancedNews);
-                    }
-                } catch (sourceError) {
-                    console.log(`⚠️ News source ${i + 1} failed:`, sourceError.message);
-                }
+            if (result) {
+                console.log(`✅ ${result.source} answered first with ${result.articles.length} real news articles`);
+                // Recent articles retained so far, merged across sources and already scored -
+                // older ones stay indexed for lookups but never come back into the feed
+                const cutoff = Date.now() - 48 * 60 * 60 * 1000;
+                const recent = this.newsPipeline.all().filter(article => Date.parse(article.publishedAt) >= cutoff);
+                return this.filterHighQualityNews(recent.length > 0 ? recent : result.articles);
             }
             
             console.log('⚠️ All real news sources failed, using enhanced fallback');
@@ -7115,7 +7298,7 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
     }
 
     async fetchFromCryptoCompare() {
-        const response = await fetch('https://min-api.cryptocompare.com/data/v2/news/?lang=EN&sortOrder=latest&limit=20');
+        const response = await this.fetchScheduler.fetch('https://min-api.cryptocompare.com/data/v2/news/?lang=EN&sortOrder=latest&limit=20', {}, { priority: this.fetchPriority() });
         if (!response.ok) throw new Error('CryptoCompare API failed');
         
         const data = await response.json();
@@ -7125,7 +7308,6 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
             url: item.url,
             publishedAt: new Date(item.published_on * 1000).toISOString(),
             source: { name: item.source_info?.name || 'CryptoCompare' },
-            category: this.categorizeNews(item.title),
             imageUrl: item.imageurl,
             tags: item.tags?.split('|') || []
         })) || [];
@@ -7133,7 +7315,7 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
 
     async fetchFromNewsAPI() {
         // Using a free crypto news aggregator
-        const response = await fetch('https://api.coingecko.com/api/v3/news');
+        const response = await this.fetchScheduler.fetch('https://api.coingecko.com/api/v3/news', {}, { priority: this.fetchPriority() });
         if (!response.ok) throw new Error('NewsAPI failed');
         
         const data = await response.json();
@@ -7143,14 +7325,13 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
             url: item.url,
             publishedAt: item.published_at,
             source: { name: item.source || 'CryptoNews' },
-            category: this.categorizeNews(item.title),
             imageUrl: item.thumb_2x,
             tags: []
         })) || [];
     }
 
     async fetchFromCoinGeckoNews() {
-        const response = await fetch('https://api.coinpaprika.com/v1/news');
+        const response = await this.fetchScheduler.fetch('https://api.coinpaprika.com/v1/news', {}, { priority: this.fetchPriority() });
         if (!response.ok) throw new Error('CoinPaprika news failed');
         
         const data = await response.json();
@@ -7160,41 +7341,54 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
             url: item.url,
             publishedAt: item.published_at,
             source: { name: 'CoinPaprika' },
-            category: this.categorizeNews(item.title),
             imageUrl: null,
             tags: []
         }));
     }
 
     enhanceNewsWithImpact(newsArray) {
-        return newsArray.map(article => ({
+        return newsArray.map(article => this.scoreNewsArticle(article, this.newsPipeline.analyzeArticle(article)));
+    }
+
+    /**
+     * 🧮 Score one article from a single keyword scan of its title + description
+     */
+    scoreNewsArticle(article, analysis) {
+        const text = `${article.title} ${article.description || ''}`;
+        const scored = {
             ...article,
-            impact: this.calculateNewsImpact(article),
-            confidence: this.calculateConfidence(article),
-            sentiment: this.analyzeSentiment(article.title + ' ' + article.description),
-            aiSummary: this.generateAISummary(article)
-        }));
+            category: article.category || this.categorizeNews(article.title, analysis),
+            impact: this.calculateNewsImpact(article, analysis),
+            // Recency is added whenever confidence is read; only the source/content part is kept
+            sourceConfidence: this.calculateSourceConfidence(article),
+            sentiment: this.analyzeSentiment(text, analysis)
+        };
+        scored.confidence = this.calculateConfidence(scored);
+        scored.aiSummary = this.generateAISummary(scored, analysis);
+        return scored;
     }
 
-    generateAISummary(article) {
+    generateAISummary(article, analysis = this.newsPipeline.analyzeArticle(article)) {
         try {
             const title = article.title;
             const description = article.description;
             const category = article.category;
             const sentiment = article.sentiment;
+            const text = title + " " + description;
             
             // AI-powered summary generation based on content analysis
             let summary = "";
             
             // Extract key information
-            const keyWords = this.extractKeywords(title + " " + description);
-            const priceAction = this.detectPriceAction(title + " " + description);
-            const marketImpact = this.assessMarketImpact(title + " " + description);
+            const keyWords = this.extractKeywords(text, analysis);
+            const priceAction = this.detectPriceAction(text, analysis);
+            const marketImpact = this.assessMarketImpact(text, analysis);
             
             // Generate context-aware summary
-            if (category === 'bitcoin' || title.toLowerCase().includes('bitcoin') || title.toLowerCase().includes('btc')) {
+            const titleCategories = analysis.title.category || {};
+            if (category === 'bitcoin' || titleCategories.bitcoin) {
                 summary = this.generateBitcoinSummary(keyWords, priceAction, sentiment);
-            } else if (category === 'ethereum' || title.toLowerCase().includes('ethereum') || title.toLowerCase().includes('eth')) {
+            } else if (category === 'ethereum' || titleCategories.ethereum) {
                 summary = this.generateEthereumSummary(keyWords, priceAction, sentiment);
             } else if (category === 'regulation') {
                 summary = this.generateRegulationSummary(keyWords, marketImpact, sentiment);
@@ -7223,48 +7417,27 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
         }
     }
 
-    extractKeywords(text) {
-        const content = text.toLowerCase();
+    // Keyword helpers read one NewsPipeline scan; pass `analysis` to reuse an article's scan
+    extractKeywords(text, analysis = this.newsPipeline.analyze(text)) {
         const keywords = [];
         
-        // Price-related keywords
-        const priceKeywords = ['surge', 'rally', 'drop', 'crash', 'pump', 'dump', 'moon', 'dip', 'breakout', 'resistance', 'support'];
-        const institutionalKeywords = ['institutional', 'etf', 'sec', 'regulation', 'adoption', 'approval', 'wallstreet'];
-        const techKeywords = ['upgrade', 'fork', 'blockchain', 'defi', 'nft', 'layer2', 'scaling', 'security'];
-        
-        [...priceKeywords, ...institutionalKeywords, ...techKeywords].forEach(keyword => {
-            if (content.includes(keyword)) {
+        // Price, institutional and tech keywords, in lexicon order
+        Object.entries(NewsPipeline.lexicon.topic).forEach(([label, words]) => {
+            const matched = this.newsPipeline.matched(analysis.words, 'topic', label);
+            words.filter(keyword => matched.includes(keyword)).forEach(keyword => {
                 keywords.push(keyword.charAt(0).toUpperCase() + keyword.slice(1));
-            }
+            });
         });
         
         return keywords.length > 0 ? keywords : ['Market Update'];
     }
 
-    detectPriceAction(text) {
-        const content = text.toLowerCase();
-        
-        if (content.includes('surge') || content.includes('rally') || content.includes('moon') || content.includes('breakout')) {
-            return 'bullish';
-        } else if (content.includes('crash') || content.includes('drop') || content.includes('dump') || content.includes('fall')) {
-            return 'bearish';
-        } else if (content.includes('stable') || content.includes('consolidat') || content.includes('sideways')) {
-            return 'neutral';
-        }
-        
-        return 'mixed';
+    detectPriceAction(text, analysis = this.newsPipeline.analyze(text)) {
+        return this.newsPipeline.firstLabel(analysis.words, 'priceAction') || 'mixed';
     }
 
-    assessMarketImpact(text) {
-        const content = text.toLowerCase();
-        
-        if (content.includes('billion') || content.includes('trillion') || content.includes('massive') || content.includes('major')) {
-            return 'high';
-        } else if (content.includes('million') || content.includes('significant') || content.includes('notable')) {
-            return 'medium';
-        }
-        
-        return 'low';
+    assessMarketImpact(text, analysis = this.newsPipeline.analyze(text)) {
+        return this.newsPipeline.firstLabel(analysis.words, 'marketImpact') || 'low';
     }
 
     generateBitcoinSummary(keywords, priceAction, sentiment) {
@@ -7356,6 +7529,11 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
     }
 
     filterHighQualityNews(newsArray) {
+        // Scored articles are kept across fetches; their recency boost is as of now
+        newsArray.forEach(article => {
+            article.confidence = this.calculateConfidence(article);
+        });
+
         // Filter for high confidence (75%+) and high/critical impact news only
         const highQualityNews = newsArray.filter(article => {
             const hasHighConfidence = article.confidence >= 75;
@@ -7581,38 +7759,17 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
         }
     }
 
-    calculateNewsImpact(article) {
-        const title = article.title.toLowerCase();
-        const description = article.description.toLowerCase();
-        const content = title + ' ' + description;
-        
+    calculateNewsImpact(article, analysis = this.newsPipeline.analyzeArticle(article)) {
+        const pipeline = this.newsPipeline;
         let impactScore = 0;
         
-        // High impact keywords
-        const highImpactKeywords = [
-            'breaking', 'urgent', 'major', 'massive', 'huge', 'billion', 'trillion',
-            'sec', 'regulation', 'ban', 'approval', 'etf', 'institutional', 'adoption',
-            'hack', 'exploit', 'crash', 'surge', 'all-time high', 'ath', 'record'
-        ];
-        
-        // Medium impact keywords
-        const mediumImpactKeywords = [
-            'announce', 'launch', 'partnership', 'integration', 'upgrade', 'update',
-            'million', 'investment', 'funding', 'exchange', 'listing', 'support'
-        ];
-        
-        // Calculate impact score
-        highImpactKeywords.forEach(keyword => {
-            if (content.includes(keyword)) impactScore += 3;
-        });
-        
-        mediumImpactKeywords.forEach(keyword => {
-            if (content.includes(keyword)) impactScore += 1;
-        });
+        // High impact keywords count 3, medium impact keywords 1 (see NewsPipeline.lexicon.impact)
+        impactScore += pipeline.matched(analysis.words, 'impact', 'high').length * 3;
+        impactScore += pipeline.matched(analysis.words, 'impact', 'medium').length;
         
         // Bitcoin/Ethereum get higher impact
-        if (content.includes('bitcoin') || content.includes('btc')) impactScore += 2;
-        if (content.includes('ethereum') || content.includes('eth')) impactScore += 1;
+        if (pipeline.matched(analysis.words, 'category', 'bitcoin').length > 0) impactScore += 2;
+        if (pipeline.matched(analysis.words, 'category', 'ethereum').length > 0) impactScore += 1;
         
         // Determine impact level
         if (impactScore >= 8) return 'critical';
@@ -7622,6 +7779,13 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
     }
 
     calculateConfidence(article) {
+        const confidence = (article.sourceConfidence ?? this.calculateSourceConfidence(article)) +
+            this.calculateRecencyBoost(article);
+        return Math.min(95, Math.max(10, confidence));
+    }
+
+    // The part of confidence that never changes for an article
+    calculateSourceConfidence(article) {
         let confidence = 50; // Base confidence
         
         // Source reliability
@@ -7632,28 +7796,26 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
             confidence += 30;
         }
         
-        // Recency boost
-        const publishedDate = new Date(article.publishedAt);
-        const hoursAgo = (Date.now() - publishedDate.getTime()) / (1000 * 60 * 60);
-        
-        if (hoursAgo < 2) confidence += 20;
-        else if (hoursAgo < 24) confidence += 10;
-        else if (hoursAgo > 168) confidence -= 20; // Week old
-        
         // Content quality indicators
         if (article.description && article.description.length > 100) confidence += 10;
         if (article.imageUrl) confidence += 5;
         
-        return Math.min(95, Math.max(10, confidence));
+        return confidence;
     }
 
-    analyzeSentiment(text) {
-        const positiveWords = ['surge', 'rally', 'gain', 'bull', 'up', 'rise', 'growth', 'adoption', 'breakthrough'];
-        const negativeWords = ['crash', 'fall', 'bear', 'down', 'drop', 'decline', 'hack', 'ban', 'exploit'];
+    calculateRecencyBoost(article) {
+        const publishedDate = new Date(article.publishedAt);
+        const hoursAgo = (Date.now() - publishedDate.getTime()) / (1000 * 60 * 60);
         
-        const textLower = text.toLowerCase();
-        const positiveCount = positiveWords.filter(word => textLower.includes(word)).length;
-        const negativeCount = negativeWords.filter(word => textLower.includes(word)).length;
+        if (hoursAgo < 2) return 20;
+        if (hoursAgo < 24) return 10;
+        if (hoursAgo > 168) return -20; // Week old
+        return 0;
+    }
+
+    analyzeSentiment(text, analysis = this.newsPipeline.analyze(text)) {
+        const positiveCount = this.newsPipeline.matched(analysis.words, 'sentiment', 'positive').length;
+        const negativeCount = this.newsPipeline.matched(analysis.words, 'sentiment', 'negative').length;
         
         if (positiveCount > negativeCount) return 'positive';
         if (negativeCount > positiveCount) return 'negative';
@@ -7705,15 +7867,9 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
         ];
     }
 
-    categorizeNews(title) {
-        const titleLower = title.toLowerCase();
-        
-        if (titleLower.includes('bitcoin') || titleLower.includes('btc')) return 'bitcoin';
-        if (titleLower.includes('ethereum') || titleLower.includes('eth')) return 'ethereum';
-        if (titleLower.includes('regulation') || titleLower.includes('sec') || titleLower.includes('legal')) return 'regulation';
-        if (titleLower.includes('market') || titleLower.includes('price') || titleLower.includes('trading')) return 'market';
-        
-        return 'market'; // default category
+    categorizeNews(title, analysis = this.newsPipeline.analyze(title)) {
+        // bitcoin, ethereum, regulation, market - first match in the title wins
+        return this.newsPipeline.firstLabel(analysis.title, 'category') || 'market'; // default category
     }
 
     displayNews(newsData) {
@@ -7913,9 +8069,18 @@ SamCrypto AI remembers your preferences and conversation history to provide pers
     filterNews(category) {
         if (!this.currentNewsData) return;
         
-        const filteredNews = category === 'all' 
-            ? this.currentNewsData 
-            : this.currentNewsData.filter(article => article.category === category);
+        let filteredNews;
+        if (category === 'all') {
+            filteredNews = this.currentNewsData;
+        } else if (this.currentNewsRanks) {
+            // Index lookup: only articles in this category are touched, then kept in feed order
+            const ranks = this.currentNewsRanks;
+            filteredNews = this.newsPipeline.byCategory(category)
+                .filter(article => ranks.has(article.newsId))
+                .sort((a, b) => ranks.get(a.newsId) - ranks.get(b.newsId));
+        } else {
+            filteredNews = this.currentNewsData.filter(article => article.category === category);
+        }
             
         this.displayNews(filteredNews);
     }
@@ -0,0 +1,94 @@
+// 🌊 SSE Stream Reader - Incremental server-sent-event parsing for LLM APIs
+// Reads an OpenAI-compatible `stream: true` response (Cerebras, Perplexity)
+// chunk by chunk, forwarding each content delta as soon as it is decoded.
+// Aborting the request's AbortSignal stops the read mid-stream.
+
+class SSEStreamReader {
+    /**
+     * 📨 Yield the data payload of each SSE event as it arrives
+     */
+    static async *events(response) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let dataLines = [];
+
+        try {
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+
+                let newline;
+                while ((newline = buffer.indexOf('\n')) !== -1) {
+                    let line = buffer.slice(0, newline);
+                    buffer = buffer.slice(newline + 1);
+                    if (line.endsWith('\r')) line = line.slice(0, -1);
+
+                    // A blank line terminates the current event
+                    if (line === '') {
+                        if (dataLines.length > 0) {
+                            yield dataLines.join('\n');
+                            dataLines = [];
+                        }
+                    } else if (line.startsWith('data:')) {
+                        dataLines.push(line.slice(line.charAt(5) === ' ' ? 6 : 5));
+                    }
+                    // Comments (':') and event/id/retry fields are not used by these APIs
+                }
+            }
+
+            buffer += decoder.decode();
+            if (buffer.startsWith('data:')) dataLines.push(buffer.slice(buffer.charAt(5) === ' ' ? 6 : 5).trimEnd());
+            if (dataLines.length > 0) yield dataLines.join('\n');
+        } finally {
+            reader.releaseLock();
+        }
+    }
+
+    /**
+     * 💬 Assemble a chat completion from its stream of deltas
+     * @param {Function} onDelta - (text, fullTextSoFar) => void for each content chunk
+     * @returns {Promise<{content, finishReason, citations}>}
+     */
+    static async readChatCompletion(response, onDelta = null) {
+        let content = '';
+        let finishReason = null;
+        let citations = [];
+
+        for await (const data of SSEStreamReader.events(response)) {
+            if (data === '[DONE]') break;
+
+            let chunk;
+            try {
+                chunk = JSON.parse(data);
+            } catch (error) {
+                console.warn('⚠️ Skipping malformed stream chunk:', data.slice(0, 100));
+                continue;
+            }
+
+            if (chunk.error) {
+                throw new Error(chunk.error.message || 'Stream error');
+            }
+
+            const choice = chunk.choices && chunk.choices[0];
+            const delta = choice?.delta?.content ?? choice?.message?.content ?? '';
+            if (delta) {
+                content += delta;
+                if (onDelta) onDelta(delta, content);
+            }
+            if (choice?.finish_reason) finishReason = choice.finish_reason;
+            if (Array.isArray(chunk.citations)) citations = chunk.citations;
+        }
+
+        return { content, finishReason, citations };
+    }
+
+    static isEventStream(response) {
+        const contentType = response.headers.get('content-type') || '';
+        return !!response.body && contentType.includes('text/event-stream');
+    }
+}
+
+// Export for use in main application
+window.SSEStreamReader = SSEStreamReader;
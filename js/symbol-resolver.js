@@ -0,0 +1,187 @@
+// 🔎 Symbol Resolver - One coin registry + indexed Binance ticker lookups
+// Replaces the separate hard-coded coin/symbol tables and the linear
+// all-ticker scans with O(1) Map lookups built once per snapshot
+
+class SymbolResolver {
+    constructor() {
+        // Single source of truth for coin ids (CoinGecko), symbols and names.
+        // Extend with register() instead of adding new mapping tables.
+        this.coins = [
+            { id: 'bitcoin', symbol: 'BTC', name: 'Bitcoin' },
+            { id: 'ethereum', symbol: 'ETH', name: 'Ethereum' },
+            { id: 'solana', symbol: 'SOL', name: 'Solana' },
+            { id: 'binancecoin', symbol: 'BNB', name: 'BNB', aliases: ['binance'] },
+            { id: 'ripple', symbol: 'XRP', name: 'Ripple' },
+            { id: 'cardano', symbol: 'ADA', name: 'Cardano' },
+            { id: 'dogecoin', symbol: 'DOGE', name: 'Dogecoin' },
+            { id: 'polygon', symbol: 'MATIC', name: 'Polygon', aliases: ['matic-network'] },
+            { id: 'polkadot', symbol: 'DOT', name: 'Polkadot' },
+            { id: 'litecoin', symbol: 'LTC', name: 'Litecoin' },
+            { id: 'avalanche-2', symbol: 'AVAX', name: 'Avalanche', aliases: ['avalanche'] },
+            { id: 'chainlink', symbol: 'LINK', name: 'Chainlink' },
+            { id: 'tron', symbol: 'TRX', name: 'Tron' },
+            { id: 'stellar', symbol: 'XLM', name: 'Stellar' },
+            { id: 'cosmos', symbol: 'ATOM', name: 'Cosmos' },
+            { id: 'algorand', symbol: 'ALGO', name: 'Algorand' },
+            { id: 'filecoin', symbol: 'FIL', name: 'Filecoin' },
+            { id: 'vechain', symbol: 'VET', name: 'VeChain' },
+            { id: 'aptos', symbol: 'APT', name: 'Aptos' },
+            { id: 'injective-protocol', symbol: 'INJ', name: 'Injective', aliases: ['injective'] },
+            { id: 'near', symbol: 'NEAR', name: 'NEAR' },
+            { id: 'optimism', symbol: 'OP', name: 'Optimism' },
+            { id: 'arbitrum', symbol: 'ARB', name: 'Arbitrum' },
+            { id: 'sei-network', symbol: 'SEI', name: 'SEI', aliases: ['sei'] },
+            { id: 'sui', symbol: 'SUI', name: 'SUI' },
+            { id: 'jupiter-exchange-solana', symbol: 'JUP', name: 'Jupiter', aliases: ['jupiter'] },
+            { id: 'render-token', symbol: 'RENDER', name: 'Render', aliases: ['render'] },
+            { id: 'worldcoin-wld', symbol: 'WLD', name: 'Worldcoin', aliases: ['worldcoin'] },
+            { id: 'pepe', symbol: 'PEPE', name: 'PEPE' },
+            { id: 'shiba-inu', symbol: 'SHIB', name: 'Shiba Inu', aliases: ['shiba'] },
+            { id: 'ecash', symbol: 'XEC', name: 'eCash', aliases: ['bcha'] },
+            { id: 'bitcoin-cash', symbol: 'BCH', name: 'Bitcoin Cash' },
+            { id: 'uniswap', symbol: 'UNI', name: 'Uniswap' },
+            { id: 'fantom', symbol: 'FTM', name: 'Fantom' },
+            { id: 'hedera-hashgraph', symbol: 'HBAR', name: 'Hedera', aliases: ['hedera'] },
+            { id: 'apecoin', symbol: 'APE', name: 'ApeCoin' },
+            { id: 'monero', symbol: 'XMR', name: 'Monero' }
+        ];
+
+        // Quote assets used to split Binance symbols into base/quote (longest first)
+        this.quoteAssets = ['FDUSD', 'USDT', 'USDC', 'BUSD', 'TUSD', 'DAI', 'BTC', 'ETH', 'BNB', 'EUR', 'TRY', 'BRL', 'USD'];
+
+        // Preferred quote order when resolving a coin to a tradable pair
+        this.quotePreference = ['USDT', 'USD', 'BUSD', 'BTC', 'ETH'];
+
+        // Registry index: any lower-cased id/symbol/name/alias → coin entry
+        this.coinIndex = new Map();
+        this.coins.forEach(coin => this.indexCoin(coin));
+
+        // Ticker indexes, rebuilt once per all-ticker snapshot
+        this.tickerSnapshot = null;
+        this.tickersBySymbol = new Map();
+        this.tickersByBase = new Map();  // base → Map(quote → ticker)
+        this.tickersByQuote = new Map(); // quote → [tickers]
+    }
+
+    /**
+     * ➕ Register (or extend) a coin in the shared registry
+     */
+    register(coin) {
+        const entry = { aliases: [], ...coin, symbol: coin.symbol.toUpperCase() };
+        this.coins.push(entry);
+        this.indexCoin(entry);
+        return entry;
+    }
+
+    indexCoin(coin) {
+        const keys = [coin.id, coin.symbol, coin.name, ...(coin.aliases || [])];
+        keys.forEach(key => {
+            if (key) this.coinIndex.set(key.toLowerCase(), coin);
+        });
+    }
+
+    /**
+     * 🔍 Resolve any id, symbol, name or alias to its registry entry
+     */
+    resolve(coin) {
+        if (!coin) return null;
+        return this.coinIndex.get(String(coin).toLowerCase()) || null;
+    }
+
+    toCoinGeckoId(coin) {
+        const entry = this.resolve(coin);
+        return entry ? entry.id : String(coin).toLowerCase();
+    }
+
+    coinIdForSymbol(symbol) {
+        const entry = this.resolve(symbol);
+        return entry ? entry.id : null;
+    }
+
+    toBaseAsset(coin) {
+        const entry = this.resolve(coin);
+        return entry ? entry.symbol : String(coin).replace(/[^a-zA-Z0-9]/g, '').toUpperCase();
+    }
+
+    /**
+     * 🔄 Resolve a coin to its Binance pair, e.g. 'bitcoin' → 'BTCUSDT'
+     */
+    toBinanceSymbol(coin, quote = 'USDT') {
+        const base = this.toBaseAsset(coin);
+
+        // Prefer the live snapshot so we never return a pair Binance doesn't list
+        if (this.tickerSnapshot) {
+            const pairs = this.tickersByBase.get(base);
+            return pairs && pairs.has(quote) ? pairs.get(quote).symbol : null;
+        }
+
+        return this.resolve(coin) ? `${base}${quote}` : null;
+    }
+
+    /**
+     * 📇 Index an all-ticker snapshot (no-op if already indexed)
+     */
+    indexTickers(tickers) {
+        if (!Array.isArray(tickers) || tickers === this.tickerSnapshot) return;
+
+        const bySymbol = new Map();
+        const byBase = new Map();
+        const byQuote = new Map();
+
+        for (const ticker of tickers) {
+            bySymbol.set(ticker.symbol, ticker);
+
+            const split = this.splitSymbol(ticker.symbol);
+            if (!split) continue;
+
+            if (!byBase.has(split.base)) byBase.set(split.base, new Map());
+            byBase.get(split.base).set(split.quote, ticker);
+
+            if (!byQuote.has(split.quote)) byQuote.set(split.quote, []);
+            byQuote.get(split.quote).push(ticker);
+        }
+
+        this.tickerSnapshot = tickers;
+        this.tickersBySymbol = bySymbol;
+        this.tickersByBase = byBase;
+        this.tickersByQuote = byQuote;
+        console.log(`📇 Indexed ${bySymbol.size} Binance tickers (${byBase.size} base assets)`);
+    }
+
+    splitSymbol(symbol) {
+        for (const quote of this.quoteAssets) {
+            if (symbol.length > quote.length && symbol.endsWith(quote)) {
+                return { base: symbol.slice(0, -quote.length), quote };
+            }
+        }
+        return null;
+    }
+
+    /**
+     * ⚡ O(1) ticker lookup for a coin id, symbol, name or full pair
+     */
+    findTicker(coin, tickers = null) {
+        if (tickers) this.indexTickers(tickers);
+        if (!this.tickerSnapshot || !coin) return null;
+
+        // Full pair given directly (e.g. 'SOLUSDT')
+        const direct = this.tickersBySymbol.get(String(coin).toUpperCase());
+        if (direct && this.splitSymbol(direct.symbol)) return direct;
+
+        const pairs = this.tickersByBase.get(this.toBaseAsset(coin));
+        if (!pairs) return null;
+
+        for (const quote of this.quotePreference) {
+            if (pairs.has(quote)) return pairs.get(quote);
+        }
+        return null;
+    }
+
+    getTickersByQuote(quote) {
+        return this.tickersByQuote.get(quote) || [];
+    }
+}
+
+// Export shared instance for use across modules
+window.SymbolResolver = SymbolResolver;
+window.symbolResolver = new SymbolResolver();
@@ -6,6 +6,7 @@ class UserManager {
         this.currentUser = null;
         this.sessionKey = 'samcrypto_session';
         this.usersKey = 'samcrypto_users';
+        this.store = new UserStore({ legacyKey: this.usersKey });
         
         // Load users first (like loading from database)
         this.users = this.loadUsers();
@@ -16,47 +17,36 @@ class UserManager {
         this.setupEventListeners();
     }
 
-    // Load all users from localStorage (JSON storage)
+    // Load all users from localStorage (one record per user)
     loadUsers() {
-        try {
-            const usersData = localStorage.getItem(this.usersKey);
-            return usersData ? JSON.parse(usersData) : {};
-        } catch (error) {
-            console.error('Error loading users:', error);
-            return {};
-        }
+        return this.store.loadAll();
     }
 
     // Save users to localStorage (like SQL INSERT/UPDATE)
-    saveUsers() {
+    // Marks records dirty; UserStore coalesces them into one deferred write
+    saveUsers(userId = null) {
         try {
-            const usersJSON = JSON.stringify(this.users, null, 2);
-            localStorage.setItem(this.usersKey, usersJSON);
-            console.log('💾 Users database saved:', Object.keys(this.users).length, 'users');
-            
-            // Auto-backup to downloadable JSON every time we save
-            this.autoBackupToJSON();
+            this.store.markNewUsers(this.users);
+            this.store.markDirty(userId || this.currentUser?.id);
         } catch (error) {
             console.error('❌ Error saving users:', error);
         }
     }
+
+    // Save a single user record
+    saveUser(user) {
+        if (!user || !user.id) return;
+        this.users[user.id] = user;
+        if (this.currentUser && this.currentUser.id === user.id) {
+            this.currentUser = user;
+        }
+        this.saveUsers(user.id);
+    }
     
-    // Auto-backup users to data.json format (like SQL backup)
+    // Auto-backup users (incremental - only records changed since the last backup)
     autoBackupToJSON() {
-        try {
-            const backup = {
-                version: '1.0',
-                timestamp: new Date().toISOString(),
-                users: this.users,
-                totalUsers: Object.keys(this.users).length
-            };
-            
-            // Store backup in localStorage for recovery
-            localStorage.setItem('samcrypto_backup', JSON.stringify(backup));
-            console.log('📦 Auto-backup created');
-        } catch (error) {
-            console.error('❌ Backup failed:', error);
-        }
+        this.store.flush();
+        this.store.backup();
     }
     
     // Export database to data.json file (like SQL dump)
@@ -87,7 +77,7 @@ class UserManager {
             
             if (backup.users) {
                 this.users = backup.users;
-                this.saveUsers();
+                this.store.replaceAll(this.users);
                 this.showMessage(`Database imported! ${backup.totalUsers} users loaded.`, 'success');
                 console.log('📤 Database imported:', backup.totalUsers, 'users');
                 
@@ -389,7 +379,7 @@ class UserManager {
             user.lastLogin = Date.now();
             user.stats.lastActive = Date.now();
             this.users[user.id] = user; // Update in database
-            this.saveUsers(); // Save to localStorage + backup
+            this.saveUsers(user.id); // Save to localStorage + backup
             console.log('✅ User logged in:', user.email);
 
             // Set current user and session
@@ -0,0 +1,250 @@
+// 💾 User Store - Per-user sharded persistence with write coalescing
+// Each user lives under its own localStorage key, so saving one chat message
+// rewrites one compact record instead of the whole pretty-printed database.
+// Writes are marked dirty and flushed together on a short debounce / idle
+// callback; backups only copy the users that changed since the last backup.
+
+class UserStore {
+    constructor(options = {}) {
+        this.legacyKey = options.legacyKey || 'samcrypto_users';
+        this.indexKey = `${this.legacyKey}_index`;
+        this.userPrefix = `${this.legacyKey}_user_`;
+        this.backupKey = options.backupKey || 'samcrypto_backup';
+        this.backupPrefix = `${this.backupKey}_user_`;
+
+        // Flush shortly after the last change; backups on a slower cadence
+        this.flushDelay = options.flushDelay || 300;
+        this.backupInterval = options.backupInterval || 60000;
+
+        this.users = {};
+        this.persisted = new Set();
+        this.dirty = new Set();
+        this.backupDirty = new Set();
+        this.flushTimer = null;
+        this.backupTimer = null;
+
+        this.stats = {
+            flushes: 0,
+            writes: 0,
+            coalesced: 0,
+            bytesWritten: 0,
+            backups: 0
+        };
+
+        this.setupLifecycleFlush();
+    }
+
+    /**
+     * 📥 Load every user shard (migrating the legacy single-blob database once)
+     */
+    loadAll() {
+        try {
+            const index = localStorage.getItem(this.indexKey);
+            if (index === null) {
+                this.users = this.migrateLegacy();
+                return this.users;
+            }
+
+            const users = {};
+            for (const userId of JSON.parse(index)) {
+                const userData = localStorage.getItem(this.userPrefix + userId);
+                if (userData) {
+                    users[userId] = JSON.parse(userData);
+                    this.persisted.add(userId);
+                }
+            }
+            this.users = users;
+        } catch (error) {
+            console.error('Error loading users:', error);
+            this.users = {};
+        }
+        return this.users;
+    }
+
+    migrateLegacy() {
+        const legacyData = localStorage.getItem(this.legacyKey);
+        const users = legacyData ? JSON.parse(legacyData) : {};
+
+        this.users = users;
+        Object.keys(users).forEach(userId => this.dirty.add(userId));
+        this.flush();
+
+        if (legacyData) {
+            localStorage.removeItem(this.legacyKey);
+            console.log('🔀 Migrated users database to per-user records:', Object.keys(users).length, 'users');
+        }
+        return users;
+    }
+
+    /**
+     * ✏️ Mark a user as changed; the write happens on the next flush
+     */
+    markDirty(userId) {
+        if (!userId) return;
+        if (this.dirty.has(userId)) {
+            this.stats.coalesced++;
+        } else {
+            this.dirty.add(userId);
+        }
+        this.scheduleFlush();
+    }
+
+    /**
+     * 🔍 Pick up users added to the map directly (not yet in the index)
+     */
+    markNewUsers(users) {
+        this.users = users;
+        for (const userId of Object.keys(users)) {
+            if (!this.persisted.has(userId) && !this.dirty.has(userId)) {
+                this.markDirty(userId);
+            }
+        }
+    }
+
+    /**
+     * 🔁 Replace the whole database (import) - every user becomes dirty
+     */
+    replaceAll(users) {
+        Object.keys(this.users)
+            .filter(userId => !users[userId])
+            .forEach(userId => {
+                localStorage.removeItem(this.userPrefix + userId);
+                this.persisted.delete(userId);
+            });
+
+        this.users = users;
+        Object.keys(users).forEach(userId => this.dirty.add(userId));
+        this.flush();
+    }
+
+    scheduleFlush() {
+        if (this.flushTimer) return;
+
+        this.flushTimer = setTimeout(() => {
+            if (typeof requestIdleCallback === 'function') {
+                requestIdleCallback(() => this.flush(), { timeout: 1000 });
+            } else {
+                this.flush();
+            }
+        }, this.flushDelay);
+    }
+
+    /**
+     * 💾 Write all dirty users (compact JSON) and the index
+     */
+    flush() {
+        clearTimeout(this.flushTimer);
+        this.flushTimer = null;
+        if (this.dirty.size === 0) return;
+
+        const dirtyUsers = [...this.dirty];
+        this.dirty.clear();
+
+        for (const userId of dirtyUsers) {
+            const user = this.users[userId];
+            try {
+                if (user) {
+                    const userJSON = JSON.stringify(user);
+                    localStorage.setItem(this.userPrefix + userId, userJSON);
+                    this.persisted.add(userId);
+                    this.stats.bytesWritten += userJSON.length * 2;
+                } else {
+                    localStorage.removeItem(this.userPrefix + userId);
+                    this.persisted.delete(userId);
+                }
+                this.stats.writes++;
+                this.backupDirty.add(userId);
+            } catch (error) {
+                console.error('❌ Error saving user:', userId, error);
+            }
+        }
+
+        try {
+            localStorage.setItem(this.indexKey, JSON.stringify(Object.keys(this.users)));
+        } catch (error) {
+            console.error('❌ Error saving users index:', error);
+        }
+
+        this.stats.flushes++;
+        console.log(`💾 Saved ${dirtyUsers.length} user record(s)`);
+        this.scheduleBackup();
+    }
+
+    scheduleBackup() {
+        if (this.backupTimer) return;
+        this.backupTimer = setTimeout(() => this.backup(), this.backupInterval);
+    }
+
+    /**
+     * 📦 Incremental backup: copy only users changed since the last backup
+     */
+    backup() {
+        clearTimeout(this.backupTimer);
+        this.backupTimer = null;
+        if (this.backupDirty.size === 0) return;
+
+        const timestamp = new Date().toISOString();
+        let manifest = null;
+        try {
+            manifest = JSON.parse(localStorage.getItem(this.backupKey));
+        } catch (error) {
+            manifest = null;
+        }
+        // Older backups held the full database in this key
+        if (!manifest || manifest.version !== '2.0') {
+            manifest = { version: '2.0', users: {} };
+        }
+
+        try {
+            for (const userId of this.backupDirty) {
+                const user = this.users[userId];
+                if (user) {
+                    localStorage.setItem(this.backupPrefix + userId, JSON.stringify(user));
+                    manifest.users[userId] = timestamp;
+                } else {
+                    localStorage.removeItem(this.backupPrefix + userId);
+                    delete manifest.users[userId];
+                }
+            }
+
+            manifest.timestamp = timestamp;
+            manifest.totalUsers = Object.keys(manifest.users).length;
+            localStorage.setItem(this.backupKey, JSON.stringify(manifest));
+
+            this.stats.backups++;
+            console.log(`📦 Incremental backup: ${this.backupDirty.size} user(s)`);
+            this.backupDirty.clear();
+        } catch (error) {
+            console.error('❌ Backup failed:', error);
+        }
+    }
+
+    /**
+     * 🚪 Never lose pending writes when the tab is hidden or closed
+     */
+    setupLifecycleFlush() {
+        if (typeof window === 'undefined' || typeof document === 'undefined') return;
+
+        const flushNow = () => {
+            this.flush();
+            this.backup();
+        };
+        window.addEventListener('beforeunload', flushNow);
+        window.addEventListener('pagehide', flushNow);
+        document.addEventListener('visibilitychange', () => {
+            if (document.visibilityState === 'hidden') flushNow();
+        });
+    }
+
+    getStats() {
+        return {
+            ...this.stats,
+            users: Object.keys(this.users).length,
+            pending: this.dirty.size,
+            pendingBackup: this.backupDirty.size
+        };
+    }
+}
+
+// Export for use in main application
+window.UserStore = UserStore;
@@ -0,0 +1,262 @@
+// 🪟 Virtual Transcript - Windowed rendering for long chat sessions
+// Only the messages near the viewport (plus an overscan margin) are in the
+// DOM. Messages outside the window are removed and replaced by two spacers
+// sized to their measured heights, so the scrollbar and scroll position stay
+// exactly as if every message were rendered. Removed messages are rebuilt
+// from their content when they scroll back into view.
+
+class VirtualTranscript {
+    constructor(container, options = {}) {
+        this.container = container;
+        this.renderItem = options.renderItem;          // item => element
+        this.overscan = options.overscan || 1200;      // px kept above and below the viewport
+        this.minItems = options.minItems || 40;        // Below this, everything stays rendered
+        this.estimatedHeight = options.estimatedHeight || 160;
+        this.topThreshold = options.topThreshold || 300;
+        this.onReachTop = options.onReachTop || null;
+
+        // { id, sender, content, html, element, height, pinned }
+        this.items = [];
+        this.nextId = 1;
+        this.gap = null; // Vertical margin between messages, read once from CSS
+
+        this.topSpacer = this.createSpacer();
+        this.bottomSpacer = this.createSpacer();
+
+        this.frameRequested = false;
+        this.loadingOlder = false;
+        this.container.addEventListener('scroll', () => this.scheduleUpdate(), { passive: true });
+        window.addEventListener('resize', () => this.scheduleUpdate());
+    }
+
+    createSpacer() {
+        const spacer = document.createElement('div');
+        spacer.className = 'transcript-spacer';
+        spacer.setAttribute('aria-hidden', 'true');
+        return spacer;
+    }
+
+    /**
+     * 📐 Spacers live after the welcome message / typing indicator; re-add them after the container was cleared
+     */
+    ensureSpacers() {
+        if (this.topSpacer.parentNode !== this.container) {
+            this.container.appendChild(this.topSpacer);
+        }
+        if (this.bottomSpacer.parentNode !== this.container) {
+            this.container.appendChild(this.bottomSpacer);
+        }
+    }
+
+    /**
+     * ➕ Add a message at the end; pass `element` when the caller already built (and is animating) it
+     */
+    append(data, element = null) {
+        this.ensureSpacers();
+        const item = { id: this.nextId++, height: 0, pinned: false, ...data, element: null };
+        this.items.push(item);
+
+        item.element = element || this.renderItem(item);
+        this.container.insertBefore(item.element, this.bottomSpacer);
+        this.scheduleUpdate();
+        return item;
+    }
+
+    /**
+     * ⬆️ Add older messages before the first one, keeping the current view in place
+     */
+    prepend(dataList) {
+        if (dataList.length === 0) return [];
+        this.ensureSpacers();
+
+        const added = dataList.map(data => ({
+            id: this.nextId++, height: this.estimatedHeight, pinned: false, ...data, element: null
+        }));
+        this.items = added.concat(this.items);
+
+        // They start out unrendered inside the top spacer; shift the view down by the same amount
+        const addedHeight = added.length * this.estimatedHeight;
+        this.setSpacerHeight(this.topSpacer, this.spacerHeight(this.topSpacer) + addedHeight);
+        this.container.scrollTop += addedHeight;
+
+        this.update();
+        return added;
+    }
+
+    remove(item) {
+        const index = this.items.indexOf(item);
+        if (index !== -1) this.items.splice(index, 1);
+        if (item.element) item.element.remove();
+        item.element = null;
+        this.scheduleUpdate();
+    }
+
+    /**
+     * 📌 Pinned messages (typing / streaming) are never removed from the DOM
+     */
+    pin(item) {
+        item.pinned = true;
+    }
+
+    unpin(item) {
+        item.pinned = false;
+        this.scheduleUpdate();
+    }
+
+    reset() {
+        this.items.forEach(item => item.element && item.element.remove());
+        this.items = [];
+        this.setSpacerHeight(this.topSpacer, 0);
+        this.setSpacerHeight(this.bottomSpacer, 0);
+        this.loadingOlder = false;
+    }
+
+    scheduleUpdate() {
+        if (this.frameRequested) return;
+        this.frameRequested = true;
+        requestAnimationFrame(() => {
+            this.frameRequested = false;
+            this.update();
+        });
+    }
+
+    /**
+     * 🔄 Reconcile the rendered window with the viewport
+     */
+    update() {
+        if (!this.container.isConnected || this.items.length === 0) return;
+
+        // Reads first: heights of everything currently rendered
+        this.measure();
+
+        if (this.onReachTop && !this.loadingOlder && this.container.scrollTop < this.topThreshold) {
+            this.loadOlder();
+        }
+
+        if (this.items.length < this.minItems) {
+            this.renderRange(0, this.items.length - 1);
+            return;
+        }
+
+        const origin = this.topSpacer.offsetTop;
+        const viewTop = this.container.scrollTop - origin - this.overscan;
+        const viewBottom = this.container.scrollTop + this.container.clientHeight - origin + this.overscan;
+
+        let first = -1;
+        let last = -1;
+        let offset = 0;
+        this.items.forEach((item, index) => {
+            const top = offset;
+            offset += item.height || this.estimatedHeight;
+            const visible = offset >= viewTop && top <= viewBottom;
+            if (visible || item.pinned) {
+                if (first === -1) first = index;
+                last = index;
+            }
+        });
+
+        // Scrolled past everything (e.g. mid-resize) - keep the last messages
+        if (first === -1) {
+            first = Math.max(0, this.items.length - 1);
+            last = this.items.length - 1;
+        }
+
+        this.renderRange(first, last);
+    }
+
+    measure() {
+        if (this.gap === null) {
+            const sample = this.items.find(item => item.element && item.element.isConnected);
+            if (sample) {
+                const style = getComputedStyle(sample.element);
+                this.gap = (parseFloat(style.marginTop) || 0) + (parseFloat(style.marginBottom) || 0);
+            }
+        }
+
+        this.items.forEach(item => {
+            if (item.element && item.element.isConnected) {
+                item.height = item.element.offsetHeight + (this.gap || 0);
+            }
+        });
+    }
+
+    renderRange(first, last) {
+        const scrollTop = this.container.scrollTop;
+        let above = 0;
+        let below = 0;
+        let correction = 0;
+
+        // Detach everything outside [first, last]
+        this.items.forEach((item, index) => {
+            if (index >= first && index <= last) return;
+            if (index < first) above += item.height || this.estimatedHeight;
+            else below += item.height || this.estimatedHeight;
+            if (item.element) {
+                item.element.remove();
+                item.element = null;
+            }
+        });
+
+        // Attach what is missing inside it, in order
+        let anchor = this.bottomSpacer;
+        for (let index = last; index >= first; index--) {
+            const item = this.items[index];
+            if (!item.element) {
+                item.element = this.renderItem(item);
+                item.element.classList.add('virtual-restored');
+                this.container.insertBefore(item.element, anchor);
+                item.fresh = true;
+            }
+            anchor = item.element;
+        }
+
+        this.setSpacerHeight(this.topSpacer, above);
+        this.setSpacerHeight(this.bottomSpacer, below);
+
+        // Rebuilt messages above the viewport replace an estimate - keep the visible content still
+        const origin = this.topSpacer.offsetTop + above;
+        let offset = 0;
+        for (let index = first; index <= last; index++) {
+            const item = this.items[index];
+            const estimate = item.height || this.estimatedHeight;
+            if (item.fresh) {
+                item.fresh = false;
+                item.height = item.element.offsetHeight + (this.gap || 0);
+                if (origin + offset + estimate <= scrollTop) correction += item.height - estimate;
+            }
+            offset += item.height;
+        }
+
+        if (correction !== 0) {
+            this.container.scrollTop = scrollTop + correction;
+        }
+    }
+
+    async loadOlder() {
+        this.loadingOlder = true;
+        try {
+            const loaded = await this.onReachTop();
+            if (loaded === false) this.onReachTop = null; // Nothing older left
+        } finally {
+            this.loadingOlder = false;
+        }
+    }
+
+    spacerHeight(spacer) {
+        return parseFloat(spacer.style.height) || 0;
+    }
+
+    setSpacerHeight(spacer, height) {
+        spacer.style.height = `${Math.max(0, Math.round(height))}px`;
+    }
+
+    getStats() {
+        return {
+            messages: this.items.length,
+            rendered: this.items.filter(item => item.element).length
+        };
+    }
+}
+
+// Export for use in main application
+window.VirtualTranscript = VirtualTranscript;
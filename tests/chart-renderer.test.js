@@ -0,0 +1,57 @@
+// 📉 ChartCore - LTTB downsampling
+const assert = require('assert');
+const { load, test, run, random, quiet } = require('./helpers');
+
+quiet();
+load('chart-renderer.js');
+
+function series(n, valueAt) {
+    const times = new Float64Array(n);
+    const values = new Float64Array(n);
+    for (let i = 0; i < n; i++) {
+        times[i] = 1700000000000 + i * 60000;
+        values[i] = valueAt(i);
+    }
+    return { times, values };
+}
+
+test('keeps the threshold number of points, first and last included, in time order', () => {
+    const next = random(3);
+    const { times, values } = series(10000, () => next() * 100);
+    const sampled = ChartCore.lttb(times, values, 300);
+
+    assert.strictEqual(sampled.times.length, 300);
+    assert.strictEqual(sampled.values.length, 300);
+    assert.strictEqual(sampled.times[0], times[0]);
+    assert.strictEqual(sampled.times[299], times[9999]);
+    for (let i = 1; i < 300; i++) assert.ok(sampled.times[i] > sampled.times[i - 1]);
+
+    // Every kept point is a real point of the input
+    const index = new Map();
+    times.forEach((time, i) => index.set(time, i));
+    sampled.times.forEach((time, i) => assert.strictEqual(sampled.values[i], values[index.get(time)]));
+});
+
+test('preserves isolated spikes that plain decimation would drop', () => {
+    const { times, values } = series(10000, i => Math.sin(i / 100) + (i === 5001 ? 10 : 0) - (i === 7333 ? 10 : 0));
+    const sampled = ChartCore.lttb(times, values, 200);
+    assert.strictEqual(ChartCore.bounds(sampled.values).max, ChartCore.bounds(values).max);
+    assert.strictEqual(ChartCore.bounds(sampled.values).min, ChartCore.bounds(values).min);
+});
+
+test('returns a copy of short series untouched', () => {
+    const { times, values } = series(50, i => i);
+    const sampled = ChartCore.lttb(times, values, 300);
+    assert.deepStrictEqual([...sampled.values], [...values]);
+    assert.notStrictEqual(sampled.values, values);
+    assert.strictEqual(ChartCore.lttb(times, values, 2).values.length, 50);
+});
+
+test('bounds handles series longer than the argument limit', () => {
+    const { values } = series(300000, i => i % 1000);
+    const bounds = ChartCore.bounds(values);
+    assert.strictEqual(bounds.min, 0);
+    assert.strictEqual(bounds.max, 999);
+});
+
+run();
@@ -0,0 +1,43 @@
+// 🧵 ConversationContextManager - budgeted history packing
+const assert = require('assert');
+const { load, test, run, quiet } = require('./helpers');
+
+quiet();
+load('prompt-builder.js', 'conversation-context.js');
+
+// One token per word keeps budgets easy to reason about
+const manager = () => new ConversationContextManager({
+    estimateTokens: text => (String(text).match(/\S+/g) || []).length,
+    maxMessageTokens: 1000
+});
+const words = (count, word) => Array(count).fill(word).join(' ');
+
+test('recent turns that fit go in whole, oldest omitted first', () => {
+    const history = [
+        { role: 'user', content: words(40, 'old') },
+        { role: 'assistant', content: words(40, 'old') },
+        { role: 'user', content: 'eth price?' },
+        { role: 'assistant', content: words(30, 'reply') }
+    ];
+    const packed = manager().pack(history, 'and now?', 60);
+    assert.deepStrictEqual(packed.messages.map(message => message.content), ['eth price?', words(30, 'reply')]);
+    assert.strictEqual(packed.omitted, 2);
+});
+
+test('an oversized newest turn keeps the question whole and clips the reply', () => {
+    const question = words(50, 'question');
+    const history = [
+        { role: 'user', content: question },
+        { role: 'assistant', content: Array(50).fill(words(10, 'reply')).join('\n') }
+    ];
+    const packed = manager().pack(history, 'next', 200);
+
+    assert.strictEqual(packed.messages[0].role, 'user');
+    assert.strictEqual(packed.messages[0].content, question);
+    assert.strictEqual(packed.messages[1].role, 'assistant');
+    assert.ok(packed.messages[1].content.length < history[1].content.length);
+    assert.ok(packed.messages[1].content.startsWith('reply reply'));
+    assert.ok(packed.tokens <= 200);
+});
+
+run();
@@ -0,0 +1,61 @@
+// 🧪 Test helpers - run the browser modules under plain Node
+// Each module is evaluated as a classic script with `window` pointing at the
+// global object, so its `window.X = X` exports become globals, exactly as in
+// the page. Tests run in order; any failure makes the process exit non-zero.
+
+const fs = require('fs');
+const path = require('path');
+const vm = require('vm');
+
+global.window = global;
+
+function load(...files) {
+    for (const file of files) {
+        const filename = path.join(__dirname, '..', 'js', file);
+        vm.runInThisContext(fs.readFileSync(filename, 'utf8'), { filename });
+    }
+}
+
+const tests = [];
+// Captured before quiet() mutes the modules' logging
+const report = console.log.bind(console);
+
+function test(name, fn) {
+    tests.push({ name, fn });
+}
+
+async function run() {
+    let failed = 0;
+    for (const { name, fn } of tests) {
+        try {
+            await fn();
+            report(`  ✓ ${name}`);
+        } catch (error) {
+            failed++;
+            report(`  ✗ ${name}`);
+            report(error.stack.split('\n').map(line => `    ${line}`).join('\n'));
+        }
+    }
+    report(`${tests.length - failed}/${tests.length} passed`);
+    // A failed test may leave the module's timers running
+    process.exit(failed > 0 ? 1 : 0);
+}
+
+// Deterministic PRNG (mulberry32) so fuzz tests are reproducible
+function random(seed = 1) {
+    return () => {
+        seed = (seed + 0x6d2b79f5) | 0;
+        let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+        t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+    };
+}
+
+const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+
+// Silence the modules' progress logging so only test results are printed
+function quiet() {
+    console.log = console.info = console.warn = console.error = () => {};
+}
+
+module.exports = { load, test, run, random, sleep, quiet };
@@ -0,0 +1,92 @@
+// 🔎 KeywordMatcher + MessageAnalyzer - word boundaries, stems, coin aliases
+const assert = require('assert');
+const { load, test, run, quiet } = require('./helpers');
+
+quiet();
+load('keyword-matcher.js', 'symbol-resolver.js', 'message-analyzer.js');
+
+const texts = matches => matches.map(match => match.text);
+const coinIds = text => messageAnalyzer.analyze(text).coins.map(mention => mention.coin.id);
+
+test('matches start and whole words end at a word boundary', () => {
+    const matcher = new KeywordMatcher().add('op', 'op').add('eth', 'eth');
+    assert.deepStrictEqual(texts(matcher.scan('option stop eth')), ['eth']);
+    assert.deepStrictEqual(texts(matcher.scan('OP, eth! (op)')), ['OP', 'eth', 'op']);
+    assert.deepStrictEqual(texts(matcher.scan('ethereum method')), []);
+});
+
+test('stems are prefixes: they run on but never start mid-word', () => {
+    const matcher = new KeywordMatcher()
+        .add('trade', 'trade', { wholeWord: false })
+        .add('consolidat', 'consolidat', { wholeWord: false });
+    assert.deepStrictEqual(texts(matcher.scan('trader consolidation')), ['trade', 'consolidat']);
+    assert.deepStrictEqual(texts(matcher.scan('trading')), []);
+    assert.deepStrictEqual(texts(matcher.scan('untrade')), []);
+});
+
+test('overlapping patterns are all reported, longest first at the same start', () => {
+    const matcher = new KeywordMatcher().add('bitcoin', 1).add('bitcoin cash', 2).add('cash', 3);
+    const matches = matcher.scan('bitcoin cash');
+    assert.deepStrictEqual(matches.map(match => match.value), [2, 1, 3]);
+    assert.deepStrictEqual(matches.map(match => [match.start, match.end]), [[0, 12], [0, 7], [8, 12]]);
+});
+
+test('case-sensitive patterns only match their exact case', () => {
+    const matcher = new KeywordMatcher().add('NEAR', 'near', { caseSensitive: true });
+    assert.deepStrictEqual(texts(matcher.scan('is NEAR near Near?')), ['NEAR']);
+});
+
+test('coins resolve by id, ticker, name and alias, in order of first mention', () => {
+    assert.deepStrictEqual(coinIds('BTC vs Ethereum vs sol, then btc again'), ['bitcoin', 'ethereum', 'solana']);
+    assert.deepStrictEqual(coinIds('thoughts on avalanche and shiba?'), ['avalanche-2', 'shiba-inu']);
+    assert.deepStrictEqual(coinIds('binance coin and jupiter'), ['binancecoin', 'jupiter-exchange-solana']);
+    assert.strictEqual(messageAnalyzer.lookupCoin('XMR').id, 'monero');
+    assert.strictEqual(messageAnalyzer.lookupCoin('nothing'), null);
+});
+
+test('the longest coin match wins where names overlap', () => {
+    assert.deepStrictEqual(coinIds('is bitcoin cash dead?'), ['bitcoin-cash']);
+    assert.deepStrictEqual(coinIds('bitcoin cash or bitcoin'), ['bitcoin-cash', 'bitcoin']);
+});
+
+test('tickers that are English words need caps or a $ prefix', () => {
+    assert.deepStrictEqual(coinIds('price is near the link I sent, dot dot dot'), []);
+    assert.deepStrictEqual(coinIds('NEAR and $link and DOT'), ['near', 'chainlink', 'polkadot']);
+    assert.deepStrictEqual(coinIds('chainlink'), ['chainlink']);
+});
+
+test('mentionId is the coin id for names and the ticker otherwise', () => {
+    const [byName, byTicker] = messageAnalyzer.analyze('bitcoin and eth').coins;
+    assert.strictEqual(messageAnalyzer.mentionId(byName), 'bitcoin');
+    assert.strictEqual(messageAnalyzer.mentionId(byTicker), 'eth');
+});
+
+test('keyword groups are scanned as stems and ranked by dictionary order', () => {
+    const result = messageAnalyzer.analyze('Should I keep trading SOL? Analyzing the chart now');
+    assert.ok(messageAnalyzer.has(result, 'intent', 'trade_advice'));
+    assert.ok(messageAnalyzer.has(result, 'intent', 'analysis'));
+    assert.ok(messageAnalyzer.has(result, 'topic', 'trade'));
+    assert.ok(messageAnalyzer.has(result, 'urgency', 'urgent'));
+    assert.strictEqual(messageAnalyzer.firstLabel(result, 'intent'), 'trade_advice');
+    assert.strictEqual(messageAnalyzer.firstLabel(result, 'sentiment'), null);
+});
+
+test('the coin list follows the symbol registry', () => {
+    const registry = new SymbolResolver();
+    registry.register({ id: 'testcoin', symbol: 'TSTC', name: 'Testcoin', aliases: ['tester'] });
+    const analyzer = new MessageAnalyzer(MessageAnalyzer.dictionary, registry);
+    ['tstc', 'Tester', 'TESTCOIN'].forEach(text => {
+        assert.deepStrictEqual(analyzer.analyze(text).coins.map(mention => mention.coin.id), ['testcoin'], text);
+    });
+    assert.deepStrictEqual(MessageAnalyzer.coinsFrom(registry).find(coin => coin.id === 'testcoin'),
+        { id: 'testcoin', symbol: 'tstc', name: 'Testcoin', aliases: ['tester'] });
+});
+
+test('repeated messages are served from the cache', () => {
+    const analyzer = new MessageAnalyzer();
+    const first = analyzer.analyze('eth price');
+    assert.strictEqual(analyzer.analyze('eth price'), first);
+    assert.deepStrictEqual({ scans: analyzer.stats.scans, cacheHits: analyzer.stats.cacheHits }, { scans: 1, cacheHits: 1 });
+});
+
+run();
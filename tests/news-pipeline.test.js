@@ -0,0 +1,108 @@
+// 📰 NewsPipeline - hedged fetch, cross-source dedup, keyword index
+const assert = require('assert');
+const { load, test, run, sleep, quiet } = require('./helpers');
+
+quiet();
+load('keyword-matcher.js', 'symbol-resolver.js', 'message-analyzer.js', 'news-pipeline.js');
+
+const now = Date.now();
+const article = (title, url, minutesAgo = 0, description = '') => ({
+    title, url, description, publishedAt: new Date(now - minutesAgo * 60000).toISOString(), source: { name: 'Test' }
+});
+
+const etf = article('Bitcoin ETF approval sparks massive rally', 'https://www.coindesk.com/a?utm=1', 5,
+    'Institutional adoption surges as the SEC signs off');
+const upgrade = article('Ethereum upgrade goes live', 'https://example.com/eth', 10, 'Developers announce the fork');
+const hack = article('Solana DeFi protocol hit by exploit', 'https://example.com/sol', 1);
+
+const source = (name, delay, result) => ({
+    name,
+    calls: 0,
+    async fetch() {
+        this.calls++;
+        await sleep(delay);
+        if (result instanceof Error) throw result;
+        return result;
+    }
+});
+
+test('dedups by normalized URL and by normalized title', () => {
+    const pipeline = new NewsPipeline();
+    assert.strictEqual(pipeline.ingest([etf, upgrade]).length, 2);
+
+    const stored = pipeline.ingest([
+        { ...etf, url: 'http://coindesk.com/a/', source: { name: 'Other' } },       // same URL
+        article('bitcoin ETF APPROVAL sparks massive rally!', '#'),                 // same title
+        hack
+    ]);
+    assert.strictEqual(stored.length, 2);
+    assert.strictEqual(stored[0].newsId, pipeline.ingest([etf])[0].newsId);
+    assert.strictEqual(pipeline.articles.size, 3);
+    assert.strictEqual(pipeline.stats.duplicates, 3);
+    assert.strictEqual(pipeline.stats.scored, 3);
+});
+
+test('indexes articles by coin and keyword, newest first', () => {
+    const pipeline = new NewsPipeline();
+    pipeline.ingest([etf, upgrade, hack]);
+
+    assert.deepStrictEqual(pipeline.byCoin('bitcoin').map(a => a.title), [etf.title]);
+    assert.deepStrictEqual(pipeline.byCoin('solana').map(a => a.title), [hack.title]);
+    assert.deepStrictEqual(pipeline.lookup('keyword:etf').map(a => a.title), [etf.title]);
+    assert.deepStrictEqual(pipeline.all().map(a => a.title), [hack.title, etf.title, upgrade.title]);
+    assert.deepStrictEqual(pipeline.byCoin('cardano'), []);
+});
+
+test('eviction drops the oldest articles from every index', () => {
+    const pipeline = new NewsPipeline({ maxArticles: 2 });
+    pipeline.ingest([etf, upgrade, hack]);
+
+    assert.strictEqual(pipeline.articles.size, 2);
+    assert.deepStrictEqual(pipeline.byCoin('bitcoin'), []);
+    assert.strictEqual(pipeline.lookup('keyword:etf').length, 0);
+    // Its dedup keys are gone too, so it can come back
+    assert.strictEqual(pipeline.ingest([etf])[0].title, etf.title);
+    assert.strictEqual(pipeline.stats.scored, 4);
+});
+
+test('a slow source is hedged and the faster one wins; its late answer is merged', async () => {
+    const pipeline = new NewsPipeline({ hedgeDelay: 20 });
+    const slow = source('slow', 80, [etf, upgrade]);
+    const fast = source('fast', 5, [etf]);
+
+    const result = await pipeline.fetchHedged([slow, fast]);
+    assert.strictEqual(result.source, 'fast');
+    assert.deepStrictEqual(result.articles.map(a => a.title), [etf.title]);
+
+    await sleep(100);
+    assert.strictEqual(pipeline.stats.lateMerges, 1);
+    assert.strictEqual(pipeline.articles.size, 2);
+    assert.deepStrictEqual(pipeline.stats.wins, { fast: 1 });
+});
+
+test('failed or empty sources start the next one without waiting for the hedge', async () => {
+    const pipeline = new NewsPipeline({ hedgeDelay: 1000 });
+    const sources = [
+        source('broken', 1, new Error('HTTP 500')),
+        source('empty', 1, []),
+        source('good', 1, [hack]),
+        source('unused', 1, [upgrade])
+    ];
+
+    const started = Date.now();
+    const result = await pipeline.fetchHedged(sources);
+    assert.strictEqual(result.source, 'good');
+    assert.ok(Date.now() - started < 500);
+    assert.strictEqual(sources[3].calls, 0);
+});
+
+test('resolves null when no source has articles', async () => {
+    const pipeline = new NewsPipeline({ hedgeDelay: 5 });
+    assert.strictEqual(await pipeline.fetchHedged([]), null);
+    assert.strictEqual(await pipeline.fetchHedged([
+        source('empty', 1, []),
+        source('broken', 1, new Error('offline'))
+    ]), null);
+});
+
+run();
@@ -0,0 +1,168 @@
+// 📚 OrderBookEngine - snapshot/diff sync, bridging, gap recovery
+const assert = require('assert');
+const { load, test, run, random, sleep, quiet } = require('./helpers');
+
+// The engine's socket and REST client, replaced by in-memory fakes
+class FakeStream {
+    constructor() {
+        this.isConnected = true;
+        this.handler = null;
+        this.symbols = [];
+    }
+    track(owner, symbols, handler) {
+        this.symbols = symbols;
+        this.handler = handler;
+    }
+    onStatus(callback) {
+        this.statusCallback = callback;
+    }
+    getStats() {
+        return {};
+    }
+    emit(diff) {
+        this.handler(diff);
+    }
+}
+
+class FakeScheduler {
+    constructor() {
+        this.snapshots = [];
+        this.requests = 0;
+    }
+    async fetch() {
+        this.requests++;
+        const snapshot = this.snapshots.shift();
+        if (!snapshot) return { ok: false, status: 503 };
+        return { ok: true, json: async () => snapshot };
+    }
+}
+
+global.fetchScheduler = new FakeScheduler();
+global.MarketStreamHub = FakeStream;
+quiet();
+load('order-book-engine.js');
+
+function createEngine() {
+    const stream = new FakeStream();
+    const engine = new OrderBookEngine({ stream, retryDelay: 5 });
+    engine.scheduler = new FakeScheduler();
+    return { engine, stream, scheduler: engine.scheduler };
+}
+
+// Stop the idle sweep so the process can exit
+function dispose(engine) {
+    engine.books.clear();
+    engine.sweepIdle();
+}
+
+const diff = (firstUpdateId, finalUpdateId, bids = [], asks = []) => ({
+    symbol: 'BTCUSDT', eventTime: 1, firstUpdateId, finalUpdateId, bids, asks
+});
+
+const snapshot = lastUpdateId => ({
+    lastUpdateId,
+    bids: [['100', '1'], ['99', '2'], ['98', '3']],
+    asks: [['101', '1'], ['102', '2']]
+});
+
+test('OrderBookSide keeps the best price and level count under random updates', () => {
+    const next = random(42);
+    const side = new OrderBookSide(-1, 500);
+    const reference = new Map();
+
+    for (let i = 0; i < 20000; i++) {
+        const price = Math.round(next() * 200) / 2;
+        const quantity = next() < 0.3 ? 0 : next();
+        side.update(price, quantity);
+        if (quantity > 0) reference.set(price, quantity);
+        else reference.delete(price);
+    }
+
+    const prices = [...reference.keys()].sort((a, b) => a - b);
+    assert.strictEqual(side.count, reference.size);
+    assert.strictEqual(side.bestPrice, prices[0]);
+    assert.strictEqual(side.bestQuantity, reference.get(prices[0]));
+});
+
+test('buffers diffs, drops those in the snapshot and goes live on the bridging diff', async () => {
+    const { engine, stream, scheduler } = createEngine();
+    scheduler.snapshots.push(snapshot(100));
+
+    const metrics = engine.getMetrics('BTCUSDT', { timeout: 200 });
+    stream.emit(diff(95, 99));                         // already in the snapshot
+    stream.emit(diff(100, 103, [['100', '5']]));       // spans lastUpdateId + 1
+
+    const result = await metrics;
+    assert.ok(result, 'book should be live');
+    assert.strictEqual(result.bestBid, 100);
+    assert.strictEqual(result.bestBidQuantity, 5);
+    assert.strictEqual(result.bestAsk, 101);
+    assert.strictEqual(result.lastUpdateId, 103);
+    assert.strictEqual(scheduler.requests, 1);
+
+    // Live diffs apply in sequence; a zero quantity removes the level
+    stream.emit(diff(104, 104, [['100.5', '1']], [['101', '0']]));
+    const book = engine.books.get('BTCUSDT').book;
+    assert.strictEqual(book.bestBid, 100.5);
+    assert.strictEqual(book.bestAsk, 102);
+    assert.strictEqual(engine.getStats().live, 1);
+    dispose(engine);
+});
+
+test('a gap in a live book resyncs from a new snapshot', async () => {
+    const { engine, stream, scheduler } = createEngine();
+    scheduler.snapshots.push(snapshot(100));
+    engine.watch('BTCUSDT');
+    stream.emit(diff(100, 101));
+    await sleep(5);
+    assert.strictEqual(engine.books.get('BTCUSDT').status, 'live');
+
+    scheduler.snapshots.push(snapshot(110));
+    stream.emit(diff(105, 111, [['99.5', '4']]));      // 102-104 were missed
+    const state = engine.books.get('BTCUSDT');
+    assert.strictEqual(engine.stats.gaps, 1);
+    assert.strictEqual(engine.stats.resyncs, 1);
+    assert.notStrictEqual(state.status, 'live');
+
+    await sleep(5);
+    assert.strictEqual(state.status, 'live');
+    assert.strictEqual(state.book.lastUpdateId, 111);
+    assert.strictEqual(state.book.bids.count, 4);
+    dispose(engine);
+});
+
+test('a snapshot older than the buffered stream is retried', async () => {
+    const { engine, stream, scheduler } = createEngine();
+    scheduler.snapshots.push(snapshot(100), snapshot(120));
+    engine.watch('BTCUSDT');
+    stream.emit(diff(110, 115));                       // 101-109 not covered by snapshot 100
+    await sleep(1);
+    assert.strictEqual(engine.books.get('BTCUSDT').status, 'syncing');
+
+    stream.emit(diff(116, 121));
+    await sleep(20);
+    assert.strictEqual(scheduler.requests, 2);
+    assert.strictEqual(engine.books.get('BTCUSDT').status, 'live');
+    dispose(engine);
+});
+
+test('snapshot retries stop once the symbol is unwatched', async () => {
+    const { engine, stream, scheduler } = createEngine();
+    engine.watch('BTCUSDT');
+    stream.emit(diff(1, 2));                           // snapshot request fails (503)
+    await sleep(1);
+    engine.unwatch('BTCUSDT');
+    await sleep(20);
+    assert.strictEqual(scheduler.requests, 1);
+    dispose(engine);
+});
+
+test('getMetrics does not wait when asked not to', async () => {
+    const { engine } = createEngine();
+    const started = Date.now();
+    assert.strictEqual(await engine.getMetrics('ETHUSDT', { timeout: 0 }), null);
+    assert.ok(Date.now() - started < 50);
+    dispose(engine);
+});
+
+run();
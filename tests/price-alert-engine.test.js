@@ -0,0 +1,122 @@
+// 🔔 PriceAlertEngine - sorted threshold search and batching
+const assert = require('assert');
+const { load, test, run, random, quiet } = require('./helpers');
+
+quiet();
+load('price-alert-engine.js');
+
+const toSymbol = coinId => ({ bitcoin: 'BTCUSDT', ethereum: 'ETHUSDT' })[coinId];
+
+function collect(engine) {
+    const fired = [];
+    engine.onTrigger = batch => fired.push(...batch);
+    return fired;
+}
+
+test('boundary searches find where the reached tail starts', () => {
+    const ascending = [1, 2, 2, 3, 5].map(threshold => ({ threshold }));
+    const descending = [...ascending].reverse();
+    assert.strictEqual(PriceAlertEngine.firstAtOrAbove(ascending, 2), 1);
+    assert.strictEqual(PriceAlertEngine.firstAtOrAbove(ascending, 9), 5);
+    assert.strictEqual(PriceAlertEngine.firstAtOrBelow(descending, 2), 2);
+    assert.strictEqual(PriceAlertEngine.firstAtOrBelow(descending, 0), 5);
+    assert.strictEqual(PriceAlertEngine.firstAtOrBelow(descending, 9), 0);
+});
+
+test('a tick fires exactly the alerts a linear scan would, once each', () => {
+    const next = random(7);
+    const alerts = [];
+    for (let i = 0; i < 2000; i++) {
+        alerts.push({ id: i, coinId: 'bitcoin', condition: next() < 0.5 ? 'above' : 'below', value: 40000 + Math.round(next() * 20000) });
+    }
+
+    const engine = new PriceAlertEngine();
+    const fired = collect(engine);
+    engine.load(alerts, toSymbol);
+
+    let remaining = alerts;
+    for (const price of [50000, 52500, 47000, 50000, 61000, 39000]) {
+        const expected = remaining.filter(alert =>
+            (alert.condition === 'above' && price >= alert.value) ||
+            (alert.condition === 'below' && price <= alert.value));
+        remaining = remaining.filter(alert => !expected.includes(alert));
+
+        fired.length = 0;
+        engine.evaluate({ symbol: 'BTCUSDT', price });
+        engine.flush();
+        assert.deepStrictEqual(fired.map(entry => entry.alert.id).sort((a, b) => a - b),
+            expected.map(alert => alert.id).sort((a, b) => a - b), `price ${price}`);
+    }
+
+    assert.strictEqual(remaining.length, 0);
+    assert.strictEqual(engine.getStats().active, 0);
+    assert.strictEqual(engine.symbols().length, 0);
+});
+
+test('change alerts compare |24h change| and ignore the threshold sign', () => {
+    const engine = new PriceAlertEngine();
+    const fired = collect(engine);
+    engine.load([
+        { id: 'up', coinId: 'ethereum', condition: 'change', value: 5 },
+        { id: 'negative', coinId: 'ethereum', condition: 'change', value: -8 }
+    ], toSymbol);
+
+    engine.evaluate({ symbol: 'ETHUSDT', price: 3000, changePercent: -6 });
+    engine.flush();
+    assert.deepStrictEqual(fired.map(entry => entry.alert.id), ['up']);
+
+    engine.evaluate({ symbol: 'ETHUSDT', price: 3000 });
+    engine.evaluate({ symbol: 'ETHUSDT', price: 3000, changePercent: 9 });
+    engine.flush();
+    assert.deepStrictEqual(fired.map(entry => entry.alert.id), ['up', 'negative']);
+});
+
+test('zero, invalid, triggered and unmapped alerts are not indexed', () => {
+    const engine = new PriceAlertEngine();
+    engine.load([
+        { coinId: 'bitcoin', condition: 'change', value: 0 },
+        { coinId: 'bitcoin', condition: 'above', value: 'abc' },
+        { coinId: 'bitcoin', condition: 'sideways', value: 5 },
+        { coinId: 'bitcoin', condition: 'above', value: 1, triggered: true },
+        { coinId: 'dogecoin', condition: 'above', value: 1 }
+    ], toSymbol);
+    assert.strictEqual(engine.getStats().active, 0);
+});
+
+test('an index rebuild while a batch is pending does not re-arm the fired alert', async () => {
+    const engine = new PriceAlertEngine({ batchDelay: 10 });
+    const batches = [];
+    engine.onTrigger = batch => batches.push(batch);
+    const alerts = [{ coinId: 'bitcoin', condition: 'above', value: 100 }];
+    engine.load(alerts, toSymbol);
+
+    engine.evaluate({ symbol: 'BTCUSDT', price: 150 });
+    assert.strictEqual(alerts[0].triggered, true);
+    engine.load(alerts, toSymbol);                      // e.g. the alert list was saved meanwhile
+    engine.evaluate({ symbol: 'BTCUSDT', price: 151 });
+    await new Promise(resolve => setTimeout(resolve, 30));
+
+    assert.strictEqual(batches.length, 1);
+    assert.strictEqual(batches[0].length, 1);
+    assert.strictEqual(engine.stats.fired, 1);
+});
+
+test('alerts fired close together are delivered as one batch', async () => {
+    const engine = new PriceAlertEngine({ batchDelay: 10 });
+    const batches = [];
+    engine.onTrigger = batch => batches.push(batch);
+    engine.load([
+        { coinId: 'bitcoin', condition: 'above', value: 100 },
+        { coinId: 'ethereum', condition: 'below', value: 50 }
+    ], toSymbol);
+
+    engine.evaluate({ symbol: 'BTCUSDT', price: 150 });
+    engine.evaluate({ symbol: 'ETHUSDT', price: 40 });
+    await new Promise(resolve => setTimeout(resolve, 30));
+
+    assert.strictEqual(batches.length, 1);
+    assert.strictEqual(batches[0].length, 2);
+    assert.strictEqual(batches[0][0].price, 150);
+});
+
+run();
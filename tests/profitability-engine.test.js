@@ -0,0 +1,82 @@
+// 💰 ProfitabilityEngine - columnar screener vs the scalar scoring path
+const assert = require('assert');
+const { load, test, run, random, quiet } = require('./helpers');
+
+quiet();
+load('symbol-resolver.js', 'profitability-engine.js');
+
+function tickers(count, seed) {
+    const next = random(seed);
+    const rows = [];
+    for (let i = 0; i < count; i++) {
+        const price = Math.exp((next() - 0.7) * 15);
+        const hasRange = next() > 0.1;
+        rows.push({
+            symbol: `C${i}USDT`,
+            lastPrice: String(price),
+            priceChangePercent: String((next() - 0.5) * 40),
+            quoteVolume: String(Math.exp(next() * 24)),
+            highPrice: hasRange ? String(price * (1 + next() * 0.2)) : '0',
+            lowPrice: hasRange ? String(price * (1 - next() * 0.2)) : '0'
+        });
+    }
+    return rows;
+}
+
+test('scoreColumns matches calculateProfitabilityScore row for row', () => {
+    const engine = new ProfitabilityEngine();
+    const columns = engine.buildScreenerColumns(tickers(3000, 11), { minQuoteVolume: 0 });
+    const { score, ratio } = engine.scoreColumns(columns);
+
+    for (let i = 0; i < columns.count; i++) {
+        const marketData = engine.screenerMarketData(columns, i);
+        const profitability = engine.calculateProfitabilityScore(engine.quickTechnicalAnalysis(marketData), marketData, 'mixed');
+        assert.strictEqual(score[i], profitability.score, `${columns.symbols[i]} score`);
+        assert.strictEqual(ratio[i], profitability.riskReward.ratio, `${columns.symbols[i]} ratio`);
+    }
+});
+
+test('screenMarket returns the top opportunities by priority, above the volume floor', () => {
+    const engine = new ProfitabilityEngine();
+    const rows = tickers(3000, 5);
+    const opportunities = engine.screenMarket(rows, { limit: 5 });
+
+    assert.ok(opportunities.length > 0);
+    const floor = engine.opportunityThresholds.minimumQuoteVolume;
+    opportunities.forEach((opportunity, i) => {
+        assert.ok(opportunity.marketData.volume_24h >= floor);
+        if (i > 0) assert.ok(opportunity.priority <= opportunities[i - 1].priority);
+    });
+});
+
+test('stablecoins, leveraged tokens and other quotes are skipped', () => {
+    const engine = new ProfitabilityEngine();
+    const row = symbol => ({ symbol, lastPrice: '1', priceChangePercent: '1', quoteVolume: '5000000', highPrice: '1.1', lowPrice: '0.9' });
+    const columns = engine.buildScreenerColumns([
+        row('USDCUSDT'), row('BTCUPUSDT'), row('ETHBEARUSDT'), row('BNBDOWNUSDT'), row('ETHBTC'), row('SOLUSDT')
+    ]);
+    assert.deepStrictEqual(columns.symbols, ['SOLUSDT']);
+});
+
+test('bases that merely end in UP/DOWN/BULL/BEAR are not taken for leveraged tokens', () => {
+    const engine = new ProfitabilityEngine();
+    const row = symbol => ({ symbol, lastPrice: '1', priceChangePercent: '1', quoteVolume: '5000000', highPrice: '1.1', lowPrice: '0.9' });
+    const columns = engine.buildScreenerColumns([row('JUPUSDT'), row('SYRUPUSDT'), row('PUPUSDT')]);
+    assert.deepStrictEqual(columns.symbols, ['JUPUSDT', 'SYRUPUSDT', 'PUPUSDT']);
+
+    // The path scanProfitabilityOpportunities(['jupiter']) takes
+    const symbols = ['jupiter'].map(coinId => symbolResolver.toBinanceSymbol(coinId));
+    const screened = engine.buildScreenerColumns([row('JUPUSDT'), row('SOLUSDT')], { symbols });
+    assert.deepStrictEqual(screened.symbols, ['JUPUSDT']);
+});
+
+test('formatPrice keeps sub-cent prices readable', () => {
+    const engine = new ProfitabilityEngine();
+    assert.strictEqual(engine.formatPrice(0.00001234), '0.00001234');
+    assert.strictEqual(engine.formatPrice(0.5), '0.5');
+    assert.strictEqual(engine.formatPrice(12.3456789), '12.3457');
+    assert.strictEqual(engine.formatPrice(65000.123), '65000.12');
+    assert.strictEqual(engine.formatPrice(undefined), undefined);
+});
+
+run();
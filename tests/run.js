@@ -0,0 +1,16 @@
+// 🧪 Run every tests/*.test.js in its own Node process: node tests/run.js
+const { spawnSync } = require('child_process');
+const fs = require('fs');
+const path = require('path');
+
+const files = fs.readdirSync(__dirname).filter(file => file.endsWith('.test.js')).sort();
+let failed = 0;
+
+for (const file of files) {
+    console.log(file);
+    const result = spawnSync(process.execPath, [path.join(__dirname, file)], { stdio: 'inherit' });
+    if (result.status !== 0) failed++;
+}
+
+console.log(failed > 0 ? `❌ ${failed} of ${files.length} test files failed` : `✅ ${files.length} test files passed`);
+process.exit(failed > 0 ? 1 : 0);